@@ -0,0 +1,96 @@
+"""composite and partial indexes for the hot props / odds reads
+
+Revision ID: b7e1d4c2a9f3
+Revises: f2a7c9e1b4d2
+Create Date: 2026-10-19 09:00:00.000000
+
+Access paths (scripts/bench_hot_queries.py measures each before / after):
+
+  * get_canonical_props — unified_odds by sport + game-time window, player markets only,
+    probing ev_signals on six columns for true_prob / edge_percent
+  * GET /api/props/live — props_live by sport (+ market), newest first, LIMIT n
+  * CLVEngine._execute_sharp_consensus — unified_odds by (event_id, market_key,
+    outcome_key), reading bookmaker / implied_prob only
+
+INCLUDE columns are Postgres-only (11+); SQLite gets the same keys and predicates.
+On Postgres the indexes are built CONCURRENTLY so the live tables stay writable.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e1d4c2a9f3"
+down_revision: Union[str, Sequence[str], None] = "f2a7c9e1b4d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TEAM_MARKETS = "('h2h', 'spreads', 'totals')"
+
+INDEXES = [
+    {
+        "name": "ix_unified_odds_props_sport_game_time",
+        "table": "unified_odds",
+        "columns": ["sport", "game_time"],
+        "where": f"market_key NOT IN {TEAM_MARKETS}",
+    },
+    {
+        "name": "ix_ev_signals_odds_join",
+        "table": "ev_signals",
+        "columns": ["event_id", "sport", "player_name", "market_key", "outcome_key", "bookmaker"],
+        "include": ["true_prob", "edge_percent"],
+    },
+    {
+        "name": "ix_props_live_props_sport_updated",
+        "table": "props_live",
+        "columns": ["sport", "last_updated_at DESC"],
+        "where": f"market_key NOT IN {TEAM_MARKETS}",
+    },
+    {
+        "name": "ix_props_live_sport_market_updated",
+        "table": "props_live",
+        "columns": ["sport", "market_key", "last_updated_at DESC"],
+    },
+    {
+        "name": "ix_unified_odds_consensus",
+        "table": "unified_odds",
+        "columns": ["event_id", "market_key", "outcome_key"],
+        "include": ["bookmaker", "implied_prob"],
+        "where": "implied_prob IS NOT NULL",
+    },
+]
+
+
+def create_index_sql(spec: dict, dialect: str) -> str:
+    pg = dialect == "postgresql"
+    sql = (
+        f"CREATE INDEX {'CONCURRENTLY ' if pg else ''}IF NOT EXISTS {spec['name']} "
+        f"ON {spec['table']} ({', '.join(spec['columns'])})"
+    )
+    if pg and spec.get("include"):
+        sql += f" INCLUDE ({', '.join(spec['include'])})"
+    if spec.get("where"):
+        sql += f" WHERE {spec['where']}"
+    return sql
+
+
+def drop_index_sql(spec: dict, dialect: str) -> str:
+    return f"DROP INDEX {'CONCURRENTLY ' if dialect == 'postgresql' else ''}IF EXISTS {spec['name']}"
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    with op.get_context().autocommit_block():
+        for spec in INDEXES:
+            op.execute(create_index_sql(spec, dialect))
+        if dialect == "postgresql":
+            op.execute("ANALYZE unified_odds, ev_signals, props_live")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    with op.get_context().autocommit_block():
+        for spec in reversed(INDEXES):
+            op.execute(drop_index_sql(spec, dialect))
@@ -1,6 +1,5 @@
 import os
-import httpx
-from jose import jwt
+from api_utils.jwt_verifier import JWTVerifier, TokenUnverifiable
 from fastapi import HTTPException, Security, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
@@ -14,48 +13,19 @@ CLERK_AUDIENCE = os.getenv("CLERK_AUDIENCE") # optional
 
 class ClerkAuth:
     def __init__(self):
-        self.jwks = None
-
-    async def get_jwks(self):
-        if not self.jwks:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(CLERK_JWKS_URL)
-                if resp.status_code == 200:
-                    self.jwks = resp.json()
-                else:
-                    raise Exception(f"Failed to fetch JWKS from {CLERK_JWKS_URL}")
-        return self.jwks
+        # Verified locally against a cached JWKS (periodic refresh + refetch on unknown kid).
+        self.verifier = JWTVerifier(
+            jwks_url=CLERK_JWKS_URL,
+            audience=CLERK_AUDIENCE,
+            jwks_ttl_seconds=int(os.getenv("AUTH_JWKS_TTL_SECONDS", "600")),
+        )
 
     async def verify_token(self, credentials: HTTPAuthorizationCredentials = Security(security)):
         token = credentials.credentials
         try:
-            jwks = await self.get_jwks()
-            # In a production environment, you should use jose.jwt.decode with the JWKS
-            # Clerk tokens are standard JWTs
-            unverified_header = jwt.get_unverified_header(token)
-            rsa_key = {}
-            for key in jwks["keys"]:
-                if key["kid"] == unverified_header["kid"]:
-                    rsa_key = {
-                        "kty": key["kty"],
-                        "kid": key["kid"],
-                        "use": key["use"],
-                        "n": key["n"],
-                        "e": key["e"]
-                    }
-                    break
-            
-            if rsa_key:
-                payload = jwt.decode(
-                    token,
-                    rsa_key,
-                    algorithms=["RS256"],
-                    audience=CLERK_AUDIENCE,
-                    options={"verify_at_hash": False}
-                )
-                return payload
-            
-            raise HTTPException(status_code=401, detail="Invalid token header")
+            return await self.verifier.verify(token)
+        except TokenUnverifiable as e:
+            raise HTTPException(status_code=401, detail=f"Invalid token header: {e}")
         except Exception as e:
             raise HTTPException(status_code=401, detail=f"Unauthorized: {str(e)}")
 
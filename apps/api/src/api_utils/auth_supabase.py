@@ -1,11 +1,66 @@
-import os
+import asyncio
+import logging
 from typing import Optional
 from fastapi import HTTPException, Security, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from api_utils.supabase_proxy import supabase
+from api_utils.jwt_verifier import (
+    TokenInvalid,
+    TokenUnverifiable,
+    VerifiedUser,
+    supabase_verifier,
+)
+
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer(auto_error=False)
 
+
+async def _remote_get_user(token: str):
+    """Supabase Auth API lookup (sync client) run off the event loop."""
+    loop = asyncio.get_running_loop()
+    sb_response = await loop.run_in_executor(None, lambda: supabase.auth.get_user(token))
+
+    # In supabase-py, get_user returns a response with .user and .error
+    # or it might throw depending on the version.
+    if hasattr(sb_response, 'user') and sb_response.user:
+        return sb_response.user
+
+    # Fallback for dict-based responses if applicable
+    if isinstance(sb_response, dict) and 'user' in sb_response:
+        return sb_response['user']
+    return None
+
+
+async def resolve_supabase_user(token: str):
+    """
+    Verify a Supabase access token and return the user (or None).
+
+    Tokens are verified locally (JWT secret / cached JWKS) and memoized until expiry;
+    only token formats we cannot verify locally fall back to the Supabase Auth API.
+    """
+    try:
+        return VerifiedUser.from_claims(await supabase_verifier.verify(token))
+    except TokenInvalid as e:
+        logger.info("Supabase token rejected locally: %s", e)
+        return None
+    except TokenUnverifiable as e:
+        logger.debug("Local JWT verification unavailable (%s); using Supabase Auth API", e)
+
+    remembered = supabase_verifier.recall(token)
+    if remembered is not None:
+        return remembered
+
+    try:
+        user = await _remote_get_user(token)
+    except Exception as e:
+        logger.warning("Supabase auth error: %s", e)
+        return None
+    if user is not None:
+        supabase_verifier.remember(token, user)
+    return user
+
+
 async def get_current_user_supabase(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
     """
     FastAPI dependency to verify Supabase JWT token and return user info.
@@ -13,22 +68,6 @@ async def get_current_user_supabase(credentials: Optional[HTTPAuthorizationCrede
     """
     if not credentials:
         return None
-        
-    token = credentials.credentials
-    try:
-        # Verify token via Supabase Auth API
-        sb_response = supabase.auth.get_user(token)
-        
-        # In supabase-py, get_user returns a response with .user and .error
-        # or it might throw depending on the version.
-        if hasattr(sb_response, 'user') and sb_response.user:
-            return sb_response.user
-        
-        # Fallback for dict-based responses if applicable
-        if isinstance(sb_response, dict) and 'user' in sb_response:
-            return sb_response['user']
-            
-    except Exception as e:
-        print(f"Supabase auth error: {e}")
-        
-    return None # Return None instead of raising 401 to handle public access
+
+    # Return None instead of raising 401 to handle public access
+    return await resolve_supabase_user(credentials.credentials)
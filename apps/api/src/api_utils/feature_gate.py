@@ -8,12 +8,9 @@ import hmac, hashlib, os, json
 
 router = APIRouter(prefix='/webhooks', tags=['webhooks'])
 
-WHOP_SECRET = os.getenv('WHOP_WEBHOOK_SECRET')
+from services.entitlements import PRO_FEATURES, Entitlements, entitlement_resolver
 
-PRO_FEATURES = [
-    'kelly_sizing', 'smart_money_signal', 'sgp_builder', 'whale_watcher',
-    'clv_tracker', 'alternate_lines', 'kalshi_crossref', 'api_access'
-]
+WHOP_SECRET = os.getenv('WHOP_WEBHOOK_SECRET')
 
 def verify_whop_signature(payload: bytes, signature: str) -> bool:
     expected = hmac.new(WHOP_SECRET.encode(), payload, hashlib.sha256).hexdigest()
@@ -41,8 +38,11 @@ async def whop_webhook(request: Request, db: Session = Depends(get_db)):
         user.tier = 'free'
         user.whop_active = False
     db.commit()
+    entitlement_resolver.invalidate(email=user_email, user_key=getattr(user, 'auth_id', None))
     return {'status': 'updated', 'user': user_email, 'tier': user.tier}
 
-def require_pro(user_tier: str, feature: str):
-    if feature in PRO_FEATURES and user_tier not in ['pro', 'enterprise']:
+def require_pro(user_tier, feature: str):
+    """Raise 403 unless the tier (or resolved Entitlements) unlocks ``feature``."""
+    ents = user_tier if isinstance(user_tier, Entitlements) else Entitlements(tier=(user_tier or 'free').lower())
+    if not ents.allows(feature):
         raise HTTPException(status_code=403, detail=f'{feature} requires Pro plan')
@@ -0,0 +1,251 @@
+"""
+Local JWT verification for Supabase / Clerk bearer tokens.
+
+Verifies tokens in-process instead of calling the auth provider per request:
+  1. HS256 tokens are checked against SUPABASE_JWT_SECRET.
+  2. RS256 / ES256 tokens are checked against a cached JWKS that is refreshed
+     periodically and re-fetched when an unknown ``kid`` shows up (key rotation).
+  3. Verified claims are memoized per token until ``exp`` in a bounded LRU.
+
+Tokens we cannot verify locally (no secret configured, unknown algorithm, JWKS
+unreachable) raise ``TokenUnverifiable`` so callers can fall back to the remote
+provider call; tokens that fail verification raise ``TokenInvalid``.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import httpx
+from jose import jwt
+from jose.exceptions import JWTError
+
+logger = logging.getLogger(__name__)
+
+_ASYMMETRIC_ALGS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+
+class TokenUnverifiable(Exception):
+    """Token format/keys are not available for local verification."""
+
+
+class TokenInvalid(Exception):
+    """Token was checked locally and rejected (bad signature, expired, wrong audience)."""
+
+
+@dataclass
+class VerifiedUser:
+    """Minimal user view built from verified JWT claims.
+
+    Exposes both attribute access (like the supabase-py ``User`` model) and
+    ``.get()`` so existing ``user.email`` / ``user.get("id")`` call sites keep working.
+    """
+
+    id: Optional[str]
+    email: Optional[str] = None
+    role: Optional[str] = None
+    user_metadata: Dict[str, Any] = field(default_factory=dict)
+    app_metadata: Dict[str, Any] = field(default_factory=dict)
+    claims: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> "VerifiedUser":
+        return cls(
+            id=claims.get("sub"),
+            email=claims.get("email"),
+            role=claims.get("role"),
+            user_metadata=dict(claims.get("user_metadata") or claims.get("public_metadata") or {}),
+            app_metadata=dict(claims.get("app_metadata") or {}),
+            claims=claims,
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in ("id", "email", "role", "user_metadata", "app_metadata"):
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.claims.get(key, default)
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of token-hash -> value, each entry expiring at its own deadline."""
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._store: "OrderedDict[str, tuple[Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Any]:
+        key = self._key(token)
+        entry = self._store.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if time.time() >= expires_at:
+            del self._store[key]
+            self.misses += 1
+            return None
+        self._store.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, token: str, value: Any, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        key = self._key(token)
+        self._store[key] = (value, expires_at)
+        self._store.move_to_end(key)
+        while len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class JWKSCache:
+    """JWKS fetched once, refreshed every ``ttl_seconds``, re-fetched on unknown ``kid``."""
+
+    def __init__(self, url: Optional[str], ttl_seconds: int = 600, min_refetch_seconds: int = 30):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.min_refetch_seconds = min_refetch_seconds
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _refresh(self) -> None:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            resp = await client.get(self.url)
+        if resp.status_code != 200:
+            raise RuntimeError(f"JWKS fetch failed ({resp.status_code}) from {self.url}")
+        keys = resp.json().get("keys") or []
+        self._keys = {k["kid"]: k for k in keys if k.get("kid")}
+        self._fetched_at = time.time()
+        logger.info("JWKS refreshed from %s (%d keys)", self.url, len(self._keys))
+
+    async def get_key(self, kid: str) -> Dict[str, Any]:
+        if not self.url:
+            raise TokenUnverifiable("JWKS URL not configured")
+
+        age = time.time() - self._fetched_at
+        stale = age >= self.ttl_seconds
+        kid_miss = kid not in self._keys
+        if stale or (kid_miss and age >= self.min_refetch_seconds):
+            async with self._lock:
+                # Another waiter may have refreshed while we queued on the lock.
+                age = time.time() - self._fetched_at
+                if age >= self.ttl_seconds or (kid not in self._keys and age >= self.min_refetch_seconds):
+                    try:
+                        await self._refresh()
+                    except Exception as e:
+                        if not self._keys:
+                            raise TokenUnverifiable(f"JWKS unavailable: {e}") from e
+                        logger.warning("JWKS refresh failed, keeping cached keys: %s", e)
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise TokenInvalid(f"Unknown signing key id: {kid}")
+        return key
+
+
+class JWTVerifier:
+    """Verifies bearer JWTs locally with per-token claim memoization."""
+
+    def __init__(
+        self,
+        *,
+        hs_secret: Optional[str] = None,
+        jwks_url: Optional[str] = None,
+        audience: Optional[str] = None,
+        cache_size: int = 10_000,
+        jwks_ttl_seconds: int = 600,
+    ):
+        self.hs_secret = hs_secret
+        self.audience = audience
+        self.jwks = JWKSCache(jwks_url, ttl_seconds=jwks_ttl_seconds)
+        self.cache = VerifiedTokenCache(maxsize=cache_size)
+        self.remote_cache = VerifiedTokenCache(maxsize=max(1, cache_size // 10))
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """Return verified claims or raise ``TokenInvalid`` / ``TokenUnverifiable``."""
+        cached = self.cache.get(token)
+        if cached is not None:
+            return cached
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError as e:
+            raise TokenUnverifiable(f"Not a JWT: {e}") from e
+
+        alg = (header.get("alg") or "").upper()
+        options = {"verify_aud": bool(self.audience), "verify_at_hash": False}
+        try:
+            if alg == "HS256":
+                if not self.hs_secret:
+                    raise TokenUnverifiable("HS256 token but no JWT secret configured")
+                claims = jwt.decode(token, self.hs_secret, algorithms=["HS256"], audience=self.audience, options=options)
+            elif alg in _ASYMMETRIC_ALGS and header.get("kid"):
+                key = await self.jwks.get_key(header["kid"])
+                claims = jwt.decode(token, key, algorithms=[alg], audience=self.audience, options=options)
+            else:
+                raise TokenUnverifiable(f"Unsupported token alg={alg or 'none'}")
+        except JWTError as e:
+            raise TokenInvalid(str(e)) from e
+
+        exp = claims.get("exp")
+        if exp:
+            self.cache.set(token, claims, float(exp))
+        return claims
+
+    def recall(self, token: str) -> Optional[Any]:
+        """Return a memoized remote-verification result for ``token``, if still fresh."""
+        return self.remote_cache.get(token)
+
+    def remember(self, token: str, value: Any, ttl_seconds: int = 60) -> None:
+        """Memoize a remotely-verified result, bounded by the token's own ``exp`` when readable."""
+        expires_at = time.time() + ttl_seconds
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+            if exp:
+                expires_at = min(expires_at, float(exp))
+        except JWTError:
+            pass
+        self.remote_cache.set(token, value, expires_at)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached_tokens": len(self.cache),
+            "cached_remote_users": len(self.remote_cache),
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "jwks_keys": len(self.jwks._keys),
+        }
+
+
+def _supabase_jwks_url() -> Optional[str]:
+    explicit = (os.getenv("SUPABASE_JWKS_URL") or "").strip()
+    if explicit:
+        return explicit
+    base = (os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL") or "").strip().rstrip("/")
+    return f"{base}/auth/v1/.well-known/jwks.json" if base else None
+
+
+supabase_verifier = JWTVerifier(
+    hs_secret=(os.getenv("SUPABASE_JWT_SECRET") or "").strip() or None,
+    jwks_url=_supabase_jwks_url(),
+    audience=(os.getenv("SUPABASE_JWT_AUDIENCE") or "authenticated").strip() or None,
+    cache_size=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")),
+    jwks_ttl_seconds=int(os.getenv("AUTH_JWKS_TTL_SECONDS", "600")),
+)
@@ -1,29 +1,18 @@
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, status, Depends, Request
 from models.user import User
 from routers.auth import get_current_user
-
-# Rank-based access control
-TIER_RANK = {
-    "free": 0,
-    "pro": 1,
-    "elite": 2,
-    "admin": 3
-}
+from services.entitlements import TIER_RANK, entitlement_resolver, request_entitlements
 
 def require_tier(min_tier: str):
     """
     FastAPI dependency that ensures the current user has at least the required tier.
     Admin users bypass all checks.
     """
-    async def tier_dependency(current_user: User = Depends(get_current_user)):
-        # Admin bypass (role-based)
-        if current_user.is_admin or current_user.role == "admin":
-            return current_user
-            
-        user_tier = (current_user.subscription_tier or "free").lower()
-        
-        # Check rank vs requirement
-        if TIER_RANK.get(user_tier, 0) < TIER_RANK.get(min_tier.lower(), 0):
+    async def tier_dependency(request: Request, current_user: User = Depends(get_current_user)):
+        ents = await request_entitlements(request, lambda: entitlement_resolver.for_user(current_user))
+
+        # Admin bypass (role-based) and rank vs requirement
+        if not (ents.is_owner or ents.has_tier(min_tier)):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"This feature requires a {min_tier.capitalize()} subscription."
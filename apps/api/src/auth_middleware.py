@@ -43,29 +43,24 @@ async def require_auth(credentials: HTTPAuthorizationCredentials = Depends(secur
         logger.warning(f"Auth failed: {e}")
         raise HTTPException(status_code=401, detail=str(e))
 
-async def require_pro(user=Depends(require_auth)):
-    """FastAPI dependency to verify Pro plan or higher/bypass."""
+async def _require_tier(user, minimum: str, message: str):
     from core.config import settings
-    if settings.BYPASS_AUTH or user.get("email", "").lower() in OWNER_EMAILS:
+    from services.entitlements import entitlement_resolver
+    if settings.BYPASS_AUTH:
         return user
-    if user.get("plan", "free") not in ("pro", "premium", "elite", "syndicate", "admin"):
-        raise HTTPException(status_code=403, detail="Pro subscription required.")
+    ents = await entitlement_resolver.for_user(user)
+    if not (ents.is_owner or ents.has_tier(minimum)):
+        raise HTTPException(status_code=403, detail=message)
     return user
 
+async def require_pro(user=Depends(require_auth)):
+    """FastAPI dependency to verify Pro plan or higher/bypass."""
+    return await _require_tier(user, "pro", "Pro subscription required.")
+
 async def require_elite(user=Depends(require_auth)):
     """FastAPI dependency to verify Elite plan or higher/bypass."""
-    from core.config import settings
-    if settings.BYPASS_AUTH or user.get("email", "").lower() in OWNER_EMAILS:
-        return user
-    if user.get("plan", "free") not in ("elite", "syndicate", "admin"):
-        raise HTTPException(status_code=403, detail="Elite subscription required.")
-    return user
+    return await _require_tier(user, "elite", "Elite subscription required.")
 
 async def require_syndicate(user=Depends(require_auth)):
     """FastAPI dependency to verify Syndicate plan or higher/bypass."""
-    from core.config import settings
-    if settings.BYPASS_AUTH or user.get("email", "").lower() in OWNER_EMAILS:
-        return user
-    if user.get("plan", "free") not in ("syndicate", "admin"):
-        raise HTTPException(status_code=403, detail="Syndicate subscription required.")
-    return user
+    return await _require_tier(user, "syndicate", "Syndicate subscription required.")
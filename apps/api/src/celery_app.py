@@ -26,3 +26,6 @@ celery_app.conf.update(
 # Load the tiered schedule from the config
 from workers.celery_schedule import CELERYBEAT_SCHEDULE
 celery_app.conf.beat_schedule = CELERYBEAT_SCHEDULE
+
+# One persistent event loop per worker process (worker_process_init / _shutdown hooks)
+import workers.runtime  # noqa: E402,F401
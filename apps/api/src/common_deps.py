@@ -1,52 +1,22 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 logger = logging.getLogger(__name__)
-from fastapi import Header, HTTPException, Depends
-from services.auth_service import auth_service
+from fastapi import Header, HTTPException, Depends, Request
 from db.session import get_async_db, get_db
-from models.user import UserOverride
-from sqlalchemy.future import select
-from datetime import datetime, timezone
-import os
-from core.config import settings
+from services.entitlements import Entitlements, entitlement_resolver, request_entitlements
 
-OWNER_EMAILS = os.getenv("OWNER_EMAILS", "").split(",")
-
-async def get_user_tier(
+async def get_entitlements(
+    request: Request,
     authorization: str = Header(None),
     db: AsyncSession = Depends(get_db)
-) -> str:
-    if settings.DEVELOPMENT_MODE:
-        return "elite"
-        
-    if not authorization:
-        return "free"
-    
-    try:
-        token = authorization.replace("Bearer ", "")
-        payload = auth_service.decode_access_token(token)
-        if not payload:
-            return "free"
-            
-        email = payload.get("email", "")
-        if email and (
-            email.lower() in [e.lower() for e in OWNER_EMAILS if e] or 
-            email.lower() == "dev@perplex.ai"
-        ):
-            return "elite"
-            
-        now = datetime.now(timezone.utc)
-        stmt = select(UserOverride).where(UserOverride.email == email).where(
-            (UserOverride.expires_at == None) | (UserOverride.expires_at > now)
-        )
-        result = await db.execute(stmt)
-        override = result.scalar_one_or_none()
-        if override:
-            return override.tier.lower()
-            
-        return payload.get("tier", "free").lower()
-    except Exception:
-        return "free"
+) -> Entitlements:
+    """Request-scoped entitlements for the bearer token (resolved once, cached per user)."""
+    token = authorization.replace("Bearer ", "") if authorization else None
+    return await request_entitlements(request, lambda: entitlement_resolver.for_token(token, db))
+
+
+async def get_user_tier(ents: Entitlements = Depends(get_entitlements)) -> str:
+    return ents.tier
 
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
@@ -57,18 +27,9 @@ security = HTTPBearer(auto_error=False)
 async def get_current_user_supabase(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
     if not credentials:
         return None
-    
-    from api_utils.supabase_proxy import supabase
-    token = credentials.credentials
-    try:
-        sb_response = supabase.auth.get_user(token)
-        if hasattr(sb_response, 'user') and sb_response.user:
-            return sb_response.user
-        if isinstance(sb_response, dict) and 'user' in sb_response:
-            return sb_response['user']
-    except Exception as e:
-        logger.warning(f"Supabase auth error in common_deps: {e}")
-    return None
+
+    from api_utils.auth_supabase import resolve_supabase_user
+    return await resolve_supabase_user(credentials.credentials)
 
 def require_elite(tier: str = Depends(get_user_tier)):
     if tier != "elite":
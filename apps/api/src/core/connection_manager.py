@@ -3,11 +3,20 @@ from fastapi import WebSocket
 import json
 import asyncio
 import logging
+import time
 import redis.asyncio as redis
 from core.config import settings
+from services.metrics_registry import registry
 
 logger = logging.getLogger(__name__)
 
+WS_CONNECTIONS = registry.gauge("ws_connections", "Open websocket connections on this process")
+WS_SEND_SECONDS = registry.histogram(
+    "ws_send_seconds", "Websocket fan-out latency per message", ("kind",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+WS_SEND_FAILURES = registry.counter("ws_send_failures", "Websocket sends that failed (connection dropped)", ("kind",))
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, Set[WebSocket]] = {}  # user_id -> set of websockets
@@ -18,19 +27,23 @@ class ConnectionManager:
         await websocket.accept()
         if user_id not in self.active_connections:
             self.active_connections[user_id] = set()
-        self.active_connections[user_id].add(websocket)
+        if websocket not in self.active_connections[user_id]:
+            self.active_connections[user_id].add(websocket)
+            WS_CONNECTIONS.inc()
         logger.info(f"✅ User {user_id} connected to WebSocket. Total users: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket, user_id: str):
         if user_id in self.active_connections:
             if websocket in self.active_connections[user_id]:
                 self.active_connections[user_id].remove(websocket)
+                WS_CONNECTIONS.dec()
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
             logger.info(f"❌ User {user_id} connection closed. Remaining users: {len(self.active_connections)}")
 
     async def send_personal(self, message: dict, user_id: str):
         if user_id in self.active_connections:
+            started = time.perf_counter()
             payload = json.dumps(message)
             dead_ws = []
             for ws in list(self.active_connections[user_id]):
@@ -39,12 +52,15 @@ class ConnectionManager:
                 except Exception as e:
                     logger.error(f"Error sending personal message to {user_id}: {e}")
                     dead_ws.append(ws)
+            WS_SEND_SECONDS.observe(time.perf_counter() - started, kind="personal")
             
             for ws in dead_ws:
+                WS_SEND_FAILURES.inc(kind="personal")
                 self.disconnect(ws, user_id)
 
     async def broadcast(self, message: dict):
         """Send message to ALL connected local users."""
+        started = time.perf_counter()
         payload = json.dumps(message)
         dead_connections = []
         
@@ -55,10 +71,16 @@ class ConnectionManager:
                     await ws.send_text(payload)
                 except Exception:
                     dead_connections.append((ws, user_id))
+        WS_SEND_SECONDS.observe(time.perf_counter() - started, kind="broadcast")
         
         for ws, user_id in dead_connections:
+            WS_SEND_FAILURES.inc(kind="broadcast")
             self.disconnect(ws, user_id)
 
+    async def publish(self, message: dict, channel: str = "updates:global") -> None:
+        """Publish through Redis so every process's listener fans ``message`` out to its sockets."""
+        await self.redis_client.publish(channel, json.dumps(message, default=str))
+
     async def start_redis_listener(self):
         """Listen to Redis pub/sub and broadcast to local connections."""
         task = self._broadcast_task
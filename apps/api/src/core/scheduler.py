@@ -1,11 +1,11 @@
 import logging
 import os
 import asyncio
+from datetime import datetime, timezone
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from core.config import settings
 from core.sports_config import ACTIVE_SPORTS
-from core.ingest_scheduler_config import build_unified_ingest_schedule, scheduled_sport_keys
 
 logger = logging.getLogger(__name__)
 
@@ -60,23 +60,18 @@ def init_scheduler_jobs():
         "jitter": 30,
     }
 
-    # 2. Build Ingest Schedule
-    ingest_job_specs, ingest_meta = build_unified_ingest_schedule()
-    
-    for spec in ingest_job_specs:
-        job_id = f"ingest_{spec.sport_key}"
-        job_kw: dict = common_kw.copy()
-        job_kw.update({
-            "args": [spec.sport_key],
-            "id": job_id,
-            "name": job_id,
-        })
-        if spec.minutes is not None:
-            job_kw["minutes"] = spec.minutes
-        else:
-            job_kw["hours"] = spec.hours
-            
-        scheduler.add_job(guarded_unified_ingest, "interval", **job_kw)
+    # 2. Ingest: one leader-elected tick dispatches every sport (services/ingest_scheduler.py)
+    from services.ingest_scheduler import INGEST_SCHEDULER_TICK_SECONDS, ingest_scheduler
+    tick_kw = common_kw.copy()
+    tick_kw["jitter"] = 5
+    scheduler.add_job(
+        ingest_scheduler.tick,
+        'interval',
+        seconds=INGEST_SCHEDULER_TICK_SECONDS,
+        id="ingest_scheduler_tick",
+        name="ingest_scheduler_tick",
+        **tick_kw
+    )
 
     # 3. Grading Jobs
     scheduler.add_job(
@@ -97,6 +92,32 @@ def init_scheduler_jobs():
         **common_kw
     )
 
+    # 3b. Rollups behind the *_statistics endpoints (incremental: dirty buckets only).
+    # Runs once at startup too: this job is the only backfill, reads use the raw table until then.
+    from services.stats_rollups import STATS_ROLLUP_INTERVAL_MINUTES, compact_all
+    scheduler.add_job(
+        compact_all,
+        'interval',
+        minutes=STATS_ROLLUP_INTERVAL_MINUTES,
+        next_run_time=datetime.now(timezone.utc),
+        id="stats_rollup_compaction",
+        name="stats_rollup_compaction",
+        **common_kw
+    )
+
+    # 3c. Search dictionary (incremental: source rows written since the last window).
+    # Runs once at startup too, so search is not empty for the first interval after a deploy.
+    from services.search_index import SEARCH_REFRESH_MINUTES, refresh_search_index
+    scheduler.add_job(
+        refresh_search_index,
+        'interval',
+        minutes=SEARCH_REFRESH_MINUTES,
+        next_run_time=datetime.now(timezone.utc),
+        id="search_dictionary_refresh",
+        name="search_dictionary_refresh",
+        **common_kw
+    )
+
     # 4. Kalshi Sync
     kalshi_supported = ["NBA", "MLB", "WNBA", "NFL", "NHL"]
     for sport_key in ACTIVE_SPORTS:
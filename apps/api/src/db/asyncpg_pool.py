@@ -0,0 +1,177 @@
+"""
+Process-wide asyncpg pool for raw-SQL code paths.
+
+Created once in the app lifespan (``init_asyncpg_pool``) and closed on shutdown.
+Uses the same DSN normalization as db/session.py and keeps the statement cache
+disabled so it is safe behind the Supabase transaction pooler (PgBouncer).
+Acquire wait time and utilization are tracked in ``pool_metrics`` (see ``pool_stats``).
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+import asyncpg
+
+from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ASYNCPG_POOL_MIN_SIZE = max(0, int(os.getenv("ASYNCPG_POOL_MIN_SIZE", "1")))
+ASYNCPG_POOL_MAX_SIZE = max(1, int(os.getenv("ASYNCPG_POOL_MAX_SIZE", "5")))
+ASYNCPG_POOL_MAX_IDLE_SECONDS = float(os.getenv("ASYNCPG_POOL_MAX_IDLE_SECONDS", "300"))
+ASYNCPG_POOL_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("ASYNCPG_POOL_ACQUIRE_TIMEOUT_SECONDS", "10"))
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+
+class PoolMetrics:
+    def __init__(self, window: int = 1000):
+        self.acquired = 0
+        self.acquire_timeouts = 0
+        self.direct_connects = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self._waits: Deque[float] = deque(maxlen=window)
+
+    def on_acquire(self, wait_s: float) -> None:
+        self.acquired += 1
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        self._waits.append(wait_s)
+
+    def on_release(self) -> None:
+        self.in_use = max(0, self.in_use - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self._waits)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 2)
+
+        return {
+            "acquired": self.acquired,
+            "acquire_timeouts": self.acquire_timeouts,
+            "direct_connects": self.direct_connects,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "wait_p50_ms": pct(0.50),
+            "wait_p95_ms": pct(0.95),
+            "wait_max_ms": round(ordered[-1] * 1000, 2) if ordered else None,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+def _pool_dsn() -> str:
+    return asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or settings.DATABASE_URL)
+
+
+def asyncpg_available() -> bool:
+    """False for SQLite/local setups where raw asyncpg cannot be used."""
+    dsn = _pool_dsn()
+    return bool(dsn) and not dsn.startswith("sqlite")
+
+
+async def init_asyncpg_pool() -> Optional[asyncpg.Pool]:
+    """Create the shared pool (idempotent). Returns None when DATABASE_URL is not Postgres."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    if not asyncpg_available():
+        return None
+
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(
+                _pool_dsn(),
+                min_size=min(ASYNCPG_POOL_MIN_SIZE, ASYNCPG_POOL_MAX_SIZE),
+                max_size=ASYNCPG_POOL_MAX_SIZE,
+                max_inactive_connection_lifetime=ASYNCPG_POOL_MAX_IDLE_SECONDS,
+                # PgBouncer transaction/statement mode cannot safely support prepared statements.
+                statement_cache_size=0,
+                server_settings={"application_name": "perplex_edge_asyncpg"},
+            )
+            logger.info(
+                "asyncpg pool ready (min=%s max=%s)",
+                ASYNCPG_POOL_MIN_SIZE,
+                ASYNCPG_POOL_MAX_SIZE,
+            )
+    return _pool
+
+
+async def close_asyncpg_pool() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        try:
+            await asyncio.wait_for(pool.close(), timeout=10)
+        except Exception as e:
+            logger.warning("asyncpg pool close failed; terminating: %s", e)
+            pool.terminate()
+
+
+async def get_asyncpg_pool() -> Optional[asyncpg.Pool]:
+    """Return the shared pool, creating it lazily for workers/scripts outside the app lifespan."""
+    return _pool if _pool is not None else await init_asyncpg_pool()
+
+
+async def acquire_timed(pool: asyncpg.Pool) -> asyncpg.Connection:
+    """``pool.acquire()`` with the shared timeout, recording wait time and utilization."""
+    start = time.perf_counter()
+    try:
+        conn = await pool.acquire(timeout=ASYNCPG_POOL_ACQUIRE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        pool_metrics.acquire_timeouts += 1
+        logger.warning(
+            "asyncpg pool exhausted: no connection within %ss (max=%s)",
+            ASYNCPG_POOL_ACQUIRE_TIMEOUT_SECONDS,
+            ASYNCPG_POOL_MAX_SIZE,
+        )
+        raise
+    pool_metrics.on_acquire(time.perf_counter() - start)
+    return conn
+
+
+async def release_timed(pool: asyncpg.Pool, conn: asyncpg.Connection) -> None:
+    pool_metrics.on_release()
+    await pool.release(conn)
+
+
+@asynccontextmanager
+async def acquire_connection() -> AsyncIterator[asyncpg.Connection]:
+    """``async with acquire_connection() as conn:`` — borrow a pooled connection."""
+    pool = await get_asyncpg_pool()
+    if pool is None:
+        raise RuntimeError("asyncpg pool unavailable (DATABASE_URL is not Postgres)")
+    conn = await acquire_timed(pool)
+    try:
+        yield conn
+    finally:
+        await release_timed(pool, conn)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Pool sizing plus acquire wait / utilization counters, for the metrics router."""
+    stats: Dict[str, Any] = {
+        "initialized": _pool is not None,
+        "min_size": ASYNCPG_POOL_MIN_SIZE,
+        "max_size": ASYNCPG_POOL_MAX_SIZE,
+        **pool_metrics.snapshot(),
+    }
+    if _pool is not None:
+        size, idle = _pool.get_size(), _pool.get_idle_size()
+        stats.update({
+            "size": size,
+            "idle": idle,
+            "utilization": round((size - idle) / ASYNCPG_POOL_MAX_SIZE, 3),
+        })
+    return stats
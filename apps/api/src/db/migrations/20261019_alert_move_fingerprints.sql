@@ -0,0 +1,18 @@
+-- Set-based alert detection: dedup keys for whale_moves / steam_events.
+-- services/alert_writer.py inserts with ON CONFLICT (move_fingerprint) DO NOTHING.
+
+ALTER TABLE IF EXISTS whale_moves
+  ADD COLUMN IF NOT EXISTS move_fingerprint TEXT;
+
+ALTER TABLE IF EXISTS steam_events
+  ADD COLUMN IF NOT EXISTS move_fingerprint TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uix_whale_moves_fingerprint
+ON whale_moves (move_fingerprint);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uix_steam_events_fingerprint
+ON steam_events (move_fingerprint);
+
+-- Incremental detection scans unified_odds rows touched by the current ingest.
+CREATE INDEX IF NOT EXISTS ix_unified_odds_sport_created_at
+ON unified_odds (sport, created_at);
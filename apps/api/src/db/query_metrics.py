@@ -0,0 +1,135 @@
+"""
+Per-statement query latency for the SQLAlchemy engine (``db_query_seconds``), also
+added as a db span to the current request profile (services/request_profiler.py).
+
+Statements are labelled ``<verb> <table>`` (``select unified_odds``,
+``insert ev_signals``) so label cardinality stays bounded whatever the parameters or
+literal values. The table is the main statement's first target with any schema prefix
+dropped; a CTE or subquery there is followed to the table it reads. A caller can name
+a statement explicitly with ``execution_options(statement_name="...")``.
+"""
+import re
+import time
+from functools import lru_cache
+
+from sqlalchemy import event
+
+from services.metrics_registry import registry
+from services.request_profiler import add_span
+
+DB_QUERY_SECONDS = registry.histogram(
+    "db_query_seconds", "SQLAlchemy statement latency by statement name", ("statement",)
+)
+DB_QUERY_ERRORS = registry.counter("db_query_errors", "SQLAlchemy statements that raised", ("statement",))
+
+_IDENT = r'(?:"[^"]+"|[a-zA-Z_][\w$]*)'
+_VERB_RE = re.compile(r"\s*(select|insert|update|delete|create|alter|drop|begin|commit|rollback|set|show)\b",
+                      re.IGNORECASE)
+_WITH_RE = re.compile(r"\s*with\s+(?:recursive\s+)?", re.IGNORECASE)
+_CTE_RE = re.compile(rf"\s*({_IDENT})\s*(?:\([^()]*\))?\s*as\s+(?:not\s+)?(?:materialized\s+)?\(", re.IGNORECASE)
+_TABLE_RE = re.compile(
+    rf"\b(?:from|into|update|table|join)\s+(?:if\s+(?:not\s+)?exists\s+)?(?:only\s+)?"
+    rf"(?:(\()|((?:{_IDENT}\s*\.\s*)*{_IDENT}))",
+    re.IGNORECASE,
+)
+
+
+def _top_level(sql: str):
+    """
+    ``sql`` with string literals and everything inside parentheses blanked (the
+    parentheses themselves are kept), plus a map of each top-level ``(`` to its ``)``.
+    Keyword searches on the result only see the outermost statement.
+    """
+    out, spans = list(sql), {}
+    depth, opened, quote = 0, 0, False
+    for i, ch in enumerate(sql):
+        if quote or ch == "'":
+            quote = quote != (ch == "'")
+            out[i] = " "
+        elif ch == "(":
+            if depth == 0:
+                opened = i
+            else:
+                out[i] = " "
+            depth += 1
+        elif ch == ")" and depth:
+            depth -= 1
+            if depth == 0:
+                spans[opened] = i
+            else:
+                out[i] = " "
+        elif depth:
+            out[i] = " "
+    return "".join(out), spans
+
+
+def _ident(name: str) -> str:
+    """Last part of a possibly schema-qualified, possibly quoted name (``"public".x`` -> ``x``)."""
+    return re.findall(_IDENT, name)[-1].strip('"').lower()
+
+
+def _parse(sql: str, ctes: dict):
+    flat, spans = _top_level(sql)
+    pos, ctes = 0, dict(ctes)
+    with_ = _WITH_RE.match(flat)
+    if with_:
+        pos = with_.end()
+        while (cte := _CTE_RE.match(flat, pos)) and cte.end() - 1 in spans:
+            close = spans[cte.end() - 1]
+            ctes[_ident(cte.group(1))] = sql[cte.end():close]
+            pos = close + 1
+            comma = re.match(r"\s*,", flat[pos:])
+            if not comma:
+                break
+            pos += comma.end()
+    verb = _VERB_RE.match(flat, pos)
+    if not verb:
+        return None, None
+    name = verb.group(1).lower()
+    # The first target of the outermost statement; CTEs and FROM (subquery) resolve to what they read.
+    target = _TABLE_RE.search(flat, verb.start(1) if name == "update" else verb.end(1))
+    if not target:
+        return name, None
+    if target.group(1):
+        return name, _parse(sql[target.end():spans.get(target.start(1), len(sql))], ctes)[1]
+    table = _ident(target.group(2))
+    if table in ctes:
+        body = ctes.pop(table)
+        return name, _parse(body, ctes)[1]
+    return name, table
+
+
+@lru_cache(maxsize=2048)
+def statement_name(sql: str) -> str:
+    name, table = _parse(sql, {})
+    if not name:
+        return "other"
+    return f"{name} {table}" if table else name
+
+
+def _name(context, statement: str) -> str:
+    explicit = context.execution_options.get("statement_name") if context is not None else None
+    return explicit or statement_name(statement)
+
+
+def instrument_engine(engine) -> None:
+    """Attach timing listeners to ``engine`` (an AsyncEngine or its sync engine)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is not None:
+            elapsed, name = time.perf_counter() - started, _name(context, statement)
+            DB_QUERY_SECONDS.observe(elapsed, statement=name)
+            add_span("db", name, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        DB_QUERY_ERRORS.inc(statement=_name(exception_context.execution_context,
+                                            exception_context.statement or ""))
@@ -0,0 +1,142 @@
+"""
+Base class for raw-SQL (asyncpg) services.
+
+The legacy services used to open a fresh ``asyncpg.connect`` at the top of every
+method and close it at the end: a TCP + TLS + auth handshake per call, no upper
+bound on concurrent connections, and a leaked connection whenever a method raised
+before reaching ``close()``.
+
+``AsyncpgRepository.connect()`` borrows from the shared pool in db/asyncpg_pool.py
+instead, and ``close()`` on the borrowed connection hands it back. Every coroutine
+method a subclass defines is scoped: a connection it borrowed and did not return is
+released when the method exits, exceptions included.
+
+    class TradesService(AsyncpgRepository):
+        async def get_trade(self, trade_id):
+            conn = await self.connect()
+            row = await conn.fetchrow("SELECT * FROM trades WHERE id = $1", trade_id)
+            await conn.close()
+            return row
+
+When DATABASE_URL is not Postgres there is no pool; ``connect()`` then falls back to
+a direct connection (which fails exactly as the old per-call connect did).
+"""
+import functools
+import inspect
+import logging
+import os
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, List, Optional
+
+import asyncpg
+
+from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.asyncpg_pool import acquire_timed, get_asyncpg_pool, pool_metrics, release_timed
+from db.query_metrics import statement_name
+from services.request_profiler import span
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection:
+    """asyncpg connection borrowed from the pool; ``close()`` returns it instead of closing."""
+
+    __slots__ = ("_conn", "_pool", "released")
+
+    def __init__(self, conn: asyncpg.Connection, pool: Optional[asyncpg.Pool]) -> None:
+        self._conn = conn
+        self._pool = pool
+        self.released = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    # Query methods are spelled out (rather than proxied) so sampled requests see them as db spans.
+    async def fetch(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        with span("db", statement_name(query)):
+            return await self._conn.fetch(query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        with span("db", statement_name(query)):
+            return await self._conn.fetchrow(query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        with span("db", statement_name(query)):
+            return await self._conn.fetchval(query, *args, **kwargs)
+
+    async def execute(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        with span("db", statement_name(query)):
+            return await self._conn.execute(query, *args, **kwargs)
+
+    async def executemany(self, command: str, args: Any, **kwargs: Any) -> Any:
+        with span("db", statement_name(command)):
+            return await self._conn.executemany(command, args, **kwargs)
+
+    def is_closed(self) -> bool:
+        return self.released or self._conn.is_closed()
+
+    async def close(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        if self._pool is None:
+            await self._conn.close()
+        else:
+            await release_timed(self._pool, self._conn)
+
+
+# Connections borrowed inside the repository method currently running in this task.
+_leases: ContextVar[Optional[List[PooledConnection]]] = ContextVar("asyncpg_repository_leases", default=None)
+
+
+def _scoped(method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        leases: List[PooledConnection] = []
+        token = _leases.set(leases)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _leases.reset(token)
+            for lease in leases:
+                if not lease.released:
+                    try:
+                        await lease.close()
+                    except Exception as e:
+                        logger.warning("Releasing %s connection failed: %s", method.__qualname__, e)
+
+    return wrapper
+
+
+class AsyncpgRepository:
+    def __init__(self) -> None:
+        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for name, attr in list(vars(cls).items()):
+            if inspect.iscoroutinefunction(attr) and not name.startswith("__"):
+                setattr(cls, name, _scoped(attr))
+
+    async def connect(self) -> PooledConnection:
+        """Borrow a connection; ``await conn.close()`` returns it to the pool."""
+        pool = await get_asyncpg_pool()
+        if pool is None:
+            pool_metrics.direct_connects += 1
+            lease = PooledConnection(await asyncpg.connect(self.db_url), None)
+        else:
+            lease = PooledConnection(await acquire_timed(pool), pool)
+        leases = _leases.get()
+        if leases is not None:
+            leases.append(lease)
+        return lease
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[PooledConnection]:
+        """``async with self.connection() as conn:`` for new code."""
+        conn = await self.connect()
+        try:
+            yield conn
+        finally:
+            await conn.close()
@@ -121,6 +121,10 @@ elif _is_pooler_url or ":6543" in DATABASE_URL:
 
 engine = create_async_engine(DATABASE_URL, **engine_kwargs)
 
+from db.query_metrics import instrument_engine
+
+instrument_engine(engine)
+
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 # Standard exports for various utilities
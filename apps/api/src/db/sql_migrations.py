@@ -0,0 +1,39 @@
+"""
+Best-effort runner for the idempotent SQL files in db/migrations (applied at boot).
+
+Files are split on ``;`` and ``--`` comment lines are stripped from each chunk, so a
+header comment above the first statement does not hide that statement.
+"""
+import logging
+from typing import Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+def split_sql_statements(raw_sql: str) -> List[str]:
+    statements = []
+    for chunk in raw_sql.split(";"):
+        stmt = chunk.strip()
+        if not stmt:
+            continue
+        cleaned = "\n".join(
+            line for line in stmt.splitlines() if not line.strip().startswith("--")
+        ).strip()
+        if cleaned:
+            statements.append(cleaned)
+    return statements
+
+
+async def run_sql_migration_file(path: str, run_step: Callable[[str], Awaitable[None]]) -> int:
+    """Run each statement of ``path`` through ``run_step``; returns the statement count."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw_sql = f.read()
+    except Exception as e:
+        logger.warning("Could not read migration file %s: %s", path, e)
+        return 0
+
+    statements = split_sql_statements(raw_sql)
+    for stmt in statements:
+        await run_step(stmt)
+    return len(statements)
@@ -1,32 +1,44 @@
-import asyncpg
 import logging
-from typing import Dict, Any
-from core.config import settings
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from typing import Dict, Any, Optional
+from db.asyncpg_pool import acquire_timed, get_asyncpg_pool, release_timed
+from services.cache_service import TTLCache
 from fastapi import Header, HTTPException
 import os
 
 logger = logging.getLogger(__name__)
 
 
+# Short-lived per-user profile cache so tier checks don't hit the DB on every request.
+USER_PROFILE_TTL_SECONDS = int(os.getenv("USER_PROFILE_CACHE_TTL_SECONDS", "60"))
+# Unknown users and failed lookups are remembered too, for a shorter time.
+USER_PROFILE_MISS_TTL_SECONDS = int(os.getenv("USER_PROFILE_MISS_TTL_SECONDS", "15"))
+# Profiles and misses share one LRU, so a flood of unknown ids cannot grow it without bound.
+USER_PROFILE_CACHE_MAXSIZE = int(os.getenv("USER_PROFILE_CACHE_MAXSIZE", "10000"))
+_profile_cache = TTLCache(maxsize=USER_PROFILE_CACHE_MAXSIZE)
+_MISS = object()
+
+
 async def get_db_conn():
-    """Helper to get a direct asyncpg connection"""
-    url = asyncpg_dsn_from_database_url(settings.DATABASE_URL)
+    """Helper to borrow a connection from the shared asyncpg pool"""
+    pool = await get_asyncpg_pool()
 
     # asyncpg doesn't support sqlite; yield nothing (async generator cannot return a value).
-    if "sqlite" in url:
+    if pool is None:
         return
 
-    conn = await asyncpg.connect(url, statement_cache_size=0)
+    conn = await acquire_timed(pool)
     try:
         yield conn
     finally:
-        await conn.close()
+        await release_timed(pool, conn)
 
 async def provision_user_jit(user_payload: Dict[str, Any], db):
     """
     JIT Provisioning using the user's Supabase UUID.
     Matches the business logic requested by the user.
+
+    A single upsert both creates first-time users and returns existing rows;
+    the result is cached per auth_id for USER_PROFILE_TTL_SECONDS.
     """
     auth_id = user_payload.get("sub")
     email = user_payload.get("email")
@@ -35,28 +47,52 @@ async def provision_user_jit(user_payload: Dict[str, Any], db):
         logger.warning("No 'sub' found in user payload for JIT provisioning")
         return None
 
-    # deps/auth.py — change the lookup column
-    row = await db.fetchrow(
-        "SELECT * FROM users WHERE auth_id = $1", 
-        auth_id  # Supabase JWT 'sub' is the UUID
-    )
-    
-    if not row:
-        logger.info(f"Provisioning new user: {email} ({auth_id})")
-        await db.execute("""
-            INSERT INTO users (auth_id, email, subscription_tier, is_active)
-            VALUES ($1, $2, 'free', true)
-            ON CONFLICT (auth_id) DO NOTHING
-        """, auth_id, email)
-        
-        # Fetch the newly created row
-        row = await db.fetchrow(
-            "SELECT * FROM users WHERE auth_id = $1", 
-            auth_id
-        )
-        
+    cached = _profile_cache.get(auth_id)
+    if cached is not None and cached is not _MISS:
+        return cached
+
+    # Supabase JWT 'sub' is the UUID. DO UPDATE (instead of DO NOTHING) so RETURNING
+    # yields the existing row on conflict; email is only back-filled when missing.
+    row = await db.fetchrow("""
+        INSERT INTO users (auth_id, email, subscription_tier, is_active)
+        VALUES ($1, $2, 'free', true)
+        ON CONFLICT (auth_id) DO UPDATE
+            SET email = COALESCE(users.email, EXCLUDED.email)
+        RETURNING *
+    """, auth_id, email)
+
+    if row is not None:
+        _profile_cache.set(auth_id, row, USER_PROFILE_TTL_SECONDS)
     return row
 
+
+async def get_user_profile(auth_id: str) -> Optional[Any]:
+    """Cached users row for auth_id (None when unknown or the DB is not Postgres)."""
+    if not auth_id:
+        return None
+    cached = _profile_cache.get(auth_id)
+    if cached is not None:
+        return None if cached is _MISS else cached
+
+    pool = await get_asyncpg_pool()
+    if pool is None:
+        return None
+    try:
+        row = await pool.fetchrow("SELECT * FROM users WHERE auth_id = $1", auth_id)
+    except Exception as e:
+        logger.debug("User profile lookup failed for %s: %s", auth_id, e)
+        row = None
+    if row is None:
+        _profile_cache.set(auth_id, _MISS, USER_PROFILE_MISS_TTL_SECONDS)
+        return None
+    _profile_cache.set(auth_id, row, USER_PROFILE_TTL_SECONDS)
+    return row
+
+
+def invalidate_user_profile(auth_id: str) -> None:
+    """Drop a cached profile (e.g. after a subscription change)."""
+    _profile_cache.invalidate(auth_id)
+
 async def verify_admin(x_admin_key: str = Header(None)):
     """
     Security middleware to ensure only authorized admins can trigger seeding or administrative tasks.
@@ -1,9 +1,8 @@
 from typing import Optional
 from fastapi import WebSocket, Query, Depends, HTTPException, status
-from api_utils.supabase_proxy import supabase
+from api_utils.auth_supabase import resolve_supabase_user
 from services.auth_service import auth_service
 import logging
-import asyncio
 
 logger = logging.getLogger(__name__)
 
@@ -31,16 +30,9 @@ async def get_current_user_ws(
                 "user_metadata": {"tier": payload.get("tier", "free")}
             }
 
-        # 2. Try Supabase Auth API (Synchronous call wrapped in executor to avoid blocking loop)
-        loop = asyncio.get_running_loop()
-        sb_response = await loop.run_in_executor(None, lambda: supabase.auth.get_user(token))
-        
-        if hasattr(sb_response, 'user') and sb_response.user:
-            return sb_response.user
-        
-        if isinstance(sb_response, dict) and 'user' in sb_response:
-            return sb_response['user']
-            
+        # 2. Supabase JWT (verified locally; remote Auth API only for unknown formats)
+        return await resolve_supabase_user(token)
+
     except Exception as e:
         logger.error(f"Auth error in WebSocket: {e}")
         
@@ -10,7 +10,7 @@ from fastapi import FastAPI, HTTPException, Query, Request, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
@@ -21,8 +21,12 @@ from core.sports_config import ACTIVE_SPORTS, SPORT_DISPLAY
 from core.ingest_scheduler_config import build_unified_ingest_schedule, scheduled_sport_keys
 from middleware.request_id import RequestIDMiddleware, get_request_id
 from middleware.auth_circuit_breaker import AuthCircuitBreakerMiddleware, auth_breaker # Import new circuit breaker
+from middleware.rate_limit import RateLimitMiddleware
+from middleware.profiling import ProfilingMiddleware
+from services.request_profiler import PROFILING_ENABLED, install_http_spans
 from db.base import Base
 from db.session import engine, get_db, validate_db_connection
+from db.asyncpg_pool import init_asyncpg_pool, close_asyncpg_pool
 from services.unified_ingestion import unified_ingestion
 from core.connection_manager import manager
 from services.live_data_service import live_data_service
@@ -185,26 +189,8 @@ async def initialize_backend_services():
 
         async def run_sql_migration_file(path: str):
             """Execute an idempotent SQL migration file with best-effort semantics."""
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    raw_sql = f.read()
-            except Exception as e:
-                logger.warning("Could not read migration file %s: %s", path, e)
-                return
-
-            statements = []
-            for chunk in raw_sql.split(";"):
-                stmt = chunk.strip()
-                if not stmt or stmt.startswith("--"):
-                    continue
-                cleaned = "\n".join(
-                    line for line in stmt.splitlines() if not line.strip().startswith("--")
-                ).strip()
-                if cleaned:
-                    statements.append(cleaned)
-
-            for stmt in statements:
-                await run_migration_step(stmt)
+            from db.sql_migrations import run_sql_migration_file as run_sql_file
+            await run_sql_file(path, run_migration_step)
 
         if not is_sqlite:
             # Add columns
@@ -414,6 +400,8 @@ async def initialize_backend_services():
                     hit BOOLEAN
                 )
             """)
+            # Collector diff key: unchanged board rows are skipped before the bulk upsert
+            await run_migration_step("ALTER TABLE pp_projections_staging ADD COLUMN IF NOT EXISTS content_hash TEXT")
 
             # Line Movement table for CLV Engine tracking
             await run_migration_step("""
@@ -452,9 +440,24 @@ async def initialize_backend_services():
             """)
             await run_migration_step("INSERT INTO system_sync_state (id) VALUES (1) ON CONFLICT DO NOTHING")
 
+            # Rollup tables behind the legacy *_statistics endpoints (filled by the scheduler)
+            from services.stats_rollups import ddl_statements
+            for stmt in ddl_statements():
+                await run_migration_step(stmt)
+
+            # Player / team search dictionary and its trigram index (services/search_index.py)
+            from services.search_index import DDL as SEARCH_DDL
+            for stmt in SEARCH_DDL:
+                await run_migration_step(stmt)
+
+            # Persisted ingest job table (services/ingest_scheduler.py)
+            from services.ingest_scheduler import SCHEDULE_DDL
+            await run_migration_step(SCHEDULE_DDL)
+
             # Runtime hotfix SQL is intentionally idempotent; execute it on startup to
             # remove deploy-order dependency between code and manual DB migration steps.
             await run_sql_migration_file("src/db/migrations/20260426_runtime_hotfix_whale_and_ev_indexes.sql")
+            await run_sql_migration_file("src/db/migrations/20261019_alert_move_fingerprints.sql")
 
             logger.info("📡 [Background Init] Schema migrations and indexes complete.")
     except Exception as e:
@@ -485,6 +488,38 @@ async def initialize_backend_services():
         except Exception as e:
             logger.error(f"❌ [Background Init] Scheduler failed: {e}")
 
+    # Shared cache / rate-limit buckets (Redis when reachable, in-memory otherwise)
+    try:
+        from services.cache import cache
+        await cache.connect()
+    except Exception as e:
+        logger.error(f"❌ [Background Init] Cache connect failed: {e}")
+
+    # Outbound alert delivery (Discord / Telegram / Web Push workers)
+    try:
+        from services.delivery_queue import delivery_queue
+        try:
+            import services.push_service  # noqa: F401  registers the web-push sender
+        except Exception as e:
+            logger.warning(f"⚠️ [Background Init] Web push sender unavailable: {e}")
+        await delivery_queue.start()
+    except Exception as e:
+        logger.error(f"❌ [Background Init] Delivery queue failed: {e}")
+
+    # Metrics / health snapshot served to polling dashboards
+    try:
+        from services.metrics_collector import metrics_collector
+        metrics_collector.start()
+    except Exception as e:
+        logger.error(f"❌ [Background Init] Metrics collector failed: {e}")
+
+    # Buffered heartbeat writes (flushed as one upsert every HEARTBEAT_FLUSH_SECONDS)
+    try:
+        from services.heartbeat_service import heartbeat_buffer
+        heartbeat_buffer.start()
+    except Exception as e:
+        logger.error(f"❌ [Background Init] Heartbeat buffer failed: {e}")
+
     # 8. Kalshi WebSocket Bridge
     try:
         logger.info("📡 [Background Init] Starting Kalshi WebSocket Bridge...")
@@ -536,6 +571,11 @@ async def backend_lifespan(app: FastAPI):
         logger.critical(
             "DB connection failed after 5 attempts. Starting in degraded mode."
         )
+    else:
+        try:
+            await init_asyncpg_pool()
+        except Exception as e:
+            logger.warning("asyncpg pool init failed (raw-SQL paths will retry lazily): %s", e)
 
     async def _safe_initialize_backend_services() -> None:
         try:
@@ -549,6 +589,15 @@ async def backend_lifespan(app: FastAPI):
                 exc_info=True,
             )
 
+    # CPU-bound jobs (simulations, backtests, training) run in worker processes, off this loop
+    from services.compute_executor import compute_executor
+    try:
+        compute_executor.start()
+        warm_task = asyncio.create_task(compute_executor.warm())
+    except Exception as e:
+        warm_task = None
+        logger.warning("Compute executor unavailable (jobs run in-process): %s", e)
+
     # Run heavy tasks in the background so they don't block liveness (/health)
     init_task = asyncio.create_task(_safe_initialize_backend_services())
     yield
@@ -557,9 +606,37 @@ async def backend_lifespan(app: FastAPI):
         await init_task
     except asyncio.CancelledError:
         pass
+    if warm_task is not None:
+        warm_task.cancel()
+    try:
+        await compute_executor.stop()
+    except Exception as e:
+        logger.warning("Compute executor shutdown failed: %s", e)
+    try:
+        from services.ingest_scheduler import ingest_scheduler
+        await ingest_scheduler.stop()
+    except Exception as e:
+        logger.warning("Ingest scheduler shutdown failed: %s", e)
+    try:
+        from services.heartbeat_service import heartbeat_buffer
+        await heartbeat_buffer.stop()
+    except Exception as e:
+        logger.warning("Heartbeat flush on shutdown failed: %s", e)
+    try:
+        from services.metrics_collector import metrics_collector
+        await metrics_collector.stop()
+    except Exception as e:
+        logger.warning("Metrics collector shutdown failed: %s", e)
+    try:
+        from services.delivery_queue import delivery_queue
+        await delivery_queue.stop()
+    except Exception as e:
+        logger.warning("Delivery queue shutdown failed: %s", e)
+    await close_asyncpg_pool()
 
 app = FastAPI(title=APP_NAME, redirect_slashes=False, lifespan=backend_lifespan)
 
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(RequestIDMiddleware)
 app.add_middleware(AuthCircuitBreakerMiddleware) # Register circuit breaker middleware
 app.add_middleware(
@@ -570,6 +647,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if PROFILING_ENABLED:
+    # Added last (outermost) so the profile covers rate limiting and auth too.
+    install_http_spans()
+    app.add_middleware(ProfilingMiddleware)
 
 def _cors_headers_for_request(request: Request) -> dict:
     origin = request.headers.get("Origin") or request.headers.get("origin")
@@ -728,6 +809,13 @@ async def health():
         logger.warning("Liveness /health: database check failed: %s", e)
         raise HTTPException(status_code=503, detail="Database unavailable")
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of this process's hot-path metrics."""
+    from services.metrics_registry import CONTENT_TYPE, registry
+
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
 @app.get("/")
 async def root():
     return {"name": APP_NAME, "status": "healthy"}
@@ -746,8 +834,9 @@ async def admin_system_health(db: AsyncSession = Depends(get_db)):
     Compact ops snapshot: DB / pipeline / odds stream + quota (no full /api/health/deps degradation object).
     """
     from routers.health import compute_health
+    from services.metrics_collector import metrics_collector
 
-    base = await compute_health(db)
+    base = await metrics_collector.health() or await compute_health(db)
     internal = base.pop("_internal", None) or {}
     return {
         "status": base.get("status"),
@@ -0,0 +1,44 @@
+import os
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from services.request_profiler import PROFILING_SAMPLE_RATE, profile_store, profiling, should_sample
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _forced(request: Request) -> bool:
+    """``X-Profile: 1`` forces a profile, but only alongside a valid ``X-Admin-Key``."""
+    if request.headers.get("x-profile") != "1":
+        return False
+    admin_secret = os.getenv("ADMIN_SECRET")
+    return bool(admin_secret) and request.headers.get("x-admin-key") == admin_secret
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Opt-in (PROFILING_ENABLED) request profiler; see services.request_profiler.
+    Unsampled requests pass straight through. Sampled ones get a Server-Timing header.
+    """
+    def __init__(self, app, sample_rate: float = PROFILING_SAMPLE_RATE, store=profile_store):
+        super().__init__(app)
+        self.sample_rate = sample_rate
+        self.store = store
+
+    async def dispatch(self, request: Request, call_next):
+        if not should_sample(_forced(request), self.sample_rate):
+            return await call_next(request)
+
+        with profiling(request.method, request.url.path) as trace:
+            response = await call_next(request)
+        route = request.scope.get("route")
+        # Unmatched paths (404 scans) share one key so the store stays bounded
+        template = getattr(route, "path", None) or UNMATCHED_ROUTE
+        profile = trace.finish(f"{request.method} {template}", response.status_code)
+        self.store.record(profile)
+        response.headers["Server-Timing"] = (
+            f"db;dur={profile['db_ms']}, http;dur={profile['http_ms']}, "
+            f"cpu;dur={profile['cpu_ms']}, total;dur={profile['wall_ms']}"
+        )
+        return response
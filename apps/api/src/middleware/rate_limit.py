@@ -0,0 +1,88 @@
+import logging
+import os
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from fastapi.responses import JSONResponse
+
+from middleware.request_id import get_request_id
+from services.entitlements import entitlement_resolver, request_entitlements
+from services.rate_limiter import RATE_LIMIT_ENABLED, match_route, rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Number of reverse proxies in front of the app that append to X-Forwarded-For.
+# 0 keys anonymous callers on the TCP peer; behind the platform proxy that peer is
+# the proxy itself, so deploys set 1 to take the address that proxy appended.
+TRUSTED_PROXY_HOPS = int(os.getenv("RATE_LIMIT_TRUSTED_PROXY_HOPS", "0"))
+
+
+def _client_ip(request: Request, hops: int = None) -> str:
+    hops = TRUSTED_PROXY_HOPS if hops is None else hops
+    peer = request.client.host if request.client else "unknown"
+    if hops <= 0:
+        return peer
+    # Entries left of the trusted hops are client-controlled, so count from the right.
+    forwarded = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+    if len(forwarded) < hops:
+        return peer
+    return forwarded[-hops]
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Per-user / per-tier token buckets on metered routes (see services.rate_limiter).
+    Unmetered routes pass straight through; the resolved entitlements are pinned on
+    request.state so the route's own tier gates do not resolve them again.
+    """
+    async def dispatch(self, request: Request, call_next):
+        route = match_route(request.method, request.url.path) if RATE_LIMIT_ENABLED else None
+        if route is None:
+            return await call_next(request)
+
+        auth = request.headers.get("authorization") or ""
+        token = auth[7:] if auth.lower().startswith("bearer ") else None
+        ents = await request_entitlements(request, lambda: entitlement_resolver.for_bearer(token))
+        if ents.is_owner:
+            return await call_next(request)
+
+        identity = f"u:{ents.user_key or ents.email}" if (ents.user_key or ents.email) else f"ip:{_client_ip(request)}"
+        try:
+            decision = await rate_limiter.check(identity, ents, route)
+        except Exception as e:
+            # Limiter trouble must never take the endpoint down with it.
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return await call_next(request)
+
+        headers = {
+            "X-RateLimit-Limit": str(decision.limit),
+            "X-RateLimit-Remaining": str(max(0, decision.remaining)),
+        }
+        if not decision.allowed and not decision.included:
+            body = {
+                "error": {
+                    "code": "not_in_plan",
+                    "message": f"{decision.bucket} is not included in the {ents.tier} tier.",
+                    "bucket": decision.bucket,
+                    "upgrade_url": "/pricing",
+                    "request_id": get_request_id(),
+                }
+            }
+            return JSONResponse(status_code=403, content=body, headers=headers)
+        if not decision.allowed:
+            headers["Retry-After"] = str(decision.retry_after)
+            body = {
+                "error": {
+                    "code": "rate_limited",
+                    "message": f"Rate limit exceeded for {decision.bucket} on the {ents.tier} tier.",
+                    "bucket": decision.bucket,
+                    "retry_after": decision.retry_after,
+                    "upgrade_url": "/pricing",
+                    "request_id": get_request_id(),
+                }
+            }
+            return JSONResponse(status_code=429, content=body, headers=headers)
+
+        response = await call_next(request)
+        for name, value in headers.items():
+            response.headers[name] = value
+        return response
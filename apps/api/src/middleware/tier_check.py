@@ -3,25 +3,31 @@ from fastapi import HTTPException, Depends
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from typing import Optional, List, Dict
+from services.entitlements import TIER_RANK, entitlement_resolver, get_tier_limits, request_entitlements
 
 
 class TierCheckMiddleware(BaseHTTPMiddleware):
     """
     Middleware stub for tier-based request gating.
-    Currently a pass-through — tier enforcement is handled per-route
-    via the require_tier() decorator below.
+    Currently a pass-through — tier enforcement is handled per-route via the
+    require_tier() decorator below and the common_deps gates, all of which read
+    the request-scoped entitlements from services.entitlements.
     """
     async def dispatch(self, request: Request, call_next):
         response = await call_next(request)
         return response
 
 # Tier Levels Mapping
-TIER_LEVELS = {
-    "free": 0,
-    "pro": 1,
-    "elite": 2,
-    "owner": 3 # Admin/Owner tier
-}
+TIER_LEVELS = TIER_RANK
+
+
+async def resolve_user_tier(user) -> str:
+    """
+    Tier for a Supabase user: the provisioned users.subscription_tier when known
+    (served from the short-lived profile cache in deps.auth), else user_metadata.tier.
+    """
+    return (await entitlement_resolver.for_user(user)).tier
+
 
 def require_tier(minimum: str):
     """
@@ -45,15 +51,15 @@ def require_tier(minimum: str):
                     }
                 )
             
-            # Fetch tier from Supabase user metadata or attributes
-            # user_metadata is where we'll likely store the 'tier' string
-            user_meta = getattr(user, "user_metadata", {})
-            user_tier = user_meta.get("tier", "free").lower()
+            ents = await request_entitlements(
+                kwargs.get("request"), lambda: entitlement_resolver.for_user(user)
+            )
+            user_tier = ents.tier
             
             # Allow owners to bypass tier checks
-            is_owner = user_tier == "owner" or user.email in ["brydsonpreion31@gmail.com"]
+            is_owner = ents.is_owner or ents.email in ["brydsonpreion31@gmail.com"]
             
-            if not is_owner and TIER_LEVELS.get(user_tier, 0) < TIER_LEVELS.get(minimum.lower(), 0):
+            if not is_owner and not ents.has_tier(minimum):
                 raise HTTPException(
                     status_code=403,
                     detail={
@@ -68,12 +74,3 @@ def require_tier(minimum: str):
             return await func(*args, **kwargs)
         return wrapper
     return decorator
-
-def get_tier_limits(tier: str) -> Dict:
-    """Helper to get limits for a tier"""
-    tier = tier.lower()
-    if tier == "elite" or tier == "owner":
-        return {"oracle_daily": 1000, "sim_count": 10000, "refresh_sec": 30}
-    if tier == "pro":
-        return {"oracle_daily": 10, "sim_count": 100, "refresh_sec": 60}
-    return {"oracle_daily": 0, "sim_count": 0, "refresh_sec": 300}
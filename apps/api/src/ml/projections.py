@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 MODEL_PATH = os.getenv('ML_MODEL_PATH', 'backend/ml/models')
+TRAINING_TIMEOUT_SECONDS = float(os.getenv('ML_TRAINING_TIMEOUT_SECONDS', '600'))
 os.makedirs(MODEL_PATH, exist_ok=True)
 
 FEATURES = [
@@ -18,11 +19,8 @@ FEATURES = [
 def build_feature_vector(player_stats: dict) -> list:
     return [player_stats.get(f, 0.0) or 0.0 for f in FEATURES]
 
-def train_model(sport: str, stat_category: str, db):
-    from sklearn.ensemble import GradientBoostingRegressor
-    from sklearn.model_selection import train_test_split
-    from sklearn.metrics import mean_absolute_error
-    import joblib
+def load_training_set(sport: str, stat_category: str, db):
+    """Feature matrix and targets for the last year of ``PlayerStats`` rows."""
     from models import PlayerStats
 
     cutoff = datetime.utcnow() - timedelta(days=365)
@@ -31,8 +29,6 @@ def train_model(sport: str, stat_category: str, db):
         PlayerStats.stat_category == stat_category,
         PlayerStats.game_date >= cutoff
     ).all()
-    if len(records) < 50:
-        return {'status': 'insufficient_data', 'records': len(records)}
     X, y = [], []
     for r in records:
         features = build_feature_vector({
@@ -44,16 +40,33 @@ def train_model(sport: str, stat_category: str, db):
         })
         X.append(features)
         y.append(r.value)
+    return X, y
+
+def fit_model(sport: str, stat_category: str, X: list, y: list):
+    """CPU-bound fit + persist; DB-free so it can run in a compute_executor worker (TrainingJob)."""
+    if len(X) < 50:
+        return {'status': 'insufficient_data', 'records': len(X)}
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_absolute_error
+    import joblib
+
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     model = GradientBoostingRegressor(n_estimators=200, learning_rate=0.05, max_depth=4, random_state=42)
     model.fit(X_train, y_train)
     preds = model.predict(X_test)
     mae = mean_absolute_error(y_test, preds)
-    import joblib
     path = f'{MODEL_PATH}/{sport}_{stat_category}.pkl'
     joblib.dump(model, path)
     return {'status': 'trained', 'sport': sport, 'stat': stat_category,
-            'records': len(records), 'mae': round(mae, 3), 'model_path': path}
+            'records': len(X), 'mae': round(mae, 3), 'model_path': path}
+
+async def train_model(sport: str, stat_category: str, db, timeout: float = TRAINING_TIMEOUT_SECONDS):
+    """Load rows here, fit on the compute executor so the event loop keeps serving."""
+    from services.compute_executor import TrainingJob, compute_executor
+
+    X, y = load_training_set(sport, stat_category, db)
+    return await compute_executor.run(TrainingJob(sport, stat_category, X, y), timeout=timeout)
 
 def predict(sport: str, stat_category: str, player_features: dict) -> Optional[float]:
     import joblib
@@ -64,7 +77,7 @@ def predict(sport: str, stat_category: str, player_features: dict) -> Optional[f
     vector = build_feature_vector(player_features)
     return round(float(model.predict([vector])[0]), 2)
 
-def retrain_all(db):
+async def retrain_all(db):
     targets = [
         ('NBA','points'),('NBA','rebounds'),('NBA','assists'),('NBA','threes'),
         ('NFL','passing_yards'),('NFL','rushing_yards'),('NFL','receiving_yards'),
@@ -73,7 +86,7 @@ def retrain_all(db):
     results = []
     for sport, stat in targets:
         try:
-            results.append(train_model(sport, stat, db))
+            results.append(await train_model(sport, stat, db))
         except Exception as e:
             results.append({'sport': sport, 'stat': stat, 'error': str(e)})
     return results
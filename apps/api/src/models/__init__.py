@@ -1,6 +1,6 @@
 from .brain import (
     BrainSystemState, ModelPick, SharpSignal, BrainLog, SteamSnapshot,
-    WhaleMove, WhaleSignal, CLVRecord, SteamEvent, HitRateModel, PlayerStats, InjuryImpactEvent, 
+    WhaleMove, WhaleSignal, CLVRecord, SteamEvent, HitRateModel, PlayerStats, PlayerFeature, InjuryImpactEvent, 
     NeuralEdge, RefereeGame, Schedule, Signal, InjuryImpact, LinePrediction, 
     UnifiedOdds, UnifiedEVSignal, LineTick, UnifiedEVSignalHistory, PropLive, 
     PropHistory, EdgeEVHistory,
@@ -241,6 +241,7 @@ class WhaleMove(Base):
     move_size = Column(String, nullable=True) # 'significant', 'wormhole', etc.
     amount_estimate = Column(Float, nullable=True) # From analytical
     severity = Column(String, nullable=True) # From analytical (string variant)
+    move_fingerprint = Column(String, unique=True, nullable=True) # Dedup key for set-based detection
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
 class InjuryImpactEvent(Base):
@@ -274,6 +275,7 @@ class SteamEvent(Base):
     book_count = Column(Integer)
     severity = Column(Float)
     description = Column(String)
+    move_fingerprint = Column(String, unique=True, nullable=True) # Dedup key for set-based detection
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class HitRateModel(Base):
@@ -305,6 +307,35 @@ class PlayerStats(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class PlayerFeature(Base):
+    """Materialized per-player/stat features (rolling windows, splits, rest) built from player_stats_v2"""
+    __tablename__ = "player_features"
+    __table_args__ = (UniqueConstraint('player_id', 'stat_category', name='uix_player_features_key'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    player_id = Column(String, nullable=False)
+    player_name = Column(String, index=True)
+    stat_category = Column(String, nullable=False)
+    games = Column(Integer, default=0)
+    season_avg = Column(Float)
+    l5_avg = Column(Float)
+    l10_avg = Column(Float)
+    l20_avg = Column(Float)
+    l10_std = Column(Float)
+    home_avg = Column(Float)
+    away_avg = Column(Float)
+    home_games = Column(Integer, default=0)
+    away_games = Column(Integer, default=0)
+    last_game_date = Column(DateTime(timezone=True))
+    rest_days = Column(Integer)
+    is_back_to_back = Column(Boolean, default=False)
+    is_3_in_4 = Column(Boolean, default=False)
+    recent_values = Column(JSON)  # newest first, up to FEATURE_WINDOW values
+    recent_dates = Column(JSON)  # ISO dates of the last few games, newest first
+    opponent_splits = Column(JSON)  # {team: {"games", "avg", "max", "min", "last_5"}}
+    source_watermark = Column(DateTime(timezone=True))  # newest player_stats_v2.created_at folded in
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class NeuralEdge(Base):
     __tablename__ = "edges_v2"
     id = Column(Integer, primary_key=True, index=True)
@@ -64,6 +64,8 @@ async def clear_heartbeats(db: AsyncSession = Depends(get_async_db)):
         sql = "UPDATE heartbeats SET meta = '{\"metrics\": {}}'::jsonb"
         await db.execute(text(sql))
         await db.commit()
+        from services.heartbeat_service import heartbeat_buffer
+        heartbeat_buffer.invalidate()
         return {"status": "success", "message": "Heartbeat errors cleared."}
     except Exception as e:
         return {"status": "failed", "error": str(e)}
@@ -104,3 +106,31 @@ async def force_migrate(db: AsyncSession = Depends(get_async_db)):
     # (Abbreviated version of the logic from health.py)
     # This is powerful/dangerous, hence gated in /admin
     return {"status": "not_implemented_safely", "message": "Use Alembic for production migrations."}
+
+@router.get("/profiling")
+async def profiling_summary(route: Optional[str] = None, limit: int = Query(20, ge=1, le=200)):
+    """Sampled request profiles: per-route averages and the slowest traces (optionally for one route)."""
+    from services.request_profiler import PROFILING_ENABLED, PROFILING_SAMPLE_RATE, profile_store
+    return {
+        "enabled": PROFILING_ENABLED,
+        "sample_rate": PROFILING_SAMPLE_RATE,
+        "routes": profile_store.routes(),
+        "slowest": profile_store.slowest(route, limit),
+    }
+
+@router.post("/profiling/reset")
+async def profiling_reset():
+    """Drop all stored profiles."""
+    from services.request_profiler import profile_store
+    profile_store.clear()
+    return {"status": "cleared"}
+
+@router.get("/ingest-schedule")
+async def ingest_schedule():
+    """Persisted ingest jobs (next run, last result) and this node's scheduler state."""
+    from services.ingest_scheduler import ingest_scheduler
+    try:
+        jobs = await ingest_scheduler.jobs()
+    except Exception as e:
+        return {"scheduler": ingest_scheduler.stats(), "error": str(e)}
+    return {"scheduler": ingest_scheduler.stats(), "jobs": jobs}
@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import Optional
 from db.session import get_db
-from services.alert_writer import run_alert_detection
+from services.alert_writer import detect_alerts
 from services.ev_writer import run_ev_grader
 
 router = APIRouter(prefix="/api/alerts", tags=["alerts"])
@@ -15,11 +15,12 @@ async def trigger_alerts(
     db: AsyncSession = Depends(get_db)
 ):
     """Manually invoke the sharp/steam detection pipeline."""
-    alert_count = await run_alert_detection(sport, db)
+    counts = await detect_alerts(sport, db)
     ev_count = await run_ev_grader(sport, db)
     return {
         "status": "ok", 
-        "alerts_written": alert_count,
+        "alerts_written": counts["whales"] + counts["steam"],
+        "detection": counts,
         "ev_signals_written": ev_count,
         "sport": sport
     }
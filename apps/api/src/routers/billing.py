@@ -9,6 +9,7 @@ from db.session import get_db
 from models.user import User
 from api_utils.supabase_proxy import supabase  # Use the proxy singleton
 from services.stripe_service import stripe_service
+from services.entitlements import entitlement_resolver
 from routers.auth import get_current_user
 from core.config import settings
 
@@ -37,6 +38,8 @@ async def upgrade_user(db: AsyncSession, user_id: int, price_id: str, customer_i
         user_stmt = select(User).where(User.id == user_id)
         user_result = await db.execute(user_stmt)
         user = user_result.scalar_one_or_none()
+        if user:
+            entitlement_resolver.invalidate(email=user.email, user_key=user.auth_id)
         
         if user and user.clerk_id:
             logger.info(f"[Supabase] Syncing tier {tier} for clerk_id {user.clerk_id}")
@@ -63,6 +66,8 @@ async def downgrade_user(db: AsyncSession, customer_id: str):
         user_stmt = select(User).where(User.stripe_customer_id == customer_id)
         user_result = await db.execute(user_stmt)
         user = user_result.scalar_one_or_none()
+        if user:
+            entitlement_resolver.invalidate(email=user.email, user_key=user.auth_id)
         
         if user and user.clerk_id:
             logger.info(f"[Supabase] Syncing downgrade for clerk_id {user.clerk_id}")
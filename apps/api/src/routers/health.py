@@ -383,8 +383,11 @@ async def health_dependencies(db: AsyncSession = Depends(get_db)) -> HealthDepsR
     """
     Dependency-aware health: explicit degradation level for UI truthfulness.
     Prefer this over inferring health from HTTP 200 alone.
+    Served from the metrics collector's snapshot; computed inline only when it has none.
     """
-    base = await compute_health(db)
+    from services.metrics_collector import metrics_collector
+
+    base = await metrics_collector.health() or await compute_health(db)
     internal = base.pop("_internal", None) or {}
     level, reasons, user_message = _build_degradation_payload(base, internal)
 
@@ -483,5 +486,16 @@ async def odds_api_status():
 
 @router.get("/summary")
 async def meta_summary():
-    return {"status": "ok", "app": "PERPLEX-EDGE"}
+    """Liveness plus the metrics collector's last snapshot (never touches the database)."""
+    from services.metrics_collector import metrics_collector
+
+    snap = metrics_collector.peek()
+    return {
+        "status": "ok",
+        "app": "PERPLEX-EDGE",
+        "db_connected": snap.get("db_connected"),
+        "last_ingest_at": snap.get("last_ingest_at"),
+        "collected_at": snap.get("collected_at"),
+        "age_seconds": snap.get("age_seconds"),
+    }
 
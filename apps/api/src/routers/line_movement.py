@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Query, Depends
 from typing import Optional, List, Dict, Any
 from services.line_movement_service import line_movement_service
+from services.live_poll_planner import demand_tracker
 from common_deps import get_user_tier
 from db.session import AsyncSessionLocal
 
@@ -59,6 +60,7 @@ async def get_line_movement(
 
     try:
         if event_id:
+            demand_tracker.record(sport, event_id)
             # Return detailed book-level history for sparklines
             res = await line_movement_service.get_movement_for_event(event_id, sport)
             return {
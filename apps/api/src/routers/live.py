@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from real_data_connector import real_data_connector
 from db.session import get_db
 from services.live_scores_cache import read_cache_or_stale, upsert_live_scores_from_games
+from services.live_poll_planner import demand_tracker
 from api_utils.supabase_proxy import supabase
 from deps.auth_ws import get_current_user_ws
 
@@ -66,6 +67,7 @@ async def live_games(sport: str = "basketball_nba", db: AsyncSession = Depends(g
     Unified Live Games endpoint.
     Cascades through real_data_connector (Waterfall) and falls back to seeded database games.
     """
+    demand_tracker.record(sport)
     from services.props_service import get_all_props
     import random
     from datetime import datetime, timezone
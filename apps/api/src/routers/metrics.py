@@ -1,60 +1,79 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from db.session import get_db as get_async_db # standardizing on get_db but keeping name for compatibility
-from services.dashboard import get_dashboard_metrics
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter
 
 router = APIRouter()
 
 @router.get("")
-async def metrics(db: AsyncSession = Depends(get_async_db)):
-    """Returns core system metrics and health diagnostics."""
-    try:
-        from sqlalchemy import select, func, text
-        from models import UnifiedOdds, UnifiedEVSignal
-        from datetime import datetime, timezone
-        
-        # 1. Basic Health Check
-        health_check = await db.execute(text("SELECT 1"))
-        db_connected = health_check.scalar() == 1
-        
-        # 2. Last Ingest Time
-        last_ingest_stmt = select(func.max(UnifiedOdds.created_at))
-        last_ingest = (await db.execute(last_ingest_stmt)).scalar()
-        
-        # 3. Row Counts
-        odds_count_stmt = select(func.count(UnifiedOdds.id))
-        odds_count = (await db.execute(odds_count_stmt)).scalar() or 0
-        
-        ev_count_stmt = select(func.count(UnifiedEVSignal.id))
-        ev_count = (await db.execute(ev_count_stmt)).scalar() or 0
+async def metrics():
+    """Core system metrics from the background collector's snapshot (no per-request DB probes)."""
+    from services.metrics_collector import metrics_collector
 
-        # Current Dashboard Metrics (Fallback to placeholders if empty)
-        metrics_data = await get_dashboard_metrics(db)
-        
-        return {
-            **metrics_data,
-            "db_connected": db_connected,
-            "last_odds_ingest_at": last_ingest.isoformat() if last_ingest else "Never",
-            "counts": {
-                **metrics_data.get("counts", {}),
-                "odds_rows": odds_count,
-                "ev_signals": ev_count,
-            },
-            "status": "healthy" if odds_count > 0 else "awaiting_ingest",
-            "inference_status": "ACTIVE" if ev_count > 0 else "IDLE",
-            "pipeline_status": "ACTIVE",
-            "stream_status": "SYNCED"
-        }
-    except Exception as e:
-        import traceback
+    snap = await metrics_collector.snapshot()
+    if not snap.get("collected_at"):
         return {
             "status": "degraded",
-            "error": str(e),
+            "error": "metrics not collected yet",
             "db_connected": False,
             "last_odds_ingest_at": "Error"
         }
 
+    rows = snap.get("estimated_rows") or {}
+    odds_count = rows.get("unified_odds") or 0
+    ev_count = rows.get("ev_signals") or 0
+    metrics_data = snap.get("dashboard") or {}
+    return {
+        **metrics_data,
+        "db_connected": snap["db_connected"],
+        "last_odds_ingest_at": snap.get("last_ingest_at") or "Never",
+        "counts": {
+            **metrics_data.get("counts", {}),
+            "odds_rows": odds_count,
+            "ev_signals": ev_count,
+        },
+        "counts_estimated": True,
+        "feeds": snap.get("feeds", {}),
+        "collected_at": snap["collected_at"],
+        "age_seconds": snap.get("age_seconds"),
+        "status": "healthy" if odds_count > 0 else "awaiting_ingest",
+        "inference_status": "ACTIVE" if ev_count > 0 else "IDLE",
+        "pipeline_status": "ACTIVE",
+        "stream_status": "SYNCED"
+    }
+
+@router.get("/collector")
+async def collector_metrics():
+    """Metrics collector itself: refresh cadence, last refresh duration and snapshot age."""
+    from services.metrics_collector import metrics_collector
+
+    return metrics_collector.stats()
+
+@router.get("/delivery")
+async def delivery_metrics():
+    """Outbound alert queue depth, outcome counters and enqueue→delivery latency."""
+    from services.delivery_queue import delivery_queue
+
+    return await delivery_queue.stats()
+
+@router.get("/compute")
+async def compute_metrics():
+    """Compute executor pool: queue depth, in-flight jobs, outcomes and per-kind latency."""
+    from services.compute_executor import compute_executor
+
+    return compute_executor.stats()
+
+@router.get("/simulation-cache")
+async def simulation_cache_metrics():
+    """Monte Carlo result cache: hit rate by tier (LRU / Redis / coalesced), size and invalidations."""
+    from services.simulation_cache import simulation_cache
+
+    return simulation_cache.stats()
+
+@router.get("/db-pool")
+async def db_pool_metrics():
+    """Shared asyncpg pool: size, utilization and acquire wait (p50/p95/max) for raw-SQL services."""
+    from db.asyncpg_pool import pool_stats
+
+    return pool_stats()
+
 @router.get("/picks-stats")
 async def picks_stats():
     """Returns pick statistics (model performance) for the leaderboard page."""
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Query, Depends
+from fastapi.responses import JSONResponse
 from typing import List, Dict, Any, Optional
 from db.session import AsyncSessionLocal
 from services.parlay_service import parlay_service
-from services.monte_carlo_service import monte_carlo_service
+from services.monte_carlo_service import MC_MAX_SIMS, monte_carlo_service
+from services.compute_executor import ComputeError
 from schemas.universal import UniversalResponse, ResponseMeta
 from middleware.request_id import get_request_id
 from models.brain import UnifiedEVSignal
@@ -87,6 +89,15 @@ async def simulate_parlay(payload: Dict[str, Any]):
         legs = payload.get("legs", [])
         n_sims = payload.get("n_sims", 10000)
         sport = payload.get("sport") or "basketball_nba"
+        if not isinstance(n_sims, int) or isinstance(n_sims, bool) or not 1 <= n_sims <= MC_MAX_SIMS:
+            return JSONResponse(
+                status_code=400,
+                content={"error": {
+                    "code": "invalid_n_sims",
+                    "message": f"n_sims must be an integer between 1 and {MC_MAX_SIMS}",
+                    "request_id": get_request_id(),
+                }},
+            )
 
         # Ensure legs have required simulation fields (mean/std) if missing
         # For a real parlay matrix, we'd pull these from the model or historical data.
@@ -105,10 +116,14 @@ async def simulate_parlay(payload: Dict[str, Any]):
                 return await simulate_parlay_with_cache_and_persist(
                     session, sport, legs, n_sims=n_sims
                 )
+            except ComputeError:
+                raise
             except Exception as persist_err:
                 log.debug("Monte Carlo persist skipped: %s", persist_err)
 
-        results = monte_carlo_service.simulate_parlay(legs, n_sims=n_sims)
+        from services.monte_carlo_service import simulate_parlay_cached
+
+        results, cached = await simulate_parlay_cached(legs, n_sims=n_sims)
         return {
             "roi": results["parlay_ev"] * 100,
             "edge": results["parlay_ev"],
@@ -118,8 +133,14 @@ async def simulate_parlay(payload: Dict[str, Any]):
             "confidence": "high" if results["parlay_ev"] > 0.05 else "medium",
             "max_drawdown": 0.15,
             "leg_results": results["leg_results"],
-            "cached": False,
+            "cached": cached,
         }
+    except ComputeError as e:
+        log.warning(f"Simulation compute error: {e}")
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"error": {"code": e.code, "message": str(e), "request_id": get_request_id()}},
+        )
     except Exception as e:
         log.error(f"Simulation API Error: {e}")
         return {"error": str(e), "roi": 0, "edge": 0}
@@ -13,6 +13,7 @@ from sqlalchemy import select, desc, or_, and_
 from schemas.universal import UniversalResponse, ResponseMeta
 from services.heartbeat_service import HeartbeatService
 from middleware.request_id import get_request_id
+from services.live_poll_planner import demand_tracker
 from services.props_live_query import (
     props_live_game_time_window,
     props_live_window_params,
@@ -31,6 +32,7 @@ async def get_props_live(
     db: AsyncSession = Depends(get_async_db)
 ):
     """Returns market-based live props (Over/Under consolidated)."""
+    demand_tracker.record(sport, market=market)
     # Build query - prioritize player props if no market filter specified
     stmt = select(PropLive).where(
         PropLive.sport == sport,
@@ -88,6 +90,7 @@ async def list_props_legacy(
     Shape matches what is expected by the frontend. Legacy query parameter fallback.
     """
     from services.props_service import get_canonical_props
+    demand_tracker.record(sport, market=market)
     try:
         data = await get_canonical_props(sport=sport, min_ev=min_ev if min_ev > 0 else None, only_ev=False)
         return data
@@ -233,6 +236,21 @@ async def scored_props(
     except Exception as e:
         return {"data": [], "results": [], "count": 0, "error": str(e)}
 
+@router.get("/dvp")
+async def slate_dvp(
+    player_ids: str = Query(..., description="Comma-separated player ids on the slate"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Defense-vs-position context for every player on a slate in one call."""
+    from services.dvp_service import get_dvp_for_slate
+    ids = [pid.strip() for pid in player_ids.split(",") if pid.strip()][:200]
+    try:
+        cards = await get_dvp_for_slate(ids, db)
+        return {"data": cards, "count": len(cards), "updated": datetime.utcnow().isoformat() + "Z"}
+    except Exception as e:
+        logger.error(f"Slate DvP failed: {e}")
+        return {"data": {}, "count": 0, "error": str(e)}
+
 # Phase 6 Canonical Board Endpoint
 @router.get("/{sport_path}")
 async def list_props_by_sport(
@@ -245,6 +263,7 @@ async def list_props_by_sport(
 ):
     """Strict Canonical format by sport path var."""
     from services.props_service import get_canonical_props
+    demand_tracker.record(sport_path, market=market)
     try:
         data = await get_canonical_props(sport=sport_path, min_ev=min_ev if min_ev > 0 else None, only_ev=False)
         return data
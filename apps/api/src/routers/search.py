@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import logging
+import time
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.session import get_db
 from models.prop import PropLine
+from services.search_index import search_index
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["search"])
 
@@ -12,24 +18,53 @@ router = APIRouter(tags=["search"])
 async def search_props(q: str, db: AsyncSession = Depends(get_db)):
     if not q or len(q) < 3:
         return {"results": []}
-        
+
     try:
-        search_term = f"%{q}%"
-        
+        # Resolve the query to known player / team names (trigram index), then match
+        # those exactly instead of scanning proplines with ILIKE '%q%'.
+        matches, _cached = await search_index.search(db, q, limit=10)
+        players = [m["name"] for m in matches if m["kind"] == "player"]
+        teams = [m["name"] for m in matches if m["kind"] == "team"]
+        if players or teams:
+            name_filter = or_(PropLine.player_name.in_(players), PropLine.team.in_(teams))
+        else:
+            # Dictionary not built yet or no hit: fall back to the substring scan.
+            search_term = f"%{q}%"
+            name_filter = or_(PropLine.player_name.ilike(search_term), PropLine.team.ilike(search_term))
+
         # Using PropLine as it's the current model for player props
         stmt = select(PropLine).filter(
             PropLine.is_settled == False,
-            or_(
-                PropLine.player_name.ilike(search_term),
-                PropLine.team.ilike(search_term)
-            )
+            name_filter
         ).order_by(PropLine.steam_score.desc()).limit(10)
-        
+
         res = await db.execute(stmt)
         props = res.scalars().all()
-        
+
         return {"results": props}
     except Exception as e:
-        import logging
-        logging.error(f"Search error for {q}: {e}")
+        logger.error(f"Search error for {q}: {e}")
         return {"results": []}
+
+
+@router.get("/typeahead")
+async def typeahead(
+    q: str = Query(..., min_length=1, max_length=64),
+    kind: Optional[Literal["player", "team"]] = None,
+    sport: Optional[str] = None,
+    limit: int = Query(8, ge=1, le=25),
+    db: AsyncSession = Depends(get_db),
+):
+    """Ranked player / team suggestions (prefix first, then fuzzy)."""
+    started = time.perf_counter()
+    try:
+        results, cached = await search_index.search(db, q, kind=kind, sport=sport, limit=limit)
+    except Exception as e:
+        logger.error(f"Typeahead error for {q}: {e}")
+        results, cached = [], False
+    return {
+        "query": q,
+        "results": results,
+        "cached": cached,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
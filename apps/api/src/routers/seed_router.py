@@ -6,6 +6,7 @@ from sqlalchemy import text
 from db.session import AsyncSessionLocal
 from deps.auth import verify_admin
 from services.seed_scheduler import run_seed_pipeline
+from services.prizepicks_collector import prizepicks_collector
 
 router = APIRouter(prefix="/api/seed", tags=["seed"])
 
@@ -55,3 +56,12 @@ async def get_seed_status(admin: None = Depends(verify_admin)):
                 "error": "Table not initialized or query failed",
                 "details": str(e)
             }
+
+
+@router.get("/line-changes")
+async def get_line_changes(limit: int = 100, admin: None = Depends(verify_admin)):
+    """
+    Most recent PrizePicks line moves observed by the collector (newest first).
+    """
+    events = list(prizepicks_collector.recent_events)[-max(1, min(limit, 1000)):]
+    return {"count": len(events), "events": [e.to_dict() for e in reversed(events)]}
@@ -4,6 +4,7 @@ import stripe, os
 from core.config import settings
 from common_deps import get_db, require_elite
 from api_utils.supabase_proxy import supabase
+from services.entitlements import entitlement_resolver
 
 router = APIRouter(tags=["Stripe Monetization"])
 
@@ -105,6 +106,7 @@ async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_db)):
 
             user.subscription_tier = stripe_service.resolve_tier(price_id)
             await db.commit()
+            entitlement_resolver.invalidate(email=user.email, user_key=user.auth_id)
             
             # Sync with Supabase profiles
             try:
@@ -119,5 +121,21 @@ async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_db)):
             print(f"✅ Subscription tier updated to {user.subscription_tier} for user {user.email}")
         else:
             print(f"⚠️ User not found for Stripe completion: ID={user_id}, Email={customer_email}")
+
+    elif event['type'].startswith('customer.subscription.') or event['type'].startswith('invoice.'):
+        # Plan changes, cancellations and failed renewals: drop cached entitlements so
+        # the next request re-resolves the tier instead of waiting out the TTL.
+        obj = event['data']['object']
+        customer_id = obj.get('customer')
+        email = obj.get('customer_email')
+        from models.user import User
+
+        if customer_id:
+            result = await db.execute(select(User).where(User.stripe_customer_id == customer_id))
+            user = result.scalar_one_or_none()
+            if user:
+                entitlement_resolver.invalidate(email=user.email, user_key=user.auth_id)
+        if email:
+            entitlement_resolver.invalidate(email=email)
             
     return {"status": "success"}
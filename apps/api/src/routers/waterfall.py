@@ -27,6 +27,7 @@ from core.waterfall_config import all_registry_sport_keys
 from real_data_connector import real_data_connector, SPORT_KEY_TO_ID
 from services.waterfall_router import waterfall_router
 from services.cache import cache
+from services.live_poll_planner import demand_tracker
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["waterfall"])
@@ -458,6 +459,7 @@ async def waterfall_props(
     Supported markets: player_points, player_rebounds, player_assists,
     player_threes, player_blocks, player_steals, player_turnovers.
     """
+    demand_tracker.record(sport, game_id, market)
     try:
         props = await real_data_connector.fetch_player_props(sport, game_id, market)
         return {
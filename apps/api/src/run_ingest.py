@@ -31,6 +31,10 @@ async def run_test_ingest():
         logger.error(f"Ingestion failed: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        # No API shutdown hook here: write the buffered ingest heartbeats before exiting.
+        from services.heartbeat_service import heartbeat_buffer
+        await heartbeat_buffer.stop()
 
 if __name__ == "__main__":
     asyncio.run(run_test_ingest())
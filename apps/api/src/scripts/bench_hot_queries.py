@@ -0,0 +1,258 @@
+"""
+Benchmark the hot props / odds reads before and after the composite indexes of
+alembic revision b7e1d4c2a9f3 (hot_query_composite_indexes).
+
+Seeds a multi-sport slate (games x players x markets x books x over/under, plus the
+matching ev_signals and props_live rows and a tail of past games), then times each
+query with the index set dropped ("before") and created ("after"):
+
+  * canonical_props     — the Postgres query in PropsService.get_canonical_props
+  * props_live          — GET /api/props/live (player markets, newest first)
+  * props_live_market   — GET /api/props/live?market=player_points
+  * sharp_consensus     — CLVEngine._execute_sharp_consensus
+
+Usage (from apps/api/src):
+    python scripts/bench_hot_queries.py                      # temp SQLite file
+    python scripts/bench_hot_queries.py --database-url postgresql+asyncpg://.../bench_scratch
+    python scripts/bench_hot_queries.py --games 20 --runs 200 --json
+
+Point --database-url at a scratch database: the script creates and fills
+unified_odds / ev_signals / props_live and refuses to run if they already hold rows.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import desc, select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+from db.base import Base  # noqa: E402
+from models.brain import PropLive, UnifiedEVSignal, UnifiedOdds  # noqa: E402
+from services.props_live_query import (  # noqa: E402
+    props_live_game_time_window,
+    props_live_window_params,
+    props_live_window_sql_clause,
+)
+
+MIGRATION = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "alembic", "versions", "b7e1d4c2a9f3_hot_query_composite_indexes.py",
+)
+
+SPORTS = ["basketball_nba", "icehockey_nhl", "baseball_mlb", "americanfootball_nfl", "soccer_epl", "basketball_wnba"]
+BOOKS = ["draftkings", "fanduel", "betmgm", "caesars", "pinnacle", "bovada", "betrivers", "circa"]
+PLAYER_MARKETS = ["player_points", "player_rebounds", "player_assists", "player_threes", "player_shots_on_goal"]
+TEAM_MARKETS = ["h2h", "spreads", "totals"]
+
+# Mirrors the Postgres branch of PropsService.get_canonical_props.
+CANONICAL_SQL = """
+SELECT o.id AS odds_id, o.event_id, o.sport, o.league, o.home_team, o.away_team, o.game_time,
+       o.player_name, o.market_key, o.outcome_key, o.line, o.price, o.bookmaker, o.implied_prob,
+       o.created_at AS updated_at, e.true_prob, e.edge_percent
+FROM unified_odds o
+LEFT JOIN ev_signals e ON
+    o.event_id = e.event_id AND o.sport = e.sport AND o.player_name = e.player_name AND
+    o.market_key = e.market_key AND o.outcome_key = e.outcome_key AND o.bookmaker = e.bookmaker
+WHERE o.sport = :sport
+  AND o.market_key NOT IN ('h2h', 'spreads', 'totals')
+""" + props_live_window_sql_clause("o.game_time")
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("hot_query_indexes", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def slate_rows(sports: int, games: int, players: int, books: int, past_days: int, seed: int = 7):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    odds: List[Dict[str, Any]] = []
+    signals: List[Dict[str, Any]] = []
+    live: List[Dict[str, Any]] = []
+    for sport in SPORTS[:sports]:
+        # upcoming slate plus a tail of already-played games the window must skip
+        starts = [now + timedelta(hours=rng.randint(1, 72)) for _ in range(games)]
+        starts += [now - timedelta(days=rng.randint(1, past_days)) for _ in range(games * 2)]
+        for g, start in enumerate(starts):
+            event_id = f"{sport}_evt{g:04d}"
+            home, away = f"{sport[:4]}_home{g}", f"{sport[:4]}_away{g}"
+            markets = [(m, f"{sport[:4]}_p{g:03d}_{p:02d}") for m in PLAYER_MARKETS for p in range(players)]
+            markets += [(m, None) for m in TEAM_MARKETS]
+            for market, player in markets:
+                line = rng.choice([0.5, 1.5, 4.5, 12.5, 24.5])
+                for book in BOOKS[:books]:
+                    for side in ("over", "under"):
+                        price = rng.uniform(1.7, 2.2)
+                        outcome = f"{player or home}_{side}_{line}"
+                        odds.append({
+                            "sport": sport, "event_id": event_id, "market_key": market, "outcome_key": outcome,
+                            "bookmaker": book, "line": line, "price": price, "implied_prob": 1 / price,
+                            "player_name": player, "league": sport, "game_time": start,
+                            "home_team": home, "away_team": away, "created_at": now,
+                        })
+                        if player and rng.random() < 0.5:
+                            signals.append({
+                                "sport": sport, "event_id": event_id, "market_key": market, "outcome_key": outcome,
+                                "player_name": player, "bookmaker": book, "price": price, "line": line,
+                                "true_prob": 1 / price + 0.02, "edge_percent": rng.uniform(-5, 8),
+                                "engine_version": "bench", "created_at": now, "updated_at": now,
+                            })
+                    live.append({
+                        "sport": sport, "game_id": event_id, "game_start_time": start, "player_name": player,
+                        "team": home, "market_key": market, "line": line, "book": book,
+                        "odds_over": -110, "odds_under": -110,
+                        "last_updated_at": now - timedelta(seconds=rng.randint(0, 86400)),
+                    })
+    return odds, signals, live
+
+
+async def seed(engine, args) -> Dict[str, int]:
+    tables = [UnifiedOdds.__table__, UnifiedEVSignal.__table__, PropLive.__table__]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: Base.metadata.create_all(sync, tables=tables))
+        existing = (await conn.execute(text("SELECT COUNT(*) FROM unified_odds"))).scalar()
+        if existing:
+            raise SystemExit("unified_odds already has rows; point --database-url at a scratch database")
+    odds, signals, live = slate_rows(args.sports, args.games, args.players, args.books, args.past_days)
+    async with engine.begin() as conn:
+        for table, rows in ((UnifiedOdds.__table__, odds), (UnifiedEVSignal.__table__, signals),
+                            (PropLive.__table__, live)):
+            for i in range(0, len(rows), 5000):
+                await conn.execute(table.insert(), rows[i:i + 5000])
+    return {"unified_odds": len(odds), "ev_signals": len(signals), "props_live": len(live)}
+
+
+def hot_queries(sport: str, event_id: str, outcome_key: str) -> Dict[str, Callable]:
+    from services.clv_service import CLVEngine
+
+    t_lo, t_hi = props_live_window_params()
+    clv = CLVEngine()
+
+    async def canonical_props(db):
+        return (await db.execute(text(CANONICAL_SQL), {"sport": sport, "t_lo": t_lo, "t_hi": t_hi})).all()
+
+    async def props_live(db):
+        stmt = select(PropLive).where(
+            PropLive.sport == sport,
+            props_live_game_time_window(PropLive.game_start_time),
+            PropLive.market_key.notin_(TEAM_MARKETS),
+        ).order_by(desc(PropLive.last_updated_at)).limit(25)
+        return (await db.execute(stmt)).scalars().all()
+
+    async def props_live_market(db):
+        stmt = select(PropLive).where(
+            PropLive.sport == sport,
+            props_live_game_time_window(PropLive.game_start_time),
+            PropLive.market_key == "player_points",
+        ).order_by(desc(PropLive.last_updated_at)).limit(25)
+        return (await db.execute(stmt)).scalars().all()
+
+    async def sharp_consensus(db):
+        return await clv._execute_sharp_consensus(db, event_id, "player_points", outcome_key)
+
+    return {
+        "canonical_props": canonical_props,
+        "props_live": props_live,
+        "props_live_market": props_live_market,
+        "sharp_consensus": sharp_consensus,
+    }
+
+
+def percentile(samples: List[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+async def time_queries(engine, queries: Dict[str, Callable], runs: int, warmup: int = 3) -> Dict[str, Dict[str, float]]:
+    out = {}
+    async with AsyncSession(engine) as db:
+        for name, query in queries.items():
+            for _ in range(warmup):
+                await query(db)
+            samples = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                await query(db)
+                samples.append((time.perf_counter() - started) * 1000)
+            out[name] = {"p50_ms": round(percentile(samples, 0.50), 3), "p95_ms": round(percentile(samples, 0.95), 3)}
+    return out
+
+
+async def set_indexes(engine, migration, present: bool) -> None:
+    dialect = engine.dialect.name
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for spec in migration.INDEXES:
+            sql = migration.create_index_sql(spec, dialect) if present else migration.drop_index_sql(spec, dialect)
+            await conn.execute(text(sql))
+        await conn.execute(text("ANALYZE"))
+
+
+async def run(args) -> Dict[str, Any]:
+    url = args.database_url or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_async_engine(url)
+    migration = load_migration()
+    try:
+        rows = await seed(engine, args)
+        async with engine.connect() as conn:
+            event_id, outcome_key = (await conn.execute(text(
+                "SELECT event_id, outcome_key FROM unified_odds WHERE market_key = 'player_points' "
+                "AND game_time > :now ORDER BY event_id, outcome_key LIMIT 1"
+            ), {"now": datetime.now(timezone.utc)})).one()
+        queries = hot_queries(SPORTS[0], event_id, outcome_key)
+        report: Dict[str, Any] = {"database": engine.dialect.name, "rows": rows, "runs": args.runs}
+        phases = ["before", "after"] if args.phase == "both" else [args.phase]
+        for phase in phases:
+            await set_indexes(engine, migration, present=(phase == "after"))
+            report[phase] = await time_queries(engine, queries, args.runs)
+        return report
+    finally:
+        await engine.dispose()
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"database: {report['database']}  runs/query: {report['runs']}  rows: {report['rows']}")
+    phases = [p for p in ("before", "after") if p in report]
+    header = f"{'query':<20}" + "".join(f"{p + ' p50':>14}{p + ' p95':>14}" for p in phases)
+    print(header)
+    print("-" * len(header))
+    for name in report[phases[0]]:
+        cells = "".join(f"{report[p][name]['p50_ms']:>14.3f}{report[p][name]['p95_ms']:>14.3f}" for p in phases)
+        print(f"{name:<20}{cells}")
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=None, help="scratch database (default: temp SQLite file)")
+    parser.add_argument("--sports", type=int, default=4)
+    parser.add_argument("--games", type=int, default=8, help="upcoming games per sport (2x as many past games)")
+    parser.add_argument("--players", type=int, default=10, help="players per game")
+    parser.add_argument("--books", type=int, default=6)
+    parser.add_argument("--past-days", type=int, default=30)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--phase", choices=["before", "after", "both"], default="both")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
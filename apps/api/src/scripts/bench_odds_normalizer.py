@@ -0,0 +1,202 @@
+"""
+Benchmark the odds normalization path (Stage 3 + unified_odds row build).
+
+Compares a reference copy of the previous mapper (dict per group, Decimal per price,
+pydantic validation per row, then a second walk to split unified_odds outcomes)
+against the columnar single-pass batch, with sampled validation (the ingest default,
+ODDS_MAPPING_VALIDATE_SAMPLE) and with every row validated (ODDS_MAPPING_STRICT=true).
+
+Usage (from apps/api/src):
+    python scripts/bench_odds_normalizer.py recorded/nba_props_*.json
+    python scripts/bench_odds_normalizer.py --synthetic 200   # no recordings at hand
+
+Recorded payloads are The Odds API ``/odds`` or ``/events/{id}/odds`` JSON bodies
+(a list of events, or a single event object).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.odds_normalizer import normalize_theodds_props  # noqa: E402
+from services.unified_ingestion import UnifiedIngestionService  # noqa: E402
+
+BOOKS = ["draftkings", "fanduel", "betmgm", "caesars", "pinnacle", "bovada", "betrivers", "pointsbetus"]
+MARKETS = ["player_points", "player_rebounds", "player_assists", "player_threes", "player_points_rebounds_assists"]
+
+
+def synthetic_payload(events: int, players: int = 16) -> List[Dict[str, Any]]:
+    rng = random.Random(7)
+    out = []
+    for e in range(events):
+        bookmakers = []
+        for book in BOOKS:
+            markets = []
+            for m in MARKETS:
+                outcomes = []
+                for p in range(players):
+                    line = rng.choice([4.5, 6.5, 12.5, 18.5, 24.5])
+                    for side in ("Over", "Under"):
+                        outcomes.append({
+                            "name": side,
+                            "description": f"Player{p:02d} Team{e:03d}",
+                            "price": rng.choice([-130, -120, -115, -110, -105, 100, 105]),
+                            "point": line,
+                        })
+                markets.append({"key": m, "outcomes": outcomes})
+            bookmakers.append({"key": book, "last_update": "2026-01-01T00:00:00Z", "markets": markets})
+        out.append({
+            "id": f"evt{e}",
+            "sport_title": "NBA",
+            "commence_time": "2026-01-01T01:00:00Z",
+            "home_team": f"Home{e}",
+            "away_team": f"Away{e}",
+            "bookmakers": bookmakers,
+        })
+    return out
+
+
+def load_payloads(paths: List[str]) -> List[Dict[str, Any]]:
+    events: List[Dict[str, Any]] = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            body = json.load(f)
+        events.extend(body if isinstance(body, list) else [body])
+    return events
+
+
+def legacy_path(odds_raw, meta, sport):
+    """Reference copy of the pre-columnar mapper: dict per group, Decimal per price, full validation."""
+    from datetime import datetime, timezone
+    from decimal import Decimal
+    from schemas.props import PropRecord
+
+    def norm(name):
+        if not name:
+            return ""
+        name = name.strip()
+        if "," in name:
+            parts = [p.strip() for p in name.split(",")]
+            if len(parts) == 2:
+                name = f"{parts[1]} {parts[0]}"
+        for s in [" jr.", " jr", " iii", " ii", " iv"]:
+            if name.lower().endswith(s):
+                name = name[:-(len(s))].strip()
+        return name.title()
+
+    def implied(price):
+        american = int(price)
+        if american > 0:
+            return Decimal(100) / Decimal(american + 100)
+        return Decimal(abs(american)) / Decimal(abs(american) + 100)
+
+    now = datetime.now(timezone.utc)
+    grouped = {}
+    for event in odds_raw:
+        eid = event.get("id")
+        m = meta.get(eid, {})
+        league = event.get("sport_title") or sport.split("_")[-1].upper()
+        for bookmaker in event.get("bookmakers", []):
+            book_key = bookmaker.get("key")
+            lu = bookmaker.get("last_update")
+            source_ts = datetime.fromisoformat(lu.replace("Z", "+00:00")) if lu else now
+            for market in bookmaker.get("markets", []):
+                m_key = market.get("key")
+                for o in market.get("outcomes", []):
+                    name, desc, price, line = o.get("name"), o.get("description"), o.get("price"), o.get("point")
+                    if name is None or price is None:
+                        continue
+                    side = name.lower()
+                    is_main = m_key in ["h2h", "spreads", "totals"]
+                    p_name = ""
+                    if not is_main:
+                        p_name = desc if desc else ""
+                        if p_name.lower() in ["over", "under"] and name:
+                            p_name = name
+                    if not p_name and not is_main:
+                        p_name = desc or name or ""
+                    p_name = norm(p_name)
+                    if p_name.lower() in ["over", "under", "yes", "no"]:
+                        p_name = ""
+                    key = (eid, m_key, p_name or "team", book_key)
+                    if key not in grouped:
+                        grouped[key] = {
+                            "sport": sport, "league": league, "game_id": eid,
+                            "game_start_time": m.get("game_time"), "home_team": m.get("home_team"),
+                            "away_team": m.get("away_team"), "player_name": p_name, "market_key": m_key,
+                            "line": Decimal(str(line)) if line is not None else None, "book": book_key,
+                            "source_ts": source_ts, "odds_over": None, "odds_under": None,
+                            "implied_over": None, "implied_under": None,
+                        }
+                    imp = implied(price)
+                    if "over" in side or "home" in side:
+                        grouped[key]["odds_over"], grouped[key]["implied_over"] = Decimal(str(price)), imp
+                    elif "under" in side or "away" in side:
+                        grouped[key]["odds_under"], grouped[key]["implied_under"] = Decimal(str(price)), imp
+    records = [PropRecord(**d) for d in grouped.values()]
+    for r in records:
+        if not r.player_name:
+            r.player_name = r.home_team or "Matchup"
+    rows = []
+    for r in records:
+        base = {
+            "sport": r.sport, "league": r.league, "event_id": r.game_id, "game_time": r.game_start_time,
+            "home_team": r.home_team, "away_team": r.away_team, "market_key": r.market_key,
+            "player_name": r.player_name, "bookmaker": r.book,
+            "line": float(r.line) if r.line is not None else None,
+        }
+        for side, price, imp in (("over", r.odds_over, r.implied_over), ("under", r.odds_under, r.implied_under)):
+            if price is not None or imp is not None:
+                rows.append({**base, "outcome_key": side, "price": float(price) if price else 2.0,
+                             "implied_prob": float(imp) if imp else None})
+    return records, rows
+
+
+def columnar_path(odds_raw, meta, sport, strict=False):
+    batch = normalize_theodds_props(odds_raw, meta, sport)
+    batch.finalize()
+    batch.validate(strict=strict)
+    return batch.props_live_rows(), batch.unified_rows()
+
+
+def columnar_strict_path(odds_raw, meta, sport):
+    return columnar_path(odds_raw, meta, sport, strict=True)
+
+
+def bench(fn, *args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("payloads", nargs="*", help="Recorded provider JSON files")
+    parser.add_argument("--synthetic", type=int, default=60, help="Synthetic event count when no files given")
+    parser.add_argument("--sport", default="basketball_nba")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    odds_raw = load_payloads(args.payloads) if args.payloads else synthetic_payload(args.synthetic)
+    meta = UnifiedIngestionService._build_metadata_map(odds_raw)
+
+    legacy = bench(legacy_path, odds_raw, meta, args.sport, repeat=args.repeat)
+    sampled = bench(columnar_path, odds_raw, meta, args.sport, repeat=args.repeat)
+    strict = bench(columnar_strict_path, odds_raw, meta, args.sport, repeat=args.repeat)
+    records, rows = columnar_path(odds_raw, meta, args.sport)
+    print(f"events={len(odds_raw)} records={len(records)} unified_rows={len(rows)}")
+    print(f"legacy mapper + second walk     : {legacy * 1000:8.1f} ms")
+    print(f"columnar (sampled validation)   : {sampled * 1000:8.1f} ms  ({legacy / sampled:.2f}x)")
+    print(f"columnar (strict validation)    : {strict * 1000:8.1f} ms  ({legacy / strict:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
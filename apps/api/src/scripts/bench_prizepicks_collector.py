@@ -0,0 +1,167 @@
+"""
+Benchmark the PrizePicks collector (board parse + staging write).
+
+Compares a reference copy of the previous collector (json parse, per-row
+INSERT ... ON CONFLICT DO NOTHING) against the diffing collector (single parse,
+memoized names, content-hash skip, one executemany upsert). Both write into an
+in-memory SQLite copy of pp_projections_staging, so numbers track parse + write
+cost rather than network or Postgres latency.
+
+Usage (from apps/api/src):
+    python scripts/bench_prizepicks_collector.py recorded/prizepicks_board_*.json
+    python scripts/bench_prizepicks_collector.py --synthetic 5000   # no recordings at hand
+
+Recorded payloads are raw ``/projections`` response bodies. The first file is the
+cold board; each following file is replayed as a refresh against it.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from services.prizepicks_collector import PrizePicksCollector, iter_board  # noqa: E402
+
+STAGING_DDL = """
+    CREATE TABLE pp_projections_staging (
+        id TEXT PRIMARY KEY,
+        player_name TEXT NOT NULL,
+        stat_type TEXT NOT NULL,
+        line_score REAL NOT NULL,
+        league TEXT,
+        game_time TIMESTAMP,
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        graded BOOLEAN DEFAULT FALSE,
+        actual_value REAL,
+        hit BOOLEAN,
+        content_hash TEXT
+    )
+"""
+
+STATS = ["Points", "Rebounds", "Assists", "Pts+Rebs+Asts", "3-PT Made", "Fantasy Score"]
+
+
+def synthetic_board(projections: int, moved: float = 0.0, seed: int = 11) -> bytes:
+    rng = random.Random(seed)
+    move = random.Random(seed + 1)
+    players = max(1, projections // len(STATS))
+    data = []
+    for i in range(projections):
+        line = rng.choice([4.5, 6.5, 12.5, 18.5, 24.5, 31.5])
+        if moved and move.random() < moved:
+            line += 1.0
+        data.append({
+            "id": str(100000 + i),
+            "type": "projection",
+            "attributes": {
+                "stat_type": STATS[i % len(STATS)],
+                "line_score": line,
+                "league": "NBA",
+                "start_time": "2026-03-01T00:30:00Z",
+            },
+            "relationships": {"new_player": {"data": {"id": f"pl{i % players}", "type": "new_player"}}},
+        })
+    included = [
+        {"type": "new_player", "id": f"pl{p}", "attributes": {"name": f"Player Number{p} Jr."}}
+        for p in range(players)
+    ]
+    return json.dumps({"data": data, "included": included}).encode()
+
+
+def legacy_parse(body: bytes) -> List[dict]:
+    """Reference copy of the previous fetch_prizepicks_board parsing."""
+    data = json.loads(body)
+    players = {}
+    for item in data.get("included", []):
+        if item.get("type") == "new_player":
+            players[item.get("id")] = item.get("attributes", {}).get("name")
+    parsed = []
+    for proj in data.get("data", []):
+        attr = proj.get("attributes", {})
+        rel = proj.get("relationships", {})
+        player_name = players.get(rel.get("new_player", {}).get("data", {}).get("id"))
+        if not player_name:
+            continue
+        parsed.append({
+            "id": str(proj.get("id")),
+            "player_name": player_name,
+            "stat_type": attr.get("stat_type"),
+            "line_score": float(attr.get("line_score", 0)),
+            "league": attr.get("league"),
+            "game_time": attr.get("start_time"),
+        })
+    return parsed
+
+
+async def legacy_write(session, projections: List[dict]) -> None:
+    """Reference copy of the previous row-by-row upsert."""
+    sql = text("""
+        INSERT INTO pp_projections_staging
+        (id, player_name, stat_type, line_score, league, game_time)
+        VALUES (:id, :player_name, :stat_type, :line_score, :league, :game_time)
+        ON CONFLICT (id) DO NOTHING
+    """)
+    for p in projections:
+        game_time = p["game_time"]
+        if isinstance(game_time, str):
+            try:
+                game_time = datetime.fromisoformat(game_time.replace("Z", "+00:00"))
+            except ValueError:
+                pass
+        await session.execute(sql, {**p, "game_time": game_time})
+    await session.commit()
+
+
+async def run_pass(bodies: List[bytes], diffing: bool) -> List[float]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(text(STAGING_DDL))
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    collector = PrizePicksCollector()
+    timings = []
+    async with maker() as session:
+        for body in bodies:
+            start = time.perf_counter()
+            if diffing:
+                await collector.upsert(list(iter_board(body)), session)
+            else:
+                await legacy_write(session, legacy_parse(body))
+            timings.append(time.perf_counter() - start)
+    await engine.dispose()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("payloads", nargs="*", help="Recorded board JSON files (cold board first)")
+    parser.add_argument("--synthetic", type=int, default=3000, help="Synthetic projection count when no files given")
+    parser.add_argument("--moved", type=float, default=0.05, help="Share of synthetic lines moved on refresh")
+    args = parser.parse_args()
+
+    if args.payloads:
+        bodies = []
+        for path in args.payloads:
+            with open(path, "rb") as f:
+                bodies.append(f.read())
+    else:
+        bodies = [synthetic_board(args.synthetic), synthetic_board(args.synthetic, moved=args.moved)]
+
+    legacy = asyncio.run(run_pass(bodies, diffing=False))
+    diffing = asyncio.run(run_pass(bodies, diffing=True))
+    print(f"boards={len(bodies)} projections={len(legacy_parse(bodies[0]))}")
+    for i, (a, b) in enumerate(zip(legacy, diffing)):
+        label = "cold board" if i == 0 else f"refresh {i}"
+        print(f"{label:<12} legacy {a * 1000:8.1f} ms   diffing {b * 1000:8.1f} ms  ({a / b:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
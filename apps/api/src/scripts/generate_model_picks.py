@@ -22,6 +22,9 @@ async def generate_picks():
         import traceback
         traceback.print_exc()
         print(f"❌ Analysis failed: {e}")
+    finally:
+        from services.heartbeat_service import heartbeat_buffer
+        await heartbeat_buffer.stop()
 
 if __name__ == "__main__":
     asyncio.run(generate_picks())
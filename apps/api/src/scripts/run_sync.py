@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
 
 from jobs.ingestion_service import ingest_all_odds
+from services.heartbeat_service import heartbeat_buffer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,6 +19,8 @@ async def main():
         logger.info("✅ Manual ingestion complete!")
     except Exception as e:
         logger.error(f"❌ Ingestion failed: {e}")
+    finally:
+        await heartbeat_buffer.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -12,6 +12,7 @@ logging.basicConfig(level=logging.ERROR, format='%(levelname)s:%(name)s:%(messag
 logger = logging.getLogger(__name__)
 
 from jobs.ingestion_service import ingest_all_odds, SPORT_KEY_MAP
+from services.heartbeat_service import heartbeat_buffer
 import jobs.ingestion_service
 logger.error(f"DEBUG: ingestion_service file = {jobs.ingestion_service.__file__}")
 
@@ -23,6 +24,7 @@ async def test_single():
     
     print("🚀 Starting test ingestion for NBA (30)...")
     await ingest_all_odds()
+    await heartbeat_buffer.stop()
     print("✅ Test ingestion complete.")
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from dotenv import load_dotenv; load_dotenv()
 from jobs.ingestion_service import ingest_all_odds
 from services.odds.fetchers import SPORT_KEY_MAP
+from services.heartbeat_service import heartbeat_buffer
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +23,7 @@ async def test_nba():
         print(f"INGEST DEBUG: source file: {sys.modules['jobs.ingestion_service'].__file__}")
         print("Starting NBA-only ingestion test...")
         await ingest_all_odds()
+        await heartbeat_buffer.stop()
         print("NBA-only ingestion test complete.")
 
 if __name__ == "__main__":
@@ -119,5 +119,8 @@ async def verify_brain_stack():
             print(f"DB Verification Error: {e}")
             traceback.print_exc()
 
+    from services.heartbeat_service import heartbeat_buffer
+    await heartbeat_buffer.stop()
+
 if __name__ == "__main__":
     asyncio.run(verify_brain_stack())
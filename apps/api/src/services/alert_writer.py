@@ -1,10 +1,9 @@
 import logging
-import asyncio
+import os
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, insert
-from models.brain import WhaleMove, SteamEvent, SharpSignal
+from sqlalchemy import text
 from services.heartbeat_service import HeartbeatService
 from core.config import settings
 
@@ -13,214 +12,238 @@ logger = logging.getLogger(__name__)
 # Sharp books for move detection
 SHARP_BOOKS = ['pinnacle', 'bookmaker', 'lowvig', 'draftkings', 'fanduel']
 
-async def run_alert_detection(sport: str, db: Optional[AsyncSession] = None) -> int:
-    """Entry point for intelligence generation after an ingestion cycle."""
+# Fallback window for "rows changed in the current ingest" when the caller passes no cutoff.
+ALERT_DETECTION_LOOKBACK_MINUTES = int(os.getenv("ALERT_DETECTION_LOOKBACK_MINUTES", "15"))
+
+# 1. WHALE DETECTION (Consensus Discrepancy)
+# Identify books priced significantly far from the consensus, but only for
+# (event, market, outcome, player, line) groups touched since :since. Each move is
+# keyed by a fingerprint of its book + price so repeated cycles do not re-insert it;
+# sharp_alerts rows are only written for moves that were actually new.
+WHALE_DETECTION_SQL = text("""
+    WITH changed AS (
+        SELECT DISTINCT event_id, market_key, outcome_key, player_name, line
+        FROM unified_odds
+        WHERE sport = :sport AND player_name IS NOT NULL AND created_at >= :since
+    ),
+    consensus AS (
+        SELECT
+            u.event_id, u.market_key, u.outcome_key, u.player_name, u.line,
+            AVG(u.price) AS avg_price
+        FROM unified_odds u
+        JOIN changed ch
+            ON u.event_id = ch.event_id
+            AND u.market_key = ch.market_key
+            AND u.outcome_key = ch.outcome_key
+            AND u.player_name = ch.player_name
+            AND u.line IS NOT DISTINCT FROM ch.line
+        WHERE u.sport = :sport
+        GROUP BY u.event_id, u.market_key, u.outcome_key, u.player_name, u.line
+        HAVING COUNT(DISTINCT u.bookmaker) >= 3
+    ),
+    whales AS (
+        SELECT
+            u.event_id, u.player_name, u.market_key, u.outcome_key,
+            u.line, u.bookmaker, u.price, c.avg_price,
+            u.home_team, u.away_team,
+            ABS(u.price - c.avg_price) AS gap,
+            md5(concat_ws('|', :sport, u.event_id, u.player_name, u.market_key, u.outcome_key,
+                          u.bookmaker, u.line::text, round(u.price::numeric, 2)::text)) AS fingerprint
+        FROM unified_odds u
+        JOIN consensus c
+            ON u.event_id = c.event_id
+            AND u.market_key = c.market_key
+            AND u.outcome_key = c.outcome_key
+            AND u.player_name = c.player_name
+            AND u.line IS NOT DISTINCT FROM c.line
+        WHERE u.sport = :sport
+          AND ABS(u.price - c.avg_price) >= 25
+    ),
+    inserted AS (
+        INSERT INTO whale_moves (
+            sport, event_id, player_name, market_key, selection, bookmaker, line,
+            price_after, price_before, severity, whale_label, move_type, books_involved,
+            amount_estimate, move_fingerprint, created_at
+        )
+        SELECT
+            :sport, event_id, player_name, market_key, outcome_key, bookmaker, line,
+            price, avg_price,
+            CASE WHEN gap >= 40 THEN 'High' ELSE 'Medium' END,
+            CASE WHEN gap >= 40 THEN '🐋 WHALE ENTRY' ELSE '🌊 SIGNIFICANT MOVE' END,
+            'Outlier', bookmaker, gap * 10, fingerprint, :now
+        FROM whales
+        ON CONFLICT (move_fingerprint) DO NOTHING
+        RETURNING move_fingerprint
+    ),
+    alerts AS (
+        INSERT INTO sharp_alerts (
+            player_name, market_key, sport, alert_type, direction, line, book,
+            confidence, home_team, away_team, created_at
+        )
+        SELECT
+            w.player_name, w.market_key, :sport, 'WHALE',
+            CASE WHEN w.price > w.avg_price THEN 'OVER' ELSE 'UNDER' END,
+            w.line, w.bookmaker,
+            CASE WHEN w.gap >= 40 THEN 1.0 ELSE 0.7 END,
+            w.home_team, w.away_team, :now
+        FROM whales w
+        JOIN inserted i ON i.move_fingerprint = w.fingerprint
+        RETURNING 1
+    )
+    SELECT
+        (SELECT COUNT(*) FROM whales) AS detected,
+        (SELECT COUNT(*) FROM inserted) AS inserted,
+        (SELECT COUNT(*) FROM alerts) AS alerts
+""")
+
+# 2. STEAM DETECTION (Rapid Line Velocity)
+# Compare current props against 15 min ago in props_history.
+# Look for >= 15 American-point odds moves on the same side across 2+ sharp books.
+STEAM_DETECTION_SQL = text("""
+    WITH current_batch AS (
+        SELECT game_id, player_name, market_key, book, line, odds_over, odds_under
+        FROM props_history
+        WHERE sport = :sport AND snapshot_at >= NOW() - INTERVAL '5 minutes'
+          AND book = ANY(:sharp_books)
+    ),
+    historical_batch AS (
+        SELECT game_id, player_name, market_key, book, line, odds_over, odds_under
+        FROM props_history
+        WHERE sport = :sport
+          AND snapshot_at BETWEEN NOW() - INTERVAL '20 minutes' AND NOW() - INTERVAL '10 minutes'
+          AND book = ANY(:sharp_books)
+    ),
+    moves AS (
+        SELECT
+            c.game_id, c.player_name, c.market_key, c.book, c.line,
+            COALESCE(c.odds_over <= h.odds_over - 15, FALSE) AS over_steam,
+            COALESCE(c.odds_under <= h.odds_under - 15, FALSE) AS under_steam
+        FROM current_batch c
+        JOIN historical_batch h
+          ON c.game_id = h.game_id
+          AND c.player_name = h.player_name
+          AND c.market_key = h.market_key
+          AND c.book = h.book
+    ),
+    grouped AS (
+        SELECT
+            game_id, player_name, market_key, MAX(line) AS line,
+            COUNT(*) FILTER (WHERE over_steam) AS over_books,
+            COUNT(*) FILTER (WHERE under_steam) AS under_books,
+            string_agg(book, ',') FILTER (WHERE over_steam) AS over_book_list,
+            string_agg(book, ',') FILTER (WHERE under_steam) AS under_book_list
+        FROM moves
+        GROUP BY game_id, player_name, market_key
+    ),
+    steam AS (
+        SELECT
+            game_id, player_name, market_key, line,
+            CASE WHEN over_books >= 2 THEN 'over' ELSE 'under' END AS side,
+            CASE WHEN over_books >= 2 THEN over_books ELSE under_books END AS book_count,
+            CASE WHEN over_books >= 2 THEN over_book_list ELSE under_book_list END AS books
+        FROM grouped
+        WHERE over_books >= 2 OR under_books >= 2
+    ),
+    keyed AS (
+        SELECT *,
+            md5(concat_ws('|', :sport, game_id, player_name, market_key, side, line::text)) AS fingerprint
+        FROM steam
+    ),
+    inserted AS (
+        INSERT INTO steam_events (
+            sport, player_name, stat_type, side, line, movement, book_count,
+            severity, description, move_fingerprint, created_at
+        )
+        SELECT
+            :sport, player_name, market_key, side, line, 15.0, book_count,
+            LEAST(10.0, book_count * 2.0),
+            'Rapid Steam: ' || book_count || ' books pushed ' || UPPER(side) || ' odds for ' || player_name,
+            fingerprint, :now
+        FROM keyed
+        ON CONFLICT (move_fingerprint) DO NOTHING
+        RETURNING move_fingerprint
+    ),
+    alerts AS (
+        INSERT INTO sharp_alerts (player_name, market_key, sport, alert_type, direction, line, book, confidence, created_at)
+        SELECT k.player_name, k.market_key, :sport, 'STEAM', UPPER(k.side), k.line, k.books, 0.8, :now
+        FROM keyed k
+        JOIN inserted i ON i.move_fingerprint = k.fingerprint
+        RETURNING 1
+    )
+    SELECT
+        (SELECT COUNT(*) FROM keyed) AS detected,
+        (SELECT COUNT(*) FROM inserted) AS inserted,
+        (SELECT COUNT(*) FROM alerts) AS alerts
+""")
+
+
+async def run_alert_detection(
+    sport: str,
+    db: Optional[AsyncSession] = None,
+    since: Optional[datetime] = None,
+) -> int:
+    """
+    Entry point for intelligence generation after an ingestion cycle.
+
+    ``since`` bounds whale detection to unified_odds rows written by the current
+    ingest (defaults to the last ALERT_DETECTION_LOOKBACK_MINUTES). Returns the
+    number of new whale moves + steam events.
+    """
     if not db:
         from db.session import async_session_maker # type: ignore
         async with async_session_maker() as session:
-            return await _run_detection(sport, session)
+            counts = await detect_alerts(sport, session, since=since)
     else:
-        return await _run_detection(sport, db)
+        counts = await detect_alerts(sport, db, since=since)
+    return counts["whales"] + counts["steam"]
+
+
+async def detect_alerts(sport: str, db: AsyncSession, since: Optional[datetime] = None) -> Dict[str, int]:
+    """Run set-based whale/steam detection; returns per-kind counts of newly recorded signals."""
+    return await _run_detection(sport, db, since)
+
 
-async def _run_detection(sport: str, db: AsyncSession) -> int:
+async def _run_detection(sport: str, db: AsyncSession, since: Optional[datetime] = None) -> Dict[str, int]:
+    counts = {"whales": 0, "steam": 0, "alerts": 0, "whales_detected": 0, "steam_detected": 0}
     try:
         logger.info(f"🔍 [INTELLIGENCE ENGINE] Detecting signals for {sport}")
-        
-        total_inserted = 0
-        
-        # 1. WHALE DETECTION (Consensus Discrepancy)
-        # Identify books priced significantly far from the sharp-weighted consensus.
-        # We use the existing unified_odds table which was just refreshed.
-        whale_sql = text("""
-            WITH consensus AS (
-                SELECT 
-                    event_id, market_key, outcome_key, player_name, line,
-                    AVG(price) as avg_price,
-                    COUNT(DISTINCT bookmaker) as book_count
-                FROM unified_odds
-                WHERE sport = :sport AND player_name IS NOT NULL
-                GROUP BY event_id, market_key, outcome_key, player_name, line
-                HAVING COUNT(DISTINCT bookmaker) >= 3
-            )
-            SELECT 
-                u.event_id, u.player_name, u.market_key, u.outcome_key,
-                u.line, u.bookmaker, u.price, c.avg_price,
-                u.home_team, u.away_team
-            FROM unified_odds u
-            JOIN consensus c 
-                ON u.event_id = c.event_id 
-                AND u.market_key = c.market_key 
-                AND u.outcome_key = c.outcome_key 
-                AND u.player_name = c.player_name
-                AND (u.line = c.line OR (u.line IS NULL AND c.line IS NULL))
-            WHERE ABS(u.price - c.avg_price) >= 25
-              AND u.sport = :sport
-        """)
-        
-        whale_result = await db.execute(whale_sql, {"sport": sport})
-        whales = whale_result.mappings().all()
-        
-        for w in whales:
-            severity = 'High' if abs(w["price"] - w["avg_price"]) >= 40 else 'Medium'
-            whale_label = "🐋 WHALE ENTRY" if severity == 'High' else "🌊 SIGNIFICANT MOVE"
-            
-            # Persist to whale_moves
-            await db.execute(insert(WhaleMove).values(
-                sport=sport,
-                event_id=w["event_id"],
-                player_name=w["player_name"],
-                market_key=w["market_key"],
-                selection=w["outcome_key"],
-                bookmaker=w["bookmaker"],
-                line=w["line"],
-                price_after=float(w["price"]),
-                price_before=float(w["avg_price"]),
-                severity=severity,
-                whale_label=whale_label,
-                move_type="Outlier",
-                books_involved=w["bookmaker"],
-                amount_estimate=float(abs(w["price"] - w["avg_price"]) * 10),
-                created_at=datetime.now(timezone.utc)
-            ))
-            total_inserted += 1
+        now = datetime.now(timezone.utc)
+        if since is None:
+            since = now - timedelta(minutes=ALERT_DETECTION_LOOKBACK_MINUTES)
 
-        # 2. STEAM DETECTION (Rapid Line Velocity)
-        # Compare current props against 15 min ago in props_history.
-        # Look for moves >= 0.5 points or >= 15 cents in odds across 2+ sharp books.
-        steam_sql = text("""
-            WITH current_batch AS (
-                SELECT game_id, player_name, market_key, book, line, odds_over, odds_under, source_ts
-                FROM props_history
-                WHERE sport = :sport AND snapshot_at >= NOW() - INTERVAL '5 minutes'
-            ),
-            historical_batch AS (
-                SELECT game_id, player_name, market_key, book, line, odds_over, odds_under, snapshot_at
-                FROM props_history
-                WHERE sport = :sport 
-                  AND snapshot_at BETWEEN NOW() - INTERVAL '20 minutes' AND NOW() - INTERVAL '10 minutes'
-            )
-            SELECT 
-                c.game_id, c.player_name, c.market_key, c.book,
-                c.line as cur_line, h.line as hist_line,
-                c.odds_over as cur_over, h.odds_over as hist_over,
-                c.odds_under as cur_under, h.odds_under as hist_under
-            FROM current_batch c
-            JOIN historical_batch h 
-              ON c.game_id = h.game_id 
-              AND c.player_name = h.player_name 
-              AND c.market_key = h.market_key 
-              AND c.book = h.book
-            WHERE c.book = ANY(:sharp_books)
-        """)
-        
-        steam_result = await db.execute(steam_sql, {
-            "sport": sport, 
-            "sharp_books": SHARP_BOOKS
-        })
-        steams = steam_result.mappings().all()
-        
-        # Group by (game, player, market) to detect multi-book moves
-        market_moves = {}
-        for s in steams:
-            key = (s["game_id"], s["player_name"], s["market_key"])
-            if key not in market_moves:
-                market_moves[key] = {"over_books": [], "under_books": [], "line": s["cur_line"]}
-            
-            # Logic: If odds moved >= 15 American points on Over
-            if s["cur_over"] and s["hist_over"] and (s["cur_over"] <= s["hist_over"] - 15):
-                market_moves[key]["over_books"].append(s["book"])
-            # Logic: If odds moved >= 15 American points on Under
-            if s["cur_under"] and s["hist_under"] and (s["cur_under"] <= s["hist_under"] - 15):
-                market_moves[key]["under_books"].append(s["book"])
-                
-        for key, moves in market_moves.items():
-            game_id, p_name, m_key = key
-            
-            if len(moves["over_books"]) >= 2:
-                await db.execute(insert(SteamEvent).values(
-                    sport=sport,
-                    player_name=p_name,
-                    stat_type=m_key,
-                    side="over",
-                    line=moves["line"],
-                    movement=15.0, # Approximate odds delta
-                    book_count=len(moves["over_books"]),
-                    severity=min(10.0, len(moves["over_books"]) * 2.0),
-                    description=f"Rapid Steam: {len(moves['over_books'])} books pushed OVER odds for {p_name}",
-                    timestamp=datetime.now(timezone.utc)
-                ))
-                total_inserted += 1
-            elif len(moves["under_books"]) >= 2:
-                await db.execute(insert(SteamEvent).values(
-                    sport=sport,
-                    player_name=p_name,
-                    stat_type=m_key,
-                    side="under",
-                    line=moves["line"],
-                    movement=15.0,
-                    book_count=len(moves["under_books"]),
-                    severity=min(10.0, len(moves["under_books"]) * 2.0),
-                    description=f"Rapid Steam: {len(moves['under_books'])} books pushed UNDER odds for {p_name}",
-                    timestamp=datetime.now(timezone.utc)
-                ))
-                total_inserted += 1
+        whale = (await db.execute(WHALE_DETECTION_SQL, {"sport": sport, "since": since, "now": now})).mappings().one()
+        steam = (
+            await db.execute(STEAM_DETECTION_SQL, {"sport": sport, "sharp_books": SHARP_BOOKS, "now": now})
+        ).mappings().one()
 
-        # 3. LEGACY COMPATIBILITY: Also write to sharp_alerts for the live feed
-        if whales or steams:
-            from datetime import timedelta
-            # Ensure the table exists or handle mapping. 
-            # Given the SQL in regions/alerts.py, we just use a raw INSERT.
-            for w in whales:
-                await db.execute(text("""
-                    INSERT INTO sharp_alerts (player_name, market_key, sport, alert_type, direction, line, book, confidence, home_team, away_team, created_at)
-                    VALUES (:player_name, :market_key, :sport, :alert_type, :direction, :line, :book, :confidence, :home_team, :away_team, :created_at)
-                """), {
-                    "player_name": w["player_name"],
-                    "market_key": w["market_key"],
-                    "sport": sport,
-                    "alert_type": "WHALE",
-                    "direction": "OVER" if w["price"] > w["avg_price"] else "UNDER", # Heuristic
-                    "line": w["line"],
-                    "book": w["bookmaker"],
-                    "confidence": 1.0 if abs(w["price"] - w["avg_price"]) >= 40 else 0.7,
-                    "home_team": w["home_team"],
-                    "away_team": w["away_team"],
-                    "created_at": datetime.now(timezone.utc)
-                })
-            
-            # (Steam events follow same logic)
-            for s in steams:
-                # Pivot to alert format
-                await db.execute(text("""
-                    INSERT INTO sharp_alerts (player_name, market_key, sport, alert_type, direction, line, book, confidence, created_at)
-                    VALUES (:player_name, :market_key, :sport, :alert_type, :direction, :line, :book, :confidence, :created_at)
-                """), {
-                    "player_name": s["player_name"],
-                    "market_key": s["market_key"],
-                    "sport": sport,
-                    "alert_type": "STEAM",
-                    "direction": "OVER" if s["cur_over"] < s["hist_over"] else "UNDER",
-                    "line": s["cur_line"],
-                    "book": s["book"],
-                    "confidence": 0.8,
-                    "created_at": datetime.now(timezone.utc)
-                })
+        counts.update(
+            whales=int(whale["inserted"]),
+            whales_detected=int(whale["detected"]),
+            steam=int(steam["inserted"]),
+            steam_detected=int(steam["detected"]),
+            alerts=int(whale["alerts"]) + int(steam["alerts"]),
+        )
+        total_inserted = counts["whales"] + counts["steam"]
 
         # 4. Heartbeat Integration
         if total_inserted > 0:
-            logger.info(f"✅ [INTELLIGENCE ENGINE] Generated {total_inserted} signals for {sport} across Whales and Steam.")
+            logger.info(
+                f"✅ [INTELLIGENCE ENGINE] Generated {total_inserted} signals for {sport} across Whales and Steam "
+                f"(whales {counts['whales']}/{counts['whales_detected']}, steam {counts['steam']}/{counts['steam_detected']})."
+            )
             await HeartbeatService.log_heartbeat(db, f"intelligence_{sport}", status="ok", rows_written=total_inserted)
         else:
             await HeartbeatService.log_heartbeat(db, f"intelligence_{sport}", status="idle", rows_written=0)
             
         await db.commit()
-        return total_inserted
+        return counts
     except Exception as e:
         err = str(e)
-        if "whale_moves.market_key" in err or ("whale_moves" in err and "does not exist" in err):
+        if "move_fingerprint" in err or "whale_moves.market_key" in err or ("whale_moves" in err and "does not exist" in err):
             logger.error(
                 "❌ [INTELLIGENCE ENGINE] Whale schema mismatch. Run SQL hotfix: "
-                "ALTER TABLE whale_moves ADD COLUMN IF NOT EXISTS market_key TEXT; "
+                "db/migrations/20260426_runtime_hotfix_whale_and_ev_indexes.sql and "
+                "db/migrations/20261019_alert_move_fingerprints.sql; "
                 "Error: %s",
                 err,
                 exc_info=True,
@@ -228,4 +251,4 @@ async def _run_detection(sport: str, db: AsyncSession) -> int:
         else:
             logger.error(f"❌ [INTELLIGENCE ENGINE] Signal detection failure: {err}", exc_info=True)
         await db.rollback()
-        return 0
+        return counts
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
+import random
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from sqlalchemy import select, and_
@@ -9,6 +10,7 @@ from models.prop import PropLine
 from models.contests import Contest # Assuming result data might be related or in a results table
 # Alternative: Use a mock result generator if actual result table isn't fully populated for all metrics
 from services.risk_service import risk_service
+from services.compute_executor import BacktestJob, check_deadline, compute_executor
 
 logger = logging.getLogger(__name__)
 
@@ -40,93 +42,120 @@ class BacktestService:
             
         stmt = stmt.order_by(PropLine.created_at.asc())
         result = await db.execute(stmt)
-        props = result.scalars().all()
-
-        current_bankroll = initial_bankroll
-        equity_curve = [{"timestamp": start_date.isoformat(), "balance": current_bankroll}]
-        trades = []
-        wins = 0
-        losses = 0
-
-        # Simulation Loop
-        for prop in props:
-            # Simulate a "Result" (In production this would join with GameResults)
-            # For backtesting, we look at the 'is_settled' and 'outcome' if available
-            # If not available, we simulate based on the edge (CLV proxy)
-            # Placeholder: 55% win rate for high EV props for simulation purposes
-            import random
-            is_win = random.random() < 0.55 # Mock outcome for now 
-            
-            # Determine Stake
-            stake = 0
-            if bet_sizing_model == "fixed":
-                stake = initial_bankroll * (unit_size / 100.0)
-            elif "kelly" in bet_sizing_model:
-                fraction = 0.5 if "half" in bet_sizing_model else 1.0
-                # Use RiskService to calculate kelly stake
-                # kelly = (bp - q) / b where b is decimal odds - 1
-                odds = float(prop.odds) if prop.odds else 2.0
-                b = odds - 1
-                p = 0.55 # Estimated win prob
-                stake_pct = ((b * p) - (1 - p)) / b
-                stake = current_bankroll * max(0, stake_pct * fraction)
-
-            if stake > current_bankroll:
-                stake = current_bankroll
-
-            if stake <= 0:
-                continue
-
-            # Apply Result
-            profit = 0
-            if is_win:
-                profit = stake * (float(prop.odds) - 1 if prop.odds else 1.0)
-                current_bankroll += profit
-                wins += 1
-            else:
-                current_bankroll -= stake
-                losses += 1
-
-            equity_curve.append({
-                "timestamp": prop.created_at.isoformat(),
-                "balance": round(current_bankroll, 2),
-                "profit": round(profit if is_win else -stake, 2)
-            })
-
-        total_return = ((current_bankroll - initial_bankroll) / initial_bankroll) * 100
-        win_rate = (wins / (wins + losses)) * 100 if (wins + losses) > 0 else 0
-
-        # Calculate Advanced Metrics (Sharpe, Volatility)
-        returns = [t['profit'] / initial_bankroll for t in equity_curve if 'profit' in t]
+        props = [
+            {"created_at": p.created_at.isoformat(), "odds": float(p.odds) if p.odds else None}
+            for p in result.scalars().all()
+        ]
+
+        # The replay is pure CPU; keep it off the event loop.
+        return await compute_executor.run(BacktestJob(
+            props=props,
+            start_date=start_date.isoformat(),
+            initial_bankroll=initial_bankroll,
+            bet_sizing_model=bet_sizing_model,
+            unit_size=unit_size,
+        ))
+
+
+def replay_backtest(
+    props: List[Dict[str, Any]],
+    start_date: str,
+    initial_bankroll: float = 1000.0,
+    bet_sizing_model: str = "fixed",
+    unit_size: float = 1.0,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Replay the staking strategy over ``props`` (created_at / odds dicts, oldest first).
+    Module-level and DB-free so it can run in a compute_executor worker.
+    """
+    current_bankroll = initial_bankroll
+    equity_curve = [{"timestamp": start_date, "balance": current_bankroll}]
+    trades = []
+    wins = 0
+    losses = 0
+
+    # Simulation Loop
+    for i, prop in enumerate(props):
+        if i % 1000 == 0:
+            check_deadline(deadline)
+        # Simulate a "Result" (In production this would join with GameResults)
+        # For backtesting, we look at the 'is_settled' and 'outcome' if available
+        # If not available, we simulate based on the edge (CLV proxy)
+        # Placeholder: 55% win rate for high EV props for simulation purposes
+        is_win = random.random() < 0.55 # Mock outcome for now 
         
-        if returns:
-            import statistics
-            import math
-            
-            mean_return = statistics.mean(returns)
-            stdev_return = statistics.stdev(returns) if len(returns) > 1 else 0
-            
-            # Annualized measurements (assuming ~1000 bets per year for institutional high-volume)
-            # Sharpe = (mean / stdev) * sqrt(periods)
-            volatility = stdev_return * math.sqrt(1000) 
-            sharpe_ratio = (mean_return / stdev_return) * math.sqrt(1000) if stdev_return > 0 else 0
+        # Determine Stake
+        stake = 0
+        if bet_sizing_model == "fixed":
+            stake = initial_bankroll * (unit_size / 100.0)
+        elif "kelly" in bet_sizing_model:
+            fraction = 0.5 if "half" in bet_sizing_model else 1.0
+            # Use RiskService to calculate kelly stake
+            # kelly = (bp - q) / b where b is decimal odds - 1
+            odds = float(prop["odds"]) if prop["odds"] else 2.0
+            b = odds - 1
+            p = 0.55 # Estimated win prob
+            stake_pct = ((b * p) - (1 - p)) / b
+            stake = current_bankroll * max(0, stake_pct * fraction)
+
+        if stake > current_bankroll:
+            stake = current_bankroll
+
+        if stake <= 0:
+            continue
+
+        # Apply Result
+        profit = 0
+        if is_win:
+            profit = stake * (float(prop["odds"]) - 1 if prop["odds"] else 1.0)
+            current_bankroll += profit
+            wins += 1
         else:
-            volatility = 0
-            sharpe_ratio = 0
-
-        return {
-            "summary": {
-                "initial_bankroll": initial_bankroll,
-                "final_bankroll": round(current_bankroll, 2),
-                "total_return_pct": round(total_return, 2),
-                "win_rate": round(win_rate, 2),
-                "total_trades": wins + losses,
-                "wins": wins,
-                "losses": losses,
-                "sharpe_ratio": round(sharpe_ratio, 2),
-                "volatility": round(volatility * 100, 2)
-            },
-            "equity_curve": equity_curve
-        }
+            current_bankroll -= stake
+            losses += 1
+
+        equity_curve.append({
+            "timestamp": prop["created_at"],
+            "balance": round(current_bankroll, 2),
+            "profit": round(profit if is_win else -stake, 2)
+        })
+
+    total_return = ((current_bankroll - initial_bankroll) / initial_bankroll) * 100
+    win_rate = (wins / (wins + losses)) * 100 if (wins + losses) > 0 else 0
+
+    # Calculate Advanced Metrics (Sharpe, Volatility)
+    returns = [t['profit'] / initial_bankroll for t in equity_curve if 'profit' in t]
+    
+    if returns:
+        import statistics
+        import math
+        
+        mean_return = statistics.mean(returns)
+        stdev_return = statistics.stdev(returns) if len(returns) > 1 else 0
+        
+        # Annualized measurements (assuming ~1000 bets per year for institutional high-volume)
+        # Sharpe = (mean / stdev) * sqrt(periods)
+        volatility = stdev_return * math.sqrt(1000) 
+        sharpe_ratio = (mean_return / stdev_return) * math.sqrt(1000) if stdev_return > 0 else 0
+    else:
+        volatility = 0
+        sharpe_ratio = 0
+
+    return {
+        "summary": {
+            "initial_bankroll": initial_bankroll,
+            "final_bankroll": round(current_bankroll, 2),
+            "total_return_pct": round(total_return, 2),
+            "win_rate": round(win_rate, 2),
+            "total_trades": wins + losses,
+            "wins": wins,
+            "losses": losses,
+            "sharpe_ratio": round(sharpe_ratio, 2),
+            "volatility": round(volatility * 100, 2)
+        },
+        "equity_curve": equity_curve
+    }
+
 
 backtest_service = BacktestService()
@@ -6,7 +6,7 @@ from sqlalchemy import select, func, desc, Integer, or_
 from models.brain import BrainSystemState, ModelPick, SharpSignal, BrainLog, SteamSnapshot
 from models import InjuryImpact, UnifiedOdds, UnifiedEVSignal
 from typing import List, Optional, Dict
-from services.monte_carlo_service import monte_carlo_service
+from services.monte_carlo_service import simulate_parlay_cached
 from services.injury_service import injury_service
 from services.brain_service import brain_service
 
@@ -69,7 +69,7 @@ class BrainAdvancedService:
                     for p in top_picks
                 ]
                 
-                mc_results = monte_carlo_service.simulate_parlay(mc_legs)
+                mc_results, _ = await simulate_parlay_cached(mc_legs)
 
                 return [{
                     "legs": [
@@ -2,21 +2,20 @@
 Brain Anomaly Detection Service - Detects and tracks anomalies in brain metrics
 """
 import asyncio
-import asyncpg
 import os
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
 import statistics
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class BrainAnomalyDetector:
+class BrainAnomalyDetector(AsyncpgRepository):
     def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
+        super().__init__()
         self.thresholds = {
             'error_rate': {'warning': 0.05, 'critical': 0.10},  # 5%, 10%
             'recommendation_hit_rate': {'warning': 0.45, 'critical': 0.35},  # Below 45%, 35%
@@ -31,7 +30,7 @@ class BrainAnomalyDetector:
     async def get_baseline_values(self, metric_name: str, hours: int = 24) -> Optional[float]:
         """Get baseline value for a metric from historical data"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Get average value from the last N hours
             result = await conn.fetchval("""
@@ -53,7 +52,7 @@ class BrainAnomalyDetector:
     async def get_current_value(self, metric_name: str) -> Optional[float]:
         """Get current value for a metric"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Get latest value
             result = await conn.fetchval("""
@@ -162,7 +161,7 @@ class BrainAnomalyDetector:
     async def get_all_current_metrics(self) -> Dict[str, float]:
         """Get all current metric values"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Get latest metrics
             result = await conn.fetch("""
@@ -184,7 +183,7 @@ class BrainAnomalyDetector:
     async def record_anomaly(self, anomaly: Dict) -> bool:
         """Record an anomaly in the database"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Check if similar anomaly already exists and is active
             existing = await conn.fetchval("""
@@ -247,7 +246,7 @@ class BrainAnomalyDetector:
     async def get_active_anomalies(self) -> List[Dict]:
         """Get all active anomalies"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             result = await conn.fetch("""
                 SELECT * FROM brain_anomalies 
@@ -271,7 +270,7 @@ class BrainAnomalyDetector:
     async def resolve_anomaly(self, anomaly_id: int, resolution_method: str) -> bool:
         """Mark an anomaly as resolved"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             await conn.execute("""
                 UPDATE brain_anomalies 
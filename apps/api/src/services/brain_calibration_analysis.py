@@ -3,7 +3,6 @@
 BRAIN CALIBRATION ANALYSIS - Analyze and improve brain calibration metrics
 """
 import asyncio
-import asyncpg
 import os
 import json
 import numpy as np
@@ -13,7 +12,7 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -52,14 +51,11 @@ class CalibrationAnalysis:
     roi_percent: float
     bucket_analysis: List[CalibrationBucket]
 
-class BrainCalibrationService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class BrainCalibrationService(AsyncpgRepository):
     async def get_calibration_data(self, sport_id: int, start_date: str = None, end_date: str = None) -> List[CalibrationBucket]:
         """Get calibration data for a specific sport"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM calibration_metrics 
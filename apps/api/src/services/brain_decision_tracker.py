@@ -2,7 +2,6 @@
 Brain Decision Tracking Service - Tracks and analyzes brain decision-making process
 """
 import asyncio
-import asyncpg
 import os
 import json
 import uuid
@@ -11,7 +10,7 @@ from typing import Dict, List, Optional, Any
 import logging
 from dataclasses import dataclass
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,9 +25,9 @@ class BrainDecision:
     duration_ms: Optional[int] = None
     correlation_id: Optional[str] = None
 
-class BrainDecisionTracker:
+class BrainDecisionTracker(AsyncpgRepository):
     def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
+        super().__init__()
         self.decision_categories = [
             'player_recommendation',
             'parlay_construction', 
@@ -43,7 +42,7 @@ class BrainDecisionTracker:
     async def record_decision(self, decision: BrainDecision, outcome: str = 'pending') -> bool:
         """Record a brain decision in the database"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             correlation_id = decision.correlation_id or str(uuid.uuid4())
             
@@ -74,7 +73,7 @@ class BrainDecisionTracker:
                                    additional_details: Optional[Dict] = None) -> bool:
         """Update the outcome of a decision"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             if additional_details:
                 # Merge additional details with existing details
@@ -102,7 +101,7 @@ class BrainDecisionTracker:
     async def get_decisions_by_category(self, category: str, hours: int = 24) -> List[Dict]:
         """Get decisions by category within time range"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             result = await conn.fetch("""
                 SELECT * FROM brain_decisions 
@@ -121,7 +120,7 @@ class BrainDecisionTracker:
     async def get_decision_performance(self, hours: int = 24) -> Dict[str, Any]:
         """Get decision performance metrics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Overall performance
             overall = await conn.fetchrow("""
@@ -181,7 +180,7 @@ class BrainDecisionTracker:
     async def get_recent_decisions(self, limit: int = 50) -> List[Dict]:
         """Get recent brain decisions"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             result = await conn.fetch("""
                 SELECT * FROM brain_decisions 
@@ -199,7 +198,7 @@ class BrainDecisionTracker:
     async def get_decision_timeline(self, hours: int = 24) -> List[Dict]:
         """Get decision timeline for analysis"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             result = await conn.fetch("""
                 SELECT 
@@ -224,7 +223,7 @@ class BrainDecisionTracker:
     async def analyze_decision_patterns(self) -> Dict[str, Any]:
         """Analyze patterns in decision making"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Most common actions
             common_actions = await conn.fetch("""
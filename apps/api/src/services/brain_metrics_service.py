@@ -2,7 +2,6 @@
 Brain Metrics Service - Continuously updates brain_business_metrics table
 """
 import asyncio
-import asyncpg
 import os
 import psutil
 import time
@@ -10,14 +9,14 @@ from datetime import datetime, timezone
 from typing import Dict, Any
 import logging
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class BrainMetricsService:
+class BrainMetricsService(AsyncpgRepository):
     def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
+        super().__init__()
         self.running = False
         
     async def get_system_metrics(self) -> Dict[str, Any]:
@@ -84,7 +83,7 @@ class BrainMetricsService:
     async def update_metrics(self):
         """Update metrics in database"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Get current metrics
             system_metrics = await self.get_system_metrics()
@@ -148,16 +147,13 @@ metrics_service = BrainMetricsService()
 async def get_current_metrics() -> Dict[str, Any]:
     """Get current metrics for API endpoints"""
     try:
-        conn = await asyncpg.connect(metrics_service.db_url)
-        
-        # Get latest metrics
-        latest = await conn.fetchrow("""
-            SELECT * FROM brain_business_metrics 
-            ORDER BY timestamp DESC 
-            LIMIT 1
-        """)
-        
-        await conn.close()
+        async with metrics_service.connection() as conn:
+            # Get latest metrics
+            latest = await conn.fetchrow("""
+                SELECT * FROM brain_business_metrics 
+                ORDER BY timestamp DESC 
+                LIMIT 1
+            """)
         
         if latest:
             return dict(latest)
@@ -171,18 +167,15 @@ async def get_current_metrics() -> Dict[str, Any]:
 async def get_metrics_summary(hours: int = 24) -> Dict[str, Any]:
     """Get metrics summary for the last N hours"""
     try:
-        conn = await asyncpg.connect(metrics_service.db_url)
-        
         # Get metrics for the last N hours
         since_time = datetime.now(timezone.utc) - timedelta(hours=hours)
         
-        metrics = await conn.fetch("""
-            SELECT * FROM brain_business_metrics 
-            WHERE timestamp >= $1
-            ORDER BY timestamp DESC
-        """, since_time)
-        
-        await conn.close()
+        async with metrics_service.connection() as conn:
+            metrics = await conn.fetch("""
+                SELECT * FROM brain_business_metrics 
+                WHERE timestamp >= $1
+                ORDER BY timestamp DESC
+            """, since_time)
         
         if not metrics:
             return {}
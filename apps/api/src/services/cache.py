@@ -11,7 +11,7 @@ import os
 import time
 import json
 import logging
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +30,63 @@ except ImportError:
 
 from core.config import settings
 
+# KEYS[1] = bucket; ARGV = rate, capacity, cost, now, ttl. Returns {allowed, tokens, wait}.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 't', 's')
+local tokens = tonumber(state[1])
+local stamp = tonumber(state[2])
+if tokens == nil then
+  tokens = capacity
+else
+  tokens = math.min(capacity, tokens + math.max(0, now - stamp) * rate)
+end
+local allowed = 0
+if tokens >= cost then
+  tokens = math.min(capacity, tokens - cost)
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 't', tokens, 's', now)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+local wait = 0
+if allowed == 0 then
+  if rate > 0 then wait = (cost - tokens) / rate else wait = -1 end
+end
+return {allowed, tostring(tokens), tostring(wait)}
+"""
+
+
+# KEYS[1] = lease; ARGV = owner, ttl_ms. Take the lease if free, renew it if already ours.
+_LEASE_LUA = """
+local holder = redis.call('GET', KEYS[1])
+if holder == false then
+  redis.call('SET', KEYS[1], ARGV[1], 'PX', tonumber(ARGV[2]))
+  return 1
+end
+if holder == ARGV[1] then
+  redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[2]))
+  return 1
+end
+return 0
+"""
+
+# KEYS[1] = lease; ARGV[1] = owner. Delete only if still ours.
+_LEASE_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _bucket_wait(tokens: float, rate: float, cost: float, allowed: bool) -> float:
+    if allowed:
+        return 0.0
+    return (cost - tokens) / rate if rate > 0 else -1.0
+
 class CacheManager:
     """Dual-mode cache: Redis (production) or in-memory dict (local dev)."""
 
@@ -133,6 +190,65 @@ class CacheManager:
     async def release_lock(self, key: str):
         await self.delete(key)
 
+    async def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        """Take or renew an owner-tagged lease for ``ttl`` seconds (leader election)."""
+        if self._connected and self._redis:
+            try:
+                return bool(await self._redis.eval(_LEASE_LUA, 1, key, owner, int(ttl * 1000)))
+            except Exception:
+                pass
+        entry = self._memory.get(key)
+        if entry and time.time() < entry.get("exp", 0) and entry["val"] != owner:
+            return False
+        self._memory[key] = {"val": owner, "exp": time.time() + ttl}
+        return True
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        if self._connected and self._redis:
+            try:
+                await self._redis.eval(_LEASE_RELEASE_LUA, 1, key, owner)
+            except Exception:
+                pass
+        entry = self._memory.get(key)
+        if entry and entry["val"] == owner:
+            self._memory.pop(key, None)
+
+    async def take_tokens(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float, float]:
+        """
+        Token bucket: refill at ``rate`` tokens/sec up to ``capacity`` and take ``cost``.
+        Atomic in Redis (Lua), per-process in memory. A negative cost refunds tokens.
+        Returns (allowed, tokens_left, retry_after_seconds).
+        """
+        now = time.time()
+        ttl = int(capacity / rate) + 1 if rate > 0 else 86400
+        if self._connected and self._redis:
+            try:
+                allowed, left, wait = await self._redis.eval(
+                    _TOKEN_BUCKET_LUA, 1, key, rate, capacity, cost, now, ttl
+                )
+                return bool(int(allowed)), float(left), float(wait)
+            except Exception:
+                pass
+
+        # In-memory fallback
+        entry = self._memory.get(key)
+        if entry and time.time() < entry.get("exp", 0):
+            tokens, stamp = entry["val"]
+            tokens = min(capacity, tokens + max(0.0, now - stamp) * rate)
+        else:
+            tokens = capacity
+        allowed = tokens >= cost
+        if allowed:
+            tokens = min(capacity, tokens - cost)
+        self._memory[key] = {"val": (tokens, now), "exp": now + ttl}
+        return allowed, tokens, _bucket_wait(tokens, rate, cost, allowed)
+
+    async def close(self):
+        """Close the Redis client (the in-memory store is kept)."""
+        client, self._redis, self._connected = self._redis, None, False
+        if client is not None:
+            await client.aclose()
+
     @property
     def is_redis(self) -> bool:
         return self._connected
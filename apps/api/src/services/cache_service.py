@@ -1,20 +1,42 @@
 import time
+from collections import OrderedDict
 from typing import Any, Optional
 
 class TTLCache:
-    def __init__(self):
-        self._store: dict[str, tuple[Any, float]] = {}
+    """
+    In-process TTL cache. With ``maxsize`` it is also an LRU: setting a new key past the
+    limit first drops expired entries, then the least recently used ones.
+    """
+    def __init__(self, maxsize: Optional[int] = None):
+        self._store: "OrderedDict[str, tuple[Any, float]]" = OrderedDict()
+        self.maxsize = maxsize
 
     def get(self, key: str) -> Optional[Any]:
         if key in self._store:
             value, expires_at = self._store[key]
             if time.time() < expires_at:
+                if self.maxsize:
+                    self._store.move_to_end(key)
                 return value
             del self._store[key]
         return None
 
     def set(self, key: str, value: Any, ttl_seconds: int):
         self._store[key] = (value, time.time() + ttl_seconds)
+        if self.maxsize:
+            self._store.move_to_end(key)
+            if len(self._store) > self.maxsize:
+                self._evict()
+
+    def _evict(self):
+        now = time.time()
+        for key in [k for k, (_, expires_at) in self._store.items() if expires_at <= now]:
+            del self._store[key]
+        while len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._store)
 
     def invalidate(self, key: str):
         self._store.pop(key, None)
@@ -0,0 +1,277 @@
+"""
+Process-pool executor for CPU-bound work (parlay Monte Carlo, backtests, model training).
+
+The API process serves REST and websockets from a single event loop, so anything
+that holds the GIL for more than a few milliseconds (simulation arrays, backtest
+replays, sklearn fits) stalls every other request on the worker. Jobs submitted here run
+in a managed ``ProcessPoolExecutor`` started in the app lifespan:
+
+  * typed jobs    — ``ParlaySimulationJob``, ``BacktestJob``, ``TrainingJob``:
+                    picklable dataclasses whose ``run()`` executes in the worker process
+  * timeouts      — every job carries a deadline; the caller gets ``ComputeTimeout``
+                    and the job stops itself at its next ``check_deadline``
+  * cancellation  — a cancelled caller (client disconnect, outer timeout) drops a
+                    job that is still queued; a running job stops at its deadline
+  * backpressure  — at most COMPUTE_MAX_PENDING jobs in flight, beyond that
+                    ``ComputeBusy`` is raised instead of queueing unbounded work
+  * metrics       — queue depth, in-flight count, outcome counters and queue-wait /
+                    run-time p50/p95 per job kind
+
+When the pool is not running (tests, scripts, COMPUTE_WORKERS=0) jobs run on the
+default thread pool, so callers never need a second code path.
+
+Usage:
+    result = await compute_executor.run(ParlaySimulationJob(legs, n_sims=100_000))
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+COMPUTE_TIMEOUT_SECONDS = float(os.getenv("COMPUTE_TIMEOUT_SECONDS", "30"))
+COMPUTE_MAX_PENDING = max(1, int(os.getenv("COMPUTE_MAX_PENDING", "64")))
+# spawn: workers must not inherit the loop, sockets and threads of the API process.
+COMPUTE_START_METHOD = os.getenv("COMPUTE_START_METHOD", "spawn")
+
+
+class ComputeError(Exception):
+    """Compute job could not produce a result."""
+
+    status_code = 500
+    code = "compute_failed"
+
+
+class ComputeTimeout(ComputeError):
+    status_code = 504
+    code = "compute_timeout"
+
+
+class ComputeBusy(ComputeError):
+    status_code = 503
+    code = "compute_busy"
+
+
+class DeadlineExceeded(Exception):
+    """Raised inside a worker when a job runs past its deadline."""
+
+
+def check_deadline(deadline: Optional[float]) -> None:
+    """Cooperative cancellation point for long loops running under the executor."""
+    if deadline is not None and time.time() > deadline:
+        raise DeadlineExceeded("compute deadline exceeded")
+
+
+# ---------------------------------------------------------------------------
+# Jobs (instantiated in the API process, run() in the worker)
+# ---------------------------------------------------------------------------
+
+class ComputeJob:
+    kind = "job"
+
+    def run(self, deadline: Optional[float]) -> Any:
+        raise NotImplementedError
+
+
+@dataclass
+class ParlaySimulationJob(ComputeJob):
+    """Vectorized parlay simulation over hydrated leg dicts (monte_carlo_service)."""
+
+    legs: List[Dict[str, Any]]
+    n_sims: int = 10_000
+    kind = "parlay_simulation"
+
+    def run(self, deadline: Optional[float]) -> Dict[str, Any]:
+        from services.monte_carlo_service import simulate_parlay_legs
+        return simulate_parlay_legs(self.legs, self.n_sims, deadline=deadline)
+
+
+@dataclass
+class BacktestJob(ComputeJob):
+    """Strategy replay over props already loaded from the database (backtest_service)."""
+
+    props: List[Dict[str, Any]]
+    start_date: str
+    initial_bankroll: float = 1000.0
+    bet_sizing_model: str = "fixed"
+    unit_size: float = 1.0
+    kind = "backtest"
+
+    def run(self, deadline: Optional[float]) -> Dict[str, Any]:
+        import db.base  # noqa: F401  model registry first; models.prop alone is a circular import
+        from services.backtest_service import replay_backtest
+        return replay_backtest(
+            self.props, self.start_date, self.initial_bankroll,
+            self.bet_sizing_model, self.unit_size, deadline=deadline,
+        )
+
+
+@dataclass
+class TrainingJob(ComputeJob):
+    """Projection model fit on a prepared feature matrix (ml.projections)."""
+
+    sport: str
+    stat_category: str
+    X: List[List[float]]
+    y: List[float]
+    kind = "training"
+
+    def run(self, deadline: Optional[float]) -> Dict[str, Any]:
+        from ml.projections import fit_model
+        return fit_model(self.sport, self.stat_category, self.X, self.y)
+
+
+def _execute(job: ComputeJob, deadline: float) -> Tuple[float, Any]:
+    started = time.time()
+    check_deadline(deadline)
+    return started, job.run(deadline)
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+# ---------------------------------------------------------------------------
+# Executor
+# ---------------------------------------------------------------------------
+
+class ComputeMetrics:
+    def __init__(self, window: int = 500):
+        self.counters: Dict[str, int] = defaultdict(int)
+        self._wait: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._run: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def observe(self, kind: str, wait_s: float, run_s: float) -> None:
+        self._wait[kind].append(max(0.0, wait_s))
+        self._run[kind].append(run_s)
+
+    @staticmethod
+    def _pct(samples: Deque[float], p: float) -> Optional[float]:
+        ordered = sorted(samples)
+        if not ordered:
+            return None
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        kinds = {}
+        for kind, runs in self._run.items():
+            waits = self._wait[kind]
+            kinds[kind] = {
+                "samples": len(runs),
+                "queue_wait_p50_s": self._pct(waits, 0.50),
+                "queue_wait_p95_s": self._pct(waits, 0.95),
+                "run_p50_s": self._pct(runs, 0.50),
+                "run_p95_s": self._pct(runs, 0.95),
+            }
+        return {**self.counters, "jobs": kinds}
+
+
+class ComputeExecutor:
+    def __init__(self) -> None:
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+        self._in_flight = 0
+        self.metrics = ComputeMetrics()
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    def start(self, workers: Optional[int] = None) -> None:
+        workers = COMPUTE_WORKERS if workers is None else workers
+        if self._pool is not None or workers <= 0:
+            return
+        ctx = multiprocessing.get_context(COMPUTE_START_METHOD)
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+        self._workers = workers
+        logger.info("Compute executor started (%s %s workers)", workers, COMPUTE_START_METHOD)
+
+    async def warm(self) -> None:
+        """Boot every worker up front so the first real job does not pay interpreter start-up."""
+        if self._pool is None:
+            return
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self._pool, _noop) for _ in range(self._workers)),
+            return_exceptions=True,
+        )
+
+    async def stop(self) -> None:
+        pool, self._pool = self._pool, None
+        self._workers = 0
+        if pool is not None:
+            # Queued jobs are dropped; running ones end at their own deadline.
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+            logger.info("Compute executor stopped")
+
+    def _restart(self) -> None:
+        pool, workers = self._pool, self._workers
+        self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.start(workers)
+
+    async def run(self, job: ComputeJob, timeout: Optional[float] = None) -> Any:
+        """Run ``job`` off the event loop and return its result within ``timeout`` seconds."""
+        if self._in_flight >= COMPUTE_MAX_PENDING:
+            self.metrics.incr("rejected")
+            raise ComputeBusy(f"Compute queue full ({self._in_flight} jobs in flight); retry shortly.")
+
+        timeout = COMPUTE_TIMEOUT_SECONDS if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        deadline = submitted + timeout
+        self._in_flight += 1
+        self.metrics.incr("submitted")
+        try:
+            # Cancelling the wrapper (timeout or caller cancel) also drops a still-queued pool future.
+            future = loop.run_in_executor(self._pool, _execute, job, deadline)
+            started, result = await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            self.metrics.incr("timed_out")
+            raise ComputeTimeout(f"{job.kind} exceeded {timeout:.0f}s")
+        except asyncio.CancelledError:
+            self.metrics.incr("cancelled")
+            raise
+        except BrokenProcessPool as e:
+            # A worker died (OOM, segfault); the pool is unusable until rebuilt.
+            self.metrics.incr("failed")
+            logger.error("Compute worker crashed running %s; restarting pool: %s", job.kind, e)
+            self._restart()
+            raise ComputeError(f"{job.kind} worker crashed") from e
+        except Exception:
+            self.metrics.incr("failed")
+            raise
+        finally:
+            self._in_flight -= 1
+
+        finished = time.time()
+        self.metrics.incr("completed")
+        self.metrics.observe(job.kind, started - submitted, finished - started)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "process" if self._pool is not None else "inline",
+            "workers": self._workers,
+            "in_flight": self._in_flight,
+            "queue_depth": max(0, self._in_flight - self._workers) if self._pool is not None else 0,
+            "max_pending": COMPUTE_MAX_PENDING,
+            **self.metrics.snapshot(),
+        }
+
+
+compute_executor = ComputeExecutor()
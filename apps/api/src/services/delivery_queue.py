@@ -0,0 +1,625 @@
+"""
+Outbound alert delivery queue (Discord / Telegram / Web Push).
+
+Producers enqueue messages and return immediately; a small pool of workers drains
+the queue in batches:
+
+  * storage      — per-channel Redis lists + sorted sets (delayed retries) when Redis
+                   is reachable, otherwise in-process deques/heaps (local dev, tests);
+                   on Redis, in-flight messages sit in a per-consumer processing list
+                   until acknowledged, so a crash between pop and send loses nothing
+  * routing      — a process only takes messages for channels it has a sender for
+                   (e.g. web push needs services.push_service registered)
+  * rate limits  — one token bucket per destination; 429 ``Retry-After`` (header or
+                   Discord's JSON ``retry_after``) blocks that destination only
+  * coalescing   — Discord messages for the same webhook/username/content are merged
+                   into multi-embed payloads (max 10 embeds per request)
+  * retries      — 5xx / network errors back off exponentially up to
+                   DELIVERY_MAX_ATTEMPTS; other 4xx are dropped
+  * metrics      — enqueue→delivery latency (p50/p95) and outcome counters
+
+Usage:
+    await delivery_queue.enqueue_discord(url, embeds=[embed], username="Lucrix Bot")
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from core.config import settings
+from services.api_telemetry import InstrumentedAsyncClient
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_WORKERS = max(1, int(os.getenv("DELIVERY_WORKERS", "2")))
+DELIVERY_BATCH_SIZE = max(1, int(os.getenv("DELIVERY_BATCH_SIZE", "50")))
+DELIVERY_MAX_ATTEMPTS = max(1, int(os.getenv("DELIVERY_MAX_ATTEMPTS", "5")))
+DELIVERY_BACKOFF_BASE_SECONDS = float(os.getenv("DELIVERY_BACKOFF_BASE_SECONDS", "2"))
+# Discord allows ~5 requests / 2s per webhook; stay just under it.
+DELIVERY_RATE_PER_SECOND = float(os.getenv("DELIVERY_RATE_PER_SECOND", "2"))
+DELIVERY_BURST = float(os.getenv("DELIVERY_BURST", "4"))
+DELIVERY_USE_REDIS = os.getenv("DELIVERY_USE_REDIS", "true").lower() == "true"
+
+# Liveness of a consumer's processing list; after it lapses, another process re-queues it.
+DELIVERY_CONSUMER_TTL_SECONDS = int(os.getenv("DELIVERY_CONSUMER_TTL_SECONDS", "60"))
+DELIVERY_RECOVER_SECONDS = float(os.getenv("DELIVERY_RECOVER_SECONDS", "30"))
+
+DISCORD_MAX_EMBEDS = 10
+_READY_KEY = "delivery:ready:{}"
+_DELAYED_KEY = "delivery:delayed:{}"
+_PROCESSING_KEY = "delivery:processing:{}"
+_CONSUMER_KEY = "delivery:consumer:{}"
+_CONSUMERS_KEY = "delivery:consumers"
+# Single ready list / delayed set used before per-channel keys; drained by recover().
+_LEGACY_READY_KEY = "delivery:ready"
+_LEGACY_DELAYED_KEY = "delivery:delayed"
+
+DISCORD = "discord"
+TELEGRAM = "telegram"
+WEBPUSH = "webpush"
+
+
+@dataclass
+class OutboundMessage:
+    channel: str
+    destination: str
+    payload: Dict[str, Any]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+
+    def dumps(self) -> str:
+        return json.dumps(asdict(self), default=str)
+
+    @classmethod
+    def loads(cls, raw: str) -> "OutboundMessage":
+        return cls(**json.loads(raw))
+
+
+@dataclass
+class DeliveryResult:
+    """Sender outcome: ``ok``, ``retry`` (transient) or ``drop`` (permanent)."""
+
+    status: str
+    retry_after: Optional[float] = None
+    detail: Optional[str] = None
+
+
+Sender = Callable[[str, Dict[str, Any]], Awaitable[DeliveryResult]]
+
+
+class TokenBucket:
+    """Classic token bucket; ``reserve`` returns seconds to wait (0 when a token was taken)."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def block_for(self, seconds: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.blocked_until = max(self.blocked_until, now + max(0.0, seconds))
+        self.tokens = 0.0
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else 1.0
+
+
+class DeliveryMetrics:
+    def __init__(self, window: int = 500):
+        self.counters: Dict[str, int] = defaultdict(int)
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def observe_latency(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self._latencies)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+        return {
+            **self.counters,
+            "latency_p50_s": pct(0.50),
+            "latency_p95_s": pct(0.95),
+            "latency_samples": len(ordered),
+        }
+
+
+class _MemoryBackend:
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._ready: Dict[str, Deque[str]] = defaultdict(deque)
+        self._delayed: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+
+    def channels(self) -> List[str]:
+        return [c for c in set(self._ready) | set(self._delayed) if self._ready[c] or self._delayed[c]]
+
+    async def push(self, raw: str, channel: str) -> None:
+        self._ready[channel].appendleft(raw)
+
+    async def push_delayed(self, raw: str, channel: str, at: float) -> None:
+        heapq.heappush(self._delayed[channel], (at, raw))
+
+    async def promote_due(self, now: float, channels: List[str]) -> None:
+        for channel in channels:
+            delayed = self._delayed[channel]
+            while delayed and delayed[0][0] <= now:
+                self._ready[channel].appendleft(heapq.heappop(delayed)[1])
+
+    async def pop_batch(self, size: int, channels: List[str]) -> List[str]:
+        out = []
+        for channel in channels:
+            ready = self._ready[channel]
+            while ready and len(out) < size:
+                out.append(ready.pop())
+        return out
+
+    async def ack(self, raws: List[str]) -> None:
+        pass  # nothing outlives the process
+
+    async def heartbeat(self) -> None:
+        pass
+
+    async def recover(self) -> int:
+        return 0
+
+    async def release(self) -> None:
+        pass
+
+    async def depth(self, channels: List[str]) -> Dict[str, int]:
+        return {
+            "ready": sum(len(self._ready[c]) for c in channels),
+            "delayed": sum(len(self._delayed[c]) for c in channels),
+        }
+
+
+def _channel_of(raw: str) -> Optional[str]:
+    try:
+        return json.loads(raw).get("channel")
+    except Exception:
+        return None
+
+
+class _RedisBackend:
+    """
+    Survives restarts and crashes. Per channel: a ready list (LPUSH / LMOVE) and a
+    delayed ZSET scored by due time. Popping moves a message into this consumer's
+    processing list; it is removed (``ack``) only after it was sent, re-scheduled or
+    dropped. Processing lists of consumers whose liveness key expired are moved back to
+    their ready lists by ``recover`` (at start and every DELIVERY_RECOVER_SECONDS).
+    Each process only pops channels it has a sender for.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any, consumer: str) -> None:
+        self._redis = client
+        self.consumer = consumer
+        self._processing = _PROCESSING_KEY.format(consumer)
+
+    async def push(self, raw: str, channel: str) -> None:
+        await self._redis.lpush(_READY_KEY.format(channel), raw)
+
+    async def push_delayed(self, raw: str, channel: str, at: float) -> None:
+        await self._redis.zadd(_DELAYED_KEY.format(channel), {raw: at})
+
+    async def promote_due(self, now: float, channels: List[str]) -> None:
+        for channel in channels:
+            key = _DELAYED_KEY.format(channel)
+            due = await self._redis.zrangebyscore(key, 0, now, start=0, num=DELIVERY_BATCH_SIZE)
+            for raw in due:
+                # ZREM wins exactly once across replicas, so each item is promoted once.
+                if await self._redis.zrem(key, raw):
+                    await self._redis.lpush(_READY_KEY.format(channel), raw)
+
+    async def pop_batch(self, size: int, channels: List[str]) -> List[str]:
+        out: List[str] = []
+        for channel in channels:
+            while len(out) < size:
+                raw = await self._redis.lmove(_READY_KEY.format(channel), self._processing, "RIGHT", "LEFT")
+                if raw is None:
+                    break
+                out.append(raw)
+        return out
+
+    async def ack(self, raws: List[str]) -> None:
+        for raw in raws:
+            await self._redis.lrem(self._processing, 1, raw)
+
+    async def heartbeat(self) -> None:
+        await self._redis.set(_CONSUMER_KEY.format(self.consumer), "1", ex=DELIVERY_CONSUMER_TTL_SECONDS)
+        await self._redis.sadd(_CONSUMERS_KEY, self.consumer)
+
+    async def _requeue_list(self, source: str) -> int:
+        # LMOVE into our own processing list first, so a crash mid-way loses nothing.
+        moved = 0
+        while True:
+            raw = await self._redis.lmove(source, self._processing, "RIGHT", "LEFT")
+            if raw is None:
+                return moved
+            channel = _channel_of(raw)
+            if channel is not None:
+                await self.push(raw, channel)
+            await self._redis.lrem(self._processing, 1, raw)
+            moved += 1
+
+    async def recover(self) -> int:
+        """Return messages held by dead consumers (and pre-channel legacy keys) to their queues."""
+        recovered = await self._requeue_list(_LEGACY_READY_KEY)
+        for raw, at in await self._redis.zrange(_LEGACY_DELAYED_KEY, 0, -1, withscores=True):
+            channel = _channel_of(raw)
+            if await self._redis.zrem(_LEGACY_DELAYED_KEY, raw) and channel is not None:
+                await self.push_delayed(raw, channel, at)
+        for consumer in await self._redis.smembers(_CONSUMERS_KEY):
+            if consumer == self.consumer or await self._redis.exists(_CONSUMER_KEY.format(consumer)):
+                continue
+            recovered += await self._requeue_list(_PROCESSING_KEY.format(consumer))
+            await self._redis.srem(_CONSUMERS_KEY, consumer)
+        if recovered:
+            logger.warning("delivery: re-queued %s message(s) left in flight by stopped consumers", recovered)
+        return recovered
+
+    async def release(self) -> None:
+        """Graceful stop: hand anything still in flight back to the ready lists."""
+        await self._requeue_list(self._processing)
+        await self._redis.srem(_CONSUMERS_KEY, self.consumer)
+        await self._redis.delete(_CONSUMER_KEY.format(self.consumer))
+
+    async def depth(self, channels: List[str]) -> Dict[str, int]:
+        ready = delayed = 0
+        for channel in channels:
+            ready += int(await self._redis.llen(_READY_KEY.format(channel)))
+            delayed += int(await self._redis.zcard(_DELAYED_KEY.format(channel)))
+        return {"ready": ready, "delayed": delayed}
+
+
+def _retry_after_seconds(response: Any) -> Optional[float]:
+    raw = response.headers.get("retry-after")
+    if raw is None:
+        try:
+            raw = (response.json() or {}).get("retry_after")
+        except Exception:
+            raw = None
+    try:
+        return float(raw) if raw is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _http_result(response: Any) -> DeliveryResult:
+    code = response.status_code
+    if code < 300:
+        return DeliveryResult("ok")
+    if code == 429:
+        return DeliveryResult("retry", retry_after=_retry_after_seconds(response) or 1.0, detail="429")
+    if code >= 500:
+        return DeliveryResult("retry", detail=str(code))
+    return DeliveryResult("drop", detail=str(code))
+
+
+def coalesce_discord(messages: List[OutboundMessage]) -> List[Tuple[List[OutboundMessage], Dict[str, Any]]]:
+    """
+    Merge embed-only Discord messages that share webhook, username, avatar and content
+    into payloads of at most DISCORD_MAX_EMBEDS embeds. Returns (source messages, payload).
+    """
+    groups: Dict[Tuple, List[OutboundMessage]] = defaultdict(list)
+    out: List[Tuple[List[OutboundMessage], Dict[str, Any]]] = []
+    for msg in messages:
+        p = msg.payload
+        embeds = p.get("embeds") or []
+        if not embeds or len(embeds) > DISCORD_MAX_EMBEDS or set(p) - {"embeds", "username", "avatar_url", "content"}:
+            out.append(([msg], p))
+            continue
+        key = (msg.destination, p.get("username"), p.get("avatar_url"), p.get("content"))
+        groups[key].append(msg)
+
+    for (_, username, avatar_url, content), msgs in groups.items():
+        batch: List[OutboundMessage] = []
+        embeds: List[Dict[str, Any]] = []
+        for msg in msgs + [None]:  # sentinel flushes the last batch
+            msg_embeds = msg.payload["embeds"] if msg else []
+            if batch and (msg is None or len(embeds) + len(msg_embeds) > DISCORD_MAX_EMBEDS):
+                payload = {"embeds": embeds}
+                for k, v in (("username", username), ("avatar_url", avatar_url), ("content", content)):
+                    if v is not None:
+                        payload[k] = v
+                out.append((batch, payload))
+                batch, embeds = [], []
+            if msg is not None:
+                batch.append(msg)
+                embeds = embeds + msg_embeds
+    return out
+
+
+class DeliveryQueue:
+    def __init__(self, autostart: bool = True) -> None:
+        self.autostart = autostart
+        self._backend: Any = _MemoryBackend()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._senders: Dict[str, Sender] = {DISCORD: self._send_discord, TELEGRAM: self._send_telegram}
+        self._workers: List[asyncio.Task] = []
+        # Clients open their connection pool lazily on first request and are reused across
+        # batches; stop() closes them and start() builds fresh ones.
+        self._clients: Dict[str, InstrumentedAsyncClient] = {}
+        self._open_clients()
+        self._wake = asyncio.Event()
+        self.metrics = DeliveryMetrics()
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._maintained_at = 0.0
+
+    @property
+    def channels(self) -> List[str]:
+        """Channels this process can deliver (and therefore pops)."""
+        return sorted(self._senders)
+
+    # -- producer API ------------------------------------------------------
+
+    def register_sender(self, channel: str, sender: Sender) -> None:
+        self._senders[channel] = sender
+
+    async def enqueue(self, channel: str, destination: str, payload: Dict[str, Any]) -> str:
+        if self.autostart and not self._workers:
+            # Producers outside the API lifespan (scripts, one-off jobs) start workers on demand.
+            await self.start()
+        msg = OutboundMessage(channel=channel, destination=destination, payload=payload)
+        try:
+            await self._backend.push(msg.dumps(), channel)
+        except Exception as e:
+            logger.warning("delivery: durable enqueue failed, buffering in memory: %s", e)
+            self._backend = _MemoryBackend()
+            await self._backend.push(msg.dumps(), channel)
+        self.metrics.incr("enqueued")
+        self._wake.set()
+        return msg.id
+
+    async def enqueue_discord(
+        self,
+        webhook_url: str,
+        *,
+        embeds: Optional[List[Dict[str, Any]]] = None,
+        content: Optional[str] = None,
+        username: Optional[str] = None,
+        avatar_url: Optional[str] = None,
+    ) -> str:
+        payload: Dict[str, Any] = {}
+        for k, v in (("embeds", embeds), ("content", content), ("username", username), ("avatar_url", avatar_url)):
+            if v:
+                payload[k] = v
+        return await self.enqueue(DISCORD, webhook_url, payload)
+
+    async def enqueue_telegram(self, bot_token: str, chat_id: str, text: str) -> str:
+        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        return await self.enqueue(TELEGRAM, url, {"chat_id": chat_id, "text": text, "parse_mode": "HTML"})
+
+    # -- lifecycle -----------------------------------------------------------
+
+    async def start(self, workers: int = DELIVERY_WORKERS) -> None:
+        if self._workers:
+            return
+        await self._connect_backend()
+        self._open_clients()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(workers)]
+        logger.info("delivery: %s workers started (backend=%s)", workers, self._backend.name)
+
+    async def stop(self, drain_seconds: float = 5.0) -> None:
+        if not self._workers:
+            return
+        deadline = time.monotonic() + drain_seconds
+        while time.monotonic() < deadline and (await self._backend.depth(self.channels))["ready"] > 0:
+            await asyncio.sleep(0.1)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        try:
+            await self._backend.release()
+        except Exception as e:
+            logger.warning("delivery: releasing in-flight messages failed: %s", e)
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.__aexit__(None, None, None)
+
+    def _open_clients(self) -> None:
+        if not self._clients:
+            self._clients = {
+                DISCORD: InstrumentedAsyncClient(provider="discord", purpose="webhook", timeout=10.0),
+                TELEGRAM: InstrumentedAsyncClient(provider="telegram", purpose="webhook", timeout=10.0),
+            }
+
+    async def _connect_backend(self) -> None:
+        if not DELIVERY_USE_REDIS or not settings.REDIS_PRIMARY_URL:
+            return
+        try:
+            import redis.asyncio as aioredis
+
+            client = aioredis.from_url(
+                settings.REDIS_PRIMARY_URL, decode_responses=True, socket_connect_timeout=1.0, socket_timeout=2.0
+            )
+            await asyncio.wait_for(client.ping(), timeout=2.0)
+        except Exception as e:
+            logger.info("delivery: Redis unavailable, using in-memory queue: %s", e)
+            return
+        memory = self._backend
+        self._backend = _RedisBackend(client, self.consumer)
+        for channel in memory.channels():
+            for raw in await memory.pop_batch(10_000, [channel]):
+                await self._backend.push(raw, channel)
+        await self._maintain(force=True)
+
+    async def _maintain(self, force: bool = False) -> None:
+        """Refresh this consumer's liveness key and re-queue messages held by dead ones."""
+        now = time.monotonic()
+        if not force and now - self._maintained_at < DELIVERY_RECOVER_SECONDS:
+            return
+        self._maintained_at = now
+        try:
+            await self._backend.heartbeat()
+            await self._backend.recover()
+        except Exception as e:
+            logger.warning("delivery: consumer maintenance failed: %s", e)
+
+    # -- workers ---------------------------------------------------------------
+
+    def _bucket(self, destination: str) -> TokenBucket:
+        bucket = self._buckets.get(destination)
+        if bucket is None:
+            bucket = self._buckets[destination] = TokenBucket(DELIVERY_RATE_PER_SECOND, DELIVERY_BURST)
+        return bucket
+
+    async def _worker(self, idx: int) -> None:
+        while True:
+            try:
+                delivered = await self.process_once()
+                if not delivered:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("delivery worker %s error: %s", idx, e, exc_info=True)
+                await asyncio.sleep(1.0)
+
+    async def process_once(self) -> int:
+        """Drain one batch; returns the number of messages handled (sent, retried or dropped)."""
+        await self._maintain()
+        channels = self.channels
+        await self._backend.promote_due(time.time(), channels)
+        raws = await self._backend.pop_batch(DELIVERY_BATCH_SIZE, channels)
+        if not raws:
+            return 0
+        messages = []
+        for raw in raws:
+            try:
+                messages.append(OutboundMessage.loads(raw))
+            except Exception:
+                self.metrics.incr("dropped_malformed")
+
+        by_channel: Dict[str, List[OutboundMessage]] = defaultdict(list)
+        for msg in messages:
+            by_channel[msg.channel].append(msg)
+
+        units: List[Tuple[str, List[OutboundMessage], Dict[str, Any]]] = []
+        for channel, msgs in by_channel.items():
+            if channel == DISCORD:
+                units.extend((channel, group, payload) for group, payload in coalesce_discord(msgs))
+            else:
+                units.extend((channel, [m], m.payload) for m in msgs)
+
+        outcomes = await asyncio.gather(
+            *(self._deliver(channel, group, payload) for channel, group, payload in units), return_exceptions=True
+        )
+        for (channel, group, _), outcome in zip(units, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error("delivery: %s batch failed: %s", channel, outcome)
+                await self._requeue(group, delay=None, count_attempt=True)
+        # Every message is now sent, re-scheduled or dropped: take it off the processing list.
+        await self._backend.ack(raws)
+        return len(messages)
+
+    async def _deliver(self, channel: str, group: List[OutboundMessage], payload: Dict[str, Any]) -> None:
+        destination = group[0].destination
+        bucket = self._bucket(destination)
+        wait = bucket.reserve()
+        if wait > 0:
+            # Don't hold a worker on a throttled destination; park the messages instead.
+            self.metrics.incr("throttled", len(group))
+            await self._requeue(group, delay=wait, count_attempt=False)
+            return
+
+        sender = self._senders.get(channel)
+        if sender is None:
+            # Only registered channels are popped; if the sender went away, leave it for another process.
+            await self._requeue(group, delay=0.0, count_attempt=False)
+            return
+        try:
+            result = await sender(destination, payload)
+        except Exception as e:
+            result = DeliveryResult("retry", detail=str(e))
+
+        if result.status == "ok":
+            now = time.time()
+            self.metrics.incr("sent", len(group))
+            self.metrics.incr("requests")
+            for msg in group:
+                self.metrics.observe_latency(now - msg.enqueued_at)
+        elif result.status == "retry" and result.retry_after is not None:
+            self.metrics.incr("rate_limited", len(group))
+            bucket.block_for(result.retry_after)
+            await self._requeue(group, delay=result.retry_after, count_attempt=False)
+        elif result.status == "retry":
+            await self._requeue(group, delay=None, count_attempt=True)
+        else:
+            self.metrics.incr("dropped", len(group))
+            logger.warning("delivery: dropped %s %s message(s): %s", len(group), channel, result.detail)
+
+    async def _requeue(self, group: List[OutboundMessage], delay: Optional[float], count_attempt: bool) -> None:
+        for msg in group:
+            if count_attempt:
+                msg.attempts += 1
+                if msg.attempts >= DELIVERY_MAX_ATTEMPTS:
+                    self.metrics.incr("failed")
+                    logger.error("delivery: giving up on %s message %s after %s attempts", msg.channel, msg.id, msg.attempts)
+                    continue
+                self.metrics.incr("retried")
+                backoff = DELIVERY_BACKOFF_BASE_SECONDS * (2 ** (msg.attempts - 1))
+                msg_delay = backoff * (1 + random.random() * 0.25)
+            else:
+                msg_delay = delay or 0.0
+            await self._backend.push_delayed(msg.dumps(), msg.channel, time.time() + msg_delay)
+
+    # -- built-in senders --------------------------------------------------------
+
+    async def _send_discord(self, url: str, payload: Dict[str, Any]) -> DeliveryResult:
+        self._open_clients()
+        return _http_result(await self._clients[DISCORD].post(url, json=payload))
+
+    async def _send_telegram(self, url: str, payload: Dict[str, Any]) -> DeliveryResult:
+        self._open_clients()
+        return _http_result(await self._clients[TELEGRAM].post(url, json=payload))
+
+    async def stats(self) -> Dict[str, Any]:
+        try:
+            depth = await self._backend.depth(self.channels)
+        except Exception:
+            depth = {}
+        return {
+            "backend": self._backend.name,
+            "workers": len(self._workers),
+            "destinations": len(self._buckets),
+            "depth": depth,
+            **self.metrics.snapshot(),
+        }
+
+
+delivery_queue = DeliveryQueue()
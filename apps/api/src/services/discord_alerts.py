@@ -1,10 +1,9 @@
-import httpx
-from services.api_telemetry import InstrumentedAsyncClient
 import os
 import logging
 from typing import Dict, Any
 from services.insight_engine import get_top_edges
 from db.session import SessionLocal
+from services.delivery_queue import delivery_queue
 
 logger = logging.getLogger(__name__)
 DISCORD_WEBHOOK = os.getenv("DISCORD_WEBHOOK_URL")
@@ -41,16 +40,14 @@ async def send_daily_top_edges():
             return
 
         embeds = [format_edge_embed(e) for e in edges]
-        payload = {
-            "username": "Lucrix Edge Bot",
-            "avatar_url": "https://lucrix.ai/logo.png",
-            "content": "🏆 **Today's Top Analytics Edges** — Lucrix",
-            "embeds": embeds,
-        }
-
-        async with InstrumentedAsyncClient(provider="discord", purpose="webhook") as client:
-            r = await client.post(DISCORD_WEBHOOK, json=payload, timeout=10)
-            logger.info(f"Discord Edge Alert sent: {r.status_code}")
+        await delivery_queue.enqueue_discord(
+            DISCORD_WEBHOOK,
+            embeds=embeds,
+            content="🏆 **Today's Top Analytics Edges** — Lucrix",
+            username="Lucrix Edge Bot",
+            avatar_url="https://lucrix.ai/logo.png",
+        )
+        logger.info(f"Discord Edge Alert queued ({len(embeds)} edges)")
     except Exception as e:
         logger.error(f"Error sending Discord edge alert: {e}")
     finally:
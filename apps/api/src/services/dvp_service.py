@@ -5,10 +5,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 Defense vs Position (DvP) Service
 Provides real mapping of how well an opposing team defends a specific player position.
 """
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
-from sqlalchemy import select, func
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Tuple
+from sqlalchemy import select, text
 from models.prop import PropLine
+from services.cache import cache
 
 logger = logging.getLogger(__name__)
 
@@ -21,65 +26,196 @@ NBA_POSITION_MAP = {
     "C":  ["player_rebounds", "player_blocks"],
 }
 
+DVP_LAST_N = 15
+# The matrix is rebuilt at the end of each grading run; this bounds staleness if grading stalls.
+DVP_MATRIX_TTL_SECONDS = int(os.getenv("DVP_MATRIX_TTL_SECONDS", "1800"))
+DVP_MATRIX_CACHE_KEY = "dvp:matrix:v1"
+
+PENDING = {"rating": "Neutral", "rank": "neutral", "label": "🟡 Matchup Data Pending", "sample": 0}
+
+# Last N settled props per (opponent, position, stat), aggregated in one grouped pass.
+DVP_MATRIX_SQL = text("""
+    WITH ranked AS (
+        SELECT opponent, position, stat_type, hit_rate_l10,
+               ROW_NUMBER() OVER (
+                   PARTITION BY opponent, position, stat_type
+                   ORDER BY created_at DESC, id DESC
+               ) AS rn
+        FROM proplines
+        WHERE is_settled = TRUE
+          AND opponent IS NOT NULL AND position IS NOT NULL AND stat_type IS NOT NULL
+    )
+    SELECT opponent, position, stat_type,
+           SUM(CASE WHEN COALESCE(hit_rate_l10, 0) > 50 THEN 1 ELSE 0 END) AS hits,
+           COUNT(*) AS sample
+    FROM ranked
+    WHERE rn <= :last_n
+    GROUP BY opponent, position, stat_type
+""")
+
+# One cell with a non-default window (get_dvp_rating(..., last_n=...)); the matrix holds DVP_LAST_N.
+DVP_CELL_SQL = text("""
+    SELECT SUM(CASE WHEN COALESCE(hit_rate_l10, 0) > 50 THEN 1 ELSE 0 END) AS hits,
+           COUNT(*) AS sample
+    FROM (
+        SELECT hit_rate_l10
+        FROM proplines
+        WHERE is_settled = TRUE
+          AND opponent = :team AND position = :position AND stat_type = :stat_type
+        ORDER BY created_at DESC, id DESC
+        LIMIT :last_n
+    ) recent
+""")
+
+
+@dataclass
+class DvpMatrix:
+    """Allow-rate inputs for every team × position × stat: (hits, sample) per cell."""
+    version: int
+    built_at: float
+    cells: Dict[Tuple[str, str, str], Tuple[int, int]] = field(default_factory=dict)
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        return ((now or time.time()) - self.built_at) > DVP_MATRIX_TTL_SECONDS
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "built_at": self.built_at,
+            "cells": [[t, p, s, h, n] for (t, p, s), (h, n) in self.cells.items()],
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "DvpMatrix":
+        return cls(
+            version=int(data["version"]),
+            built_at=float(data["built_at"]),
+            cells={(t, p, s): (int(h), int(n)) for t, p, s, h, n in data.get("cells", [])},
+        )
+
+
+def rate_matchup(team: str, position: str, prop_type: str, hits: int, sample: int) -> Dict[str, Any]:
+    allow_rate = hits / sample
+    if allow_rate >= 0.65:
+        rank = "favorable"
+        label = "🟢 Favorable Matchup"
+        rating = "Favorable"
+    elif allow_rate >= 0.45:
+        rank = "neutral"
+        label = "🟡 Neutral Matchup"
+        rating = "Neutral"
+    else:
+        rank = "tough"
+        label = "🔴 Tough Matchup"
+        rating = "Tough"
+
+    return {
+        "team": team,
+        "position": position,
+        "prop_type": prop_type,
+        "allow_rate": round(allow_rate, 3),
+        "rank": rank,
+        "label": label,
+        "rating": rating,
+        "sample": sample,
+    }
+
+
 class DvpService:
     def __init__(self):
         self.nba_position_map = NBA_POSITION_MAP
+        self._matrix: Optional[DvpMatrix] = None
+        self._build_lock = asyncio.Lock()
+
+    @property
+    def matrix(self) -> Optional[DvpMatrix]:
+        return self._matrix
+
+    async def rebuild_matrix(self, db: Optional[AsyncSession] = None) -> DvpMatrix:
+        """Recompute the full matrix in one grouped query and publish it (memory + shared cache)."""
+        if db is None:
+            from db.session import async_session_maker
+            async with async_session_maker() as session:
+                return await self.rebuild_matrix(session)
+
+        async with self._build_lock:
+            rows = (await db.execute(DVP_MATRIX_SQL, {"last_n": DVP_LAST_N})).all()
+            now = time.time()
+            previous = self._matrix.version if self._matrix else 0
+            matrix = DvpMatrix(
+                version=max(previous + 1, int(now * 1000)),
+                built_at=now,
+                cells={(r[0], r[1], r[2]): (int(r[3] or 0), int(r[4] or 0)) for r in rows},
+            )
+            self._matrix = matrix
+        try:
+            await cache.set_json(DVP_MATRIX_CACHE_KEY, matrix.to_json(), ttl=DVP_MATRIX_TTL_SECONDS * 2)
+        except Exception as e:
+            logger.debug(f"DvP matrix cache publish failed: {e}")
+        logger.info(f"DvP matrix v{matrix.version} built: {len(matrix.cells)} cells")
+        return matrix
 
-    async def get_dvp_rating(self, team: str, position: str, prop_type: str, db: AsyncSession, last_n: int = 15) -> Dict[str, Any]:
-        """Calculate real DvP rating based on historical hit rates against this team/position."""
+    async def ensure_matrix(self, db: Optional[AsyncSession]) -> Optional[DvpMatrix]:
+        """
+        Current matrix: memory, or a newer shared copy once it goes stale. A stale matrix is
+        still served; the grading pipeline rebuilds it. Only a process with no matrix at
+        all (memory or shared) builds one here.
+        """
+        matrix = self._matrix
+        if matrix is not None and not matrix.is_stale():
+            return matrix
+        try:
+            shared = await cache.get_json(DVP_MATRIX_CACHE_KEY)
+            if shared:
+                candidate = DvpMatrix.from_json(shared)
+                if matrix is None or candidate.version > matrix.version:
+                    self._matrix = candidate
+                    return candidate
+        except Exception as e:
+            logger.debug(f"DvP matrix cache read failed: {e}")
+        if matrix is not None or db is None:
+            return matrix
+        return await self.rebuild_matrix(db)
+
+    def lookup(self, team: str, position: str, prop_type: str) -> Dict[str, Any]:
+        """O(1) rating from the loaded matrix (pending when absent)."""
+        cell = self._matrix.cells.get((team, position, prop_type)) if self._matrix else None
+        if not cell or not cell[1]:
+            return dict(PENDING)
+        return rate_matchup(team, position, prop_type, cell[0], cell[1])
+
+    async def get_dvp_rating(self, team: str, position: str, prop_type: str, db: AsyncSession, last_n: int = DVP_LAST_N) -> Dict[str, Any]:
+        """
+        DvP rating from the last ``last_n`` settled props against this team/position: a
+        matrix lookup for the default window, one live query for any other.
+        """
         if not db:
             logger.warning(f"No DB session provided to get_dvp_rating for {team} {position} {prop_type}")
-            return {"rating": "Neutral", "rank": "neutral", "label": "🟡 Matchup Data Pending", "sample": 0}
+            return dict(PENDING)
 
         try:
-            stmt = (
-                select(PropLine)
-                .where(
-                    PropLine.opponent == team,
-                    PropLine.position == position,
-                    PropLine.stat_type == prop_type,
-                    PropLine.is_settled == True
-                )
-                .order_by(PropLine.created_at.desc())
-                .limit(last_n)
-            )
-            
-            res = await db.execute(stmt)
-            results = res.scalars().all()
-            
-            if not results:
-                return {"rating": "Neutral", "rank": "neutral", "label": "🟡 Matchup Data Pending", "sample": 0}
-
-            hits = sum(1 for r in results if (r.hit_rate_l10 or 0) > 50) 
-            allow_rate = hits / len(results)
-
-            if allow_rate >= 0.65:
-                rank = "favorable"
-                label = "🟢 Favorable Matchup"
-                rating = "Favorable"
-            elif allow_rate >= 0.45:
-                rank = "neutral"
-                label = "🟡 Neutral Matchup"
-                rating = "Neutral"
-            else:
-                rank = "tough"
-                label = "🔴 Tough Matchup"
-                rating = "Tough"
-
-            return {
-                "team": team,
-                "position": position,
-                "prop_type": prop_type,
-                "allow_rate": round(allow_rate, 3),
-                "rank": rank,
-                "label": label,
-                "rating": rating,
-                "sample": len(results),
-            }
+            if last_n != DVP_LAST_N:
+                row = (await db.execute(DVP_CELL_SQL, {
+                    "team": team, "position": position, "stat_type": prop_type, "last_n": last_n,
+                })).one()
+                if not row[1]:
+                    return dict(PENDING)
+                return rate_matchup(team, position, prop_type, int(row[0] or 0), int(row[1]))
+            await self.ensure_matrix(db)
+            return self.lookup(team, position, prop_type)
         except Exception as e:
             logger.error(f"Error calculating real DvP: {e}")
             return {"error": str(e)}
 
+    def _card(self, prop: PropLine) -> Dict[str, Any]:
+        relevant_props = self.nba_position_map.get(prop.position, ["player_points"])
+        return {
+            "player": prop.player_name,
+            "opponent": prop.opponent,
+            "position": prop.position,
+            "dvp": {pt: self.lookup(prop.opponent, prop.position, pt) for pt in relevant_props}
+        }
+
     async def get_dvp_for_prop_card(self, player_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Get DvP context ready for a prop card."""
         stmt = select(PropLine).where(PropLine.player_id == player_id, PropLine.is_settled == False).limit(1)
@@ -89,19 +225,29 @@ class DvpService:
         if not prop:
             return {}
 
-        dvp_results = {}
-        relevant_props = self.nba_position_map.get(prop.position, ["player_points"])
-        
-        for pt in relevant_props:
-            dvp_results[pt] = await self.get_dvp_rating(prop.opponent, prop.position, pt, db)
+        await self.ensure_matrix(db)
+        return self._card(prop)
 
-        return {
-            "player": prop.player_name,
-            "opponent": prop.opponent,
-            "position": prop.position,
-            "dvp": dvp_results
-        }
+    async def get_dvp_for_slate(self, player_ids: List[str], db: AsyncSession) -> Dict[str, Dict[str, Any]]:
+        """Batch DvP context for a whole slate: one prop query, then matrix lookups. Keyed by player_id."""
+        ids = [pid for pid in dict.fromkeys(player_ids) if pid]
+        if not ids:
+            return {}
+        stmt = (
+            select(PropLine)
+            .where(PropLine.player_id.in_(ids), PropLine.is_settled == False)
+            .order_by(PropLine.player_id, PropLine.id)
+        )
+        props = (await db.execute(stmt)).scalars().all()
+        await self.ensure_matrix(db)
+
+        cards: Dict[str, Dict[str, Any]] = {}
+        for prop in props:
+            if prop.player_id not in cards:
+                cards[prop.player_id] = self._card(prop)
+        return cards
 
 dvp_service = DvpService()
 get_dvp_rating = dvp_service.get_dvp_rating
 get_dvp_for_prop_card = dvp_service.get_dvp_for_prop_card
+get_dvp_for_slate = dvp_service.get_dvp_for_slate
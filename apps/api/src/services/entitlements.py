@@ -0,0 +1,230 @@
+"""
+Entitlement resolution shared by every tier/feature gate.
+
+A user's tier is resolved once (token claims + UserOverride, or the provisioned
+users row) into an immutable ``Entitlements`` value, cached per user for a short
+TTL and pinned on ``request.state`` so every gate in the same request reads the
+same object. Billing webhooks call ``entitlement_resolver.invalidate`` so upgrades
+and cancellations apply on the next request instead of after the TTL.
+"""
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set
+
+from services.cache_service import TTLCache
+
+logger = logging.getLogger(__name__)
+
+ENTITLEMENT_CACHE_TTL_SECONDS = int(os.getenv("ENTITLEMENT_CACHE_TTL_SECONDS", "60"))
+
+OWNER_EMAILS = {e.strip().lower() for e in os.getenv("OWNER_EMAILS", "").split(",") if e.strip()}
+
+# One ladder for all gates (previously each module kept its own).
+TIER_RANK = {
+    "free": 0,
+    "basic": 0,
+    "pro": 1,
+    "premium": 1,
+    "enterprise": 1,
+    "elite": 2,
+    "syndicate": 3,
+    "admin": 4,
+    "owner": 4,
+}
+
+PRO_FEATURES = frozenset([
+    'kelly_sizing', 'smart_money_signal', 'sgp_builder', 'whale_watcher',
+    'clv_tracker', 'alternate_lines', 'kalshi_crossref', 'api_access'
+])
+
+
+def get_tier_limits(tier: str) -> Dict:
+    """Helper to get limits for a tier"""
+    tier = (tier or "free").lower()
+    # compute_per_min: cost units of expensive endpoints per minute (edge rate limiter burst)
+    if tier in ("elite", "syndicate", "admin", "owner"):
+        return {"oracle_daily": 1000, "sim_count": 10000, "refresh_sec": 30, "compute_per_min": 300}
+    if TIER_RANK.get(tier, 0) >= TIER_RANK["pro"]:
+        return {"oracle_daily": 10, "sim_count": 100, "refresh_sec": 60, "compute_per_min": 60}
+    return {"oracle_daily": 0, "sim_count": 0, "refresh_sec": 300, "compute_per_min": 10}
+
+
+@dataclass(frozen=True)
+class Entitlements:
+    tier: str = "free"
+    email: Optional[str] = None
+    user_key: Optional[str] = None
+    is_owner: bool = False
+
+    @property
+    def rank(self) -> int:
+        return TIER_RANK["owner"] if self.is_owner else TIER_RANK.get(self.tier, 0)
+
+    @property
+    def limits(self) -> Dict:
+        return get_tier_limits("owner" if self.is_owner else self.tier)
+
+    def has_tier(self, minimum: str) -> bool:
+        return self.rank >= TIER_RANK.get((minimum or "free").lower(), 0)
+
+    def allows(self, feature: str) -> bool:
+        return feature not in PRO_FEATURES or self.has_tier("pro")
+
+
+ANONYMOUS = Entitlements()
+
+
+def _attr(user: Any, name: str, default=None):
+    if isinstance(user, dict):
+        return user.get(name, default)
+    return getattr(user, name, default)
+
+
+class EntitlementResolver:
+    def __init__(self) -> None:
+        self._cache = TTLCache()
+        # email / user_key -> cache keys holding that user's entitlements
+        self._index: Dict[str, Set[str]] = {}
+
+    def _remember(self, key: str, ents: Entitlements, ttl: int = ENTITLEMENT_CACHE_TTL_SECONDS) -> Entitlements:
+        self._cache.set(key, ents, ttl)
+        for ident in (ents.email, ents.user_key):
+            if ident:
+                self._index.setdefault(ident, set()).add(key)
+        return ents
+
+    async def for_token(self, token: Optional[str], db) -> Entitlements:
+        """Entitlements for a local JWT: owner list, active UserOverride, then the token's tier claim."""
+        from core.config import settings
+        from services.auth_service import auth_service
+
+        if settings.DEVELOPMENT_MODE:
+            return Entitlements(tier="elite")
+        if not token:
+            return ANONYMOUS
+
+        try:
+            payload = auth_service.decode_access_token(token)
+            if not payload:
+                return ANONYMOUS
+
+            email = (payload.get("email") or "").lower()
+            if email and (email in OWNER_EMAILS or email == "dev@perplex.ai"):
+                return Entitlements(tier="elite", email=email, is_owner=True)
+
+            claim = str(payload.get("tier", "free")).lower()
+            key = f"email:{email}:{claim}"
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+            tier = claim
+            if email:
+                from sqlalchemy.future import select
+                from models.user import UserOverride
+
+                now = datetime.now(timezone.utc)
+                stmt = select(UserOverride).where(UserOverride.email == payload.get("email", "")).where(
+                    (UserOverride.expires_at == None) | (UserOverride.expires_at > now)
+                )
+                override = (await db.execute(stmt)).scalar_one_or_none()
+                if override:
+                    tier = override.tier.lower()
+            return self._remember(key, Entitlements(tier=tier, email=email or None, user_key=payload.get("sub")))
+        except Exception:
+            return ANONYMOUS
+
+    async def for_user(self, user: Any) -> Entitlements:
+        """
+        Entitlements for an already-authenticated user: a Supabase user (dict or object),
+        an ORM ``User`` row, or the bypass dict from auth_middleware.
+        """
+        if not user:
+            return ANONYMOUS
+
+        user_key = _attr(user, "auth_id") or _attr(user, "id") or _attr(user, "uid")
+        email = (_attr(user, "email") or "").lower() or None
+        key = f"user:{user_key or email}"
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        is_owner = bool(
+            (email and email in OWNER_EMAILS)
+            or _attr(user, "is_admin")
+            or _attr(user, "role") == "admin"
+        )
+
+        # ORM rows and bypass dicts carry the tier; Supabase users go through the cached profile.
+        tier = _attr(user, "subscription_tier") or _attr(user, "plan")
+        carried = bool(tier)
+        ttl = ENTITLEMENT_CACHE_TTL_SECONDS
+        if not tier and user_key:
+            from deps.auth import USER_PROFILE_MISS_TTL_SECONDS, get_user_profile
+
+            profile = await get_user_profile(str(user_key))
+            if profile is not None and profile["subscription_tier"]:
+                tier = profile["subscription_tier"]
+            else:
+                # not provisioned yet: re-check soon so JIT provisioning shows up quickly
+                ttl = min(ttl, USER_PROFILE_MISS_TTL_SECONDS)
+        if not tier:
+            tier = (_attr(user, "user_metadata") or {}).get("tier", "free")
+
+        tier = str(tier).lower()
+        ents = Entitlements(tier=tier, email=email, user_key=str(user_key) if user_key else None,
+                            is_owner=is_owner or tier == "owner")
+        # Only looked-up tiers are worth caching; a carried tier is already in hand.
+        return self._remember(key, ents, ttl) if not carried and (user_key or email) else ents
+
+    async def for_bearer(self, token: Optional[str]) -> Entitlements:
+        """
+        Entitlements straight from a bearer token, outside the dependency graph (middleware):
+        local JWT first, then a Supabase token through the memoized verifier.
+        """
+        if not token:
+            return ANONYMOUS
+        from db.session import async_session_maker
+
+        # The session only opens a connection if the UserOverride lookup actually runs.
+        async with async_session_maker() as db:
+            ents = await self.for_token(token, db)
+        if ents is not ANONYMOUS:
+            return ents
+        try:
+            from api_utils.auth_supabase import resolve_supabase_user
+            user = await resolve_supabase_user(token)
+        except Exception as e:
+            logger.debug("Bearer entitlement lookup failed: %s", e)
+            return ANONYMOUS
+        return await self.for_user(user) if user else ANONYMOUS
+
+    def invalidate(self, *, email: Optional[str] = None, user_key: Optional[str] = None) -> None:
+        """Drop cached entitlements (and the cached users row) after a subscription change."""
+        for ident in ((email or "").lower(), str(user_key) if user_key else None):
+            for key in self._index.pop(ident, ()) if ident else ():
+                self._cache.invalidate(key)
+        if user_key:
+            from deps.auth import invalidate_user_profile
+            invalidate_user_profile(str(user_key))
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._index.clear()
+
+
+entitlement_resolver = EntitlementResolver()
+
+
+async def request_entitlements(request: Any, compute) -> Entitlements:
+    """Resolve once per request: reuse ``request.state.entitlements`` or await ``compute()`` and pin it."""
+    state = getattr(request, "state", None) if request is not None else None
+    cached = getattr(state, "entitlements", None) if state is not None else None
+    if cached is not None:
+        return cached
+    ents = await compute()
+    if state is not None:
+        state.entitlements = ents
+    return ents
@@ -16,9 +16,15 @@ from services.monte_carlo_service import monte_carlo_engine
 from services.brains_service import brains_scorer
 from services.clv_service import clv_service
 from core.config import settings
+from services.metrics_registry import registry
 
 logger = logging.getLogger(__name__)
 
+EV_CYCLE_SECONDS = registry.histogram("ev_cycle_seconds", "EVService.run_ev_cycle duration", ("sport",))
+EV_CYCLES = registry.counter("ev_cycles", "EV cycles by outcome", ("sport", "result"))
+EV_ROWS_SCANNED = registry.counter("ev_odds_rows_scanned", "unified_odds rows matched per EV cycle", ("sport",))
+EV_SIGNALS_WRITTEN = registry.counter("ev_signals_written", "EV signals upserted", ("sport",))
+
 class EVService:
     # Maximum realistic edge — anything above this is a data artifact
     MAX_REALISTIC_EV = 15.0  # 15%
@@ -27,6 +33,10 @@ class EVService:
         self.version = "v3-brains"
 
     async def run_ev_cycle(self, sport: str):
+        with EV_CYCLE_SECONDS.time(sport=sport):
+            await self._run_ev_cycle(sport)
+
+    async def _run_ev_cycle(self, sport: str):
         try:
             async with async_session_maker() as session:
                 # 1. Load odds via Raw SQL for total visibility
@@ -44,9 +54,11 @@ class EVService:
                 if not all_odds:
                     logger.info(f"EVService: No odds found in unified_odds for sport={sport}")
                     await HeartbeatService.log_heartbeat(session, f"ev_grader_{sport}", status="idle_no_data", rows_written=0)
+                    EV_CYCLES.inc(sport=sport, result="no_data")
                     return
 
                 logger.info(f"EVService: Processing {len(all_odds)} rows for sport={sport}")
+                EV_ROWS_SCANNED.inc(len(all_odds), sport=sport)
 
                 # Grouping: (eid, mkey, line, p_name) -> outcome -> book -> (price, imp)
                 grouped = {}
@@ -221,12 +233,16 @@ class EVService:
                     logger.info(f"EVService: Generated {len(signals)} edges for sport={sport}")
                     await self.upsert_ev_signals(signals, session=session)
                     await HeartbeatService.log_heartbeat(session, f"ev_grader_{sport}", status="ok", rows_written=len(signals))
+                    EV_SIGNALS_WRITTEN.inc(len(signals), sport=sport)
+                    EV_CYCLES.inc(sport=sport, result="ok")
                 else:
                     threshold = getattr(settings, "EV_MIN_THRESHOLD", 0.5)
                     logger.info(f"EVService: No edges exceeding {threshold}% found for sport={sport} (Found {len(grouped)} market groups)")
                     await HeartbeatService.log_heartbeat(session, f"ev_grader_{sport}", status="idle_no_edges", rows_written=0)
+                    EV_CYCLES.inc(sport=sport, result="no_edges")
         except Exception as e:
             logger.error(f"EVService CRASH for {sport}: {e}")
+            EV_CYCLES.inc(sport=sport, result="error")
             async with async_session_maker() as session:
                 await HeartbeatService.log_heartbeat(session, f"ev_grader_{sport}", status="error", error_count=1)
             raise e
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from hashlib import sha256
@@ -13,9 +14,15 @@ from sqlalchemy import text
 
 from db.session import async_session_maker
 from services.cache import cache
+from services.metrics_registry import registry
 
 logger = logging.getLogger(__name__)
 
+GATEWAY_SECONDS = registry.histogram(
+    "gateway_request_seconds", "ExternalApiGateway.request latency by provider and cache outcome", ("provider", "cache")
+)
+GATEWAY_ERRORS = registry.counter("gateway_errors", "ExternalApiGateway upstream request failures", ("provider",))
+
 
 @dataclass
 class GatewayResult:
@@ -51,6 +58,11 @@ class ExternalApiGateway:
         return int(self.TTL_POLICY_SECONDS.get(data_class, 120))
 
     async def _budget_state(self, provider: str) -> Dict[str, Any]:
+        """
+        Usage against the hourly / daily budgets, in provider credits (the ``x-requests-last``
+        cost of each paid call; 1 when the provider does not report it). LivePollPlanner sizes
+        its per-interval plan in the same unit via ``market_cost``.
+        """
         hour_limit = int(__import__("os").getenv("EXT_API_HOURLY_BUDGET", "1200"))
         day_limit = int(__import__("os").getenv("EXT_API_DAILY_BUDGET", "12000"))
         reserve_limit = int(__import__("os").getenv("EXT_API_LIVE_RESERVE_BUDGET", "250"))
@@ -64,7 +76,7 @@ class ExternalApiGateway:
             async with async_session_maker() as session:
                 res_h = await session.execute(
                     text(
-                        "SELECT COUNT(*) FROM external_api_call_log "
+                        "SELECT COALESCE(SUM(COALESCE(x_requests_last, 1)), 0) FROM external_api_call_log "
                         "WHERE provider=:p AND started_at >= :hs AND cache_hit = FALSE"
                     ),
                     {"p": provider, "hs": hour_start},
@@ -72,7 +84,7 @@ class ExternalApiGateway:
                 used_hour = int(res_h.scalar() or 0)
                 res_d = await session.execute(
                     text(
-                        "SELECT COUNT(*) FROM external_api_call_log "
+                        "SELECT COALESCE(SUM(COALESCE(x_requests_last, 1)), 0) FROM external_api_call_log "
                         "WHERE provider=:p AND started_at >= :ds AND cache_hit = FALSE"
                     ),
                     {"p": provider, "ds": day_start},
@@ -158,7 +170,15 @@ class ExternalApiGateway:
         except Exception as e:
             logger.debug("gateway call logging failed: %s", e)
 
-    async def request(
+    async def request(self, *, provider: str, **kwargs: Any) -> Optional[GatewayResult]:
+        """See ``_request``; records latency under cache=hit|miss|skipped (blocked by budget or failed)."""
+        start = time.perf_counter()
+        result = await self._request(provider=provider, **kwargs)
+        outcome = "skipped" if result is None else ("hit" if result.cache_hit else "miss")
+        GATEWAY_SECONDS.observe(time.perf_counter() - start, provider=provider, cache=outcome)
+        return result
+
+    async def _request(
         self,
         *,
         provider: str,
@@ -277,6 +297,7 @@ class ExternalApiGateway:
                 return result
             except Exception as e:
                 fut.set_result(None)
+                GATEWAY_ERRORS.inc(provider=provider)
                 logger.error("external gateway request failed %s %s: %s", provider, endpoint, e)
                 return None
             finally:
@@ -0,0 +1,366 @@
+"""
+Slate-level player feature store.
+
+Materializes per player/stat features from ``player_stats_v2`` into ``player_features``:
+rolling L5/L10/L20 windows, home/away and opponent splits, rest/back-to-back flags and
+the recent value vector hit rates are computed from for any line. Refresh is incremental
+(only players with stat rows newer than the last watermark are rebuilt) and runs at the
+end of each grading pipeline run. Reads are batched: one query for a whole slate of keys.
+"""
+import asyncio
+import logging
+import math
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.brain import PlayerFeature, PlayerStats
+from services.cache_service import TTLCache
+from services.simulation_cache import PRIORS, simulation_cache
+
+logger = logging.getLogger(__name__)
+
+FEATURE_WINDOW = 20
+FEATURE_RECENT_DATES = 4
+# Opponent splits cover the same horizon the H2H endpoint always used.
+FEATURE_H2H_SEASONS = int(os.getenv("FEATURE_H2H_SEASONS", "3"))
+FEATURE_CACHE_TTL_SECONDS = int(os.getenv("FEATURE_CACHE_TTL_SECONDS", "600"))
+FEATURE_REFRESH_CHUNK = 500
+
+FeatureKey = Tuple[str, str]  # (player_id or player_name, stat_category)
+
+
+def stat_category(stat_type: str) -> str:
+    """Prop market/stat keys map onto player_stats_v2 categories (player_points -> points)."""
+    return (stat_type or "").lower().replace("player_", "", 1)
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).date()
+
+
+def _avg(values: Sequence[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def _std(values: Sequence[float]) -> Optional[float]:
+    if len(values) < 2:
+        return None
+    mean = sum(values) / len(values)
+    return round(math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1)), 3)
+
+
+def compute_features(
+    player_id: str,
+    category: str,
+    rows: Sequence[Any],
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    One player_features row from this player/stat's player_stats_v2 rows, newest first.
+    Rows expose game_date, value, opponent_team, is_home, player_name and created_at.
+    """
+    now = now or datetime.now(timezone.utc)
+    values = [float(r.value or 0) for r in rows]
+    home = [float(r.value or 0) for r in rows if r.is_home]
+    away = [float(r.value or 0) for r in rows if not r.is_home]
+
+    h2h_cutoff = (now - timedelta(days=365 * FEATURE_H2H_SEASONS)).date()
+    by_opp: Dict[str, List[float]] = {}
+    for r in rows:
+        played = _as_date(r.game_date)
+        if r.opponent_team and played is not None and played >= h2h_cutoff:
+            by_opp.setdefault(r.opponent_team, []).append(float(r.value or 0))
+    opponent_splits = {
+        team: {
+            "games": len(vals),
+            "avg": _avg(vals),
+            "max": max(vals),
+            "min": min(vals),
+            "last_5": [round(v, 1) for v in vals[:5]],
+        }
+        for team, vals in by_opp.items()
+    }
+
+    dates: List[date] = []
+    for r in rows:
+        d = _as_date(r.game_date)
+        if d is not None and d not in dates:
+            dates.append(d)
+        if len(dates) >= FEATURE_RECENT_DATES:
+            break
+    rest_days = (dates[0] - dates[1]).days - 1 if len(dates) >= 2 else None
+
+    watermarks = [r.created_at for r in rows if r.created_at is not None]
+    last_game = rows[0].game_date if rows else None
+    return {
+        "player_id": player_id,
+        "player_name": next((r.player_name for r in rows if r.player_name), None),
+        "stat_category": category,
+        "games": len(values),
+        "season_avg": _avg(values),
+        "l5_avg": _avg(values[:5]),
+        "l10_avg": _avg(values[:10]),
+        "l20_avg": _avg(values[:20]),
+        "l10_std": _std(values[:10]),
+        "home_avg": _avg(home),
+        "away_avg": _avg(away),
+        "home_games": len(home),
+        "away_games": len(away),
+        "last_game_date": last_game,
+        "rest_days": rest_days,
+        "is_back_to_back": rest_days == 0,
+        "is_3_in_4": len(dates) >= 3 and (dates[0] - dates[2]).days <= 3,
+        "recent_values": values[:FEATURE_WINDOW],
+        "recent_dates": [d.isoformat() for d in dates],
+        "opponent_splits": opponent_splits,
+        "source_watermark": max(watermarks) if watermarks else None,
+    }
+
+
+@dataclass
+class PlayerFeatures:
+    """Read-side view of a player_features row; line-dependent numbers are derived on demand."""
+    player_id: str
+    player_name: Optional[str]
+    stat_category: str
+    games: int = 0
+    season_avg: Optional[float] = None
+    l5_avg: Optional[float] = None
+    l10_avg: Optional[float] = None
+    l20_avg: Optional[float] = None
+    l10_std: Optional[float] = None
+    home_avg: Optional[float] = None
+    away_avg: Optional[float] = None
+    home_games: int = 0
+    away_games: int = 0
+    rest_days: Optional[int] = None
+    is_back_to_back: bool = False
+    is_3_in_4: bool = False
+    recent_values: List[float] = field(default_factory=list)
+    recent_dates: List[str] = field(default_factory=list)
+    opponent_splits: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def from_row(cls, row: PlayerFeature) -> "PlayerFeatures":
+        return cls(
+            player_id=row.player_id,
+            player_name=row.player_name,
+            stat_category=row.stat_category,
+            games=row.games or 0,
+            season_avg=row.season_avg,
+            l5_avg=row.l5_avg,
+            l10_avg=row.l10_avg,
+            l20_avg=row.l20_avg,
+            l10_std=row.l10_std,
+            home_avg=row.home_avg,
+            away_avg=row.away_avg,
+            home_games=row.home_games or 0,
+            away_games=row.away_games or 0,
+            rest_days=row.rest_days,
+            is_back_to_back=bool(row.is_back_to_back),
+            is_3_in_4=bool(row.is_3_in_4),
+            recent_values=list(row.recent_values or []),
+            recent_dates=list(row.recent_dates or []),
+            opponent_splits=dict(row.opponent_splits or {}),
+        )
+
+    def hit_rate(self, line: float, window: int = 10) -> Dict[str, Any]:
+        """Over-the-line hit rate on the last ``window`` games (player_splits_service shape)."""
+        values = self.recent_values[:window]
+        if not values:
+            return {"hit_rate": None, "sample": 0, "avg": None, "values": []}
+        hits = sum(1 for v in values if v > line)
+        return {
+            "hit_rate": round(hits / len(values), 3),
+            "sample": len(values),
+            "avg": round(sum(values) / len(values), 1),
+            "values": values,
+            "hits": hits,
+        }
+
+    def splits(self, line: float) -> Dict[str, Dict[str, Any]]:
+        return {"l5": self.hit_rate(line, 5), "l10": self.hit_rate(line, 10), "l20": self.hit_rate(line, 20)}
+
+    def h2h(self, opponent_team: str) -> Dict[str, Any]:
+        split = self.opponent_splits.get(opponent_team)
+        if not split:
+            return {'games': 0, 'avg': None, 'message': 'No H2H data'}
+        return {
+            'player_id': self.player_id,
+            'opponent': opponent_team,
+            'stat': self.stat_category,
+            'games': split["games"],
+            'avg': split["avg"],
+            'max': split["max"],
+            'min': split["min"],
+            'last_3': split["last_5"][:3],
+            'last_5': split["last_5"],
+        }
+
+    def home_away(self) -> Dict[str, Any]:
+        return {
+            'home_avg': self.home_avg,
+            'away_avg': self.away_avg,
+            'home_games': self.home_games,
+            'away_games': self.away_games,
+            'home_advantage': round(self.home_avg - self.away_avg, 2)
+            if self.home_avg is not None and self.away_avg is not None else None,
+        }
+
+    def played_on(self, day: date) -> bool:
+        return day.isoformat() in self.recent_dates
+
+    def covers(self, day: date) -> bool:
+        """Whether ``played_on(day)`` is authoritative: only the last few game dates are kept."""
+        if len(self.recent_dates) < FEATURE_RECENT_DATES:
+            return True
+        return day >= date.fromisoformat(self.recent_dates[-1])
+
+
+def _row_to_key(row: PlayerFeature, by: str) -> FeatureKey:
+    return (row.player_name if by == "player_name" else row.player_id, row.stat_category)
+
+
+class FeatureStore:
+    def __init__(self) -> None:
+        self._cache = TTLCache()
+        self._watermark: Optional[datetime] = None
+        self._refresh_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+    async def refresh(self, db: Optional[AsyncSession] = None, full: bool = False) -> int:
+        """
+        Rebuild features for players with player_stats_v2 rows newer than the watermark
+        (every player when ``full``). Returns the number of feature rows written.
+        """
+        if db is None:
+            from db.session import async_session_maker
+            async with async_session_maker() as session:
+                return await self.refresh(session, full=full)
+
+        async with self._refresh_lock:
+            if self._watermark is None and not full:
+                self._watermark = (await db.execute(select(func.max(PlayerFeature.source_watermark)))).scalar()
+
+            stmt = select(PlayerStats.player_id).where(PlayerStats.player_id.isnot(None)).distinct()
+            if not full and self._watermark is not None:
+                stmt = stmt.where(PlayerStats.created_at > self._watermark)
+            player_ids = [pid for (pid,) in (await db.execute(stmt)).all()]
+            if not player_ids:
+                return 0
+
+            written = 0
+            newest = self._watermark
+            for i in range(0, len(player_ids), FEATURE_REFRESH_CHUNK):
+                chunk = player_ids[i:i + FEATURE_REFRESH_CHUNK]
+                rows = (await db.execute(
+                    select(PlayerStats)
+                    .where(PlayerStats.player_id.in_(chunk))
+                    .order_by(PlayerStats.player_id, PlayerStats.stat_category,
+                              PlayerStats.game_date.desc(), PlayerStats.id.desc())
+                )).scalars().all()
+
+                grouped: Dict[FeatureKey, List[PlayerStats]] = {}
+                for r in rows:
+                    grouped.setdefault((r.player_id, r.stat_category), []).append(r)
+                features = [compute_features(pid, cat, group) for (pid, cat), group in grouped.items()]
+
+                await db.execute(delete(PlayerFeature).where(PlayerFeature.player_id.in_(chunk)))
+                if features:
+                    await db.execute(insert(PlayerFeature), features)
+                written += len(features)
+                for f in features:
+                    mark = f["source_watermark"]
+                    if mark is not None and (newest is None or mark > newest):
+                        newest = mark
+
+            await db.commit()
+            self._watermark = newest
+            self._cache.clear()
+            if written:
+                await simulation_cache.bump(PRIORS)
+            logger.info(f"Feature store refreshed {written} rows for {len(player_ids)} players")
+            return written
+
+    # ------------------------------------------------------------------
+    # Batch reads
+    # ------------------------------------------------------------------
+    def _read_stmt(self, keys: Sequence[FeatureKey], by: str):
+        column = PlayerFeature.player_name if by == "player_name" else PlayerFeature.player_id
+        return select(PlayerFeature).where(
+            column.in_({k for k, _ in keys}),
+            PlayerFeature.stat_category.in_({c for _, c in keys}),
+        )
+
+    def _split_cached(self, keys: Iterable[FeatureKey], by: str) -> Tuple[Dict[FeatureKey, PlayerFeatures], List[FeatureKey]]:
+        found: Dict[FeatureKey, PlayerFeatures] = {}
+        missing: List[FeatureKey] = []
+        for key in dict.fromkeys((k, stat_category(c)) for k, c in keys if k):
+            hit = self._cache.get(f"{by}:{key[0]}:{key[1]}")
+            if hit is not None:
+                found[key] = hit
+            else:
+                missing.append(key)
+        return found, missing
+
+    def _absorb(self, rows: Iterable[PlayerFeature], wanted: Sequence[FeatureKey], by: str, found: Dict[FeatureKey, PlayerFeatures]) -> None:
+        wanted_set = set(wanted)
+        for row in rows:
+            key = _row_to_key(row, by)
+            if key in wanted_set and key not in found:
+                features = PlayerFeatures.from_row(row)
+                found[key] = features
+                self._cache.set(f"{by}:{key[0]}:{key[1]}", features, FEATURE_CACHE_TTL_SECONDS)
+
+    async def get_many(self, db: AsyncSession, keys: Iterable[FeatureKey], by: str = "player_id") -> Dict[FeatureKey, PlayerFeatures]:
+        """
+        Features for a batch of (player_id, stat) keys — or (player_name, stat) with
+        ``by="player_name"`` — in one query. Stat keys are normalized (player_points -> points)
+        and the result is keyed by the normalized pair; keys without features are absent.
+        """
+        found, missing = self._split_cached(keys, by)
+        if missing:
+            rows = (await db.execute(self._read_stmt(missing, by))).scalars().all()
+            self._absorb(rows, missing, by, found)
+        return found
+
+    def get_many_sync(self, db: Session, keys: Iterable[FeatureKey], by: str = "player_id") -> Dict[FeatureKey, PlayerFeatures]:
+        """``get_many`` for callers still holding a sync Session."""
+        found, missing = self._split_cached(keys, by)
+        if missing:
+            rows = db.execute(self._read_stmt(missing, by)).scalars().all()
+            self._absorb(rows, missing, by, found)
+        return found
+
+    async def get(self, db: AsyncSession, key: str, stat: str, by: str = "player_id") -> Optional[PlayerFeatures]:
+        return (await self.get_many(db, [(key, stat)], by=by)).get((key, stat_category(stat)))
+
+    def get_sync(self, db: Session, key: str, stat: str, by: str = "player_id") -> Optional[PlayerFeatures]:
+        return self.get_many_sync(db, [(key, stat)], by=by).get((key, stat_category(stat)))
+
+    def get_player_sync(self, db: Session, player_id: str) -> Optional[PlayerFeatures]:
+        """Any one stat row for a player; rest/back-to-back fields are player-level."""
+        row = db.execute(
+            select(PlayerFeature).where(PlayerFeature.player_id == player_id)
+            .order_by(PlayerFeature.last_game_date.desc()).limit(1)
+        ).scalars().first()
+        return PlayerFeatures.from_row(row) if row is not None else None
+
+
+feature_store = FeatureStore()
+refresh_features = feature_store.refresh
+get_features = feature_store.get_many
@@ -2,7 +2,6 @@
 Game Results Service - Track and manage game results for settlement and analysis
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,7 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,14 +37,11 @@ class GameResult:
     created_at: datetime
     updated_at: datetime
 
-class GameResultsService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class GameResultsService(AsyncpgRepository):
     async def create_game_result(self, game_id: int, external_fixture_id: str) -> bool:
         """Create a new game result record"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             await conn.execute("""
                 INSERT INTO game_results (game_id, external_fixture_id, home_score, away_score, period_scores, is_settled)
@@ -64,7 +60,7 @@ class GameResultsService:
                                period_scores: Dict[str, Dict[str, int]] = None) -> bool:
         """Update game result with scores"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             period_scores = period_scores or {}
             now = datetime.now(timezone.utc)
@@ -87,7 +83,7 @@ class GameResultsService:
     async def get_game_result(self, game_id: int) -> Optional[GameResult]:
         """Get game result by ID"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             result = await conn.fetchrow("""
                 SELECT * FROM game_results 
@@ -118,7 +114,7 @@ class GameResultsService:
     async def get_game_results_by_date(self, date: str, sport_id: int = None) -> List[GameResult]:
         """Get game results for a specific date"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM game_results 
@@ -159,7 +155,7 @@ class GameResultsService:
     async def get_pending_games(self) -> List[GameResult]:
         """Get all pending games"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM game_results 
@@ -191,7 +187,7 @@ class GameResultsService:
     async def get_settled_games(self, days: int = 7) -> List[GameResult]:
         """Get settled games within specified days"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM game_results 
@@ -224,7 +220,7 @@ class GameResultsService:
     async def get_game_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get game statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Overall statistics
             overall = await conn.fetchrow("""
@@ -301,7 +297,7 @@ class GameResultsService:
     async def settle_pending_games(self, external_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Settle pending games with external results"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             settled_count = 0
             failed_count = 0
@@ -367,7 +363,7 @@ class GameResultsService:
     async def get_game_results_for_settlement(self, sport_id: int = None) -> List[Dict[str, Any]]:
         """Get pending games that need settlement"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT game_id, external_fixture_id, created_at 
@@ -403,7 +399,7 @@ class GameResultsService:
     async def analyze_game_patterns(self, days: int = 30) -> Dict[str, Any]:
         """Analyze game patterns and trends"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Score distribution
             score_dist = await conn.fetch("""
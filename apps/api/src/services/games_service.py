@@ -2,7 +2,6 @@
 Games Management Service - Track and manage game schedules and metadata
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,8 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
+from services.stats_rollups import ROLLUPS, window_bounds
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,15 +40,12 @@ class Game:
     updated_at: datetime
     season_id: Optional[int]
 
-class GamesService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class GamesService(AsyncpgRepository):
     async def create_game(self, sport_id: int, external_game_id: str, home_team_id: int, 
                         away_team_id: int, start_time: datetime, season_id: int = None) -> bool:
         """Create a new game record"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -71,7 +68,7 @@ class GamesService:
     async def update_game_status(self, game_id: int, status: GameStatus) -> bool:
         """Update game status"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -92,7 +89,7 @@ class GamesService:
     async def get_game_by_id(self, game_id: int) -> Optional[Game]:
         """Get game by ID"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             result = await conn.fetchrow("""
                 SELECT * FROM games 
@@ -125,7 +122,7 @@ class GamesService:
                              start_date: str = None, end_date: str = None) -> List[Game]:
         """Get games by sport with optional filters"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM games 
@@ -175,7 +172,7 @@ class GamesService:
     async def get_games_by_date(self, date: str, sport_id: int = None) -> List[Game]:
         """Get games for a specific date"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM games 
@@ -217,7 +214,7 @@ class GamesService:
     async def get_upcoming_games(self, hours: int = 24, sport_id: int = None) -> List[Game]:
         """Get upcoming games within specified hours"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM games 
@@ -260,7 +257,7 @@ class GamesService:
     async def get_recent_games(self, hours: int = 24, sport_id: int = None) -> List[Game]:
         """Get recent games within specified hours"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM games 
@@ -302,48 +299,52 @@ class GamesService:
     async def get_games_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get games statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
+            
+            since, through = await window_bounds(conn, "games", timedelta(days=days))
+            rollup = ROLLUPS["games"]
+            w = rollup.window()
             
             # Overall statistics
-            overall = await conn.fetchrow("""
+            overall = await conn.fetchrow(f"""
+                WITH w AS ({w})
                 SELECT 
-                    COUNT(*) as total_games,
-                    COUNT(CASE WHEN status = 'final' THEN 1 END) as final_games,
-                    COUNT(CASE WHEN status = 'scheduled' THEN 1 END) as scheduled_games,
-                    COUNT(CASE WHEN status = 'in_progress' THEN 1 END) as in_progress_games,
-                    COUNT(CASE WHEN status = 'cancelled' THEN 1 END) as cancelled_games,
-                    COUNT(CASE WHEN status = 'postponed' THEN 1 END) as postponed_games,
-                    COUNT(CASE WHEN status = 'suspended' THEN 1 END) as suspended_games
-                FROM games 
-                WHERE created_at >= NOW() - INTERVAL '$1 days'
-            """, days)
+                    COALESCE(SUM(n), 0) as total_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'final'), 0) as final_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'scheduled'), 0) as scheduled_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'in_progress'), 0) as in_progress_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'cancelled'), 0) as cancelled_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'postponed'), 0) as postponed_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'suspended'), 0) as suspended_games
+                FROM w
+            """, since, through)
             
             # By sport statistics
-            by_sport = await conn.fetch("""
+            by_sport = await conn.fetch(f"""
+                WITH w AS ({w})
                 SELECT 
                     sport_id,
-                    COUNT(*) as total_games,
-                    COUNT(CASE WHEN status = 'final' THEN 1 END) as final_games,
-                    COUNT(CASE WHEN status = 'scheduled' THEN 1 END) as scheduled_games,
-                    COUNT(CASE WHEN status = 'in_progress' THEN 1 END) as in_progress_games
-                FROM games 
-                WHERE created_at >= NOW() - INTERVAL '$1 days'
+                    SUM(n) as total_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'final'), 0) as final_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'scheduled'), 0) as scheduled_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'in_progress'), 0) as in_progress_games
+                FROM w
                 GROUP BY sport_id
                 ORDER BY total_games DESC
-            """, days)
+            """, since, through)
             
-            # By date statistics
-            by_date = await conn.fetch("""
+            # By date statistics (windowed on start_time, not on when the game was created)
+            by_date = await conn.fetch(f"""
+                WITH w AS ({rollup.rows("start_date >= $1::date", "start_time >= $1")})
                 SELECT 
-                    DATE(start_time) as game_date,
-                    COUNT(*) as total_games,
-                    COUNT(CASE WHEN status = 'final' THEN 1 END) as final_games,
-                    COUNT(CASE WHEN status = 'scheduled' THEN 1 END) as scheduled_games
-                FROM games 
-                WHERE start_time >= NOW() - INTERVAL '$1 days'
-                GROUP BY DATE(start_time)
+                    start_date as game_date,
+                    SUM(n) as total_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'final'), 0) as final_games,
+                    COALESCE(SUM(n) FILTER (WHERE status = 'scheduled'), 0) as scheduled_games
+                FROM w
+                GROUP BY start_date
                 ORDER BY game_date DESC
-            """, days)
+            """, since, through)
             
             await conn.close()
             
@@ -385,7 +386,7 @@ class GamesService:
     async def get_game_schedule(self, start_date: str, end_date: str, sport_id: int = None) -> List[Dict[str, Any]]:
         """Get game schedule for a date range"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT 
@@ -438,7 +439,7 @@ class GamesService:
     async def update_game_statuses(self, game_updates: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Update multiple game statuses"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             updated_count = 0
             failed_count = 0
@@ -513,7 +514,7 @@ class GamesService:
     async def search_games(self, query: str, sport_id: int = None, limit: int = 50) -> List[Dict[str, Any]]:
         """Search games by external ID or team names"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
@@ -267,3 +267,15 @@ async def run_full_grading_pipeline():
         await grade_props_live(session)
         await compute_ev_signals(session)
         await grade_model_picks_from_scores(session)
+        # DvP allow-rates come from settled props; publish them once per grading run
+        from services.dvp_service import dvp_service
+        try:
+            await dvp_service.rebuild_matrix(session)
+        except Exception as e:
+            logger.error(f"❌ [Grader] DvP matrix rebuild failed: {e}")
+        # Player features (rolling windows, splits, rest) pick up the stat rows graded above
+        from services.feature_store import feature_store
+        try:
+            await feature_store.refresh(session)
+        except Exception as e:
+            logger.error(f"❌ [Grader] Feature store refresh failed: {e}")
@@ -5,11 +5,15 @@ from models.brain import PlayerStats
 from models import Schedule
 from datetime import datetime, timedelta
 from typing import Optional
+from services.feature_store import FEATURE_H2H_SEASONS, feature_store
 
 class H2HService:
     def get_h2h_splits(self, player_id: str, opponent_team: str, stat_category: str,
                        db: Session, seasons: int = 3) -> dict:
         try:
+            features = feature_store.get_sync(db, player_id, stat_category)
+            if features is not None and seasons == FEATURE_H2H_SEASONS:
+                return features.h2h(opponent_team)
             cutoff = datetime.utcnow() - timedelta(days=365 * seasons)
             games = db.query(PlayerStats).filter(
                 PlayerStats.player_id == player_id,
@@ -37,6 +41,11 @@ class H2HService:
     def check_back_to_back(self, player_id: str, game_date: str, db: Session) -> dict:
         try:
             game_dt = datetime.strptime(game_date, '%Y-%m-%d')
+            features = feature_store.get_player_sync(db, player_id)
+            if features is not None and features.covers((game_dt - timedelta(days=2)).date()):
+                played_yesterday = features.played_on((game_dt - timedelta(days=1)).date())
+                played_two_ago = features.played_on((game_dt - timedelta(days=2)).date())
+                return self._fatigue(played_yesterday, played_yesterday and played_two_ago)
             yesterday = (game_dt - timedelta(days=1)).strftime('%Y-%m-%d')
             two_ago = (game_dt - timedelta(days=2)).strftime('%Y-%m-%d')
             played_yesterday = db.query(PlayerStats).filter(
@@ -52,8 +61,9 @@ class H2HService:
         except Exception:
             is_b2b = False
             is_3_in_4 = False
-            played_two_ago = False
-            
+        return self._fatigue(is_b2b, is_3_in_4)
+
+    def _fatigue(self, is_b2b: bool, is_3_in_4) -> dict:
         rest_days = 0 if is_b2b else (1 if not is_3_in_4 else 0) # Fallback heuristic
         return {
             'is_back_to_back': is_b2b,
@@ -66,6 +76,9 @@ class H2HService:
 
     def get_home_away_splits(self, player_id: str, stat_category: str, db: Session) -> dict:
         try:
+            features = feature_store.get_sync(db, player_id, stat_category)
+            if features is not None:
+                return features.home_away()
             games = db.query(PlayerStats).filter(
                 PlayerStats.player_id == player_id,
                 PlayerStats.stat_category == stat_category
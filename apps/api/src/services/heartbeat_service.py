@@ -1,15 +1,237 @@
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+"""
+Feed heartbeats (the ``heartbeats`` table) behind /api/meta, /api/health and the admin views.
+
+``log_heartbeat`` is called from every ingest stage, EV cycle, coordinator skip and
+error path. It used to SELECT the feed row, update or insert it and ``commit()`` on the
+caller's session each time. It now only records the update in ``heartbeat_buffer``:
+
+  * pending      — per-feed deltas since the last flush (rows / errors summed, latest
+                   status and run time, meta merged), written every HEARTBEAT_FLUSH_SECONDS
+                   and on shutdown as one multi-row upsert in a single transaction
+  * rows         — the table as last read, reloaded at most every HEARTBEAT_CACHE_SECONDS
+                   (other processes write heartbeats too) and advanced by each flush
+
+``get_heartbeat`` / ``get_all_heartbeats`` return rows with the pending deltas applied,
+so a read straight after ``log_heartbeat`` already sees it. Counters are incremented in
+SQL, so API and worker processes flushing the same feed do not overwrite each other.
+
+The API lifespan and the Celery worker runtime flush on shutdown. Standalone entrypoints
+that reach heartbeat-writing code under ``asyncio.run`` (run_ingest.py, scripts/*) must
+``await heartbeat_buffer.stop()`` before returning, or the pending heartbeats are lost.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, null, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.session import async_session_maker, engine
 from models.heartbeat import Heartbeat
-import logging
+from services.metrics_collector import metrics_collector
 
 logger = logging.getLogger(__name__)
 
+HEARTBEAT_FLUSH_SECONDS = float(os.getenv("HEARTBEAT_FLUSH_SECONDS", "5"))
+HEARTBEAT_CACHE_SECONDS = float(os.getenv("HEARTBEAT_CACHE_SECONDS", "30"))
+
 # Pipeline completed successfully (possibly zero rows). Keeps freshness in sync with idle EV/ingest paths.
 _SUCCESS_LAST_SUCCESS_STATUSES = frozenset({"ok", "idle_no_data", "idle_no_edges"})
 
 
+@dataclass
+class HeartbeatState:
+    """One feed's heartbeat; same attributes as the ``Heartbeat`` row callers used to get."""
+    feed_name: str
+    status: str = "unknown"
+    last_run_at: Optional[datetime] = None
+    last_success_at: Optional[datetime] = None
+    rows_written_today: int = 0
+    error_count_today: int = 0
+    meta: Optional[Dict[str, Any]] = None
+
+
+def merge(base: HeartbeatState, delta: HeartbeatState) -> HeartbeatState:
+    """Apply ``delta`` (a pending update) on top of ``base``."""
+    meta = base.meta
+    if delta.meta:
+        meta = {**(base.meta or {}), **delta.meta}
+    return replace(
+        base,
+        status=delta.status,
+        last_run_at=delta.last_run_at or base.last_run_at,
+        last_success_at=delta.last_success_at or base.last_success_at,
+        rows_written_today=(base.rows_written_today or 0) + delta.rows_written_today,
+        error_count_today=(base.error_count_today or 0) + delta.error_count_today,
+        meta=meta,
+    )
+
+
+class HeartbeatBuffer:
+    def __init__(self):
+        self._pending: Dict[str, HeartbeatState] = {}
+        self._rows: Dict[str, HeartbeatState] = {}
+        self._loaded_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+    def record(
+        self,
+        feed_name: str,
+        status: str = "ok",
+        rows_written: int = 0,
+        error_count: int = 0,
+        meta: dict = None,
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        delta = HeartbeatState(
+            feed_name=feed_name,
+            status=status,
+            last_run_at=now,
+            last_success_at=now if status in _SUCCESS_LAST_SUCCESS_STATUSES else None,
+            rows_written_today=rows_written,
+            error_count_today=error_count,
+            meta=dict(meta) if meta else None,
+        )
+        previous = self._pending.get(feed_name)
+        self._pending[feed_name] = merge(previous, delta) if previous else delta
+        self.start()
+
+    # --- reads ---------------------------------------------------------------------
+
+    async def _load(self, db: AsyncSession) -> None:
+        if self._loaded_at and time.monotonic() - self._loaded_at < HEARTBEAT_CACHE_SECONDS:
+            return
+        res = await db.execute(select(Heartbeat))
+        self._rows = {
+            h.feed_name: HeartbeatState(
+                feed_name=h.feed_name,
+                status=h.status,
+                last_run_at=h.last_run_at,
+                last_success_at=h.last_success_at,
+                rows_written_today=h.rows_written_today or 0,
+                error_count_today=h.error_count_today or 0,
+                meta=h.meta,
+            )
+            for h in res.scalars().all()
+        }
+        self._loaded_at = time.monotonic()
+
+    def _view(self, feed_name: str) -> Optional[HeartbeatState]:
+        row, delta = self._rows.get(feed_name), self._pending.get(feed_name)
+        if delta is None:
+            return row
+        return merge(row or HeartbeatState(feed_name=feed_name), delta)
+
+    async def get(self, db: AsyncSession, feed_name: str) -> Optional[HeartbeatState]:
+        await self._load(db)
+        return self._view(feed_name)
+
+    async def all(self, db: AsyncSession) -> List[HeartbeatState]:
+        await self._load(db)
+        return [self._view(name) for name in sorted(set(self._rows) | set(self._pending))]
+
+    def invalidate(self) -> None:
+        """Reload the table on the next read (after writing heartbeats outside the buffer)."""
+        self._loaded_at = 0.0
+
+    # --- writes --------------------------------------------------------------------
+
+    def _upsert(self, batch: List[HeartbeatState]):
+        insert = sqlite_insert if "sqlite" in str(engine.url) else pg_insert
+        stmt = insert(Heartbeat).values([
+            {
+                "feed_name": d.feed_name,
+                "status": d.status,
+                "last_run_at": d.last_run_at,
+                "last_success_at": d.last_success_at,
+                "rows_written_today": d.rows_written_today,
+                "error_count_today": d.error_count_today,
+                # SQL NULL (not JSON null) so COALESCE keeps the stored meta
+                "meta": d.meta if d.meta else null(),
+            }
+            for d in batch
+        ])
+        return stmt.on_conflict_do_update(
+            index_elements=["feed_name"],
+            set_={
+                "status": stmt.excluded.status,
+                "last_run_at": stmt.excluded.last_run_at,
+                "last_success_at": func.coalesce(stmt.excluded.last_success_at, Heartbeat.last_success_at),
+                "rows_written_today": Heartbeat.rows_written_today + stmt.excluded.rows_written_today,
+                "error_count_today": Heartbeat.error_count_today + stmt.excluded.error_count_today,
+                "meta": func.coalesce(stmt.excluded.meta, Heartbeat.meta),
+            },
+        )
+
+    async def flush(self) -> int:
+        """Write all pending heartbeats in one transaction; returns how many feeds were written."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            try:
+                async with async_session_maker() as db:
+                    with_meta = [name for name, d in pending.items() if d.meta]
+                    if with_meta:
+                        # meta is merged key-wise, as the per-call update did
+                        res = await db.execute(
+                            select(Heartbeat.feed_name, Heartbeat.meta).where(Heartbeat.feed_name.in_(with_meta))
+                        )
+                        stored = {name: meta for name, meta in res.all()}
+                        for name in with_meta:
+                            pending[name].meta = {**(stored.get(name) or {}), **pending[name].meta}
+                    await db.execute(self._upsert(sorted(pending.values(), key=lambda d: d.feed_name)))
+                    await db.commit()
+            except Exception as e:
+                # keep the batch (older than anything recorded since) for the next flush
+                logger.warning("heartbeats: flush of %s feeds failed: %s", len(pending), e)
+                for name, newer in self._pending.items():
+                    pending[name] = merge(pending[name], newer) if name in pending else newer
+                self._pending = pending
+                return 0
+            for name, delta in pending.items():
+                self._rows[name] = merge(self._rows.get(name) or HeartbeatState(feed_name=name), delta)
+            return len(pending)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_FLUSH_SECONDS)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the flush loop on the running event loop (idempotent; also done on first record)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._flush_lock = None
+            self._task = loop.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+heartbeat_buffer = HeartbeatBuffer()
+
+
 class HeartbeatService:
     @staticmethod
     async def log_heartbeat(
@@ -20,48 +242,17 @@ class HeartbeatService:
         error_count: int = 0,
         meta: dict = None
     ):
-        """Update or create a heartbeat record for a given feed."""
+        """Record a heartbeat for a given feed; written by the next buffer flush, not on ``db``."""
         try:
-            stmt = select(Heartbeat).where(Heartbeat.feed_name == feed_name)
-            res = await db.execute(stmt)
-            record = res.scalar_one_or_none()
-            
-            now = datetime.now(timezone.utc)
-            
-            if record:
-                record.last_run_at = now
-                if status in _SUCCESS_LAST_SUCCESS_STATUSES:
-                    record.last_success_at = now
-                record.rows_written_today += rows_written
-                record.error_count_today += error_count
-                record.status = status
-                if meta:
-                    record.meta = {**(record.meta or {}), **meta}
-            else:
-                new_record = Heartbeat(
-                    feed_name=feed_name,
-                    last_run_at=now,
-                    last_success_at=now if status in _SUCCESS_LAST_SUCCESS_STATUSES else None,
-                    rows_written_today=rows_written,
-                    error_count_today=error_count,
-                    status=status,
-                    meta=meta
-                )
-                db.add(new_record)
-            
-            await db.commit()
+            heartbeat_buffer.record(feed_name, status, rows_written, error_count, meta)
+            metrics_collector.record_heartbeat(feed_name, status, rows_written)
         except Exception as e:
             logger.error(f"Failed to log heartbeat for {feed_name}: {e}")
-            await db.rollback()
 
     @staticmethod
     async def get_all_heartbeats(db: AsyncSession):
-        stmt = select(Heartbeat)
-        res = await db.execute(stmt)
-        return res.scalars().all()
-    
+        return await heartbeat_buffer.all(db)
+
     @staticmethod
     async def get_heartbeat(db: AsyncSession, feed_name: str):
-        stmt = select(Heartbeat).where(Heartbeat.feed_name == feed_name)
-        res = await db.execute(stmt)
-        return res.scalar_one_or_none()
+        return await heartbeat_buffer.get(db, feed_name)
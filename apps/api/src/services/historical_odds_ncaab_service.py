@@ -2,7 +2,6 @@
 Historical Odds NCAAB Service - Track and analyze NCAA basketball betting odds
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,8 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
+from services.stats_rollups import ROLLUPS, window_bounds
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -43,16 +43,13 @@ class HistoricalOdds:
     created_at: datetime
     updated_at: datetime
 
-class HistoricalOddsNCAABService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class HistoricalOddsNCAABService(AsyncpgRepository):
     async def create_odds_snapshot(self, sport: int, game_id: int, home_team: str, away_team: str,
                                  home_odds: float, away_odds: float, draw_odds: Optional[float],
                                  bookmaker: str, season: int = None) -> bool:
         """Create a new odds snapshot"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -75,7 +72,7 @@ class HistoricalOddsNCAABService:
     async def update_odds_result(self, game_id: int, result: GameResult) -> bool:
         """Update odds result for a game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -96,7 +93,7 @@ class HistoricalOddsNCAABService:
     async def get_odds_by_game(self, game_id: int) -> List[HistoricalOdds]:
         """Get odds snapshots for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM historical_odds_ncaab 
@@ -133,7 +130,7 @@ class HistoricalOddsNCAABService:
     async def get_odds_by_bookmaker(self, bookmaker: str, days: int = 30) -> List[HistoricalOdds]:
         """Get odds snapshots from a specific bookmaker"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM historical_odds_ncaab 
@@ -171,7 +168,7 @@ class HistoricalOddsNCAABService:
     async def get_odds_by_team(self, team_name: str, days: int = 30) -> List[HistoricalOdds]:
         """Get odds snapshots for a specific team"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM historical_odds_ncaab 
@@ -209,7 +206,7 @@ class HistoricalOddsNCAABService:
     async def get_odds_movements(self, game_id: int) -> List[Dict[str, Any]]:
         """Get odds movements for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT 
@@ -257,7 +254,7 @@ class HistoricalOddsNCAABService:
     async def get_bookmaker_comparison(self, game_id: int) -> List[Dict[str, Any]]:
         """Compare odds across bookmakers for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT 
@@ -298,58 +295,61 @@ class HistoricalOddsNCAABService:
     async def get_odds_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get odds statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
+            
+            since, through = await window_bounds(conn, "historical_odds_ncaab", timedelta(days=days))
+            w = ROLLUPS["historical_odds_ncaab"].window()
             
             # Overall statistics
-            overall = await conn.fetchrow("""
+            overall = await conn.fetchrow(f"""
+                WITH w AS ({w})
                 SELECT 
-                    COUNT(*) as total_odds,
+                    COALESCE(SUM(n), 0) as total_odds,
                     COUNT(DISTINCT game_id) as unique_games,
                     COUNT(DISTINCT bookmaker) as unique_bookmakers,
                     COUNT(DISTINCT home_team) as unique_teams,
-                    COUNT(CASE WHEN result = 'home_win' THEN 1 END) as home_wins,
-                    COUNT(CASE WHEN result = 'away_win' THEN 1 END) as away_wins,
-                    COUNT(CASE WHEN result IS NULL THEN 1 END) as pending_games,
-                    AVG(home_odds) as avg_home_odds,
-                    AVG(away_odds) as avg_away_odds,
-                    AVG(draw_odds) as avg_draw_odds
-                FROM historical_odds_ncaab 
-                WHERE snapshot_date >= NOW() - INTERVAL '$1 days'
-            """, days)
+                    COALESCE(SUM(n) FILTER (WHERE result = 'home_win'), 0) as home_wins,
+                    COALESCE(SUM(n) FILTER (WHERE result = 'away_win'), 0) as away_wins,
+                    COALESCE(SUM(n) FILTER (WHERE result IS NULL), 0) as pending_games,
+                    SUM(home_odds_sum) / NULLIF(SUM(home_odds_n), 0) as avg_home_odds,
+                    SUM(away_odds_sum) / NULLIF(SUM(away_odds_n), 0) as avg_away_odds,
+                    SUM(draw_odds_sum) / NULLIF(SUM(draw_odds_n), 0) as avg_draw_odds
+                FROM w
+            """, since, through)
             
             # By bookmaker statistics
-            by_bookmaker = await conn.fetch("""
+            by_bookmaker = await conn.fetch(f"""
+                WITH w AS ({w})
                 SELECT 
                     bookmaker,
-                    COUNT(*) as total_odds,
+                    SUM(n) as total_odds,
                     COUNT(DISTINCT game_id) as unique_games,
-                    COUNT(CASE WHEN result = 'home_win' THEN 1 END) as home_wins,
-                    COUNT(CASE WHEN result = 'away_win' THEN 1 END) as away_wins,
-                    COUNT(CASE WHEN result IS NULL THEN 1 END) as pending_games,
-                    AVG(home_odds) as avg_home_odds,
-                    AVG(away_odds) as avg_away_odds,
-                    AVG(draw_odds) as avg_draw_odds
-                FROM historical_odds_ncaab 
-                WHERE snapshot_date >= NOW() - INTERVAL '$1 days'
+                    COALESCE(SUM(n) FILTER (WHERE result = 'home_win'), 0) as home_wins,
+                    COALESCE(SUM(n) FILTER (WHERE result = 'away_win'), 0) as away_wins,
+                    COALESCE(SUM(n) FILTER (WHERE result IS NULL), 0) as pending_games,
+                    SUM(home_odds_sum) / NULLIF(SUM(home_odds_n), 0) as avg_home_odds,
+                    SUM(away_odds_sum) / NULLIF(SUM(away_odds_n), 0) as avg_away_odds,
+                    SUM(draw_odds_sum) / NULLIF(SUM(draw_odds_n), 0) as avg_draw_odds
+                FROM w
                 GROUP BY bookmaker
                 ORDER BY total_odds DESC
-            """, days)
+            """, since, through)
             
             # By team statistics
-            by_team = await conn.fetch("""
+            by_team = await conn.fetch(f"""
+                WITH w AS ({w})
                 SELECT 
                     home_team,
-                    COUNT(*) as total_games,
-                    COUNT(CASE WHEN result = 'home_win' THEN 1 END) as home_wins,
-                    COUNT(CASE WHEN result = 'away_win' THEN 1 END) as home_losses,
-                    AVG(home_odds) as avg_home_odds,
-                    AVG(away_odds) as avg_away_odds
-                FROM historical_odds_ncaab 
-                WHERE snapshot_date >= NOW() - INTERVAL '$1 days'
+                    SUM(n) as total_games,
+                    COALESCE(SUM(n) FILTER (WHERE result = 'home_win'), 0) as home_wins,
+                    COALESCE(SUM(n) FILTER (WHERE result = 'away_win'), 0) as home_losses,
+                    SUM(home_odds_sum) / NULLIF(SUM(home_odds_n), 0) as avg_home_odds,
+                    SUM(away_odds_sum) / NULLIF(SUM(away_odds_n), 0) as avg_away_odds
+                FROM w
                 GROUP BY home_team
                 ORDER BY total_games DESC
                 LIMIT 20
-            """, days)
+            """, since, through)
             
             await conn.close()
             
@@ -403,7 +403,7 @@ class HistoricalOddsNCAABService:
     async def analyze_odds_efficiency(self, days: int = 30) -> Dict[str, Any]:
         """Analyze odds efficiency and accuracy"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Calculate implied probabilities vs actual results
             efficiency = await conn.fetch("""
@@ -484,7 +484,7 @@ class HistoricalOddsNCAABService:
     async def search_odds(self, query: str, days: int = 30, limit: int = 50) -> List[Dict[str, Any]]:
         """Search odds by team names or bookmaker"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
@@ -2,7 +2,6 @@
 Historical Performance Service - Track and analyze player and system performance
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,7 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -50,15 +49,12 @@ class HistoricalPerformance:
     created_at: datetime
     updated_at: datetime
 
-class HistoricalPerformanceService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class HistoricalPerformanceService(AsyncpgRepository):
     async def create_performance_record(self, player_name: str, stat_type: str, total_picks: int,
                                      hits: int, misses: int, avg_ev: float) -> bool:
         """Create a new performance record"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             hit_rate = (hits / total_picks * 100) if total_picks > 0 else 0
             now = datetime.now(timezone.utc)
@@ -82,7 +78,7 @@ class HistoricalPerformanceService:
                                       hits: int, misses: int, avg_ev: float) -> bool:
         """Update an existing performance record"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             hit_rate = (hits / total_picks * 100) if total_picks > 0 else 0
             now = datetime.now(timezone.utc)
@@ -105,7 +101,7 @@ class HistoricalPerformanceService:
     async def get_performance_by_player(self, player_name: str, stat_type: str = None) -> List[HistoricalPerformance]:
         """Get performance records for a specific player"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             if stat_type:
                 results = await conn.fetch("""
@@ -145,7 +141,7 @@ class HistoricalPerformanceService:
     async def get_performance_by_stat_type(self, stat_type: str) -> List[HistoricalPerformance]:
         """Get performance records for a specific stat type"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM historical_performances 
@@ -178,7 +174,7 @@ class HistoricalPerformanceService:
     async def get_top_performers(self, limit: int = 10, stat_type: str = None) -> List[Dict[str, Any]]:
         """Get top performers by hit rate"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             if stat_type:
                 results = await conn.fetch("""
@@ -218,7 +214,7 @@ class HistoricalPerformanceService:
     async def get_best_ev_performers(self, limit: int = 10, stat_type: str = None) -> List[Dict[str, Any]]:
         """Get best performers by expected value"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             if stat_type:
                 results = await conn.fetch("""
@@ -258,7 +254,7 @@ class HistoricalPerformanceService:
     async def get_worst_performers(self, limit: int = 10, stat_type: str = None) -> List[Dict[str, Any]]:
         """Get worst performers by hit rate"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             if stat_type:
                 results = await conn.fetch("""
@@ -298,7 +294,7 @@ class HistoricalPerformanceService:
     async def get_performance_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get overall performance statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Overall statistics
             overall = await conn.fetchrow("""
@@ -394,7 +390,7 @@ class HistoricalPerformanceService:
     async def analyze_performance_trends(self, player_name: str, stat_type: str) -> Dict[str, Any]:
         """Analyze performance trends for a specific player and stat type"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT hit_rate_percentage, avg_ev, total_picks, hits, misses, updated_at
@@ -472,7 +468,7 @@ class HistoricalPerformanceService:
     async def search_performances(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search performances by player name or stat type"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
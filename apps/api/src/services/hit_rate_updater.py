@@ -2,6 +2,7 @@
 import logging
 from sqlalchemy import text
 from db.session import async_session_maker
+from services.simulation_cache import PRIORS, simulation_cache
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +63,8 @@ async def recompute_all_hit_rates():
                 logger.error(f"Hit Rate Updater: Error updating hit rate for {agg.player_name}: {e}")
                 
         await session.commit()
+        if count:
+            await simulation_cache.bump(PRIORS)
         logger.info(f"Hit Rate Updater: Successfully updated {count} player empirical hit rates.")
 
 async def run_hit_rate_update():
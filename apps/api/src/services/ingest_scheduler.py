@@ -0,0 +1,301 @@
+"""
+The one scheduler that decides when each sport is ingested.
+
+Ingest used to be triggered from per-sport APScheduler interval jobs on every API
+replica, from the Celery beat ingest coordinator, and (unused, but importable) from
+jobs/ingest_scheduler.py. ``ingestion_job_guard`` and Redis locks kept overlapping runs
+from doubling up, but each replica still woke up, checked and often hit the provider.
+
+Now every ingest job is a row in ``ingest_schedule`` (one per sport, synced from
+``build_unified_ingest_schedule``), and ``tick()`` is the only thing that starts one:
+
+  * leadership — a tick does nothing unless this node holds the Redis lease
+    ``ingest_scheduler:leader`` (taken or renewed by the tick itself). Without Redis
+    every process is its own leader, as before.
+  * next run — a due job's ``next_run_at`` moves to now + ``scale_interval_seconds``
+    (its base interval stretched as the monthly Odds API quota burns). The move is a
+    conditional UPDATE, so a job is claimed once even across a leader hand-over.
+  * dispatch — claimed jobs go to a worker queue: in-process workers by default, or
+    the Celery ``ingest_job_task`` with INGEST_DISPATCH=celery.
+
+The API runs ``tick`` from APScheduler; the Celery beat coordinator runs the same tick,
+so whichever side holds the lease schedules and the other stands by.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import bindparam, text
+
+from core.ingest_coordinator_env import INGEST_COORDINATOR_MAX_PER_TICK
+from db.session import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+INGEST_SCHEDULER_TICK_SECONDS = max(5, int(os.getenv("INGEST_SCHEDULER_TICK_SECONDS", "30")))
+INGEST_SCHEDULER_LEASE_SECONDS = max(
+    INGEST_SCHEDULER_TICK_SECONDS * 2, int(os.getenv("INGEST_SCHEDULER_LEASE_SECONDS", "90"))
+)
+INGEST_SCHEDULER_WORKERS = max(1, int(os.getenv("INGEST_SCHEDULER_WORKERS", "2")))
+INGEST_DISPATCH = os.getenv("INGEST_DISPATCH", "local").strip().lower()
+
+LEADER_KEY = "ingest_scheduler:leader"
+# How often the leader re-reads the ingest config into the job table.
+SYNC_EVERY_SECONDS = 300
+# last_status of jobs disabled because their sport left the config (re-enabled if it returns).
+UNCONFIGURED = "unconfigured"
+
+SCHEDULE_DDL = """
+CREATE TABLE IF NOT EXISTS ingest_schedule (
+    job_key TEXT PRIMARY KEY,
+    sport_key TEXT NOT NULL,
+    base_interval_seconds INTEGER NOT NULL,
+    enabled BOOLEAN NOT NULL DEFAULT TRUE,
+    next_run_at TIMESTAMPTZ NOT NULL,
+    last_dispatched_at TIMESTAMPTZ,
+    last_finished_at TIMESTAMPTZ,
+    last_status TEXT,
+    dispatch_count INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def job_key(sport_key: str) -> str:
+    return f"ingest_{sport_key}"
+
+
+def desired_jobs() -> Dict[str, int]:
+    """sport_key -> base interval seconds, from the tiered ingest config."""
+    from core.ingest_scheduler_config import build_unified_ingest_schedule
+
+    specs, _meta = build_unified_ingest_schedule()
+    return {
+        spec.sport_key: (spec.minutes * 60 if spec.minutes is not None else spec.hours * 3600)
+        for spec in specs
+    }
+
+
+def next_interval_seconds(base_seconds: int, quota_pct: float) -> int:
+    from brain.quota_guard import scale_interval_seconds
+
+    return scale_interval_seconds(base_seconds, quota_pct)
+
+
+async def run_job(sport_key: str) -> str:
+    """Run one ingest (the old interval-job body) and record how it ended."""
+    from core.scheduler import guarded_unified_ingest
+
+    status = "ok"
+    try:
+        await guarded_unified_ingest(sport_key)
+    except Exception as e:
+        status = "error"
+        logger.error("ingest_scheduler: %s failed: %s", sport_key, e)
+    await ingest_scheduler.record_finished(sport_key, status)
+    return status
+
+
+class IngestScheduler:
+    def __init__(self, session_factory=None, node_id: Optional[str] = None) -> None:
+        self._session_factory = session_factory or async_session_maker
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.is_leader = False
+        self._synced_at: Optional[float] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pending: Set[str] = set()
+        self.ticks = 0
+        self.dispatched = 0
+
+    def _session(self):
+        return self._session_factory()
+
+    # -- job table -----------------------------------------------------------
+
+    async def sync_jobs(self, db, jobs: Optional[Dict[str, int]] = None) -> None:
+        """
+        Upsert one row per configured sport; sports dropped from the config are disabled and
+        marked ``unconfigured``. An existing row keeps its ``enabled`` flag (a job switched off
+        by hand stays off) unless it was only disabled for being out of the config.
+        """
+        jobs = desired_jobs() if jobs is None else jobs
+        now = _now()
+        for sport, base in jobs.items():
+            await db.execute(
+                text(
+                    "INSERT INTO ingest_schedule (job_key, sport_key, base_interval_seconds, enabled, next_run_at) "
+                    "VALUES (:job_key, :sport, :base, TRUE, :now) "
+                    "ON CONFLICT (job_key) DO UPDATE SET base_interval_seconds = excluded.base_interval_seconds, "
+                    "enabled = ingest_schedule.enabled OR COALESCE(ingest_schedule.last_status, '') = :unconfigured, "
+                    "last_status = CASE WHEN ingest_schedule.last_status = :unconfigured THEN NULL "
+                    "ELSE ingest_schedule.last_status END"
+                ),
+                {"job_key": job_key(sport), "sport": sport, "base": int(base), "now": now,
+                 "unconfigured": UNCONFIGURED},
+            )
+        res = await db.execute(text("SELECT sport_key FROM ingest_schedule WHERE enabled"))
+        for (sport,) in res.all():
+            if sport not in jobs:
+                await db.execute(
+                    text(
+                        "UPDATE ingest_schedule SET enabled = FALSE, last_status = :unconfigured "
+                        "WHERE job_key = :job_key"
+                    ),
+                    {"job_key": job_key(sport), "unconfigured": UNCONFIGURED},
+                )
+        await db.commit()
+
+    async def claim_due(self, db, quota_pct: float, limit: int = INGEST_COORDINATOR_MAX_PER_TICK) -> List[str]:
+        """Move due jobs' next_run_at forward and return the sports whose claim won."""
+        now = _now()
+        params: Dict[str, Any] = {"now": now, "limit": limit}
+        # Jobs still queued or running here are skipped in SQL so they do not use up the LIMIT.
+        pending = ""
+        if self._pending:
+            pending = "AND sport_key NOT IN :pending "
+            params["pending"] = sorted(self._pending)
+        stmt = text(
+            "SELECT sport_key, base_interval_seconds, next_run_at FROM ingest_schedule "
+            f"WHERE enabled AND next_run_at <= :now {pending}ORDER BY next_run_at LIMIT :limit"
+        )
+        if self._pending:
+            stmt = stmt.bindparams(bindparam("pending", expanding=True))
+        res = await db.execute(stmt, params)
+        claimed: List[str] = []
+        for sport, base, due_at in res.all():
+            next_run = now + timedelta(seconds=next_interval_seconds(int(base), quota_pct))
+            upd = await db.execute(
+                text(
+                    "UPDATE ingest_schedule SET next_run_at = :next_run, last_dispatched_at = :now, "
+                    "dispatch_count = dispatch_count + 1 "
+                    "WHERE job_key = :job_key AND next_run_at = :due_at"
+                ),
+                {"next_run": next_run, "now": now, "job_key": job_key(sport), "due_at": due_at},
+            )
+            if upd.rowcount == 1:
+                claimed.append(sport)
+        await db.commit()
+        return claimed
+
+    async def record_finished(self, sport_key: str, status: str) -> None:
+        try:
+            async with self._session() as db:
+                await db.execute(
+                    text(
+                        "UPDATE ingest_schedule SET last_finished_at = :now, last_status = :status "
+                        "WHERE job_key = :job_key AND COALESCE(last_status, '') <> :unconfigured"
+                    ),
+                    {
+                        "now": _now(), "status": status, "job_key": job_key(sport_key),
+                        "unconfigured": UNCONFIGURED,
+                    },
+                )
+                await db.commit()
+        except Exception as e:
+            logger.debug("ingest_scheduler: recording %s result failed: %s", sport_key, e)
+
+    async def jobs(self) -> List[Dict[str, Any]]:
+        async with self._session() as db:
+            res = await db.execute(text("SELECT * FROM ingest_schedule ORDER BY next_run_at"))
+            return [dict(r) for r in res.mappings().all()]
+
+    # -- scheduling ----------------------------------------------------------
+
+    async def _quota(self, db) -> Optional[float]:
+        """Fraction of the monthly quota used, or None while ingest is quota-blocked."""
+        from services.odds_quota_store import fetch_usage_summary, raise_if_quota_blocked
+
+        blocked, reason = await raise_if_quota_blocked(db)
+        if blocked:
+            logger.warning("ingest_scheduler: quota blocked (%s) — dispatching nothing", reason)
+            return None
+        usage = await fetch_usage_summary(db)
+        return float(usage.get("percent_used") or 0) / 100.0
+
+    async def tick(self) -> List[str]:
+        """One scheduling pass; returns the sports dispatched (empty unless leader)."""
+        from services.cache import cache
+
+        self.ticks += 1
+        self.is_leader = await cache.acquire_lease(LEADER_KEY, self.node_id, INGEST_SCHEDULER_LEASE_SECONDS)
+        if not self.is_leader:
+            return []
+
+        async with self._session() as db:
+            if self._synced_at is None or time.monotonic() - self._synced_at > SYNC_EVERY_SECONDS:
+                await self.sync_jobs(db)
+                self._synced_at = time.monotonic()
+            quota_pct = await self._quota(db)
+            if quota_pct is None:
+                return []
+            claimed = await self.claim_due(db, quota_pct)
+
+        for sport in claimed:
+            await self.dispatch(sport)
+        if claimed:
+            logger.info("ingest_scheduler: dispatched %s (quota_pct=%.3f)", ", ".join(claimed), quota_pct)
+        return claimed
+
+    async def dispatch(self, sport_key: str) -> None:
+        self.dispatched += 1
+        if INGEST_DISPATCH == "celery":
+            from celery_app import celery_app
+
+            celery_app.send_task("workers.ingest_coordinator.ingest_job_task", args=[sport_key])
+            return
+        self._ensure_workers()
+        self._pending.add(sport_key)
+        self._queue.put_nowait(sport_key)
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < INGEST_SCHEDULER_WORKERS:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            sport = await self._queue.get()
+            try:
+                await run_job(sport)
+            finally:
+                self._pending.discard(sport)
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.node_id,
+            "is_leader": self.is_leader,
+            "dispatch": INGEST_DISPATCH,
+            "ticks": self.ticks,
+            "dispatched": self.dispatched,
+            "queued_or_running": sorted(self._pending),
+        }
+
+    async def stop(self) -> None:
+        from services.cache import cache
+
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        if self.is_leader:
+            await cache.release_lease(LEADER_KEY, self.node_id)
+            self.is_leader = False
+
+
+ingest_scheduler = IngestScheduler()
@@ -3,6 +3,7 @@ from typing import Dict, List, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 from models.prop import PropLine
+from services.feature_store import feature_store
 
 logger = logging.getLogger(__name__)
 
@@ -10,8 +11,16 @@ def get_player_insights(player_id: str, stat_type: str, line: float, db: Session
     """
     Computes hit rate trends for a specific player and prop.
     Signals 'heating_up' if L5 rate > L15 rate, 'cooling_down' if vice-versa.
+    Uses the feature store's per-line game values when present, otherwise the
+    settled PropLine history.
     """
     try:
+        features = feature_store.get_sync(db, player_id, stat_type)
+        if features is not None and features.recent_values and line is not None:
+            full = features.hit_rate(line, 15)
+            recent = features.hit_rate(line, 5)
+            return _insight(player_id, stat_type, line, full["hit_rate"], recent["hit_rate"], full["sample"])
+
         # Fetch last 15 settled games for this player/stat
         stmt = (
             select(PropLine)
@@ -37,33 +46,37 @@ def get_player_insights(player_id: str, stat_type: str, line: float, db: Session
         recent = results[:5]
         hits_recent = sum(1 for r in recent if r.hit_rate_l10 > 50)
         recent_rate = hits_recent / len(recent)
-        
-        # Determine trend
-        if recent_rate > hit_rate + 0.15:
-            trend = "heating_up"
-        elif recent_rate < hit_rate - 0.15:
-            trend = "cooling_down"
-        else:
-            trend = "stable"
-            
-        return {
-            "player_id": player_id,
-            "stat_type": stat_type,
-            "line": line,
-            "hit_rate": round(hit_rate, 3),
-            "recent_rate": round(recent_rate, 3),
-            "trend": trend,
-            "sample_size": len(results)
-        }
+        return _insight(player_id, stat_type, line, hit_rate, recent_rate, len(results))
     except Exception as e:
         logger.error(f"Error computing player insights: {e}")
         return {"error": str(e)}
 
+def _insight(player_id: str, stat_type: str, line: float, hit_rate: float, recent_rate: float, sample: int) -> Dict[str, Any]:
+    # Determine trend
+    if recent_rate > hit_rate + 0.15:
+        trend = "heating_up"
+    elif recent_rate < hit_rate - 0.15:
+        trend = "cooling_down"
+    else:
+        trend = "stable"
+
+    return {
+        "player_id": player_id,
+        "stat_type": stat_type,
+        "line": line,
+        "hit_rate": round(hit_rate, 3),
+        "recent_rate": round(recent_rate, 3),
+        "trend": trend,
+        "sample_size": sample
+    }
+
 def get_top_edges(db: Session, min_hit_rate: float = 0.70, limit: int = 5) -> List[Dict[str, Any]]:
     """Used for Discord alerts to find the highest-probability trends."""
     # This queries active props and calculates their historical edge
     stmt = select(PropLine).where(PropLine.is_active == True, PropLine.hit_rate_l10 >= (min_hit_rate * 100)).limit(10)
     props = db.execute(stmt).scalars().all()
+    # One feature read for the whole batch; get_player_insights then hits the store cache.
+    feature_store.get_many_sync(db, [(p.player_id, p.stat_type) for p in props])
     
     edges = []
     for p in props:
@@ -3,14 +3,24 @@ from __future__ import annotations
 from sqlalchemy.ext.asyncio import AsyncSession
 from models import BetSlip, BetLog, BetLeg, BetResult
 from models.user import User
-from sqlalchemy import select, update
+from sqlalchemy import select, update, case, and_, func
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import Iterable, List
 import logging
+import os
+import time
+from services.cache import cache
 
 logger = logging.getLogger(__name__)
 
+LEDGER_STATS_CACHE_TTL_SECONDS = int(os.getenv("LEDGER_STATS_CACHE_TTL_SECONDS", "300"))
+# Stats live in the shared cache under a per-user version; a tracked or settled bet in any
+# process bumps the version, so no worker serves stats computed before the change.
+_STATS_VERSION_KEY = "ledger:stats:version:{}"
+_STATS_KEY = "ledger:stats:{}:{}"
+
 class LedgerService:
+
     async def track_bet(self, db: AsyncSession, user_id: str, slip_data: dict, legs: List[dict]):
         """
         Track a new bet slip with multiple legs.
@@ -38,6 +48,7 @@ class LedgerService:
         
         await db.commit()
         await db.refresh(new_slip)
+        await self.invalidate_user_stats(user_id)
         return new_slip
 
     async def get_user_ledger(self, db: AsyncSession, user_id: str):
@@ -47,15 +58,63 @@ class LedgerService:
         slips = result.scalars().all()
         return slips
 
+    @staticmethod
+    def _slip_profit_expr():
+        """Per-slip profit in units (1u stake), computed in SQL: +odds/100 or +100/|odds| on a win, -1 on a loss."""
+        return case(
+            (and_(BetSlip.status == "won", BetSlip.total_odds > 0), BetSlip.total_odds / 100.0),
+            (and_(BetSlip.status == "won", BetSlip.total_odds < 0), 100.0 / func.abs(BetSlip.total_odds)),
+            (BetSlip.status == "lost", -1.0),
+            else_=0.0,
+        )
+
+    async def _heatmap(self, db: AsyncSession, user_id: str, column) -> List[dict]:
+        """Profit by leg attribute; each slip's profit is split evenly across its (PropLine-matched) legs."""
+        from models.prop import PropLine
+
+        legs = (
+            select(
+                func.coalesce(column, "Unknown").label("label"),
+                self._slip_profit_expr().label("profit"),
+                func.count().over(partition_by=BetLeg.slip_id).label("div"),
+            )
+            .select_from(BetLeg)
+            .join(BetSlip, BetLeg.slip_id == BetSlip.id)
+            .join(PropLine, BetLeg.prop_id == PropLine.id)
+            .where(BetSlip.user_id == user_id)
+            .subquery()
+        )
+        stmt = select(legs.c.label, func.sum(legs.c.profit / legs.c.div)).group_by(legs.c.label)
+        rows = (await db.execute(stmt)).all()
+        heatmap = [
+            {"label": label, "value": round(float(profit or 0), 2), "intensity": min(1, max(0, (float(profit or 0) + 5) / 10))}
+            for label, profit in rows
+        ]
+        return sorted(heatmap, key=lambda x: x["value"], reverse=True)
+
     async def get_user_stats(self, db: AsyncSession, user_id: str):
-        """Calculate ROI, Win Rate, Heatmaps, and Risk/Reward data."""
+        """Calculate ROI, Win Rate, Heatmaps, and Risk/Reward data (cached per user until a bet is tracked or settled)."""
+        version = await cache.get(_STATS_VERSION_KEY.format(user_id)) or "0"
+        key = _STATS_KEY.format(user_id, version)
+        cached = await cache.get_json(key)
+        if cached is not None:
+            return cached
+        stats = await self._compute_user_stats(db, user_id)
+        await cache.set_json(key, stats, ttl=LEDGER_STATS_CACHE_TTL_SECONDS)
+        return stats
+
+    async def _compute_user_stats(self, db: AsyncSession, user_id: str):
         from models.prop import PropLine
-        
-        # 1. Fetch all slips for the user
-        stmt = select(BetSlip).where(BetSlip.user_id == user_id).options(selectinload(BetSlip.legs))
-        result = await db.execute(stmt)
-        slips = result.scalars().all()
-        
+        from services.risk_service import RiskService
+
+        # 1. One row per slip with its profit computed in SQL, oldest first
+        stmt = (
+            select(BetSlip.total_odds, BetSlip.status, BetSlip.placed_at, self._slip_profit_expr().label("profit"))
+            .where(BetSlip.user_id == user_id)
+            .order_by(BetSlip.placed_at.asc(), BetSlip.id.asc())
+        )
+        slips = (await db.execute(stmt)).all()
+
         if not slips:
             return {
                 "total_bets": 0, "win_rate": 0, "profit_loss": 0,
@@ -63,93 +122,40 @@ class LedgerService:
                 "risk_reward": []
             }
 
-        slip_ids = [s.id for s in slips]
-        
-        # 2. Fetch all legs and join with PropLine for sport/stat info
-        legs_stmt = select(BetLeg, PropLine).join(PropLine, BetLeg.prop_id == PropLine.id).where(BetLeg.slip_id.in_(slip_ids))
-        legs_result = await db.execute(legs_stmt)
-        legs_data = legs_result.all()
-
-        # Aggregators
-        stats = {
-            "total_bets": len(slips),
-            "wins": len([s for s in slips if s.status == "won"]),
-            "losses": len([s for s in slips if s.status == "lost"]),
-            "by_sport": {}, 
-            "by_market": {}, 
-            "risk_reward": []
-        }
-
-        # Helper to calculate profit for a slip (1 unit assumption)
-        def get_slip_profit(slip: BetSlip):
-            if slip.status == "won":
-                odds = slip.total_odds
-                if not odds: return 0.0
-                return (odds/100) if odds > 0 else (100/abs(odds))
-            elif slip.status == "lost":
-                return -1.0
-            return 0.0
-
-        for slip in slips:
-            profit = get_slip_profit(slip)
-            
-            # Find legs for this slip to aggregate sport/market
-            slip_legs = [l for l in legs_data if l[0].slip_id == slip.id]
-            div = len(slip_legs) if slip_legs else 1
-            for leg, prop in slip_legs:
-                sport = prop.sport_key or "Unknown"
-                market = prop.stat_type or "Unknown"
-                
-                # aggregate sport
-                if sport not in stats["by_sport"]: stats["by_sport"][sport] = {"profit": 0, "bets": 0}
-                stats["by_sport"][sport]["profit"] += profit / div 
-                stats["by_sport"][sport]["bets"] += 1
-                
-                # aggregate market
-                if market not in stats["by_market"]: stats["by_market"][market] = {"profit": 0, "bets": 0}
-                stats["by_market"][market]["profit"] += profit / div
-                stats["by_market"][market]["bets"] += 1
-
+        total_bets = len(slips)
+        wins = sum(1 for s in slips if s.status == "won")
+        total_profit = 0.0
+        balance_history = [100.0]
+        current_balance = 100.0
+        risk_reward = []
+        for s in slips:
+            profit = float(s.profit or 0)
+            total_profit += profit
+            # 3. Balance History & Drawdown (Starting with 100 units)
+            if s.placed_at:
+                current_balance += profit
+                balance_history.append(current_balance)
             # Scatter plot data: odds vs profit
-            stats["risk_reward"].append({
-                "odds": slip.total_odds,
+            risk_reward.append({
+                "odds": s.total_odds,
                 "profit": profit,
-                "status": slip.status,
-                "date": slip.placed_at.isoformat() if slip.placed_at else None
+                "status": s.status,
+                "date": s.placed_at.isoformat() if s.placed_at else None
             })
 
-        # Format heatmaps for frontend
-        sport_heatmap = [
-            {"label": k, "value": round(v["profit"], 2), "intensity": min(1, max(0, (v["profit"] + 5) / 10))}
-            for k, v in stats["by_sport"].items()
-        ]
-        
-        market_heatmap = [
-            {"label": k, "value": round(v["profit"], 2), "intensity": min(1, max(0, (v["profit"] + 5) / 10))}
-            for k, v in stats["by_market"].items()
-        ]
-
-        from services.risk_service import RiskService
-        
-        total_profit = sum(get_slip_profit(s) for s in slips)
+        # 2. Heatmaps via grouped SQL
+        sport_heatmap = await self._heatmap(db, user_id, PropLine.sport_key)
+        market_heatmap = await self._heatmap(db, user_id, PropLine.stat_type)
 
-        # 3. Calculate Balance History & Drawdown (Starting with 100 units)
-        balance_history = [100.0]
-        current_balance = 100.0
-        sorted_slips = sorted([s for s in slips if s.placed_at], key=lambda x: x.placed_at)
-        for slip in sorted_slips:
-            current_balance += get_slip_profit(slip)
-            balance_history.append(current_balance)
-        
         max_dd = RiskService.calculate_max_drawdown(balance_history)
 
         # 4. Calculate Risk of Ruin
-        win_rate_raw = (stats["wins"] / stats["total_bets"]) if stats["total_bets"] > 0 else 0
+        win_rate_raw = wins / total_bets
         ror = RiskService.calculate_risk_of_ruin(win_rate_raw, 0.03, 100)
 
         return {
-            "total_bets": stats["total_bets"],
-            "win_rate": round((stats["wins"] / stats["total_bets"] * 100), 1) if stats["total_bets"] > 0 else 0,
+            "total_bets": total_bets,
+            "win_rate": round((wins / total_bets * 100), 1),
             "profit_loss": round(total_profit, 2),
             "risk_metrics": {
                 "max_drawdown": f"{max_dd}%",
@@ -161,12 +167,27 @@ class LedgerService:
                 ]
             },
             "heatmaps": {
-                "by_sport": sorted(sport_heatmap, key=lambda x: x["value"], reverse=True),
-                "by_market": sorted(market_heatmap, key=lambda x: x["value"], reverse=True)
+                "by_sport": sport_heatmap,
+                "by_market": market_heatmap
             },
-            "risk_reward": stats["risk_reward"]
+            "risk_reward": risk_reward
         }
 
+    async def invalidate_user_stats(self, user_id: str) -> None:
+        # the version outlives any stats entry written under the previous one
+        await cache.set(_STATS_VERSION_KEY.format(user_id), str(time.time_ns()), ttl=LEDGER_STATS_CACHE_TTL_SECONDS * 2)
+
+    async def refresh_user_stats(self, db: AsyncSession, user_ids: Iterable[str]) -> None:
+        """Recompute cached stats for users whose slips just changed (called after settlement)."""
+        for user_id in set(user_ids):
+            if not user_id:
+                continue
+            await self.invalidate_user_stats(user_id)
+            try:
+                await self.get_user_stats(db, user_id)
+            except Exception as e:
+                logger.warning("Ledger stats refresh failed for %s: %s", user_id, e)
+
     async def settle_pending_bets(self, db: AsyncSession):
         """Find pending bets and settle them against player_stats table."""
         from services.player_stats_service import player_stats_service
@@ -177,6 +198,7 @@ class LedgerService:
         pending_slips = result.scalars().all()
         
         settled_count = 0
+        settled_users = set()
         for slip in pending_slips:
             # Load legs explicitly if not already loaded
             stmt_legs = select(BetLeg).where(BetLeg.slip_id == slip.id)
@@ -209,8 +231,11 @@ class LedgerService:
                 elif any(r == "lost" for r in leg_results):
                     slip.status = "lost"
                 settled_count += 1
+                settled_users.add(slip.user_id)
         
         await db.commit()
+        # Incremental refresh: only users with newly settled slips get their stats recomputed.
+        await self.refresh_user_stats(db, settled_users)
         return settled_count
 
 ledger_service = LedgerService()
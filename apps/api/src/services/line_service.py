@@ -2,7 +2,6 @@
 Line Tracking Service - Track and analyze betting lines and odds
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,8 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
+from services.stats_rollups import ROLLUPS, window_bounds
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -45,15 +45,12 @@ class Line:
     is_current: bool
     fetched_at: datetime
 
-class LineService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class LineService(AsyncpgRepository):
     async def create_line(self, game_id: int, market_id: int, player_id: int, sportsbook: str,
                         line_value: float, odds: int, side: LineSide, is_current: bool = True) -> bool:
         """Create a new line record"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -76,7 +73,7 @@ class LineService:
     async def get_lines_by_game(self, game_id: int, is_current: bool = None) -> List[Line]:
         """Get lines for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM lines 
@@ -118,7 +115,7 @@ class LineService:
     async def get_lines_by_player(self, player_id: int, is_current: bool = None) -> List[Line]:
         """Get lines for a specific player"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM lines 
@@ -160,7 +157,7 @@ class LineService:
     async def get_lines_by_sportsbook(self, sportsbook: str, is_current: bool = None) -> List[Line]:
         """Get lines from a specific sportsbook"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM lines 
@@ -202,7 +199,7 @@ class LineService:
     async def get_current_lines(self, game_id: int = None, player_id: int = None) -> List[Line]:
         """Get current lines"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM lines 
@@ -248,7 +245,7 @@ class LineService:
     async def get_line_movements(self, game_id: int, player_id: int, market_id: int = None) -> List[Dict[str, Any]]:
         """Get line movements for a specific game/player/market"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT 
@@ -301,7 +298,7 @@ class LineService:
     async def get_sportsbook_comparison(self, game_id: int, player_id: int, market_id: int = None) -> List[Dict[str, Any]]:
         """Compare lines across sportsbooks"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT 
@@ -344,58 +341,73 @@ class LineService:
     async def get_line_statistics(self, hours: int = 24) -> Dict[str, Any]:
         """Get line statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
+            
+            since, through = await window_bounds(conn, "lines", timedelta(hours=hours))
+            w = ROLLUPS["lines"].window()
             
             # Overall statistics
-            overall = await conn.fetchrow("""
+            overall = await conn.fetchrow(f"""
+                WITH w AS ({w})
                 SELECT 
-                    COUNT(*) as total_lines,
+                    COALESCE(SUM(n), 0) as total_lines,
                     COUNT(DISTINCT game_id) as unique_games,
-                    COUNT(DISTINCT market_id) as unique_markets,
-                    COUNT(DISTINCT player_id) as unique_players,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.market_ids) x) as unique_markets,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.player_ids) x) as unique_players,
                     COUNT(DISTINCT sportsbook) as unique_sportsbooks,
-                    COUNT(CASE WHEN is_current = TRUE THEN 1 END) as current_lines,
-                    COUNT(CASE WHEN is_current = FALSE THEN 1 END) as historical_lines,
-                    AVG(line_value) as avg_line_value,
-                    AVG(odds) as avg_odds,
-                    COUNT(CASE WHEN side = 'over' THEN 1 END) as over_lines,
-                    COUNT(CASE WHEN side = 'under' THEN 1 END) as under_lines
-                FROM lines 
-                WHERE fetched_at >= NOW() - INTERVAL '$1 hours'
-            """, hours)
+                    COALESCE(SUM(n) FILTER (WHERE is_current = TRUE), 0) as current_lines,
+                    COALESCE(SUM(n) FILTER (WHERE is_current = FALSE), 0) as historical_lines,
+                    SUM(line_value_sum) / NULLIF(SUM(line_value_n), 0) as avg_line_value,
+                    SUM(odds_sum) / NULLIF(SUM(odds_n), 0) as avg_odds,
+                    COALESCE(SUM(n) FILTER (WHERE side = 'over'), 0) as over_lines,
+                    COALESCE(SUM(n) FILTER (WHERE side = 'under'), 0) as under_lines
+                FROM w
+            """, since, through)
             
             # By sportsbook statistics
-            by_sportsbook = await conn.fetch("""
+            by_sportsbook = await conn.fetch(f"""
+                WITH w AS ({w}),
+                players AS (
+                    SELECT w.sportsbook, COUNT(DISTINCT x) as unique_players
+                    FROM w, unnest(w.player_ids) x
+                    GROUP BY w.sportsbook
+                )
                 SELECT 
-                    sportsbook,
-                    COUNT(*) as total_lines,
-                    COUNT(CASE WHEN is_current = TRUE THEN 1 END) as current_lines,
-                    COUNT(DISTINCT game_id) as unique_games,
-                    COUNT(DISTINCT player_id) as unique_players,
-                    AVG(line_value) as avg_line_value,
-                    AVG(odds) as avg_odds,
-                    COUNT(CASE WHEN side = 'over' THEN 1 END) as over_lines,
-                    COUNT(CASE WHEN side = 'under' THEN 1 END) as under_lines
-                FROM lines 
-                WHERE fetched_at >= NOW() - INTERVAL '$1 hours'
-                GROUP BY sportsbook
+                    w.sportsbook,
+                    SUM(w.n) as total_lines,
+                    COALESCE(SUM(w.n) FILTER (WHERE w.is_current = TRUE), 0) as current_lines,
+                    COUNT(DISTINCT w.game_id) as unique_games,
+                    COALESCE(MAX(p.unique_players), 0) as unique_players,
+                    SUM(w.line_value_sum) / NULLIF(SUM(w.line_value_n), 0) as avg_line_value,
+                    SUM(w.odds_sum) / NULLIF(SUM(w.odds_n), 0) as avg_odds,
+                    COALESCE(SUM(w.n) FILTER (WHERE w.side = 'over'), 0) as over_lines,
+                    COALESCE(SUM(w.n) FILTER (WHERE w.side = 'under'), 0) as under_lines
+                FROM w
+                LEFT JOIN players p ON p.sportsbook IS NOT DISTINCT FROM w.sportsbook
+                GROUP BY w.sportsbook
                 ORDER BY total_lines DESC
-            """, hours)
+            """, since, through)
             
             # By side statistics
-            by_side = await conn.fetch("""
+            by_side = await conn.fetch(f"""
+                WITH w AS ({w}),
+                players AS (
+                    SELECT w.side, COUNT(DISTINCT x) as unique_players
+                    FROM w, unnest(w.player_ids) x
+                    GROUP BY w.side
+                )
                 SELECT 
-                    side,
-                    COUNT(*) as total_lines,
-                    AVG(line_value) as avg_line_value,
-                    AVG(odds) as avg_odds,
-                    COUNT(DISTINCT sportsbook) as unique_sportsbooks,
-                    COUNT(DISTINCT player_id) as unique_players
-                FROM lines 
-                WHERE fetched_at >= NOW() - INTERVAL '$1 hours'
-                GROUP BY side
+                    w.side,
+                    SUM(w.n) as total_lines,
+                    SUM(w.line_value_sum) / NULLIF(SUM(w.line_value_n), 0) as avg_line_value,
+                    SUM(w.odds_sum) / NULLIF(SUM(w.odds_n), 0) as avg_odds,
+                    COUNT(DISTINCT w.sportsbook) as unique_sportsbooks,
+                    COALESCE(MAX(p.unique_players), 0) as unique_players
+                FROM w
+                LEFT JOIN players p ON p.side IS NOT DISTINCT FROM w.side
+                GROUP BY w.side
                 ORDER BY total_lines DESC
-            """, hours)
+            """, since, through)
             
             await conn.close()
             
@@ -447,7 +459,7 @@ class LineService:
     async def analyze_line_efficiency(self, hours: int = 24) -> Dict[str, Any]:
         """Analyze line efficiency and market efficiency"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Get line movements and calculate efficiency metrics
             efficiency = await conn.fetch("""
@@ -500,7 +512,7 @@ class LineService:
     async def search_lines(self, query: str, sportsbook: str = None, limit: int = 50) -> List[Dict[str, Any]]:
         """Search lines by player ID or sportsbook"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
@@ -1,6 +1,7 @@
 import asyncio
 import logging
-from typing import List, Set
+import os
+from typing import Any, Dict, List, Optional, Set
 from datetime import datetime, timezone
 
 from services.odds_api_client import odds_api_client
@@ -8,6 +9,13 @@ from core.config import settings
 from real_data_connector import real_data_connector
 from db.session import AsyncSessionLocal
 from services.live_scores_cache import upsert_live_scores_from_games
+from services.live_poll_planner import (
+    RefreshTarget,
+    demand_tracker,
+    interval_budget,
+    live_poll_planner,
+    volatility_tracker,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +24,9 @@ class LiveDataService:
     High-frequency background polling service to keep the Redis cache warm
     for 'hot' sports and markets. This ensures the frontend gets 15-30s fresh 
     data via standard REST endpoints without calling external providers on demand.
+
+    Each interval spends a quota-derived budget on the targets ranked highest by
+    services.live_poll_planner (game state, user demand, line volatility).
     """
     
     def __init__(self):
@@ -27,63 +38,87 @@ class LiveDataService:
         ]
         self._stop_event = asyncio.Event()
         self.polling_interval = int(settings.LIVE_DATA_POLLING_INTERVAL) if hasattr(settings, "LIVE_DATA_POLLING_INTERVAL") else 120
+        self.concurrency = max(1, int(os.getenv("LIVE_POLL_CONCURRENCY", "4")))
+        self._featured_markets: Optional[str] = None
+        self._props_markets: Dict[str, str] = {}
         
-    async def poll_odds(self):
-        """Polls live odds for all hot sports to warm the cache."""
-        if odds_api_client.all_keys_dead():
-            logger.debug("Skipping poll_odds — all keys cooling down")
-            return
-        from services.external_api_gateway import external_api_gateway
-        quota = await external_api_gateway.quota_status("theoddsapi")
-        mode = str(quota.get("mode") or "normal")
-        regions = "us"
-        markets = None if mode == "normal" else "h2h"
-        for sport in self.hot_sports:
+    async def _collect_events(self, sports: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Event lists per sport (cached /events calls; these do not cost quota units)."""
+        async def _one(sport: str):
             try:
-                logger.info(f"🔥 [Live Polling] Refreshing cache for {sport} odds...")
-                # Use use_cache=False to force a fetch from the provider; 
-                # OddsApiClient._make_request will handle populating the cache.
-                await odds_api_client.get_live_odds(sport, regions=regions, markets=markets)
+                return sport, await odds_api_client.get_events(sport) or []
             except Exception as e:
-                logger.error(f"❌ [Live Polling] Failed to refresh odds for {sport}: {e}")
+                logger.error(f"❌ [Live Polling] Failed to list events for {sport}: {e}")
+                return sport, []
 
-    async def poll_props(self):
-        """Polls player props for active games in hot sports."""
-        if odds_api_client.all_keys_dead():
-            logger.debug("Skipping poll_props — all keys cooling down")
-            return
+        results = await asyncio.gather(*(_one(s) for s in sports))
+        return {sport: events for sport, events in results}
+
+    async def build_plan(self) -> List[RefreshTarget]:
+        """Rank (sport, event, market) targets and fit them into this interval's quota budget."""
         from services.external_api_gateway import external_api_gateway
+
         quota = await external_api_gateway.quota_status("theoddsapi")
         mode = str(quota.get("mode") or "normal")
-        if mode in {"protection", "emergency_freeze"}:
-            logger.info("Skipping poll_props due to quota mode: %s", mode)
-            return
-        for sport in self.hot_sports:
+        budget = interval_budget(quota, self.polling_interval)
+        if budget <= 0:
+            logger.info("Skipping live polling plan due to quota mode: %s", mode)
+            return []
+
+        sports = list(dict.fromkeys(self.hot_sports + demand_tracker.sports()))
+        events_by_sport = await self._collect_events(sports)
+        self._featured_markets = None if mode == "normal" else "h2h"
+        props_markets = {s: odds_api_client.get_markets_for_sport(s) for s in sports}
+        targets = live_poll_planner.candidates(
+            events_by_sport,
+            featured_markets=self._featured_markets,
+            props_markets_by_sport=props_markets,
+            include_props=mode not in {"protection", "emergency_freeze"},
+        )
+        plan = live_poll_planner.plan(targets, budget)
+        self._props_markets = props_markets
+        logger.info(
+            "🔥 [Live Polling] Plan: %d/%d targets, %d/%d units (mode=%s)",
+            len(plan),
+            len(targets),
+            sum(t.cost for t in plan),
+            budget,
+            mode,
+        )
+        return plan
+
+    async def _refresh_target(self, target: RefreshTarget, sem: asyncio.Semaphore) -> None:
+        async with sem:
             try:
-                # 1. Get active events first (uses cache)
-                events = await odds_api_client.get_events(sport)
-                if not events: continue
-                
-                # 2. Limit to first 5 active events to protect quota while warming hot games
-                active_eids = [e['id'] for e in events[:5] if 'id' in e]
-                
-                logger.info(f"🔥 [Live Polling] Refreshing cache for {len(active_eids)} {sport} event props...")
-                
-                # Fetch props for these events
-                markets = odds_api_client.get_markets_for_sport(sport)
-                for eid in active_eids:
-                    await odds_api_client.get_player_props(
-                        sport=sport, 
-                        event_id=eid, 
-                        markets=markets,
-                        use_cache=False, # Force refresh
-                        ttl=60 
+                if target.event_id is None:
+                    payload = await odds_api_client.get_live_odds(
+                        target.sport, regions="us", markets=self._featured_markets
+                    )
+                else:
+                    payload = await odds_api_client.get_player_props(
+                        sport=target.sport,
+                        event_id=target.event_id,
+                        markets=self._props_markets.get(target.sport),
+                        use_cache=False,  # Force refresh
+                        ttl=60,
                     )
-                    # Small sleep to avoid hitting provider rate limits too hard in one burst
-                    await asyncio.sleep(0.5)
-                    
+                volatility_tracker.observe(target.key, payload)
             except Exception as e:
-                logger.error(f"❌ [Live Polling] Failed to refresh props for {sport}: {e}")
+                logger.error(
+                    f"❌ [Live Polling] Failed to refresh {target.market} for {target.sport}/{target.event_id}: {e}"
+                )
+
+    async def poll_planned(self) -> int:
+        """Execute this interval's refresh plan concurrently. Returns targets refreshed."""
+        if odds_api_client.all_keys_dead():
+            logger.debug("Skipping live polling — all keys cooling down")
+            return 0
+        plan = await self.build_plan()
+        if not plan:
+            return 0
+        sem = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._refresh_target(t, sem) for t in plan))
+        return len(plan)
 
     async def poll_scores(self):
         """Refresh live_scores cache from the same waterfall used by /api/live (ESPN → …)."""
@@ -111,8 +146,7 @@ class LiveDataService:
                 start_time = datetime.now(timezone.utc)
                 
                 # Run polling (live_scores upsert runs on APScheduler in main.py)
-                await self.poll_odds()
-                await self.poll_props()
+                await self.poll_planned()
                 
                 elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
                 wait_time = max(0.0, float(self.polling_interval) - elapsed)
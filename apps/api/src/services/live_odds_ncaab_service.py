@@ -2,7 +2,6 @@
 Live Odds NCAAB Service - Track and analyze NCAA basketball live odds
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,7 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -51,16 +50,13 @@ class LiveOdds:
     created_at: datetime
     updated_at: datetime
 
-class LiveOddsNCAABService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class LiveOddsNCAABService(AsyncpgRepository):
     async def create_live_odds(self, sport: int, game_id: int, home_team: str, away_team: str,
                               home_odds: int, away_odds: int, draw_odds: Optional[int],
                               bookmaker: str, season: int) -> bool:
         """Create a new live odds record"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -84,7 +80,7 @@ class LiveOddsNCAABService:
                              draw_odds: Optional[int] = None) -> bool:
         """Update live odds"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -112,7 +108,7 @@ class LiveOddsNCAABService:
     async def get_live_odds_by_game(self, game_id: int, bookmaker: str = None) -> List[LiveOdds]:
         """Get live odds for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM live_odds_ncaab 
@@ -157,7 +153,7 @@ class LiveOddsNCAABService:
     async def get_live_odds_by_team(self, team_name: str, bookmaker: str = None) -> List[LiveOdds]:
         """Get live odds for a specific team"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM live_odds_ncaab 
@@ -202,7 +198,7 @@ class LiveOddsNCAABService:
     async def get_current_odds(self, game_id: int = None, bookmaker: str = None) -> List[LiveOdds]:
         """Get current live odds"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM live_odds_ncaab 
@@ -251,7 +247,7 @@ class LiveOddsNCAABService:
     async def get_odds_by_sportsbook(self, bookmaker: str, hours: int = 24) -> List[LiveOdds]:
         """Get odds from a specific sportsbook"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM live_odds_ncaab 
@@ -288,7 +284,7 @@ class LiveOddsNCAABService:
     async def get_odds_statistics(self, hours: int = 24) -> Dict[str, Any]:
         """Get live odds statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Overall statistics
             overall = await conn.fetchrow("""
@@ -426,7 +422,7 @@ class LiveOddsNCAABService:
     async def get_odds_movements(self, game_id: int, minutes: int = 30) -> List[Dict[str, Any]]:
         """Get odds movements for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT 
@@ -475,7 +471,7 @@ class LiveOddsNCAABService:
     async def get_sportsbook_comparison(self, game_id: int, minutes: int = 30) -> Dict[str, Any]:
         """Compare odds across sportsbooks for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT 
@@ -529,7 +525,7 @@ class LiveOddsNCAABService:
     async def analyze_market_efficiency(self, hours: int = 24) -> Dict[str, Any]:
         """Analyze market efficiency and arbitrage opportunities"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Get arbitrage opportunities
             arbitrage = await conn.fetch("""
@@ -593,7 +589,7 @@ class LiveOddsNCAABService:
     async def search_live_odds(self, query: str, sportsbook: str = None, limit: int = 20) -> List[Dict[str, Any]]:
         """Search live odds by team name or sportsbook"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
@@ -2,7 +2,6 @@
 Live Odds NFL Service - Track and analyze NFL live odds
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,8 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
+from services.stats_rollups import ROLLUPS, window_bounds
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -52,16 +52,13 @@ class LiveOddsNFL:
     created_at: datetime
     updated_at: datetime
 
-class LiveOddsNFLService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class LiveOddsNFLService(AsyncpgRepository):
     async def create_live_odds(self, sport: int, game_id: int, home_team: str, away_team: str,
                               home_odds: int, away_odds: int, draw_odds: Optional[int],
                               bookmaker: str, week: int, season: int) -> bool:
         """Create a new live NFL odds record"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -85,7 +82,7 @@ class LiveOddsNFLService:
                              draw_odds: Optional[int] = None) -> bool:
         """Update live NFL odds"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -113,7 +110,7 @@ class LiveOddsNFLService:
     async def get_live_odds_by_game(self, game_id: int, bookmaker: str = None) -> List[LiveOddsNFL]:
         """Get live NFL odds for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM live_odds_nfl 
@@ -159,7 +156,7 @@ class LiveOddsNFLService:
     async def get_live_odds_by_team(self, team_name: str, bookmaker: str = None) -> List[LiveOddsNFL]:
         """Get live NFL odds for a specific team"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM live_odds_nfl 
@@ -205,7 +202,7 @@ class LiveOddsNFLService:
     async def get_current_odds(self, game_id: int = None, bookmaker: str = None) -> List[LiveOddsNFL]:
         """Get current live NFL odds"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM live_odds_nfl 
@@ -255,7 +252,7 @@ class LiveOddsNFLService:
     async def get_odds_by_week(self, week: int, season: int = 2026, bookmaker: str = None) -> List[LiveOddsNFL]:
         """Get odds for a specific week"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM live_odds_nfl 
@@ -301,7 +298,7 @@ class LiveOddsNFLService:
     async def get_odds_by_sportsbook(self, bookmaker: str, hours: int = 24) -> List[LiveOddsNFL]:
         """Get odds from a specific sportsbook"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM live_odds_nfl 
@@ -339,105 +336,129 @@ class LiveOddsNFLService:
     async def get_odds_statistics(self, hours: int = 24) -> Dict[str, Any]:
         """Get live NFL odds statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
+            
+            since, through = await window_bounds(conn, "live_odds_nfl", timedelta(hours=hours))
+            w = ROLLUPS["live_odds_nfl"].window()
             
             # Overall statistics
-            overall = await conn.fetchrow("""
+            overall = await conn.fetchrow(f"""
+                WITH w AS ({w})
                 SELECT 
-                    COUNT(*) as total_odds,
-                    COUNT(DISTINCT game_id) as unique_games,
-                    COUNT(DISTINCT home_team) as unique_teams,
-                    COUNT(DISTINCT away_team) as unique_opponents,
+                    COALESCE(SUM(n), 0) as total_odds,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.game_ids) x) as unique_games,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.home_teams) x) as unique_teams,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.away_teams) x) as unique_opponents,
                     COUNT(DISTINCT bookmaker) as unique_bookmakers,
                     COUNT(DISTINCT week) as unique_weeks,
-                    AVG(home_odds) as avg_home_odds,
-                    AVG(away_odds) as avg_away_odds,
-                    COUNT(CASE WHEN home_odds < 0 THEN 1 END) as home_favorites,
-                    COUNT(CASE WHEN away_odds < 0 THEN 1 END) as away_favorites,
-                    COUNT(CASE WHEN draw_odds IS NOT NULL THEN 1 END) as draw_markets
-                FROM live_odds_nfl 
-                WHERE timestamp >= NOW() - INTERVAL '$1 hours'
-            """, hours)
+                    SUM(home_odds_sum) / NULLIF(SUM(home_odds_n), 0) as avg_home_odds,
+                    SUM(away_odds_sum) / NULLIF(SUM(away_odds_n), 0) as avg_away_odds,
+                    COALESCE(SUM(home_favorites), 0) as home_favorites,
+                    COALESCE(SUM(away_favorites), 0) as away_favorites,
+                    COALESCE(SUM(draw_markets), 0) as draw_markets
+                FROM w
+            """, since, through)
             
             # By sportsbook statistics
-            by_sportsbook = await conn.fetch("""
+            by_sportsbook = await conn.fetch(f"""
+                WITH w AS ({w}),
+                games AS (
+                    SELECT w.bookmaker, COUNT(DISTINCT x) as unique_games
+                    FROM w, unnest(w.game_ids) x
+                    GROUP BY w.bookmaker
+                ),
+                teams AS (
+                    SELECT w.bookmaker, COUNT(DISTINCT x) as unique_teams
+                    FROM w, unnest(w.home_teams) x
+                    GROUP BY w.bookmaker
+                ),
+                opponents AS (
+                    SELECT w.bookmaker, COUNT(DISTINCT x) as unique_opponents
+                    FROM w, unnest(w.away_teams) x
+                    GROUP BY w.bookmaker
+                )
                 SELECT 
-                    bookmaker,
-                    COUNT(*) as total_odds,
-                    COUNT(DISTINCT game_id) as unique_games,
-                    COUNT(DISTINCT week) as unique_weeks,
-                    AVG(home_odds) as avg_home_odds,
-                    AVG(away_odds) as avg_away_odds,
-                    COUNT(CASE WHEN home_odds < 0 THEN 1 END) as home_favorites,
-                    COUNT(CASE WHEN away_odds < 0 THEN 1 END) as away_favorites,
-                    COUNT(DISTINCT home_team) as unique_teams,
-                    COUNT(DISTINCT away_team) as unique_opponents
-                FROM live_odds_nfl 
-                WHERE timestamp >= NOW() - INTERVAL '$1 hours'
-                GROUP BY bookmaker
+                    w.bookmaker,
+                    SUM(w.n) as total_odds,
+                    COALESCE(MAX(g.unique_games), 0) as unique_games,
+                    COUNT(DISTINCT w.week) as unique_weeks,
+                    SUM(w.home_odds_sum) / NULLIF(SUM(w.home_odds_n), 0) as avg_home_odds,
+                    SUM(w.away_odds_sum) / NULLIF(SUM(w.away_odds_n), 0) as avg_away_odds,
+                    SUM(w.home_favorites) as home_favorites,
+                    SUM(w.away_favorites) as away_favorites,
+                    COALESCE(MAX(t.unique_teams), 0) as unique_teams,
+                    COALESCE(MAX(o.unique_opponents), 0) as unique_opponents
+                FROM w
+                LEFT JOIN games g ON g.bookmaker IS NOT DISTINCT FROM w.bookmaker
+                LEFT JOIN teams t ON t.bookmaker IS NOT DISTINCT FROM w.bookmaker
+                LEFT JOIN opponents o ON o.bookmaker IS NOT DISTINCT FROM w.bookmaker
+                GROUP BY w.bookmaker
                 ORDER BY total_odds DESC
-            """, hours)
+            """, since, through)
             
             # By week statistics
-            by_week = await conn.fetch("""
+            by_week = await conn.fetch(f"""
+                WITH w AS ({w}),
+                games AS (
+                    SELECT w.week, w.season, COUNT(DISTINCT x) as unique_games
+                    FROM w, unnest(w.game_ids) x
+                    GROUP BY w.week, w.season
+                )
                 SELECT 
-                    week,
-                    season,
-                    COUNT(*) as total_odds,
-                    COUNT(DISTINCT game_id) as unique_games,
-                    AVG(home_odds) as avg_home_odds,
-                    AVG(away_odds) as avg_away_odds,
-                    COUNT(CASE WHEN home_odds < 0 THEN 1 END) as home_favorites,
-                    COUNT(CASE WHEN away_odds < 0 THEN 1 END) as away_favorites
-                FROM live_odds_nfl 
-                WHERE timestamp >= NOW() - INTERVAL '$1 hours'
-                GROUP BY week, season
-                ORDER BY week DESC
-            """, hours)
-            
-            # By team statistics
-            by_team = await conn.fetch("""
+                    w.week,
+                    w.season,
+                    SUM(w.n) as total_odds,
+                    COALESCE(MAX(g.unique_games), 0) as unique_games,
+                    SUM(w.home_odds_sum) / NULLIF(SUM(w.home_odds_n), 0) as avg_home_odds,
+                    SUM(w.away_odds_sum) / NULLIF(SUM(w.away_odds_n), 0) as avg_away_odds,
+                    SUM(w.home_favorites) as home_favorites,
+                    SUM(w.away_favorites) as away_favorites
+                FROM w
+                LEFT JOIN games g ON g.week IS NOT DISTINCT FROM w.week
+                    AND g.season IS NOT DISTINCT FROM w.season
+                GROUP BY w.week, w.season
+                ORDER BY w.week DESC
+            """, since, through)
+            
+            # By team statistics (separate rollup keyed by team only)
+            team_since, team_through = await window_bounds(conn, "live_odds_nfl_teams", timedelta(hours=hours))
+            by_team = await conn.fetch(f"""
+                WITH w AS ({ROLLUPS["live_odds_nfl_teams"].window()}),
+                top AS (
+                    SELECT 
+                        home_team,
+                        SUM(n) as total_games,
+                        SUM(home_favorites) as home_wins,
+                        SUM(away_favorites) as away_wins,
+                        SUM(home_odds_sum) / NULLIF(SUM(home_odds_n), 0) as avg_home_odds,
+                        SUM(away_odds_sum) / NULLIF(SUM(away_odds_n), 0) as avg_away_odds
+                    FROM w
+                    GROUP BY home_team
+                    ORDER BY total_games DESC
+                    LIMIT 20
+                )
                 SELECT 
-                    home_team,
-                    COUNT(*) as total_games,
-                    COUNT(CASE WHEN home_odds < 0 THEN 1 END) as home_wins,
-                    COUNT(CASE WHEN away_odds < 0 THEN 1 END) as away_wins,
-                    AVG(home_odds) as avg_home_odds,
-                    AVG(away_odds) as avg_away_odds,
-                    COUNT(DISTINCT game_id) as unique_games,
-                    COUNT(DISTINCT week) as unique_weeks
-                FROM live_odds_nfl 
-                WHERE timestamp >= NOW() - INTERVAL '$1 hours'
-                GROUP BY home_team
-                ORDER BY total_games DESC
-                LIMIT 20
-            """, hours)
+                    top.*,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.game_ids) x
+                     WHERE w.home_team IS NOT DISTINCT FROM top.home_team) as unique_games,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.weeks) x
+                     WHERE w.home_team IS NOT DISTINCT FROM top.home_team) as unique_weeks
+                FROM top
+                ORDER BY top.total_games DESC
+            """, team_since, team_through)
             
             # By odds range statistics
-            by_odds_range = await conn.fetch("""
+            by_odds_range = await conn.fetch(f"""
+                WITH w AS ({w})
                 SELECT 
-                    CASE 
-                        WHEN home_odds < -300 THEN 'Heavy Favorite'
-                        WHEN home_odds < -200 THEN 'Strong Favorite'
-                        WHEN home_odds < -150 THEN 'Moderate Favorite'
-                        WHEN home_odds < -110 THEN 'Light Favorite'
-                        WHEN home_odds < -100 THEN 'Pickem' 
-                        WHEN home_odds < -50 THEN 'Slight Favorite'
-                        WHEN home_odds < 0 THEN 'Pickem' 
-                        WHEN home_odds <= 50 THEN 'Slight Underdog'
-                        WHEN home_odds <= 100 THEN 'Moderate Underdog'
-                        WHEN home_odds <= 150 THEN 'Strong Underdog'
-                        WHEN home_odds <= 200 THEN 'Heavy Underdog'
-                        ELSE 'Extreme Underdog'
-                    END as odds_range,
-                    COUNT(*) as total_odds,
-                    AVG(home_odds) as avg_odds,
-                    AVG(away_odds) as avg_away_odds
-                FROM live_odds_nfl 
-                WHERE timestamp >= NOW() - INTERVAL '$1 hours'
+                    odds_range,
+                    SUM(n) as total_odds,
+                    SUM(home_odds_sum) / NULLIF(SUM(home_odds_n), 0) as avg_odds,
+                    SUM(away_odds_sum) / NULLIF(SUM(away_odds_n), 0) as avg_away_odds
+                FROM w
                 GROUP BY odds_range
                 ORDER BY avg_odds ASC
-            """, hours)
+            """, since, through)
             
             await conn.close()
             
@@ -514,7 +535,7 @@ class LiveOddsNFLService:
     async def get_odds_movements(self, game_id: int, minutes: int = 30) -> List[Dict[str, Any]]:
         """Get odds movements for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT 
@@ -563,7 +584,7 @@ class LiveOddsNFLService:
     async def get_sportsbook_comparison(self, game_id: int, minutes: int = 30) -> Dict[str, Any]:
         """Compare odds across sportsbooks for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT 
@@ -617,7 +638,7 @@ class LiveOddsNFLService:
     async def analyze_market_efficiency(self, hours: int = 24) -> Dict[str, Any]:
         """Analyze market efficiency and arbitrage opportunities"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Get arbitrage opportunities
             arbitrage = await conn.fetch("""
@@ -685,7 +706,7 @@ class LiveOddsNFLService:
     async def search_live_odds(self, query: str, sportsbook: str = None, limit: int = 20) -> List[Dict[str, Any]]:
         """Search live NFL odds by team name or sportsbook"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
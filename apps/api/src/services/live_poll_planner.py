@@ -0,0 +1,275 @@
+"""
+Live polling budget planner.
+
+Ranks (sport, event, market) refresh targets for LiveDataService and fits them
+into a per-interval request budget derived from the gateway quota state:
+
+  score = game_state_weight * (1 + demand) * (1 + volatility) / cost
+
+  * game state  — live > starting soon > later (from event commence_time)
+  * demand      — recent user requests per key (exponentially decayed counts)
+  * volatility  — how often the last polls for a key returned changed payloads
+
+Targets are picked greedily by score until the interval budget is spent, so the
+quota goes to the games and markets users are actually looking at.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.sports_config import VALID_SPORTS
+from services.commence_time import parse_commence_to_utc
+
+# Half-life (seconds) for demand / volatility decay.
+DEMAND_HALF_LIFE_SECONDS = float(os.getenv("LIVE_POLL_DEMAND_HALF_LIFE_SECONDS", "600"))
+VOLATILITY_HALF_LIFE_SECONDS = float(os.getenv("LIVE_POLL_VOLATILITY_HALF_LIFE_SECONDS", "900"))
+# Games that started within this window are treated as live.
+LIVE_GAME_WINDOW_HOURS = float(os.getenv("LIVE_POLL_LIVE_WINDOW_HOURS", "4"))
+SOON_WINDOW_HOURS = float(os.getenv("LIVE_POLL_SOON_WINDOW_HOURS", "3"))
+# Never plan more than this many provider calls per interval, regardless of quota.
+MAX_CALLS_PER_INTERVAL = int(os.getenv("LIVE_POLL_MAX_CALLS_PER_INTERVAL", "24"))
+
+GAME_STATE_WEIGHTS = {"live": 10.0, "soon": 3.0, "later": 0.5, "unknown": 1.0}
+
+# Share of the hourly headroom each quota mode may spend on live polling.
+MODE_BUDGET_FACTOR = {
+    "normal": 1.0,
+    "conservative": 0.5,
+    "protection": 0.2,
+    "emergency_freeze": 0.0,
+}
+
+FEATURED_MARKETS = "featured"
+PLAYER_PROPS = "player_props"
+
+
+def _decay(value: float, elapsed: float, half_life: float) -> float:
+    if elapsed <= 0 or half_life <= 0:
+        return value
+    return value * math.pow(0.5, elapsed / half_life)
+
+
+class DecayingCounter:
+    """Per-key counts that halve every ``half_life`` seconds (O(1) update/read)."""
+
+    def __init__(self, half_life: float, max_keys: int = 5000):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self._values: Dict[Tuple, Tuple[float, float]] = {}
+
+    def add(self, key: Tuple, amount: float = 1.0, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        value, ts = self._values.get(key, (0.0, now))
+        self._values[key] = (_decay(value, now - ts, self.half_life) + amount, now)
+        if len(self._values) > self.max_keys:
+            self._prune(now)
+
+    def get(self, key: Tuple, now: Optional[float] = None) -> float:
+        entry = self._values.get(key)
+        if entry is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return _decay(entry[0], now - entry[1], self.half_life)
+
+    def keys(self) -> Iterable[Tuple]:
+        return list(self._values.keys())
+
+    def _prune(self, now: float) -> None:
+        ranked = sorted(self._values.items(), key=lambda kv: _decay(kv[1][0], now - kv[1][1], self.half_life))
+        for key, _ in ranked[: len(ranked) - self.max_keys]:
+            self._values.pop(key, None)
+
+
+_FEATURED_MARKET_KEYS = frozenset({FEATURED_MARKETS, "h2h", "spreads", "totals"})
+
+
+def demand_market(market: Optional[str]) -> Optional[str]:
+    """Map an endpoint's market filter onto the planner's target markets (None = all markets)."""
+    if not market:
+        return None
+    return FEATURED_MARKETS if market in _FEATURED_MARKET_KEYS else PLAYER_PROPS
+
+
+class DemandTracker:
+    """
+    Recent user demand per (sport, event_id, market). Recorded from read endpoints with
+    the market folded onto the planner's targets (``featured`` / ``player_props``).
+    Sports come from request parameters, so only known sport keys are tracked — demand
+    adds sports to the live polling set.
+    """
+
+    def __init__(self) -> None:
+        self._counts = DecayingCounter(DEMAND_HALF_LIFE_SECONDS)
+
+    def record(self, sport: Optional[str], event_id: Optional[str] = None, market: Optional[str] = None) -> None:
+        if sport not in VALID_SPORTS:
+            return
+        self._counts.add((sport, event_id, demand_market(market)))
+
+    def score(self, sport: str, event_id: Optional[str] = None, market: Optional[str] = None) -> float:
+        """Demand for a target: exact key plus the broader sport/market views that include it."""
+        market = demand_market(market)
+        keys = {(sport, None, None), (sport, None, market)}
+        if event_id is not None:
+            keys.update({(sport, event_id, None), (sport, event_id, market)})
+        return sum(self._counts.get(key) for key in keys)
+
+    def sports(self) -> List[str]:
+        return sorted({k[0] for k in self._counts.keys() if self._counts.get(k) >= 0.05})
+
+
+class VolatilityTracker:
+    """Tracks how often successive polls of a target returned a different payload."""
+
+    def __init__(self) -> None:
+        self._changes = DecayingCounter(VOLATILITY_HALF_LIFE_SECONDS)
+        self._fingerprints: Dict[Tuple, str] = {}
+
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+    def observe(self, key: Tuple, payload: Any) -> bool:
+        """Record a poll result; returns True when it differs from the previous one."""
+        fp = self.fingerprint(payload)
+        previous = self._fingerprints.get(key)
+        self._fingerprints[key] = fp
+        changed = previous is not None and previous != fp
+        if changed:
+            self._changes.add(key)
+        return changed
+
+    def score(self, key: Tuple) -> float:
+        return self._changes.get(key)
+
+
+@dataclass
+class RefreshTarget:
+    sport: str
+    event_id: Optional[str]
+    market: str
+    game_state: str
+    cost: int
+    score: float = 0.0
+
+    @property
+    def key(self) -> Tuple[str, Optional[str], str]:
+        return (self.sport, self.event_id, self.market)
+
+
+def classify_game_state(commence_time: Any, now: Optional[datetime] = None) -> str:
+    start = parse_commence_to_utc(commence_time)
+    if start is None:
+        return "unknown"
+    now = now or datetime.now(timezone.utc)
+    if start <= now <= start + timedelta(hours=LIVE_GAME_WINDOW_HOURS):
+        return "live"
+    if now < start <= now + timedelta(hours=SOON_WINDOW_HOURS):
+        return "soon"
+    if start > now:
+        return "later"
+    return "finished"
+
+
+def interval_budget(quota: Dict[str, Any], interval_seconds: float, now: Optional[datetime] = None) -> int:
+    """
+    Credits this polling interval may spend — the gateway budgets in provider credits too:
+    the hourly (and daily) headroom spread over the intervals left in the hour, scaled by
+    the gateway protection mode.
+    """
+    mode = str(quota.get("mode") or "normal")
+    factor = MODE_BUDGET_FACTOR.get(mode, 0.5)
+    if factor <= 0:
+        return 0
+    hour_limit = int(quota.get("hour_limit") or 0)
+    used_hour = int(quota.get("used_hour") or 0)
+    day_headroom = int(quota.get("day_limit") or 0) - int(quota.get("used_day") or 0)
+    headroom = max(0, hour_limit - used_hour)
+    if quota.get("day_limit"):
+        headroom = min(headroom, max(0, day_headroom))
+
+    now = now or datetime.now(timezone.utc)
+    seconds_left = max(1.0, 3600.0 - (now.minute * 60 + now.second))
+    intervals_left = max(1.0, seconds_left / max(1.0, float(interval_seconds)))
+    budget = int(headroom * factor / intervals_left)
+    # Always allow at least one call while we have headroom so live games never go dark.
+    if headroom > 0 and budget == 0:
+        budget = 1
+    return min(budget, MAX_CALLS_PER_INTERVAL)
+
+
+def market_cost(markets: Optional[str]) -> int:
+    """The Odds API bills one request unit per market (per region)."""
+    if not markets:
+        return 3  # featured: h2h, spreads, totals
+    return max(1, len([m for m in markets.split(",") if m.strip()]))
+
+
+class LivePollPlanner:
+    """Builds a budgeted, ranked refresh plan for one polling interval."""
+
+    def __init__(self, demand: DemandTracker, volatility: VolatilityTracker) -> None:
+        self.demand = demand
+        self.volatility = volatility
+
+    def _score(self, target: RefreshTarget) -> float:
+        weight = GAME_STATE_WEIGHTS.get(target.game_state, 0.0)
+        demand = self.demand.score(target.sport, target.event_id, target.market)
+        vol = self.volatility.score(target.key)
+        return weight * (1.0 + demand) * (1.0 + vol) / max(1, target.cost)
+
+    def candidates(
+        self,
+        events_by_sport: Dict[str, List[Dict[str, Any]]],
+        *,
+        featured_markets: Optional[str],
+        props_markets_by_sport: Dict[str, str],
+        include_props: bool,
+        now: Optional[datetime] = None,
+    ) -> List[RefreshTarget]:
+        now = now or datetime.now(timezone.utc)
+        out: List[RefreshTarget] = []
+        for sport, events in events_by_sport.items():
+            states = [classify_game_state(e.get("commence_time"), now) for e in events]
+            active = [s for s in states if s in ("live", "soon")]
+            sport_state = "live" if "live" in active else ("soon" if active else ("later" if states else "unknown"))
+            out.append(
+                RefreshTarget(sport, None, FEATURED_MARKETS, sport_state, market_cost(featured_markets))
+            )
+            if not include_props:
+                continue
+            props_cost = market_cost(props_markets_by_sport.get(sport))
+            for event, state in zip(events, states):
+                eid = event.get("id")
+                if not eid or (state in ("finished", "later") and self.demand.score(sport, eid) <= 0):
+                    continue
+                out.append(RefreshTarget(sport, eid, PLAYER_PROPS, state, props_cost))
+        return out
+
+    def plan(self, targets: List[RefreshTarget], budget: int) -> List[RefreshTarget]:
+        """Greedy knapsack by score-per-cost; cheaper targets fill leftover budget."""
+        for t in targets:
+            t.score = self._score(t)
+        ranked = sorted((t for t in targets if t.score > 0), key=lambda t: t.score, reverse=True)
+        chosen: List[RefreshTarget] = []
+        remaining = budget
+        for t in ranked:
+            if t.cost <= remaining:
+                chosen.append(t)
+                remaining -= t.cost
+            if remaining <= 0:
+                break
+        return chosen
+
+
+demand_tracker = DemandTracker()
+volatility_tracker = VolatilityTracker()
+live_poll_planner = LivePollPlanner(demand_tracker, volatility_tracker)
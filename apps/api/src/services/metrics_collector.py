@@ -0,0 +1,278 @@
+"""
+Background collector behind the polled metrics / health endpoints.
+
+Dashboards poll ``/api/metrics`` and ``/api/health/deps`` every few seconds. Both used
+to probe the database on every call: ``SELECT 1``, ``MAX(created_at)`` and exact
+``COUNT(*)`` over ``unified_odds`` / ``ev_signals``, plus the full ``compute_health``
+pass. The collector does that work once per METRICS_REFRESH_SECONDS and the endpoints
+return its in-memory snapshot:
+
+  * row counts       — ``pg_class.reltuples`` estimates (exact ``COUNT(*)`` only for a
+                       table Postgres has not analyzed yet, or off Postgres)
+  * feeds            — per-feed rows written today / last run / last success from the
+                       heartbeats table, advanced in between by ``record_heartbeat``
+                       (called from HeartbeatService) without touching the database
+  * last ingest      — newest successful ``ingest_*`` heartbeat or odds sync
+  * average EV       — over signals refreshed in the last METRICS_EV_WINDOW_MINUTES
+                       (range scan on the indexed ``updated_at``, not the whole table)
+  * health           — the ``compute_health`` payload for /deps and admin views
+
+A snapshot older than METRICS_STALE_SECONDS (collector not running, first request after
+boot) is refreshed inline; concurrent callers share that one refresh.
+"""
+import asyncio
+import copy
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+METRICS_REFRESH_SECONDS = float(os.getenv("METRICS_REFRESH_SECONDS", "15"))
+METRICS_STALE_SECONDS = float(os.getenv("METRICS_STALE_SECONDS", str(METRICS_REFRESH_SECONDS * 4)))
+METRICS_EV_WINDOW_MINUTES = float(os.getenv("METRICS_EV_WINDOW_MINUTES", "60"))
+
+ESTIMATED_TABLES = ("unified_odds", "ev_signals", "props_live")
+
+# Mirrors HeartbeatService: these statuses count as a successful run.
+_SUCCESS_STATUSES = frozenset({"ok", "idle_no_data", "idle_no_edges"})
+
+
+def _iso(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return str(value)
+
+
+async def estimate_rows(db, tables: Iterable[str] = ESTIMATED_TABLES) -> Dict[str, Optional[int]]:
+    """Planner row estimates; falls back to COUNT(*) where there is no estimate yet."""
+    tables = list(tables)
+    estimates: Dict[str, Optional[int]] = {t: None for t in tables}
+    try:
+        res = await db.execute(
+            text(
+                "SELECT c.relname, c.reltuples::bigint AS n FROM pg_class c "
+                "JOIN pg_namespace ns ON ns.oid = c.relnamespace "
+                "WHERE ns.nspname = current_schema() AND c.relname = ANY(:names)"
+            ),
+            {"names": tables},
+        )
+        for name, n in res.all():
+            # -1: never vacuumed/analyzed (PG14+); 0 may be the same on older servers
+            estimates[name] = int(n) if n is not None and n > 0 else None
+    except Exception:
+        await db.rollback()  # not Postgres: count exactly below
+    for table in tables:
+        if estimates[table] is None:
+            try:
+                estimates[table] = int((await db.execute(text(f"SELECT COUNT(*) FROM {table}"))).scalar() or 0)
+            except Exception as e:
+                logger.debug("metrics: row count for %s unavailable: %s", table, e)
+                await db.rollback()
+    return estimates
+
+
+def _parse(stamp: str) -> datetime:
+    value = datetime.fromisoformat(stamp)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def recent_average_edge(db, window_minutes: float = METRICS_EV_WINDOW_MINUTES) -> float:
+    """Average ``edge_percent`` of the signals refreshed within the window (0.0 when none)."""
+    since = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+    avg = (await db.execute(
+        text("SELECT AVG(edge_percent) FROM ev_signals WHERE updated_at >= :since"),
+        {"since": since},
+    )).scalar()
+    return round(float(avg), 4) if avg is not None else 0.0
+
+
+class MetricsCollector:
+    def __init__(self, interval: float = METRICS_REFRESH_SECONDS) -> None:
+        self.interval = interval
+        self._snapshot: Dict[str, Any] = {}
+        self._health: Optional[Dict[str, Any]] = None
+        self._feeds: Dict[str, Dict[str, Any]] = {}
+        self._collected_mono: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh_ms: Optional[float] = None
+
+    # -- write side ----------------------------------------------------------
+
+    def record_heartbeat(self, feed_name: str, status: str = "ok", rows_written: int = 0) -> None:
+        """Advance the in-memory view of a feed (O(1), no I/O)."""
+        now = datetime.now(timezone.utc).isoformat()
+        feed = self._feeds.setdefault(
+            feed_name, {"rows_written_today": 0, "last_run_at": None, "last_success_at": None, "status": None}
+        )
+        feed["rows_written_today"] += int(rows_written or 0)
+        feed["last_run_at"] = now
+        feed["status"] = status
+        if status in _SUCCESS_STATUSES:
+            feed["last_success_at"] = now
+
+    # -- collection ----------------------------------------------------------
+
+    async def _collect(self) -> None:
+        from db.session import AsyncSessionLocal
+        from routers.health import compute_health
+
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            try:
+                probe = time.perf_counter()
+                await db.execute(text("SELECT 1"))
+                db_connected = True
+                db_probe_ms = round((time.perf_counter() - probe) * 1000, 2)
+            except Exception as e:
+                logger.warning("metrics: database probe failed: %s", e)
+                await db.rollback()
+                db_connected, db_probe_ms = False, None
+
+            rows: Dict[str, Optional[int]] = {}
+            average_ev = 0.0
+            feeds: Dict[str, Dict[str, Any]] = {}
+            if db_connected:
+                rows = await estimate_rows(db)
+                try:
+                    average_ev = await recent_average_edge(db)
+                except Exception as e:
+                    logger.debug("metrics: average EV unavailable: %s", e)
+                    await db.rollback()
+                try:
+                    res = await db.execute(
+                        text(
+                            "SELECT feed_name, status, rows_written_today, last_run_at, last_success_at "
+                            "FROM heartbeats"
+                        )
+                    )
+                    for hb in res.mappings().all():
+                        feeds[hb["feed_name"]] = {
+                            "rows_written_today": int(hb["rows_written_today"] or 0),
+                            "last_run_at": _iso(hb["last_run_at"]),
+                            "last_success_at": _iso(hb["last_success_at"]),
+                            "status": hb["status"],
+                        }
+                except Exception as e:
+                    logger.debug("metrics: heartbeats unavailable: %s", e)
+                    await db.rollback()
+
+            health = await compute_health(db)
+
+        self._feeds = feeds or self._feeds
+        self._health = health
+        self._snapshot = {
+            "collected_at": datetime.now(timezone.utc).isoformat(),
+            "db_connected": db_connected,
+            "db_probe_ms": db_probe_ms,
+            "estimated_rows": rows,
+            "dashboard": {
+                "total_ev_signals": rows.get("ev_signals") or 0,
+                "average_ev": average_ev,
+            },
+            "last_odds_sync": health.get("last_odds_sync"),
+        }
+        self._collected_mono = time.monotonic()
+        self.refreshes += 1
+        self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    async def refresh(self) -> None:
+        """Collect now; callers arriving mid-refresh wait for it instead of starting another."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        seen = self.refreshes
+        async with self._lock:
+            if self.refreshes != seen:
+                return
+            try:
+                await self._collect()
+            except Exception as e:
+                self.failures += 1
+                logger.warning("metrics: collection failed: %s", e)
+
+    def age(self) -> Optional[float]:
+        if self._collected_mono is None:
+            return None
+        return time.monotonic() - self._collected_mono
+
+    async def _ensure_fresh(self) -> None:
+        age = self.age()
+        if age is None or age > METRICS_STALE_SECONDS:
+            await self.refresh()
+
+    # -- read side -----------------------------------------------------------
+
+    def last_ingest_at(self) -> Optional[str]:
+        stamps = [f["last_success_at"] for name, f in self._feeds.items()
+                  if name.startswith("ingest_") and f.get("last_success_at")]
+        if self._snapshot.get("last_odds_sync"):
+            stamps.append(self._snapshot["last_odds_sync"])
+        return max(stamps, key=_parse) if stamps else None
+
+    def peek(self) -> Dict[str, Any]:
+        """Current snapshot without refreshing (may be empty before the first collection)."""
+        age = self.age()
+        return {
+            **self._snapshot,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "last_ingest_at": self.last_ingest_at(),
+            "feeds": copy.deepcopy(self._feeds),
+        }
+
+    async def snapshot(self) -> Dict[str, Any]:
+        await self._ensure_fresh()
+        return self.peek()
+
+    async def health(self) -> Optional[Dict[str, Any]]:
+        """A copy of the last ``compute_health`` payload (``_internal`` included), or None."""
+        await self._ensure_fresh()
+        if self._health is None:
+            return None
+        return {**copy.deepcopy({k: v for k, v in self._health.items() if k != "_internal"}),
+                "_internal": dict(self._health.get("_internal") or {})}
+
+    def stats(self) -> Dict[str, Any]:
+        age = self.age()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_refresh_ms": self.last_refresh_ms,
+            "age_seconds": round(age, 1) if age is not None else None,
+        }
+
+    # -- lifecycle -----------------------------------------------------------
+
+    async def _loop(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+metrics_collector = MetricsCollector()
@@ -0,0 +1,258 @@
+"""
+In-process metrics registry with Prometheus text exposition (``GET /metrics``).
+
+Hot paths record into plain Python containers: a labelled child is resolved once (dict
+lookup by label values) and recording is an integer/float add on it. Nothing takes a
+lock; all recording happens on the event loop, and a worker thread racing it can at
+worst lose an increment, never corrupt the series.
+
+Every process keeps its own registry. Under several API workers each scrape sees the
+worker that served it; the ``process_info{process_id=...} 1`` series tells them apart and
+``process_start_time_seconds`` shows restarts. Counters are exposed as ``<name>_total``
+(metadata and samples alike).
+
+    INGEST_STAGE_SECONDS = registry.histogram(
+        "ingest_stage_seconds", "UnifiedIngestionService.run stage duration", ("sport", "stage"))
+    with INGEST_STAGE_SECONDS.time(sport="basketball_nba", stage="persist"):
+        ...
+"""
+import math
+import os
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: sub-millisecond DB reads up to multi-minute ingest stages.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_NAME_RE = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        if not _NAME_RE.match(name):
+            raise ValueError(f"invalid metric name: {name}")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def labels(self, **labels: object):
+        key = self._key(labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_str(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    @property
+    def exposed_name(self) -> str:
+        """Name used in the exposition (``# HELP`` / ``# TYPE`` and samples)."""
+        return self.name
+
+    def render(self) -> List[str]:
+        name = self.exposed_name
+        return [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.type}", *self._samples()]
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        self.labels(**labels).inc(amount)
+
+    def value(self, **labels: object) -> float:
+        return self.labels(**labels).value
+
+    @property
+    def exposed_name(self) -> str:
+        return self.name if self.name.endswith("_total") else f"{self.name}_total"
+
+    def _samples(self) -> List[str]:
+        name = self.exposed_name
+        return [f"{name}{self._label_str(k)} {_fmt(c.value)}" for k, c in list(self._children.items())]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        self.labels(**labels).inc(amount)
+
+    def dec(self, amount: float = 1.0, **labels: object) -> None:
+        self.labels(**labels).dec(amount)
+
+    def set(self, value: float, **labels: object) -> None:
+        self.labels(**labels).set(value)
+
+    def value(self, **labels: object) -> float:
+        return self.labels(**labels).value
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{self._label_str(k)} {_fmt(c.value)}" for k, c in list(self._children.items())]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot: > largest bound
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != math.inf))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float, **labels: object) -> None:
+        self.labels(**labels).observe(value)
+
+    def time(self, **labels: object):
+        return self.labels(**labels).time()
+
+    def _samples(self) -> List[str]:
+        lines: List[str] = []
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{self._label_str(key, ('le', _fmt(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_fmt(child.sum)}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {child.count}")
+        return lines
+
+
+class StageTimer:
+    """Times consecutive stages of one run into ``histogram``: ``next(stage)`` closes the previous one."""
+
+    def __init__(self, histogram: Histogram, **labels: object) -> None:
+        self.histogram = histogram
+        self.labels = labels
+        self.stage: Optional[str] = None
+        self._started = 0.0
+
+    def next(self, stage: Optional[str]) -> None:
+        now = time.perf_counter()
+        if self.stage is not None:
+            self.histogram.observe(now - self._started, stage=self.stage, **self.labels)
+        self.stage, self._started = stage, now
+
+    def done(self) -> None:
+        self.next(None)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> _Metric:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics.setdefault(name, cls(name, documentation, labelnames, **kwargs))
+        if not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"metric {name} already registered with a different type or labels")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+registry.gauge("process_info", "API process identity (one series per worker)", ("process_id",)).set(
+    1, process_id=os.getpid()
+)
+registry.gauge("process_start_time_seconds", "Start time of the process since the Unix epoch").set(time.time())
@@ -1,118 +1,263 @@
 import logging
-from typing import List, Dict, Any
-from datetime import datetime, timezone
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.cache_service import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Only consider prices written by recent ingest cycles.
+MIDDLE_SCAN_FRESHNESS_MINUTES = int(os.getenv("MIDDLE_SCAN_FRESHNESS_MINUTES", "90"))
+# Safety TTL; each sport keeps one entry tagged with its ingest stamp, so a new cycle misses anyway.
+MIDDLE_SCAN_CACHE_TTL_SECONDS = int(os.getenv("MIDDLE_SCAN_CACHE_TTL_SECONDS", "900"))
+ARB_MAX_IMPLIED_SUM = 0.99
+# Max combined implied probability paid for a middle window (alternate lines get pricey).
+MIDDLE_MAX_IMPLIED_SUM = float(os.getenv("MIDDLE_MAX_IMPLIED_SUM", "1.10"))
+
+# All book prices for a sport in one round-trip (one row per book/outcome).
+SPORT_OFFERS_SQL = text("""
+    SELECT event_id, player_name, market_key, outcome_key, bookmaker, line, price,
+           implied_prob, home_team, away_team
+    FROM unified_odds
+    WHERE sport = :sport
+      AND created_at >= :since
+      AND line IS NOT NULL
+      AND outcome_key IN ('over', 'under')
+""")
+
+INGEST_STAMP_SQL = text("SELECT MAX(created_at) FROM unified_odds WHERE sport = :sport")
+
+
+def american_to_implied(odds: Optional[float]) -> Optional[float]:
+    if odds is None:
+        return None
+    odds = float(odds)
+    if odds == 0:
+        return None
+    if odds > 0:
+        return 100.0 / (odds + 100.0)
+    return -odds / (-odds + 100.0)
+
+
+def base_market(market_key: str) -> str:
+    """Alternate-line markets share a ladder with their main market (player_points_alternate -> player_points)."""
+    return market_key[: -len("_alternate")] if market_key.endswith("_alternate") else market_key
+
+
+@dataclass
+class Offer:
+    side: str  # 'over' | 'under'
+    book: str
+    line: float
+    odds: float
+    implied: float
+
+
+def _better(a: Offer, b: Optional[Offer]) -> bool:
+    return b is None or a.implied < b.implied
+
+
+def best_by_line(offers: Iterable[Offer]) -> Tuple[Dict[float, Offer], Dict[float, Offer]]:
+    """Best-priced (lowest implied) over and under per line, in one pass."""
+    overs: Dict[float, Offer] = {}
+    unders: Dict[float, Offer] = {}
+    for o in offers:
+        table = overs if o.side == "over" else unders
+        if _better(o, table.get(o.line)):
+            table[o.line] = o
+    return overs, unders
+
+
+def find_arbs(overs: Dict[float, Offer], unders: Dict[float, Offer]) -> List[Tuple[Offer, Offer, float]]:
+    """Same-line over/under pairs whose best prices sum to < ARB_MAX_IMPLIED_SUM implied probability."""
+    out = []
+    for line, over in overs.items():
+        under = unders.get(line)
+        if under is not None and over.implied + under.implied < ARB_MAX_IMPLIED_SUM:
+            out.append((over, under, over.implied + under.implied))
+    return out
+
+
+def find_middle(overs: Dict[float, Offer], unders: Dict[float, Offer]) -> Optional[Tuple[Offer, Offer]]:
+    """
+    Widest true middle across main + alternate lines: Over a low line, Under a higher
+    one, with the pair's combined implied probability (the cost of the window) at most
+    MIDDLE_MAX_IMPLIED_SUM. Lines are swept in sorted order, so for each under line the
+    first affordable over below it is also the widest; ties go to the cheaper pair.
+    """
+    if not overs or not unders:
+        return None
+    over_lines = sorted(overs)
+    best: Optional[Tuple[Offer, Offer]] = None
+    best_key: Optional[Tuple[float, float]] = None
+    for u_line in sorted(unders, reverse=True):
+        under = unders[u_line]
+        if best_key is not None and u_line - over_lines[0] < best_key[0]:
+            break  # no remaining under line can produce a wider window
+        for o_line in over_lines:
+            if o_line >= u_line:
+                break
+            over = overs[o_line]
+            total = over.implied + under.implied
+            if total <= MIDDLE_MAX_IMPLIED_SUM:
+                key = (u_line - o_line, -total)
+                if best_key is None or key > best_key:
+                    best, best_key = (over, under), key
+                break
+    return best
+
+
 class MiddleService:
+    def __init__(self) -> None:
+        self._cache = TTLCache()
+
     async def scan_for_middles(self, games_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Scans a list of games and their bookmaker data for middle opportunities.
         A middle occurs when Book A's Over line is significantly lower than Book B's Under line.
         """
         middles = []
-        
+        now = datetime.now(timezone.utc).isoformat()
+
         for game in games_data:
             bookmakers = game.get("bookmakers", [])
             if len(bookmakers) < 2:
                 continue
-                
-            # Dictionary to track best lines per market
-            # market_id -> { 'over': {'book': name, 'line': val, 'odds': odds}, 'under': ... }
-            market_map = {}
-            
+
+            by_market: Dict[Tuple[str, str], List[Offer]] = defaultdict(list)
             for bm in bookmakers:
                 bm_name = bm.get("title")
                 for market in bm.get("markets", []):
-                    market_key = market.get("key")
-                    outcomes = market.get("outcomes", [])
-                    
-                    if market_key not in market_map:
-                        market_map[market_key] = {"over": None, "under": None}
-                        
-                    for outcome in outcomes:
-                        name = outcome.get("name", "").lower()
-                        line = outcome.get("point")
-                        odds = outcome.get("price")
-                        
-                        if line is None: continue
-                        
-                        if "over" in name:
-                            current = market_map[market_key]["over"]
-                            if current is None or line < current["line"]:
-                                market_map[market_key]["over"] = {
-                                    "book": bm_name, "line": line, "odds": odds
-                                }
-                        elif "under" in name:
-                            current = market_map[market_key]["under"]
-                            if current is None or line > current["line"]:
-                                market_map[market_key]["under"] = {
-                                    "book": bm_name, "line": line, "odds": odds
-                                }
-            
-            # Check for windows in each market
-            for m_key, best in market_map.items():
-                if best["over"] and best["under"]:
-                    over_line = best["over"]["line"]
-                    under_line = best["under"]["line"]
-                    
-                    if under_line > over_line:
-                        # Profit window found
-                        middles.append({
-                            "game": f"{game.get('away_team')} @ {game.get('home_team')}",
-                            "market": m_key.replace("player_", "").replace("_", " ").upper(),
-                            "window": f"{over_line} - {under_line}",
-                            "width": round(under_line - over_line, 1),
-                            "over_side": best["over"],
-                            "under_side": best["under"],
-                            "profit_potential": "High" if (under_line - over_line) >= 2 else "Medium",
-                            "timestamp": datetime.now(timezone.utc).isoformat()
-                        })
-                        
+                    m_key = base_market(market.get("key") or "")
+                    for outcome in market.get("outcomes", []):
+                        name = (outcome.get("name") or "").lower()
+                        line, odds = outcome.get("point"), outcome.get("price")
+                        if line is None:
+                            continue
+                        side = "over" if "over" in name else ("under" if "under" in name else None)
+                        if side:
+                            implied = american_to_implied(odds)
+                            player = outcome.get("description") or ""
+                            by_market[(m_key, player)].append(
+                                Offer(side, bm_name, float(line), odds, implied if implied is not None else 1.0)
+                            )
+
+            for (m_key, player), offers in by_market.items():
+                pair = find_middle(*best_by_line(offers))
+                if pair is None:
+                    continue
+                over, under = pair
+                width = under.line - over.line
+                middles.append({
+                    "game": f"{game.get('away_team')} @ {game.get('home_team')}",
+                    "market": f"{player} {m_key.replace('player_', '').replace('_', ' ').upper()}".strip(),
+                    "window": f"{over.line} - {under.line}",
+                    "width": round(width, 1),
+                    "over_side": {"book": over.book, "line": over.line, "odds": over.odds},
+                    "under_side": {"book": under.book, "line": under.line, "odds": under.odds},
+                    "profit_potential": "High" if width >= 2 else "Medium",
+                    "timestamp": now
+                })
+
         return middles
 
-    async def scan_for_prop_middles(self, sport_key: str) -> List[Dict[str, Any]]:
+    async def _ingest_stamp(self, db: AsyncSession, sport_key: str) -> Optional[datetime]:
+        return (await db.execute(INGEST_STAMP_SQL, {"sport": sport_key})).scalar()
+
+    async def get_opportunities(self, sport_key: str, db: Optional[AsyncSession] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Scans the PropLine/PropOdds database for middle/arbitrage windows.
+        Middles and same-line arbs for a sport from the latest unified_odds snapshot.
+        Results are cached per ingest cycle (tagged with the sport's newest unified_odds write).
         """
-        from db.session import SessionLocal
-        from models.prop import PropLine, PropOdds
-        from sqlalchemy import select
-        from services.monte_carlo_service import american_to_implied
-        
-        db = SessionLocal()
-        middles = []
-        try:
-            stmt = select(PropLine).where(PropLine.sport_key == sport_key).limit(500)
-            res = db.execute(stmt)
-            props = res.scalars().all()
-            
-            for p in props:
-                odds_stmt = select(PropOdds).where(PropOdds.prop_line_id == p.id)
-                o_res = db.execute(odds_stmt)
-                book_odds = o_res.scalars().all()
-                
-                if len(book_odds) < 2: continue
-                
-                for i, b1 in enumerate(book_odds):
-                    for j, b2 in enumerate(book_odds):
-                        if i == j: continue
-                        p1, p2 = american_to_implied(b1.over_odds), american_to_implied(b2.under_odds)
-                        if (p1 + p2) < 0.99:
-                            middles.append({
-                                "game": f"{p.team} vs {p.opponent}" if p.team and p.opponent else "Game Info Missing",
-                                "market": f"{p.player_name} {p.stat_type.upper().replace('_', ' ')}",
-                                "window": f"Line: {p.line}",
-                                "width": round(1.0 - (p1 + p2), 3),
-                                "over_side": {"book": b1.sportsbook, "odds": b1.over_odds},
-                                "under_side": {"book": b2.sportsbook, "odds": b2.under_odds},
-                                "profit_potential": "High" if (p1 + p2) < 0.95 else "Medium",
-                                "timestamp": datetime.now(timezone.utc).isoformat(),
-                                "is_arb": True 
-                            })
-            return middles
-        finally:
-            db.close()
+        if db is None:
+            from db.session import async_session_maker
+            async with async_session_maker() as session:
+                return await self.get_opportunities(sport_key, session)
+
+        stamp = await self._ingest_stamp(db, sport_key)
+        stamp_key = stamp.isoformat() if stamp else "none"
+        # One entry per sport: a newer stamp overwrites the superseded cycle's result.
+        cached = self._cache.get(sport_key)
+        if cached is not None and cached[0] == stamp_key:
+            return cached[1]
+
+        result: Dict[str, List[Dict[str, Any]]] = {"middles": [], "arbs": []}
+        if stamp is not None:
+            since = stamp - timedelta(minutes=MIDDLE_SCAN_FRESHNESS_MINUTES)
+            rows = (await db.execute(SPORT_OFFERS_SQL, {"sport": sport_key, "since": since})).mappings().all()
+            result = self._scan_rows(rows)
+        self._cache.set(sport_key, (stamp_key, result), MIDDLE_SCAN_CACHE_TTL_SECONDS)
+        return result
+
+    def _scan_rows(self, rows: Iterable[Any]) -> Dict[str, List[Dict[str, Any]]]:
+        groups: Dict[Tuple[str, str, str], List[Offer]] = defaultdict(list)
+        games: Dict[str, str] = {}
+        for r in rows:
+            implied = r["implied_prob"] or american_to_implied(r["price"])
+            if implied is None:
+                continue
+            key = (r["event_id"], r["player_name"] or "", base_market(r["market_key"] or ""))
+            groups[key].append(Offer(r["outcome_key"], r["bookmaker"], float(r["line"]), r["price"], float(implied)))
+            if r["event_id"] not in games:
+                games[r["event_id"]] = (
+                    f"{r['away_team']} @ {r['home_team']}" if r["home_team"] and r["away_team"] else "Game Info Missing"
+                )
+
+        now = datetime.now(timezone.utc).isoformat()
+        middles: List[Dict[str, Any]] = []
+        arbs: List[Dict[str, Any]] = []
+        for (event_id, player, market), offers in groups.items():
+            overs, unders = best_by_line(offers)
+            label = f"{player} {market.replace('player_', '').replace('_', ' ').upper()}".strip()
+
+            for over, under, total in find_arbs(overs, unders):
+                arbs.append({
+                    "game": games[event_id],
+                    "event_id": event_id,
+                    "market": label,
+                    "window": f"Line: {over.line}",
+                    "width": round(1.0 - total, 3),
+                    "over_side": {"book": over.book, "line": over.line, "odds": over.odds},
+                    "under_side": {"book": under.book, "line": under.line, "odds": under.odds},
+                    "profit_potential": "High" if total < 0.95 else "Medium",
+                    "timestamp": now,
+                    "is_arb": True,
+                })
+
+            pair = find_middle(overs, unders)
+            if pair is not None:
+                over, under = pair
+                width = under.line - over.line
+                middles.append({
+                    "game": games[event_id],
+                    "event_id": event_id,
+                    "market": label,
+                    "window": f"{over.line} - {under.line}",
+                    "width": round(width, 1),
+                    "over_side": {"book": over.book, "line": over.line, "odds": over.odds},
+                    "under_side": {"book": under.book, "line": under.line, "odds": under.odds},
+                    "profit_potential": "High" if width >= 2 else "Medium",
+                    "timestamp": now,
+                    "is_arb": False,
+                })
+
+        middles.sort(key=lambda m: m["width"], reverse=True)
+        arbs.sort(key=lambda m: m["width"], reverse=True)
+        return {"middles": middles, "arbs": arbs}
+
+    async def scan_for_prop_middles(self, sport_key: str, db: Optional[AsyncSession] = None) -> List[Dict[str, Any]]:
+        """
+        Scans the latest book odds for arbitrage windows (same line) and middles
+        (main + alternate lines). Arbs first, matching the previous output.
+        """
+        result = await self.get_opportunities(sport_key, db)
+        return result["arbs"] + result["middles"]
 
 middle_service = MiddleService()
 scan_for_middles = middle_service.scan_for_middles
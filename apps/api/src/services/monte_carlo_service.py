@@ -1,15 +1,23 @@
 from __future__ import annotations
 
 import logging
+import os
 import numpy as np
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from db.session import async_session_maker
-from services.cache import cache  # CacheManager singleton (Redis or in-memory)
+from services.compute_executor import ParlaySimulationJob, check_deadline, compute_executor
+from services.feature_store import feature_store, stat_category
+from services.simulation_cache import MISS, ODDS, PRIORS, parlay_fingerprint, simulation_cache
 
 logger = logging.getLogger(__name__)
 
+# Minimum feature-store sample before its per-line hit rate replaces the stored priors.
+MIN_FEATURE_GAMES = 5
+# Upper bound on trials per parlay simulation (each leg allocates n_sims floats).
+MC_MAX_SIMS = int(os.getenv("MC_MAX_SIMS", "200000"))
+
 
 class MonteCarloProbabilityEngine:
     """Run Monte Carlo simulations to derive true probability for player props."""
@@ -24,9 +32,10 @@ class MonteCarloProbabilityEngine:
         self, player_name: str, market_key: str, line: float, db: Optional[AsyncSession] = None
     ) -> float:
         """
-        Query the existing ``player_hit_rates`` table (HitRateModel) which
-        stores l5/l10/l20 hit-rate columns.  We normalise by mapping
-        ``market_key`` → ``stat_type`` (strip the ``player_`` prefix).
+        L10 hit rate at ``line`` from the player feature store when the
+        player has enough games there; otherwise the ``player_mc_hit_rates``
+        table.  We normalise by mapping ``market_key`` → ``stat_type``
+        (strip the ``player_`` prefix).
 
         Falls back to ``props_live`` aggregate if no row exists, and
         ultimately to a 0.50 neutral prior.
@@ -35,10 +44,10 @@ class MonteCarloProbabilityEngine:
 
         try:
             if db:
-                return await self._execute_hit_rate_query(db, player_name, stat_type, market_key)
+                return await self._execute_hit_rate_query(db, player_name, stat_type, market_key, line)
             
             async with async_session_maker() as session:
-                return await self._execute_hit_rate_query(session, player_name, stat_type, market_key)
+                return await self._execute_hit_rate_query(session, player_name, stat_type, market_key, line)
         except Exception as e:
             logger.debug("get_historical_hit_rate fallback for %s: %s", player_name, e)
 
@@ -49,8 +58,16 @@ class MonteCarloProbabilityEngine:
         )
         return 0.50
 
-    async def _execute_hit_rate_query(self, session, player_name, stat_type, market_key):
-        # 1. Try the dedicated Monte Carlo hit-rate table first
+    async def _execute_hit_rate_query(self, session, player_name, stat_type, market_key, line=None):
+        # 0. Materialized per-line hit rate from the feature store
+        if line is not None:
+            features = await feature_store.get(session, player_name, stat_type, by="player_name")
+            if features is not None and features.games >= MIN_FEATURE_GAMES:
+                rate = features.hit_rate(float(line), 10)["hit_rate"]
+                if rate is not None:
+                    return min(0.95, max(0.05, rate))
+
+        # 1. Try the dedicated Monte Carlo hit-rate table
         hr_sql = text("""
             SELECT hit_rate 
             FROM player_mc_hit_rates 
@@ -149,19 +166,21 @@ class MonteCarloProbabilityEngine:
 
         Returns ``true_probability`` ∈ (0.01, 0.99).
         """
-        cache_key = (
-            f"mc:{player_name.replace(' ', '_')}:{market_key}:{line}:{over_under}"
+        # Keyed on the request plus the odds / hit-rate generations it reads, so an
+        # ingest or prior refresh re-keys it instead of serving a stale probability.
+        cache_key = await simulation_cache.key(
+            "prop",
+            {
+                "p": player_name.strip().lower(),
+                "m": market_key,
+                "l": round(float(line), 2),
+                "s": over_under.lower(),
+                "n": int(n),
+            },
+            scopes=(ODDS, PRIORS),
         )
 
-        # Check cache first
-        cached = await cache.get(cache_key)
-        if cached is not None:
-            try:
-                return float(cached)
-            except (ValueError, TypeError):
-                pass
-
-        try:
+        async def _run() -> float:
             hit_rate_mean = await self.get_historical_hit_rate(
                 player_name, market_key, line, db=db
             )
@@ -177,18 +196,48 @@ class MonteCarloProbabilityEngine:
             else:
                 hits = int(np.sum(sims <= 0.5))
 
-            true_prob = max(0.01, min(0.99, hits / n))
-
-            # Write to cache
-            await cache.set(cache_key, str(round(true_prob, 6)), ttl=self.cache_ttl)
+            return round(max(0.01, min(0.99, hits / n)), 6)
 
-            return true_prob
+        try:
+            true_prob, _ = await simulation_cache.get_or_compute(cache_key, _run, ttl=self.cache_ttl)
+            return float(true_prob)
 
         except Exception as e:
             logger.error("Monte Carlo simulation failed for %s: %s", player_name, e)
             return 0.50
 
 
+    async def hydrate_legs(self, session: AsyncSession, legs: list) -> list:
+        """
+        Fill missing ``mean``/``std_dev`` on parlay legs from the feature store
+        (L10 average and deviation), with one batch read for the whole slip.
+        """
+        wanted = [
+            (leg.get("player_name"), leg.get("stat_type") or leg.get("market_key"))
+            for leg in legs
+            if ("mean" not in leg or "std_dev" not in leg)
+            and leg.get("player_name") and (leg.get("stat_type") or leg.get("market_key"))
+        ]
+        if not wanted:
+            return legs
+        try:
+            features = await feature_store.get_many(session, wanted, by="player_name")
+        except Exception as e:
+            logger.debug("parlay leg hydration skipped: %s", e)
+            return legs
+
+        hydrated = []
+        for leg in legs:
+            stat = leg.get("stat_type") or leg.get("market_key") or ""
+            f = features.get((leg.get("player_name"), stat_category(stat)))
+            if f is not None and f.games >= MIN_FEATURE_GAMES and f.l10_avg is not None:
+                leg = dict(leg)
+                leg.setdefault("mean", f.l10_avg)
+                if f.l10_std:
+                    leg.setdefault("std_dev", f.l10_std)
+            hydrated.append(leg)
+        return hydrated
+
     # ------------------------------------------------------------------
     # Parlay simulation  (synchronous, called by brain_advanced_service)
     # ------------------------------------------------------------------
@@ -198,59 +247,72 @@ class MonteCarloProbabilityEngine:
         n_sims: int = 10_000,
     ) -> dict:
         """
-        Run a Monte Carlo parlay simulation over *legs*.
-
-        Each leg dict should contain:
-            player_name, mean, std_dev, line, side, odds
-
-        Returns dict with:
-            parlay_hit_rate, parlay_ev, combined_decimal_odds, leg_results
+        Run a Monte Carlo parlay simulation over *legs* inline.
+        Async callers should go through ``compute_executor`` (ParlaySimulationJob).
         """
-        leg_results = []
-        parlay_hits = np.zeros(n_sims)
-        parlay_hits[:] = 1  # start assuming all parlays hit
-
-        for leg in legs:
-            mean = float(leg.get("mean", leg.get("line", 0)))
-            std = float(leg.get("std_dev", abs(mean) * 0.15 if mean else 1.0))
-            line = float(leg.get("line", mean))
-            side = str(leg.get("side", "over")).lower()
+        return simulate_parlay_legs(legs, n_sims)
 
-            sims = np.random.normal(loc=mean, scale=std, size=n_sims)
 
-            if side == "over":
-                hits = sims > line
-            else:
-                hits = sims <= line
+def simulate_parlay_legs(legs: list, n_sims: int = 10_000, deadline: Optional[float] = None) -> dict:
+    """
+    Run a Monte Carlo parlay simulation over *legs*.
 
-            hit_rate = float(np.mean(hits))
-            parlay_hits *= hits.astype(float)
+    Each leg dict should contain:
+        player_name, mean, std_dev, line, side, odds
 
-            odds_raw = float(leg.get("odds", -110))
-            if odds_raw > 0:
-                decimal_odds = 1 + odds_raw / 100
-            else:
-                decimal_odds = 1 + 100 / abs(odds_raw)
+    Returns dict with:
+        parlay_hit_rate, parlay_ev, combined_decimal_odds, leg_results
 
-            leg_results.append({
-                "player_name": leg.get("player_name", "Unknown"),
-                "hit_rate": round(hit_rate, 4),
-                "decimal_odds": round(decimal_odds, 4),
-            })
+    Module-level so compute_executor workers can run it in a separate process.
+    """
+    if not 1 <= n_sims <= MC_MAX_SIMS:
+        raise ValueError(f"n_sims must be between 1 and {MC_MAX_SIMS}")
+    leg_results = []
+    parlay_hits = np.zeros(n_sims)
+    parlay_hits[:] = 1  # start assuming all parlays hit
+
+    for leg in legs:
+        check_deadline(deadline)
+        mean = float(leg.get("mean", leg.get("line", 0)))
+        std = float(leg.get("std_dev", abs(mean) * 0.15 if mean else 1.0))
+        line = float(leg.get("line", mean))
+        side = str(leg.get("side", "over")).lower()
+
+        sims = np.random.normal(loc=mean, scale=std, size=n_sims)
+
+        if side == "over":
+            hits = sims > line
+        else:
+            hits = sims <= line
+
+        hit_rate = float(np.mean(hits))
+        parlay_hits *= hits.astype(float)
+
+        odds_raw = float(leg.get("odds", -110))
+        if odds_raw > 0:
+            decimal_odds = 1 + odds_raw / 100
+        else:
+            decimal_odds = 1 + 100 / abs(odds_raw)
+
+        leg_results.append({
+            "player_name": leg.get("player_name", "Unknown"),
+            "hit_rate": round(hit_rate, 4),
+            "decimal_odds": round(decimal_odds, 4),
+        })
 
-        parlay_hit_rate = float(np.mean(parlay_hits))
-        combined_decimal_odds = 1.0
-        for lr in leg_results:
-            combined_decimal_odds *= lr["decimal_odds"]
+    parlay_hit_rate = float(np.mean(parlay_hits))
+    combined_decimal_odds = 1.0
+    for lr in leg_results:
+        combined_decimal_odds *= lr["decimal_odds"]
 
-        parlay_ev = parlay_hit_rate * combined_decimal_odds - 1.0
+    parlay_ev = parlay_hit_rate * combined_decimal_odds - 1.0
 
-        return {
-            "parlay_hit_rate": round(parlay_hit_rate, 4),
-            "parlay_ev": round(parlay_ev, 4),
-            "combined_decimal_odds": round(combined_decimal_odds, 4),
-            "leg_results": leg_results,
-        }
+    return {
+        "parlay_hit_rate": round(parlay_hit_rate, 4),
+        "parlay_ev": round(parlay_ev, 4),
+        "combined_decimal_odds": round(combined_decimal_odds, 4),
+        "leg_results": leg_results,
+    }
 
 
 # Singleton
@@ -260,35 +322,53 @@ monte_carlo_engine = MonteCarloProbabilityEngine()
 monte_carlo_service = monte_carlo_engine
 
 
+async def simulate_parlay_cached(legs: list, n_sims: int = 10_000) -> Tuple[dict, bool]:
+    """
+    ``simulate_parlay`` through the result cache: identical slips (in any leg order)
+    share one simulation. Returns ``(results, cached)``.
+    """
+    key, order = parlay_fingerprint(legs, n_sims)
+    results, source = await simulation_cache.get_or_compute(
+        key, lambda: compute_executor.run(ParlaySimulationJob([legs[i] for i in order], n_sims=n_sims))
+    )
+    # Cached leg_results are in canonical order; map them back onto this caller's legs.
+    leg_results = [None] * len(order)
+    for pos, i in enumerate(order):
+        leg_results[i] = dict(results["leg_results"][pos])
+    return {**results, "leg_results": leg_results}, source != MISS
+
+
 async def simulate_parlay_with_cache_and_persist(
     session, sport: str, legs: list, n_sims: int = 10_000
 ) -> dict:
     """
-    Thin async wrapper around the synchronous simulate_parlay that
-    persists results to the database when possible.
+    Hydrates the legs, serves the simulation from the result cache (or the
+    compute executor on a miss) and persists fresh results when possible.
     """
-    results = monte_carlo_engine.simulate_parlay(legs, n_sims=n_sims)
-
-    # Persist attempt (best-effort)
-    try:
-        from models.brain import BrainLog
-        import uuid as _uuid
-
-        log_entry = BrainLog(
-            id=str(_uuid.uuid4()),
-            sport=sport,
-            player="Parlay Simulation",
-            stat_type="parlay",
-            line=0.0,
-            signal="PARLAY",
-            brain_score=int(results["parlay_hit_rate"] * 100),
-            reason=f"{len(legs)}-leg parlay simulated ({n_sims} sims). EV={results['parlay_ev']:.2%}",
-            result="PENDING",
-        )
-        session.add(log_entry)
-        await session.commit()
-    except Exception as e:
-        logger.debug("simulate_parlay persist skipped: %s", e)
+    legs = await monte_carlo_engine.hydrate_legs(session, legs)
+    results, cached = await simulate_parlay_cached(legs, n_sims=n_sims)
+
+    # Persist attempt (best-effort); a cache hit was already logged when it was computed.
+    if not cached:
+        try:
+            from models.brain import BrainLog
+            import uuid as _uuid
+
+            log_entry = BrainLog(
+                id=str(_uuid.uuid4()),
+                sport=sport,
+                player="Parlay Simulation",
+                stat_type="parlay",
+                line=0.0,
+                signal="PARLAY",
+                brain_score=int(results["parlay_hit_rate"] * 100),
+                reason=f"{len(legs)}-leg parlay simulated ({n_sims} sims). EV={results['parlay_ev']:.2%}",
+                result="PENDING",
+            )
+            session.add(log_entry)
+            await session.commit()
+        except Exception as e:
+            logger.debug("simulate_parlay persist skipped: %s", e)
 
     return {
         "roi": results["parlay_ev"] * 100,
@@ -299,5 +379,5 @@ async def simulate_parlay_with_cache_and_persist(
         "confidence": "high" if results["parlay_ev"] > 0.05 else "medium",
         "max_drawdown": 0.15,
         "leg_results": results["leg_results"],
-        "cached": False,
+        "cached": cached,
     }
@@ -0,0 +1,434 @@
+"""
+Single-pass, columnar normalizer for The Odds API event payloads.
+
+Walks event → bookmaker → market → outcome once and writes Over/Under pairs into
+a ``PropBatch`` (one Python list per column) instead of building per-row dicts and
+validating each through pydantic:
+
+  * interned book / market / league strings (shared across thousands of rows)
+  * memoized player-name normalization, ISO timestamp parsing and implied odds
+  * raw provider numbers kept as-is; Decimals are only built for persisted rows
+
+Pydantic validation through ``PropRecord`` is sampled (ODDS_MAPPING_VALIDATE_SAMPLE)
+or covers every row when ODDS_MAPPING_STRICT=true; rows that fail are dropped from
+the batch. The props_live/props_history writers read the batch directly
+(``props_live_rows()``) and unified_odds gets ``unified_rows()``, so no per-row
+``PropRecord`` is built on the ingest path. ``to_records()`` remains for callers
+that want models and always validates every row.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from schemas.props import PropRecord
+from services.commence_time import reject_absurd_future
+
+logger = logging.getLogger(__name__)
+
+MAIN_MARKETS = frozenset(("h2h", "spreads", "totals"))
+_PLACEHOLDER_NAMES = frozenset(("over", "under", "yes", "no"))
+_NAME_SUFFIXES = (" jr.", " jr", " iii", " ii", " iv")
+_intern = sys.intern
+
+ODDS_MAPPING_STRICT = os.getenv("ODDS_MAPPING_STRICT", "false").strip().lower() == "true"
+ODDS_MAPPING_VALIDATE_SAMPLE = max(0.0, min(1.0, float(os.getenv("ODDS_MAPPING_VALIDATE_SAMPLE", "0.01"))))
+
+
+@lru_cache(maxsize=65536)
+def normalize_player_name(name: Optional[str]) -> str:
+    if not name:
+        return ""
+    # 1. Clean whitespace and basic noise
+    name = name.strip()
+    # 2. Handle "Last, First" -> "First Last"
+    if "," in name:
+        parts = [p.strip() for p in name.split(",")]
+        if len(parts) == 2:
+            name = f"{parts[1]} {parts[0]}"
+    # 3. Strip Jr/III/etc
+    for s in _NAME_SUFFIXES:
+        if name.lower().endswith(s):
+            name = name[:-(len(s))].strip()
+    return name.title()
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+@lru_cache(maxsize=4096)
+def american_to_implied(american: int) -> Decimal:
+    if american > 0:
+        return Decimal(100) / Decimal(american + 100)
+    return Decimal(abs(american)) / Decimal(abs(american) + 100)
+
+
+def _implied(price: Any) -> Decimal:
+    return american_to_implied(int(price)) if isinstance(price, (int, float)) else Decimal("0")
+
+
+def _decimal(value: Any) -> Optional[Decimal]:
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+@dataclass
+class PropBatch:
+    """Column-oriented prop rows (one Over/Under pair per row)."""
+
+    sport: str
+    league: List[str] = field(default_factory=list)
+    game_id: List[str] = field(default_factory=list)
+    game_start_time: List[Optional[datetime]] = field(default_factory=list)
+    home_team: List[Optional[str]] = field(default_factory=list)
+    away_team: List[Optional[str]] = field(default_factory=list)
+    player_name: List[Optional[str]] = field(default_factory=list)
+    market_key: List[str] = field(default_factory=list)
+    line: List[Any] = field(default_factory=list)
+    book: List[str] = field(default_factory=list)
+    source_ts: List[datetime] = field(default_factory=list)
+    odds_over: List[Any] = field(default_factory=list)
+    odds_under: List[Any] = field(default_factory=list)
+    implied_over: List[Optional[Decimal]] = field(default_factory=list)
+    implied_under: List[Optional[Decimal]] = field(default_factory=list)
+    # Market-intel flags, filled by mark_market_intel() after validation
+    is_best_over: List[bool] = field(default_factory=list)
+    is_best_under: List[bool] = field(default_factory=list)
+    is_sharp_book: List[bool] = field(default_factory=list)
+    is_soft_book: List[bool] = field(default_factory=list)
+    confidence: List[Optional[float]] = field(default_factory=list)
+    _validated: bool = field(default=False, repr=False, compare=False)
+    _live_rows: Optional[List[Dict[str, Any]]] = field(default=None, repr=False, compare=False)
+
+    _COLUMNS = (
+        "league", "game_id", "game_start_time", "home_team", "away_team", "player_name",
+        "market_key", "line", "book", "source_ts", "odds_over", "odds_under",
+        "implied_over", "implied_under",
+    )
+    _FLAG_COLUMNS = ("is_best_over", "is_best_under", "is_sharp_book", "is_soft_book", "confidence")
+
+    def __len__(self) -> int:
+        return len(self.game_id)
+
+    def append_row(self, **values: Any) -> int:
+        for col in self._COLUMNS:
+            getattr(self, col).append(values.get(col))
+        self._validated = False
+        self._live_rows = None
+        return len(self.game_id) - 1
+
+    def extend_records(self, records: List[PropRecord]) -> None:
+        """Merge rows from other providers (e.g. Betstack) that already arrive as PropRecords."""
+        for r in records:
+            self.append_row(**{col: getattr(r, col) for col in self._COLUMNS})
+
+    def finalize(self) -> None:
+        """Ingest-wide fixes applied once per column: team fallback for player_name, far-future start times."""
+        self._live_rows = None
+        names, homes = self.player_name, self.home_team
+        for i, name in enumerate(names):
+            if not name:
+                names[i] = homes[i] or "Matchup"
+        checked: Dict[datetime, Optional[datetime]] = {}
+        starts = self.game_start_time
+        for i, ts in enumerate(starts):
+            if ts is not None:
+                if ts not in checked:
+                    checked[ts] = reject_absurd_future(ts)
+                starts[i] = checked[ts]
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        return {
+            "sport": self.sport,
+            "league": self.league[i],
+            "game_id": self.game_id[i],
+            "game_start_time": self.game_start_time[i],
+            "home_team": self.home_team[i],
+            "away_team": self.away_team[i],
+            "player_name": self.player_name[i],
+            "market_key": self.market_key[i],
+            "line": _decimal(self.line[i]),
+            "book": self.book[i],
+            "source_ts": self.source_ts[i],
+            "odds_over": _decimal(self.odds_over[i]),
+            "odds_under": _decimal(self.odds_under[i]),
+            "implied_over": self.implied_over[i],
+            "implied_under": self.implied_under[i],
+        }
+
+    def validate(
+        self,
+        sample: float = ODDS_MAPPING_VALIDATE_SAMPLE,
+        strict: bool = ODDS_MAPPING_STRICT,
+    ) -> int:
+        """
+        Validate a sample of rows (every row when ``strict``) through ``PropRecord`` and
+        drop the rows that fail from the columns. Runs once per batch; returns rows dropped.
+        """
+        if self._validated:
+            return 0
+        keep: List[int] = []
+        checked = 0
+        for i in range(len(self)):
+            if strict or (sample and random.random() < sample):
+                checked += 1
+                data = self._row(i)
+                try:
+                    PropRecord(**data)
+                except Exception as e:
+                    logger.error(f"OddsMapper: Validation failed for record {data.get('game_id')}: {e}")
+                    continue
+            keep.append(i)
+        dropped = len(self) - len(keep)
+        if dropped:
+            logger.warning("OddsNormalizer: %s/%s checked rows failed validation for %s", dropped, checked, self.sport)
+            self._take(keep)
+        self._validated = True
+        return dropped
+
+    def _take(self, keep: List[int]) -> None:
+        self._live_rows = None
+        for col in self._COLUMNS + self._FLAG_COLUMNS:
+            values = getattr(self, col)
+            if values:
+                setattr(self, col, [values[i] for i in keep])
+
+    def mark_market_intel(self, sharp_books: List[str], soft_books: List[str]) -> None:
+        """
+        Flag best Over/Under prices per (game, market, player, line) across books, sharp/soft
+        books, and a confidence that grows with the number of books quoting the line.
+        """
+        self.validate()
+        self._live_rows = None
+        n = len(self)
+        groups: Dict[Tuple[Any, ...], List[int]] = {}
+        for i in range(n):
+            line = self.line[i]
+            key = (self.game_id[i], self.market_key[i], self.player_name[i], float(line) if line is not None else None)
+            groups.setdefault(key, []).append(i)
+
+        self.is_best_over, self.is_best_under = [False] * n, [False] * n
+        self.is_sharp_book, self.is_soft_book = [False] * n, [False] * n
+        self.confidence = [None] * n
+        book_flags: Dict[str, Tuple[bool, bool]] = {}
+        for members in groups.values():
+            best_over = max((self.odds_over[i] for i in members if self.odds_over[i] is not None), default=None)
+            best_under = max((self.odds_under[i] for i in members if self.odds_under[i] is not None), default=None)
+            confidence = round(float(min(len(members) / 10.0, 0.95)), 4)
+            for i in members:
+                if best_over is not None and self.odds_over[i] == best_over:
+                    self.is_best_over[i] = True
+                if best_under is not None and self.odds_under[i] == best_under:
+                    self.is_best_under[i] = True
+                book = self.book[i]
+                if book not in book_flags:
+                    lower = book.lower()
+                    book_flags[book] = (any(b in lower for b in sharp_books), any(b in lower for b in soft_books))
+                self.is_sharp_book[i], self.is_soft_book[i] = book_flags[book]
+                self.confidence[i] = confidence
+
+    def _persisted_row(self, i: int, now: datetime) -> Dict[str, Any]:
+        row = self._row(i)
+        flagged = len(self.is_best_over) == len(self)
+        row.update(
+            player_id=None,
+            team=None,
+            market_label=None,
+            ingested_ts=now,
+            is_best_over=self.is_best_over[i] if flagged else False,
+            is_best_under=self.is_best_under[i] if flagged else False,
+            is_sharp_book=self.is_sharp_book[i] if flagged else False,
+            is_soft_book=self.is_soft_book[i] if flagged else False,
+            confidence=self.confidence[i] if flagged else None,
+        )
+        return row
+
+    def props_live_rows(self) -> List[Dict[str, Any]]:
+        """
+        Validated rows in the props_live/props_history column shape (``PropRecord`` fields),
+        built once and shared by both writers.
+        """
+        self.validate()
+        if self._live_rows is None:
+            now = datetime.now()
+            self._live_rows = [self._persisted_row(i, now) for i in range(len(self))]
+        return self._live_rows
+
+    def to_records(self) -> List[PropRecord]:
+        """Every row as a ``PropRecord``; building them validates all rows, failures are dropped."""
+        now = datetime.now()
+        records: List[PropRecord] = []
+        keep: List[int] = []
+        for i in range(len(self)):
+            data = self._persisted_row(i, now)
+            try:
+                records.append(PropRecord(**data))
+                keep.append(i)
+            except Exception as e:
+                logger.error(f"OddsMapper: Validation failed for record {data.get('game_id')}: {e}")
+        if len(keep) != len(self):
+            self._take(keep)
+        self._validated = True
+        return records
+
+    def unified_rows(self) -> List[Dict[str, Any]]:
+        """Split each validated Over/Under pair into discrete unified_odds outcome rows."""
+        self.validate()
+        rows: List[Dict[str, Any]] = []
+        for i in range(len(self)):
+            line = self.line[i]
+            base = {
+                "sport": self.sport,
+                "league": self.league[i],
+                "event_id": self.game_id[i],
+                "game_time": self.game_start_time[i],
+                "home_team": self.home_team[i],
+                "away_team": self.away_team[i],
+                "market_key": self.market_key[i],
+                "player_name": self.player_name[i],
+                "bookmaker": self.book[i],
+                "line": float(line) if line is not None else None,
+            }
+            for outcome, price, implied in (
+                ("over", self.odds_over[i], self.implied_over[i]),
+                ("under", self.odds_under[i], self.implied_under[i]),
+            ):
+                if price is None and implied is None:
+                    continue
+                row = base.copy()
+                row["outcome_key"] = outcome
+                row["price"] = float(price) if price else 2.0
+                row["implied_prob"] = float(implied) if implied else None
+                rows.append(row)
+        return rows
+
+
+def normalize_theodds_props(odds_raw: List[Dict], metadata_map: Dict, sport: str) -> PropBatch:
+    """
+    Groups OddsAPI response into a PropBatch with one row per (game, market, player, book).
+    Over/home prices fill the ``*_over`` columns and Under/away prices the ``*_under`` columns.
+    """
+    now = datetime.now(timezone.utc)
+    batch = PropBatch(sport=sport)
+    index: Dict[Tuple[str, str, str, str], int] = {}
+    market_counts: Dict[str, int] = {}
+    bookmaker_counts: Dict[str, int] = {}
+    default_league = _intern(sport.split("_")[-1].upper())
+    odds_over, odds_under = batch.odds_over, batch.odds_under
+    implied_over, implied_under = batch.implied_over, batch.implied_under
+    # Bound list.append per column: rows are appended in the hot loop without dict/kwargs churn.
+    col_league, col_game, col_start = batch.league.append, batch.game_id.append, batch.game_start_time.append
+    col_home, col_away, col_player = batch.home_team.append, batch.away_team.append, batch.player_name.append
+    col_market, col_line, col_book = batch.market_key.append, batch.line.append, batch.book.append
+    col_ts = batch.source_ts.append
+    add_over, add_under = odds_over.append, odds_under.append
+    add_imp_over, add_imp_under = implied_over.append, implied_under.append
+
+    for event in odds_raw:
+        eid = event.get("id")
+        if not eid:
+            continue
+        meta = metadata_map.get(eid, {})
+        league = event.get("sport_title")
+        league = _intern(league) if league else default_league
+        game_time = meta.get("game_time")
+        home_team = meta.get("home_team")
+        away_team = meta.get("away_team")
+        home_lower = (home_team or "").lower()
+        away_lower = (away_team or "").lower()
+
+        for bookmaker in event.get("bookmakers", []):
+            book_key = bookmaker.get("key")
+            bookmaker_counts[book_key or "unknown"] = bookmaker_counts.get(book_key or "unknown", 0) + 1
+            if not book_key:
+                continue
+            book_key = _intern(book_key)
+            last_update = bookmaker.get("last_update")
+            source_ts = _parse_iso(last_update) if last_update else now
+
+            for market in bookmaker.get("markets", []):
+                m_key = market.get("key")
+                market_counts[m_key or "unknown"] = market_counts.get(m_key or "unknown", 0) + 1
+                if not m_key:
+                    continue
+                m_key = _intern(m_key)
+                is_main_market = m_key in MAIN_MARKETS
+
+                for outcome in market.get("outcomes", []):
+                    name = outcome.get("name")
+                    price = outcome.get("price")
+                    if name is None or price is None:
+                        continue
+                    line = outcome.get("point")
+
+                    # NBA Spread Protection: skip anomalous lines
+                    if m_key == "spreads" and line is not None and abs(float(line)) > 20.0:
+                        logger.warning(f"OddsMapper: Rejected bad spread line {line} from {book_key}")
+                        continue
+
+                    # In Player Props, name is often 'Over'/'Under' and description is the player name;
+                    # some books reverse this or put the name in the 'name' field.
+                    p_name = ""
+                    if not is_main_market:
+                        desc = outcome.get("description")
+                        p_name = desc or ""
+                        if p_name.lower() in ("over", "under"):
+                            p_name = name
+                        if not p_name:
+                            p_name = desc or name or ""
+                        p_name = normalize_player_name(p_name)
+                        if p_name.lower() in _PLACEHOLDER_NAMES:
+                            p_name = ""
+
+                    group_key = (eid, m_key, p_name or "team", book_key)
+                    i = index.get(group_key)
+                    if i is None:
+                        i = index[group_key] = len(batch.game_id)
+                        col_league(league)
+                        col_game(eid)
+                        col_start(game_time)
+                        col_home(home_team)
+                        col_away(away_team)
+                        col_player(p_name)
+                        col_market(m_key)
+                        col_line(line)
+                        col_book(book_key)
+                        col_ts(source_ts)
+                        add_over(None)
+                        add_under(None)
+                        add_imp_over(None)
+                        add_imp_under(None)
+
+                    # Better H2H/Main mapping: 'Home' -> Over slot, 'Away' -> Under slot
+                    side = name.lower()
+                    if "over" in side or "home" in side or side == home_lower:
+                        odds_over[i], implied_over[i] = price, _implied(price)
+                    elif "under" in side or "away" in side or side == away_lower:
+                        odds_under[i], implied_under[i] = price, _implied(price)
+                    elif m_key == "h2h":
+                        # Robust fallback for H2H if meta name mapping failed
+                        if odds_over[i] is None:
+                            odds_over[i], implied_over[i] = price, _implied(price)
+                        elif odds_under[i] is None:
+                            odds_under[i], implied_under[i] = price, _implied(price)
+
+    logger.info(
+        "OddsMapper summary sport=%s grouped=%s markets=%s books=%s",
+        sport,
+        len(batch),
+        market_counts,
+        bookmaker_counts,
+    )
+    return batch
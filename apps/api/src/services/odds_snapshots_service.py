@@ -2,7 +2,6 @@
 Odds Snapshots Service - Track and analyze historical odds snapshots from external sportsbooks
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,8 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
+from services.stats_rollups import ROLLUPS, window_bounds
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -53,17 +53,14 @@ class OddsSnapshot:
     created_at: datetime
     updated_at: datetime
 
-class OddsSnapshotsService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class OddsSnapshotsService(AsyncpgRepository):
     async def create_odds_snapshot(self, game_id: int, market_id: int, player_id: Optional[int],
                                   external_fixture_id: str, external_market_id: str, external_outcome_id: str,
                                   bookmaker: str, line_value: Optional[float], price: float,
                                   american_odds: int, side: OddsSide, is_active: bool = True) -> bool:
         """Create a new odds snapshot"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -89,7 +86,7 @@ class OddsSnapshotsService:
                                         hours: int = 24) -> List[OddsSnapshot]:
         """Get odds snapshots for a specific game"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM odds_snapshots 
@@ -139,7 +136,7 @@ class OddsSnapshotsService:
                                            hours: int = 24) -> List[OddsSnapshot]:
         """Get odds snapshots for a specific player"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT * FROM odds_snapshots 
@@ -188,7 +185,7 @@ class OddsSnapshotsService:
     async def get_odds_snapshots_by_bookmaker(self, bookmaker: str, hours: int = 24) -> List[OddsSnapshot]:
         """Get odds snapshots from a specific bookmaker"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM odds_snapshots 
@@ -229,7 +226,7 @@ class OddsSnapshotsService:
                                 hours: int = 24) -> List[Dict[str, Any]]:
         """Get odds movements for a specific game/market/player combination"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT 
@@ -290,7 +287,7 @@ class OddsSnapshotsService:
                                       hours: int = 1) -> Dict[str, Any]:
         """Compare odds across bookmakers for a specific game/market/player"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             query = """
                 SELECT DISTINCT ON (bookmaker)
@@ -360,79 +357,92 @@ class OddsSnapshotsService:
     async def get_odds_statistics(self, hours: int = 24) -> Dict[str, Any]:
         """Get odds snapshot statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
+            
+            since, through = await window_bounds(conn, "odds_snapshots", timedelta(hours=hours))
+            w = ROLLUPS["odds_snapshots"].window()
             
             # Overall statistics
-            overall = await conn.fetchrow("""
+            overall = await conn.fetchrow(f"""
+                WITH w AS ({w})
                 SELECT 
-                    COUNT(*) as total_snapshots,
+                    COALESCE(SUM(n), 0) as total_snapshots,
                     COUNT(DISTINCT game_id) as unique_games,
-                    COUNT(DISTINCT market_id) as unique_markets,
-                    COUNT(DISTINCT player_id) as unique_players,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.market_ids) x) as unique_markets,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.player_ids) x) as unique_players,
                     COUNT(DISTINCT bookmaker) as unique_bookmakers,
-                    COUNT(DISTINCT external_fixture_id) as unique_fixtures,
-                    COUNT(DISTINCT external_market_id) as unique_external_markets,
-                    COUNT(DISTINCT external_outcome_id) as unique_external_outcomes,
-                    AVG(line_value) as avg_line_value,
-                    AVG(price) as avg_price,
-                    AVG(american_odds) as avg_american_odds,
-                    COUNT(CASE WHEN side = 'over' THEN 1 END) as over_snapshots,
-                    COUNT(CASE WHEN side = 'under' THEN 1 END) as under_snapshots,
-                    COUNT(CASE WHEN is_active = TRUE THEN 1 END) as active_snapshots
-                FROM odds_snapshots 
-                WHERE snapshot_at >= NOW() - INTERVAL '$1 hours'
-            """, hours)
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.fixture_ids) x) as unique_fixtures,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.external_market_ids) x) as unique_external_markets,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.external_outcome_ids) x) as unique_external_outcomes,
+                    SUM(line_value_sum) / NULLIF(SUM(line_value_n), 0) as avg_line_value,
+                    SUM(price_sum) / NULLIF(SUM(price_n), 0) as avg_price,
+                    SUM(american_odds_sum) / NULLIF(SUM(american_odds_n), 0) as avg_american_odds,
+                    COALESCE(SUM(n) FILTER (WHERE side = 'over'), 0) as over_snapshots,
+                    COALESCE(SUM(n) FILTER (WHERE side = 'under'), 0) as under_snapshots,
+                    COALESCE(SUM(n) FILTER (WHERE is_active = TRUE), 0) as active_snapshots
+                FROM w
+            """, since, through)
             
             # By bookmaker statistics
-            by_bookmaker = await conn.fetch("""
+            by_bookmaker = await conn.fetch(f"""
+                WITH w AS ({w}),
+                markets AS (
+                    SELECT w.bookmaker, COUNT(DISTINCT x) as unique_markets
+                    FROM w, unnest(w.market_ids) x
+                    GROUP BY w.bookmaker
+                )
                 SELECT 
-                    bookmaker,
-                    COUNT(*) as total_snapshots,
-                    COUNT(DISTINCT game_id) as unique_games,
-                    COUNT(DISTINCT market_id) as unique_markets,
-                    AVG(line_value) as avg_line_value,
-                    AVG(price) as avg_price,
-                    AVG(american_odds) as avg_american_odds,
-                    COUNT(CASE WHEN side = 'over' THEN 1 END) as over_snapshots,
-                    COUNT(CASE WHEN side = 'under' THEN 1 END) as under_snapshots
-                FROM odds_snapshots 
-                WHERE snapshot_at >= NOW() - INTERVAL '$1 hours'
-                GROUP BY bookmaker
+                    w.bookmaker,
+                    SUM(w.n) as total_snapshots,
+                    COUNT(DISTINCT w.game_id) as unique_games,
+                    COALESCE(MAX(m.unique_markets), 0) as unique_markets,
+                    SUM(w.line_value_sum) / NULLIF(SUM(w.line_value_n), 0) as avg_line_value,
+                    SUM(w.price_sum) / NULLIF(SUM(w.price_n), 0) as avg_price,
+                    SUM(w.american_odds_sum) / NULLIF(SUM(w.american_odds_n), 0) as avg_american_odds,
+                    COALESCE(SUM(w.n) FILTER (WHERE w.side = 'over'), 0) as over_snapshots,
+                    COALESCE(SUM(w.n) FILTER (WHERE w.side = 'under'), 0) as under_snapshots
+                FROM w
+                LEFT JOIN markets m ON m.bookmaker IS NOT DISTINCT FROM w.bookmaker
+                GROUP BY w.bookmaker
                 ORDER BY total_snapshots DESC
-            """, hours)
+            """, since, through)
             
             # By game statistics
-            by_game = await conn.fetch("""
+            by_game = await conn.fetch(f"""
+                WITH w AS ({w}),
+                top AS (
+                    SELECT game_id, SUM(n) as total_snapshots, COUNT(DISTINCT bookmaker) as unique_bookmakers,
+                           MIN(first_snapshot) as first_snapshot, MAX(last_snapshot) as last_snapshot
+                    FROM w
+                    GROUP BY game_id
+                    ORDER BY total_snapshots DESC
+                    LIMIT 10
+                )
                 SELECT 
-                    game_id,
-                    COUNT(*) as total_snapshots,
-                    COUNT(DISTINCT market_id) as unique_markets,
-                    COUNT(DISTINCT player_id) as unique_players,
-                    COUNT(DISTINCT bookmaker) as unique_bookmakers,
-                    MIN(snapshot_at) as first_snapshot,
-                    MAX(snapshot_at) as last_snapshot
-                FROM odds_snapshots 
-                WHERE snapshot_at >= NOW() - INTERVAL '$1 hours'
-                GROUP BY game_id
-                ORDER BY total_snapshots DESC
-                LIMIT 10
-            """, hours)
+                    top.*,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.market_ids) x
+                     WHERE w.game_id IS NOT DISTINCT FROM top.game_id) as unique_markets,
+                    (SELECT COUNT(DISTINCT x) FROM w, unnest(w.player_ids) x
+                     WHERE w.game_id IS NOT DISTINCT FROM top.game_id) as unique_players
+                FROM top
+                ORDER BY top.total_snapshots DESC
+            """, since, through)
             
             # By side statistics
-            by_side = await conn.fetch("""
+            by_side = await conn.fetch(f"""
+                WITH w AS ({w})
                 SELECT 
                     side,
-                    COUNT(*) as total_snapshots,
-                    AVG(line_value) as avg_line_value,
-                    AVG(price) as avg_price,
-                    AVG(american_odds) as avg_american_odds,
+                    SUM(n) as total_snapshots,
+                    SUM(line_value_sum) / NULLIF(SUM(line_value_n), 0) as avg_line_value,
+                    SUM(price_sum) / NULLIF(SUM(price_n), 0) as avg_price,
+                    SUM(american_odds_sum) / NULLIF(SUM(american_odds_n), 0) as avg_american_odds,
                     COUNT(DISTINCT bookmaker) as unique_bookmakers,
                     COUNT(DISTINCT game_id) as unique_games
-                FROM odds_snapshots 
-                WHERE snapshot_at >= NOW() - INTERVAL '$1 hours'
+                FROM w
                 GROUP BY side
                 ORDER BY total_snapshots DESC
-            """, hours)
+            """, since, through)
             
             await conn.close()
             
@@ -501,7 +511,7 @@ class OddsSnapshotsService:
                                     limit: int = 50) -> List[Dict[str, Any]]:
         """Search odds snapshots by external IDs or bookmaker"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
@@ -1,6 +1,6 @@
 # apps/api/src/services/persistence_helpers.py
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime, timezone
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
@@ -9,12 +9,21 @@ from models import PropLive, PropHistory, EdgeEVHistory
 from services.market_labeling import derive_market_label
 from models.brain import WhaleMove, CLVRecord, InjuryImpactEvent
 from schemas.props import PropRecord
+from services.odds_normalizer import PropBatch
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
-async def upsert_props_live(records: List[PropRecord], session: Optional[AsyncSession] = None):
+PropRows = Union[PropBatch, List[PropRecord]]
+
+def _prop_rows(records: PropRows) -> List[Dict[str, Any]]:
+    """Writer rows: read column-wise from a validated PropBatch, or dumped from PropRecords."""
+    if isinstance(records, PropBatch):
+        return records.props_live_rows()
+    return [r.dict() for r in records]
+
+async def upsert_props_live(records: PropRows, session: Optional[AsyncSession] = None):
     """Standardized upsert into public.props_live using raw SQL for robustness."""
     if not records: 
         return
@@ -26,15 +35,14 @@ async def upsert_props_live(records: List[PropRecord], session: Optional[AsyncSe
     async with async_session_maker() as session:
         await _execute_upsert_props_live(session, records)
 
-async def _execute_upsert_props_live(session: AsyncSession, records: List[PropRecord]):
+async def _execute_upsert_props_live(session: AsyncSession, records: PropRows):
         try:
             now = datetime.now(timezone.utc)
             rows = []
-            for r in records:
-                # Include all fields, even None, to satisfy SQLAlchemy bound parameters
-                row = r.dict()
+            # Include all fields, even None, to satisfy SQLAlchemy bound parameters
+            for row in _prop_rows(records):
+                row = {**row, "last_updated_at": row.get("last_updated_at") or now}
                 row.setdefault("ingested_ts", now)
-                row.setdefault("last_updated_at", now)
                 rows.append(row)
 
             player_rows = [r for r in rows if r.get("player_name")]
@@ -133,7 +141,7 @@ async def _execute_delete_props_for_sport(session: AsyncSession, sport: str):
             await session.rollback()
             logger.error(f"Persistence: Failed to clear props for {sport}: {e}")
 
-async def insert_props_history(records: List[PropRecord], source: str = 'live_ingest', run_id: Optional[str] = None, session: Optional[AsyncSession] = None):
+async def insert_props_history(records: PropRows, source: str = 'live_ingest', run_id: Optional[str] = None, session: Optional[AsyncSession] = None):
     """Appends records to props_history."""
     if not records: 
         return
@@ -145,8 +153,9 @@ async def insert_props_history(records: List[PropRecord], source: str = 'live_in
     async with async_session_maker() as session:
         await _execute_insert_props_history(session, records, source, run_id)
 
-async def _execute_insert_props_history(session: AsyncSession, records: List[PropRecord], source: str, run_id: Optional[str]):
+async def _execute_insert_props_history(session: AsyncSession, records: PropRows, source: str, run_id: Optional[str]):
         try:
+            now = datetime.now(timezone.utc)
             is_sqlite = "sqlite" in str(engine.url)
             ins_obj = sqlite_insert(PropHistory) if is_sqlite else pg_insert(PropHistory)
             
@@ -155,8 +164,8 @@ async def _execute_insert_props_history(session: AsyncSession, records: List[Pro
             
             # Filter to only include columns that exist in PropHistory
             history_rows = []
-            for r in records:
-                row_data = r.dict()
+            for row in _prop_rows(records):
+                row_data = dict(row)
                 row_data["snapshot_at"] = now
                 row_data["source"] = source
                 row_data["run_id"] = run_id
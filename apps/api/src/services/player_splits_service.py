@@ -4,7 +4,7 @@ Fetches real player stat splits: L5, L10, L20, vs-opponent, home/away.
 """
 import httpx
 from services.api_telemetry import InstrumentedAsyncClient
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime, timedelta
 import os
 import logging
@@ -75,8 +75,37 @@ STAT_KEY_MAP = {
     "pra":       None,  # computed below
 }
 
-async def get_full_splits(player_name: str, stat_type: str, line: float) -> dict:
-    """Master function: returns L5/L10/L20/season splits for a player + stat."""
+async def _stored_features(player_name: str, stat_type: str, db: Any = None):
+    """Materialized features for this player/stat by name, or None when not built yet."""
+    from services.feature_store import feature_store
+    try:
+        if db is None:
+            from db.session import async_session_maker
+            async with async_session_maker() as session:
+                return await feature_store.get(session, player_name, stat_type, by="player_name")
+        return await feature_store.get(db, player_name, stat_type, by="player_name")
+    except Exception as e:
+        logger.warning(f"Feature store read failed for {player_name}/{stat_type}: {e}")
+        return None
+
+async def get_full_splits(player_name: str, stat_type: str, line: float, db: Any = None) -> dict:
+    """
+    Master function: returns L5/L10/L20/season splits for a player + stat. Served from
+    the feature store; BallDontLie is only called for players it has not materialized.
+    """
+    features = await _stored_features(player_name, stat_type, db)
+    if features is not None and features.recent_values:
+        return {
+            "player_name": player_name,
+            "player_id": features.player_id,
+            "team": "N/A",
+            "stat_type": stat_type,
+            "line": line,
+            "splits": features.splits(float(line)),
+            "source": "feature_store",
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+
     player = await search_player(player_name)
     if not player:
         return {"error": f"Player '{player_name}' not found", "player_name": player_name}
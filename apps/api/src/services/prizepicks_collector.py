@@ -1,14 +1,42 @@
 # apps/api/src/services/prizepicks_collector.py
-import httpx
+import hashlib
+import json
 import logging
+import os
 import unicodedata
 import re
-from datetime import datetime
+from collections import deque
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from db.session import async_session_maker
+from services.api_telemetry import InstrumentedAsyncClient
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+PRIZEPICKS_BOARD_URL = "https://api.prizepicks.com/projections?per_page=250&single_stat=true"
+PRIZEPICKS_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+}
+# Recent line-change events kept in memory for pollers that missed the callback.
+PRIZEPICKS_EVENT_BUFFER = int(os.getenv("PRIZEPICKS_EVENT_BUFFER", "2000"))
+
+_SUFFIX_RE = re.compile(r"\s+(jr|sr|iii|iv|v)$")
+_NON_ALPHA_RE = re.compile(r"[^a-z\s]")
+_SPACES_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=16384)
 def normalize_player_name(name: str) -> str:
     """
     Normalize player names for matching: lowercase, strip accents, remove suffixes.
@@ -24,106 +52,243 @@ def normalize_player_name(name: str) -> str:
         if unicodedata.category(c) != "Mn"
     )
     # Remove suffixes like jr, sr, iii, iv, v
-    name = re.sub(r"\s+(jr|sr|iii|iv|v)$", "", name)
+    name = _SUFFIX_RE.sub("", name)
     # Remove special characters except spaces
-    name = re.sub(r"[^a-z\s]", "", name)
+    name = _NON_ALPHA_RE.sub("", name)
     # Collapse multiple spaces
-    name = re.sub(r"\s+", " ", name)
+    name = _SPACES_RE.sub(" ", name)
     return name.strip()
 
-async def fetch_prizepicks_board():
+
+def _loads(body: Union[bytes, str]) -> Any:
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+@lru_cache(maxsize=4096)
+def _parse_game_time(value: str) -> Union[datetime, str]:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+
+
+def projection_hash(p: Dict[str, Any]) -> str:
+    """Stable content hash of the fields a board refresh can change."""
+    raw = f"{p['player_name']}|{p['stat_type']}|{p['line_score']}|{p['league']}|{p['game_time']}"
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def iter_board(body: Union[bytes, str, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
     """
-    Fetch the current PrizePicks board and return a list of parsed projections.
+    Yield parsed projections from a raw board payload in one pass over ``data``.
+    ``included`` players are indexed first since projections only reference them by id.
     """
-    url = "https://api.prizepicks.com/projections?per_page=250&single_stat=true"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "application/json",
+    data = body if isinstance(body, dict) else _loads(body)
+    players = {
+        item.get("id"): (item.get("attributes") or {}).get("name")
+        for item in data.get("included", ())
+        if item.get("type") == "new_player"
     }
-    
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            resp = await client.get(url, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception as e:
-            logger.error(f"Failed to fetch PrizePicks board: {e}")
-            return []
 
-    projections = data.get("data", [])
-    included = data.get("included", [])
-    
-    # Map player IDs to names from the 'included' section
-    players = {}
-    for item in included:
-        if item.get("type") == "new_player":
-            players[item.get("id")] = item.get("attributes", {}).get("name")
-
-    parsed = []
-    for proj in projections:
-        attr = proj.get("attributes", {})
-        rel = proj.get("relationships", {})
-        
-        player_id = rel.get("new_player", {}).get("data", {}).get("id")
+    for proj in data.get("data", ()):
+        attr = proj.get("attributes") or {}
+        rel = proj.get("relationships") or {}
+
+        player_id = ((rel.get("new_player") or {}).get("data") or {}).get("id")
         player_name = players.get(player_id)
-        
+
         if not player_name:
             continue
-            
-        parsed.append({
+
+        yield {
             "id": str(proj.get("id")),
             "player_name": player_name,
             "stat_type": attr.get("stat_type"),
             "line_score": float(attr.get("line_score", 0)),
             "league": attr.get("league"),
             "game_time": attr.get("start_time"),
+        }
+
+
+async def fetch_prizepicks_board():
+    """
+    Fetch the current PrizePicks board and return a list of parsed projections.
+    """
+    async with InstrumentedAsyncClient(provider="prizepicks", timeout=30.0) as client:
+        try:
+            resp = await client.get(PRIZEPICKS_BOARD_URL, headers=PRIZEPICKS_HEADERS)
+            resp.raise_for_status()
+            body = resp.content
+        except Exception as e:
+            logger.error(f"Failed to fetch PrizePicks board: {e}")
+            return []
+
+    return list(iter_board(body))
+
+
+@dataclass
+class LineChangeEvent:
+    projection_id: str
+    player_name: str
+    normalized_name: str
+    stat_type: str
+    league: Optional[str]
+    old_line: float
+    new_line: float
+    game_time: Optional[str]
+    observed_at: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+LineChangeListener = Callable[[List[LineChangeEvent]], Union[None, Awaitable[None]]]
+
+# Graded rows are frozen: a line move after grading must not rewrite the settled record.
+UPSERT_SQL = text("""
+    INSERT INTO pp_projections_staging
+    (id, player_name, stat_type, line_score, league, game_time, content_hash)
+    VALUES (:id, :player_name, :stat_type, :line_score, :league, :game_time, :content_hash)
+    ON CONFLICT (id) DO UPDATE SET
+        player_name = EXCLUDED.player_name,
+        stat_type = EXCLUDED.stat_type,
+        line_score = EXCLUDED.line_score,
+        league = EXCLUDED.league,
+        game_time = EXCLUDED.game_time,
+        content_hash = EXCLUDED.content_hash,
+        fetched_at = CURRENT_TIMESTAMP
+    WHERE pp_projections_staging.graded = FALSE
+""")
+
+KNOWN_SQL = text("""
+    SELECT id, content_hash, line_score
+    FROM pp_projections_staging
+    WHERE graded = FALSE
+""")
+
+
+class PrizePicksCollector:
+    """
+    Board -> staging pipeline. Keeps ``id -> (hash, line)`` for the live board so
+    unchanged projections are skipped before touching the database; changed and new
+    rows go out in a single executemany upsert.
+    """
+
+    def __init__(self) -> None:
+        self._known: Dict[str, Tuple[str, float]] = {}
+        self._seeded = False
+        self._listeners: List[LineChangeListener] = []
+        self.recent_events: deque = deque(maxlen=PRIZEPICKS_EVENT_BUFFER)
+
+    def on_line_change(self, listener: LineChangeListener) -> LineChangeListener:
+        """Register a (sync or async) callback receiving each batch of line-change events."""
+        self._listeners.append(listener)
+        return listener
+
+    async def _seed(self, session: AsyncSession) -> None:
+        rows = (await session.execute(KNOWN_SQL)).all()
+        self._known = {r[0]: (r[1], float(r[2])) for r in rows if r[1]}
+        self._seeded = True
+
+    def diff(self, projections: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[LineChangeEvent]]:
+        """Rows that need writing (new or changed) and line-change events for moved lines."""
+        changed: List[Dict[str, Any]] = []
+        events: List[LineChangeEvent] = []
+        observed_at = datetime.now(timezone.utc).isoformat()
+        for p in projections:
+            digest = projection_hash(p)
+            prev = self._known.get(p["id"])
+            if prev is not None and prev[0] == digest:
+                continue
+            if prev is not None and prev[1] != p["line_score"]:
+                events.append(LineChangeEvent(
+                    projection_id=p["id"],
+                    player_name=p["player_name"],
+                    normalized_name=normalize_player_name(p["player_name"]),
+                    stat_type=p["stat_type"],
+                    league=p["league"],
+                    old_line=prev[1],
+                    new_line=p["line_score"],
+                    game_time=p["game_time"],
+                    observed_at=observed_at,
+                ))
+            game_time = p["game_time"]
+            changed.append({
+                **p,
+                "game_time": _parse_game_time(game_time) if isinstance(game_time, str) else game_time,
+                "content_hash": digest,
+            })
+        return changed, events
+
+    async def upsert(self, projections: List[Dict[str, Any]], session: Optional[AsyncSession] = None) -> Dict[str, int]:
+        """Write new/changed projections in one bulk upsert and emit line-change events."""
+        if session is None:
+            async with async_session_maker() as s:
+                return await self.upsert(projections, s)
+
+        if not projections:
+            return {"seen": 0, "written": 0, "unchanged": 0, "line_changes": 0}
+        if not self._seeded:
+            await self._seed(session)
+
+        changed, events = self.diff(projections)
+        if changed:
+            await session.execute(UPSERT_SQL, changed)
+            await session.commit()
+        # Index only what is on the board now; pulled/graded projections drop out.
+        known = self._known
+        written = {row["id"]: (row["content_hash"], row["line_score"]) for row in changed}
+        self._known = {p["id"]: written.get(p["id"]) or known[p["id"]] for p in projections}
+
+        if events:
+            self.recent_events.extend(events)
+            await self._emit(events)
+
+        stats = {
+            "seen": len(projections),
+            "written": len(changed),
+            "unchanged": len(projections) - len(changed),
+            "line_changes": len(events),
+        }
+        logger.info(f"PrizePicks Collector: {stats}")
+        return stats
+
+    async def _emit(self, events: List[LineChangeEvent]) -> None:
+        for listener in self._listeners:
+            try:
+                result = listener(events)
+                if hasattr(result, "__await__"):
+                    await result
+            except Exception as e:
+                logger.error(f"PrizePicks line-change listener failed: {e}")
+
+
+prizepicks_collector = PrizePicksCollector()
+on_line_change = prizepicks_collector.on_line_change
+
+
+@on_line_change
+async def broadcast_line_changes(events: List[LineChangeEvent]) -> None:
+    """Push moved PrizePicks lines to websocket clients (updates:global, all API processes)."""
+    from core.connection_manager import manager
+
+    try:
+        await manager.publish({
+            "type": "prizepicks_line_change",
+            "events": [e.to_dict() for e in events],
         })
-    
-    return parsed
+    except Exception as e:
+        # no Redis (local dev): pollers still have recent_events
+        logger.debug(f"PrizePicks line-change broadcast skipped: {e}")
+
 
 async def upsert_projections(projections):
     """
     Upsert projections into pp_projections_staging.
     Does not overwrite already-graded rows.
     """
-    if not projections:
-        return
-        
-    async with async_session_maker() as session:
-        count = 0
-        for p in projections:
-            try:
-                # We use ON CONFLICT DO NOTHING to avoid overwriting or re-inserting graded rows
-                # since the 'id' is unique from PrizePicks.
-                sql = text("""
-                    INSERT INTO pp_projections_staging 
-                    (id, player_name, stat_type, line_score, league, game_time)
-                    VALUES (:id, :player_name, :stat_type, :line_score, :league, :game_time)
-                    ON CONFLICT (id) DO NOTHING
-                """)
-                # Convert ISO string to datetime if needed, though Postgres handles it well
-                game_time = p["game_time"]
-                if isinstance(game_time, str):
-                    try:
-                        game_time = datetime.fromisoformat(game_time.replace("Z", "+00:00"))
-                    except ValueError:
-                        pass
-
-                result = await session.execute(sql, {
-                    "id": p["id"],
-                    "player_name": p["player_name"],
-                    "stat_type": p["stat_type"],
-                    "line_score": p["line_score"],
-                    "league": p["league"],
-                    "game_time": game_time
-                })
-                if result.rowcount > 0:
-                    count += 1
-            except Exception as e:
-                logger.error(f"Error upserting PP projection {p['id']}: {e}")
-        
-        await session.commit()
-        logger.info(f"PrizePicks Collector: Upserted {count} new projections.")
+    return await prizepicks_collector.upsert(projections)
+
 
 async def run_collector():
     """Entry point for the collector task."""
@@ -1,8 +1,10 @@
 import os
 import json
+import asyncio
 import logging
 from typing import Dict, Any, Optional
 from pywebpush import webpush, WebPushException
+from services.delivery_queue import WEBPUSH, DeliveryResult, delivery_queue
 
 logger = logging.getLogger(__name__)
 
@@ -12,10 +14,11 @@ class PushService:
         self.vapid_claims = {
             "sub": f"mailto:{os.getenv('ADMIN_EMAIL', 'admin@perplexedge.com')}"
         }
+        delivery_queue.register_sender(WEBPUSH, self._deliver)
 
     async def send_notification(self, subscription: Dict[str, Any], message: str, title: str = "Lucrix Alert"):
         """
-        Sends a web push notification to a specific subscriber.
+        Queues a web push notification for a specific subscriber.
         Subscription should contain {endpoint, p256dh, auth}.
         """
         if not self.vapid_private_key:
@@ -32,26 +35,50 @@ class PushService:
             }
         }
 
+        subscription_info = {
+            "endpoint": subscription["endpoint"],
+            "keys": {
+                "p256dh": subscription["p256dh"],
+                "auth": subscription["auth"]
+            }
+        }
         try:
-            webpush(
-                subscription_info={
-                    "endpoint": subscription["endpoint"],
-                    "keys": {
-                        "p256dh": subscription["p256dh"],
-                        "auth": subscription["auth"]
-                    }
-                },
-                data=json.dumps(payload),
-                vapid_private_key=self.vapid_private_key,
-                vapid_claims=self.vapid_claims
+            await delivery_queue.enqueue(
+                WEBPUSH, subscription["endpoint"], {"subscription_info": subscription_info, "data": payload}
             )
             return True
-        except WebPushException as ex:
-            logger.error(f"WebPush Error: {ex}")
-            # If 410 Gone, the subscription has expired or been removed
-            return False
         except Exception as e:
             logger.error(f"General Push Error: {e}")
             return False
 
+    async def _deliver(self, endpoint: str, message: Dict[str, Any]) -> DeliveryResult:
+        """Delivery-queue sender: pywebpush is blocking, so run it off the event loop."""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                None,
+                lambda: webpush(
+                    subscription_info=message["subscription_info"],
+                    data=json.dumps(message["data"]),
+                    vapid_private_key=self.vapid_private_key,
+                    vapid_claims=dict(self.vapid_claims),
+                ),
+            )
+            return DeliveryResult("ok")
+        except WebPushException as ex:
+            response = getattr(ex, "response", None)
+            code = getattr(response, "status_code", None)
+            # 404/410 Gone: the subscription has expired or been removed
+            if code in (404, 410) or (code is not None and 400 <= code < 500 and code != 429):
+                logger.info(f"WebPush dropped ({code}): {ex}")
+                return DeliveryResult("drop", detail=str(code))
+            retry_after = None
+            if code == 429 and response is not None:
+                try:
+                    retry_after = float(response.headers.get("retry-after", "60"))
+                except (TypeError, ValueError):
+                    retry_after = 60.0
+            logger.error(f"WebPush Error: {ex}")
+            return DeliveryResult("retry", retry_after=retry_after, detail=str(code))
+
 push_service = PushService()
@@ -0,0 +1,102 @@
+"""
+Edge rate limiting for CPU- and quota-heavy endpoints.
+
+Each request to a metered route spends ``cost`` units from two token buckets
+keyed by user (or client IP when anonymous):
+
+* a per-minute compute bucket sized by the tier's ``compute_per_min`` — absorbs
+  bursts so simulations and LLM calls cannot pin worker CPU;
+* a daily quota bucket for routes tied to a tier allowance in
+  ``get_tier_limits`` (``oracle_daily``, ``sim_count``).
+
+A tier whose allowance is 0 does not include the route at all; the request is
+refused as not-in-plan (403) rather than told to retry tomorrow. Cheap reads
+(e.g. the stored Monte Carlo listing) are not metered at all.
+
+Buckets live in Redis through ``CacheManager.take_tokens`` (atomic Lua) and fall
+back to the process-local store when Redis is unavailable.
+"""
+import logging
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Pattern
+
+from services.cache import cache
+from services.entitlements import Entitlements
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_KEY_PREFIX = "rl"
+DAY_SECONDS = 86400
+
+
+@dataclass(frozen=True)
+class RouteCost:
+    method: str
+    pattern: Pattern
+    cost: float
+    quota: Optional[str] = None  # get_tier_limits key charged once per request
+
+
+def _route(method: str, path: str, cost: float, quota: Optional[str] = None) -> RouteCost:
+    return RouteCost(method, re.compile(path), cost, quota)
+
+
+# Relative CPU/quota weight of each metered route (1 unit ~ one cheap DB-backed read).
+ROUTE_COSTS: List[RouteCost] = [
+    _route("POST", r"^/api/parlays/simulate/?$", 5, "sim_count"),
+    _route("POST", r"^/api/oracle/(chat|analyze-prop)/?$", 8, "oracle_daily"),
+    _route("GET", r"^/api/(arb|arbitrage)(/.*)?$", 2),
+    _route("GET", r"^/api/middle-boost(/.*)?$", 2),
+]
+
+
+def match_route(method: str, path: str) -> Optional[RouteCost]:
+    for route in ROUTE_COSTS:
+        if route.method == method and route.pattern.match(path):
+            return route
+    return None
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int = 0
+    bucket: str = "compute"
+    included: bool = True  # False when the tier's plan has no allowance for the route
+
+
+class RateLimiter:
+    async def _take(self, key: str, rate: float, capacity: float, cost: float):
+        return await cache.take_tokens(key, rate, capacity, cost)
+
+    async def check(self, identity: str, ents: Entitlements, route: RouteCost) -> Decision:
+        limits = ents.limits
+        per_min = float(limits.get("compute_per_min", 10))
+
+        if route.quota:
+            daily = float(limits.get(route.quota, 0))
+            if daily <= 0:
+                # Not part of this tier's plan: nothing will ever refill.
+                return Decision(False, 0, 0, 0, route.quota, included=False)
+            quota_key = f"{RATE_LIMIT_KEY_PREFIX}:{route.quota}:{identity}"
+            ok, left, wait = await self._take(quota_key, daily / DAY_SECONDS, daily, 1)
+            if not ok:
+                return Decision(False, int(daily), int(left), max(1, math.ceil(wait)), route.quota)
+
+        burst_key = f"{RATE_LIMIT_KEY_PREFIX}:compute:{identity}"
+        ok, left, wait = await self._take(burst_key, per_min / 60.0, per_min, route.cost)
+        if not ok:
+            if route.quota:
+                # Refund the quota unit; the request never ran.
+                await self._take(quota_key, daily / DAY_SECONDS, daily, -1)
+            return Decision(False, int(per_min), int(left), max(1, math.ceil(wait)), "compute")
+        return Decision(True, int(per_min), int(left))
+
+
+rate_limiter = RateLimiter()
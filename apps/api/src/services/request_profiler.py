@@ -0,0 +1,190 @@
+"""
+Sampled per-request profiles: where the wall time of a slow request went.
+
+A sampled request (PROFILING_SAMPLE_RATE of traffic, or any request carrying
+``X-Profile: 1`` with a valid ``X-Admin-Key``) gets a ``Trace`` in a context var. Spans
+add to it from wherever the work happens:
+
+  * db    — SQLAlchemy cursor executions (db/query_metrics.py engine events) and asyncpg
+            calls on pooled repository connections (db/repository.PooledConnection)
+  * http  — every ``httpx.AsyncClient.send`` once ``install_http_spans()`` has run
+  * cpu   — the remainder of the wall time: Python work on the event loop, including
+            time spent waiting behind other requests for it
+
+Spans that run concurrently (``asyncio.gather`` over queries) both count, so db + http
+can exceed wall time; cpu is clamped at zero then. Outside a sampled request a span is
+one context-var lookup.
+
+Finished traces go to ``profile_store``, which keeps the PROFILING_SLOWEST_PER_ROUTE
+slowest per route template (``GET /api/props/{prop_id}``) for ``/api/admin/profiling``.
+"""
+import heapq
+import itertools
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").strip().lower() in {"1", "true", "yes", "on"}
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+PROFILING_SLOWEST_PER_ROUTE = int(os.getenv("PROFILING_SLOWEST_PER_ROUTE", "20"))
+
+MAX_SPANS_PER_TRACE = 50
+
+
+class Trace:
+    __slots__ = ("method", "path", "started_at", "_t0", "totals", "counts", "spans", "dropped_spans")
+
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self.totals = {"db": 0.0, "http": 0.0}
+        self.counts = {"db": 0, "http": 0}
+        self.spans: List[Tuple[str, str, float]] = []
+        self.dropped_spans = 0
+
+    def add(self, kind: str, label: str, seconds: float) -> None:
+        self.totals[kind] = self.totals.get(kind, 0.0) + seconds
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        if len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append((kind, label, seconds))
+        else:
+            self.dropped_spans += 1
+
+    def finish(self, route: str, status: int) -> Dict[str, Any]:
+        wall = time.perf_counter() - self._t0
+        db, http = self.totals["db"], self.totals["http"]
+        return {
+            "route": route,
+            "path": self.path,
+            "status": status,
+            "started_at": self.started_at.isoformat(),
+            "wall_ms": round(wall * 1000, 2),
+            "db_ms": round(db * 1000, 2),
+            "db_calls": self.counts["db"],
+            "http_ms": round(http * 1000, 2),
+            "http_calls": self.counts["http"],
+            "cpu_ms": round(max(0.0, wall - db - http) * 1000, 2),
+            "spans": [
+                {"kind": k, "label": label, "ms": round(s * 1000, 2)}
+                for k, label, s in sorted(self.spans, key=lambda span: span[2], reverse=True)
+            ],
+            "dropped_spans": self.dropped_spans,
+        }
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("request_profile", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+def add_span(kind: str, label: str, seconds: float) -> None:
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(kind, label, seconds)
+
+
+@contextmanager
+def span(kind: str, label: str = "") -> Iterator[None]:
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(kind, label, time.perf_counter() - start)
+
+
+def should_sample(forced: bool = False, rate: float = PROFILING_SAMPLE_RATE) -> bool:
+    return forced or (rate > 0 and random.random() < rate)
+
+
+@contextmanager
+def profiling(method: str, path: str) -> Iterator[Trace]:
+    trace = Trace(method, path)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+
+
+class ProfileStore:
+    """Slowest-N finished traces per route (a bounded min-heap each), plus per-route totals."""
+
+    def __init__(self, per_route: int = PROFILING_SLOWEST_PER_ROUTE) -> None:
+        self.per_route = per_route
+        self._slowest: Dict[str, List[Tuple[float, int, Dict[str, Any]]]] = {}
+        self._totals: Dict[str, Dict[str, float]] = {}
+        self._seq = itertools.count()
+
+    def record(self, profile: Dict[str, Any]) -> None:
+        route = profile["route"]
+        totals = self._totals.setdefault(route, {"sampled": 0, "wall_ms": 0.0, "db_ms": 0.0, "http_ms": 0.0})
+        totals["sampled"] += 1
+        for key in ("wall_ms", "db_ms", "http_ms"):
+            totals[key] += profile[key]
+
+        heap = self._slowest.setdefault(route, [])
+        entry = (profile["wall_ms"], next(self._seq), profile)
+        if len(heap) < self.per_route:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    def routes(self) -> List[Dict[str, Any]]:
+        out = []
+        for route, t in self._totals.items():
+            n = t["sampled"] or 1
+            out.append({
+                "route": route,
+                "sampled": int(t["sampled"]),
+                "avg_wall_ms": round(t["wall_ms"] / n, 2),
+                "avg_db_ms": round(t["db_ms"] / n, 2),
+                "avg_http_ms": round(t["http_ms"] / n, 2),
+                "max_wall_ms": max((e[0] for e in self._slowest.get(route, ())), default=None),
+            })
+        return sorted(out, key=lambda r: r["max_wall_ms"] or 0, reverse=True)
+
+    def slowest(self, route: Optional[str] = None, limit: int = PROFILING_SLOWEST_PER_ROUTE) -> List[Dict[str, Any]]:
+        heaps = [self._slowest.get(route, [])] if route else list(self._slowest.values())
+        entries = sorted((e for heap in heaps for e in heap), key=lambda e: e[0], reverse=True)
+        return [e[2] for e in entries[:limit]]
+
+    def clear(self) -> None:
+        self._slowest.clear()
+        self._totals.clear()
+
+
+profile_store = ProfileStore()
+
+
+_http_installed = False
+
+
+def install_http_spans() -> None:
+    """Time every ``httpx.AsyncClient.send`` as an http span (idempotent)."""
+    global _http_installed
+    if _http_installed:
+        return
+    import httpx
+
+    original_send = httpx.AsyncClient.send
+
+    async def send(self, request, *args, **kwargs):
+        if _trace.get() is None:
+            return await original_send(self, request, *args, **kwargs)
+        with span("http", f"{request.method} {request.url.host}{request.url.path}"):
+            return await original_send(self, request, *args, **kwargs)
+
+    httpx.AsyncClient.send = send
+    _http_installed = True
@@ -0,0 +1,378 @@
+"""
+Player / team search behind ``/api/search`` and ``/api/search/typeahead``.
+
+``search_props`` used to run ``ILIKE '%q%'`` over ``proplines.player_name`` / ``team``
+on every keystroke: no index can serve a leading wildcard, so each call scanned the
+table. Search now goes through a small dictionary instead:
+
+  * ``search_entities`` — one row per (kind, normalized name, sport), built from the
+    player and team names in ``unified_odds``, ``props_live`` and ``proplines``.
+    ``refresh`` (at startup, then every SEARCH_REFRESH_MINUTES) reads each source time
+    range exactly once: from the ``search_refresh_state`` watermark up to REFRESH_LAG
+    before now, adding the counts to ``mentions``. The first build recounts the last
+    SEARCH_BOOTSTRAP_DAYS and replaces ``mentions``.
+  * Postgres — candidates come from a ``pg_trgm`` GIN index on the normalized name
+    (prefix ``LIKE`` and the ``%`` similarity operator both use it).
+  * SQLite / no ``pg_trgm`` — the dictionary is held in an in-memory trigram index
+    (``NgramIndex``) with a sorted word list for prefix lookups.
+
+Both backends rank candidates with the same ``score``: exact match, then full-name
+prefix, then word prefix ("jam" finds "lebron james"), then trigram similarity, with
+more frequently quoted names first on ties. Typeahead results are cached in-process
+for SEARCH_CACHE_TTL_SECONDS, so a repeated keystroke is answered from memory.
+"""
+import logging
+import os
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+SEARCH_REFRESH_MINUTES = int(os.getenv("SEARCH_REFRESH_MINUTES", "10"))
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "60"))
+SEARCH_CACHE_SIZE = 4096
+# First build (empty dictionary) looks back this far into the source tables.
+SEARCH_BOOTSTRAP_DAYS = int(os.getenv("SEARCH_BOOTSTRAP_DAYS", "30"))
+# Windows end this far behind now, so rows committed a little late still fall in the
+# next window instead of being skipped (windows never overlap, so nothing is counted twice).
+REFRESH_LAG = timedelta(minutes=5)
+
+SIMILARITY_THRESHOLD = 0.3  # pg_trgm's default for the % operator
+# After a failed pg_trgm lookup (with the extension installed), the in-memory index
+# answers for this long before Postgres is tried again.
+PG_TRGM_RETRY_SECONDS = 60.0
+CANDIDATES = 50
+
+DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS search_entities (
+        kind TEXT NOT NULL,
+        norm TEXT NOT NULL,
+        sport TEXT NOT NULL DEFAULT '',
+        name TEXT NOT NULL,
+        team TEXT,
+        mentions INTEGER NOT NULL DEFAULT 0,
+        last_seen_at TIMESTAMPTZ,
+        PRIMARY KEY (kind, norm, sport)
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS search_refresh_state (id INTEGER PRIMARY KEY, scanned_until TIMESTAMPTZ)",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_search_entities_norm_trgm ON search_entities USING gin (norm gin_trgm_ops)",
+    # search_props resolves names through the dictionary, then matches these exactly
+    "CREATE INDEX IF NOT EXISTS ix_proplines_player_name ON proplines (player_name)",
+    "CREATE INDEX IF NOT EXISTS ix_proplines_team ON proplines (team)",
+]
+
+# (kind, name expr, team expr, sport column, time column, table)
+SOURCES: List[Tuple[str, str, str, str, str, str]] = [
+    ("player", "player_name", "NULL", "sport", "created_at", "unified_odds"),
+    ("team", "home_team", "NULL", "sport", "created_at", "unified_odds"),
+    ("team", "away_team", "NULL", "sport", "created_at", "unified_odds"),
+    ("player", "player_name", "MAX(team)", "sport", "last_updated_at", "props_live"),
+    ("team", "team", "NULL", "sport", "last_updated_at", "props_live"),
+    # search_props matches proplines by exact name, so its spellings must be in the dictionary
+    ("player", "player_name", "MAX(team)", "sport_key", "created_at", "proplines"),
+    ("team", "team", "NULL", "sport_key", "created_at", "proplines"),
+]
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(value: Optional[str]) -> str:
+    """Lowercase, strip accents and punctuation: "Luka Dončić" / "luka doncic" -> "luka doncic"."""
+    if not value:
+        return ""
+    ascii_only = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    return _NON_WORD.sub(" ", ascii_only.lower()).strip()
+
+
+def trigrams(norm: str) -> Set[str]:
+    """pg_trgm-style trigrams: each word padded with two leading blanks and one trailing."""
+    grams: Set[str] = set()
+    for word in norm.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def score(query: str, query_grams: Set[str], norm: str) -> float:
+    """Rank key: exact > full prefix > word prefix > trigram similarity (0 = no match)."""
+    if norm == query:
+        return 4.0
+    if norm.startswith(query):
+        return 3.0 + len(query) / len(norm)
+    if f" {query}" in norm:
+        return 2.0 + len(query) / len(norm)
+    sim = similarity(query_grams, trigrams(norm))
+    return sim if sim >= SIMILARITY_THRESHOLD else 0.0
+
+
+def _result(entry: Dict[str, Any], rank: float) -> Dict[str, Any]:
+    return {
+        "kind": entry["kind"],
+        "name": entry["name"],
+        "sport": entry["sport"] or None,
+        "team": entry.get("team"),
+        "score": round(rank, 4),
+    }
+
+
+def rank(query: str, entries: Iterable[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    grams = trigrams(query)
+    scored = []
+    for entry in entries:
+        s = score(query, grams, entry["norm"])
+        if s > 0:
+            scored.append((s, int(entry.get("mentions") or 0), entry["name"], entry))
+    scored.sort(key=lambda t: (-t[0], -t[1], t[2]))
+    return [_result(entry, s) for s, _mentions, _name, entry in scored[:limit]]
+
+
+class NgramIndex:
+    """In-memory trigram + word-prefix index over the dictionary (SQLite fallback)."""
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()) -> None:
+        self.entries: List[Dict[str, Any]] = list(entries)
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        words: List[Tuple[str, int]] = []
+        for i, entry in enumerate(self.entries):
+            for gram in trigrams(entry["norm"]):
+                self._postings[gram].append(i)
+            words.extend((word, i) for word in entry["norm"].split())
+        words.sort()
+        self._words = [w for w, _ in words]
+        self._word_ids = [i for _, i in words]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _prefix_ids(self, query: str) -> Set[int]:
+        first = query.split()[0]
+        ids: Set[int] = set()
+        pos = bisect_left(self._words, first)
+        while pos < len(self._words) and self._words[pos].startswith(first):
+            ids.add(self._word_ids[pos])
+            pos += 1
+        return ids
+
+    def search(self, query: str, kind: Optional[str] = None, sport: Optional[str] = None,
+               limit: int = 10) -> List[Dict[str, Any]]:
+        ids = self._prefix_ids(query)
+        for gram in trigrams(query):
+            ids.update(self._postings.get(gram, ()))
+        candidates = (
+            self.entries[i] for i in ids
+            if (kind is None or self.entries[i]["kind"] == kind)
+            and (sport is None or self.entries[i]["sport"] == sport)
+        )
+        return rank(query, candidates, limit)
+
+
+class SearchIndex:
+    def __init__(self) -> None:
+        self._memory: Optional[NgramIndex] = None
+        self._results: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self.refreshed_at: Optional[datetime] = None
+        self.pg_trgm: Optional[bool] = None
+        self._pg_retry_at = 0.0
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    # -- dictionary ----------------------------------------------------------
+
+    async def _collect(self, db, since: datetime, until: datetime) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+        found: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        for kind, name_expr, team_expr, sport_col, ts_col, table in SOURCES:
+            try:
+                res = await db.execute(
+                    text(
+                        f"SELECT {name_expr} AS name, COALESCE({sport_col}, '') AS sport, {team_expr} AS team, "
+                        f"COUNT(*) AS n, MAX({ts_col}) AS seen FROM {table} "
+                        f"WHERE {name_expr} IS NOT NULL AND {ts_col} >= :since AND {ts_col} < :until "
+                        f"GROUP BY {name_expr}, COALESCE({sport_col}, '')"
+                    ),
+                    {"since": since, "until": until},
+                )
+                rows = res.mappings().all()
+            except Exception as e:
+                logger.debug("search: %s.%s unavailable: %s", table, name_expr, e)
+                await db.rollback()
+                continue
+            for row in rows:
+                norm = normalize(row["name"])
+                if not norm:
+                    continue
+                entry = found.setdefault((kind, norm, row["sport"]), {
+                    "kind": kind, "norm": norm, "sport": row["sport"], "name": row["name"],
+                    "team": None, "mentions": 0, "last_seen_at": None,
+                })
+                entry["mentions"] += int(row["n"] or 0)
+                entry["team"] = entry["team"] or row["team"]
+                seen = row["seen"]
+                if isinstance(seen, str):
+                    seen = datetime.fromisoformat(seen)
+                if seen is not None and seen.tzinfo is None:
+                    seen = seen.replace(tzinfo=timezone.utc)
+                if seen is not None and (entry["last_seen_at"] is None or seen > entry["last_seen_at"]):
+                    entry["last_seen_at"] = seen
+        return found
+
+    async def refresh(self, db) -> Dict[str, Any]:
+        """Fold source rows written since the last refresh's window into the dictionary."""
+        started = time.perf_counter()
+        mark = (await db.execute(text("SELECT scanned_until FROM search_refresh_state WHERE id = 1"))).scalar()
+        if isinstance(mark, str):
+            mark = datetime.fromisoformat(mark)
+        until = datetime.now(timezone.utc) - REFRESH_LAG
+        bootstrap = mark is None
+        if bootstrap:
+            since = until - timedelta(days=SEARCH_BOOTSTRAP_DAYS)
+        else:
+            since = mark if mark.tzinfo else mark.replace(tzinfo=timezone.utc)
+        found = await self._collect(db, since, until) if since < until else {}
+        if found:
+            # The first build recounts a fixed window; later windows add to it.
+            mentions = "excluded.mentions" if bootstrap else "search_entities.mentions + excluded.mentions"
+            await db.execute(
+                text(
+                    "INSERT INTO search_entities (kind, norm, sport, name, team, mentions, last_seen_at) "
+                    "VALUES (:kind, :norm, :sport, :name, :team, :mentions, :last_seen_at) "
+                    "ON CONFLICT (kind, norm, sport) DO UPDATE SET name = excluded.name, "
+                    "team = COALESCE(excluded.team, search_entities.team), "
+                    f"mentions = {mentions}, last_seen_at = excluded.last_seen_at"
+                ),
+                list(found.values()),
+            )
+        await db.execute(
+            text(
+                "INSERT INTO search_refresh_state (id, scanned_until) VALUES (1, :until) "
+                "ON CONFLICT (id) DO UPDATE SET scanned_until = excluded.scanned_until"
+            ),
+            {"until": max(until, since)},
+        )
+        await db.commit()
+        await self.load(db)
+        self.refreshed_at = datetime.now(timezone.utc)
+        return {
+            "upserted": len(found),
+            "entities": len(self._memory or ()),
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    async def load(self, db) -> None:
+        res = await db.execute(text("SELECT kind, norm, sport, name, team, mentions FROM search_entities"))
+        self._memory = NgramIndex(dict(r) for r in res.mappings().all())
+        self._results.clear()
+
+    # -- lookup --------------------------------------------------------------
+
+    async def _pg_candidates(self, db, query: str, kind: Optional[str], sport: Optional[str]) -> List[Dict[str, Any]]:
+        filters = ""
+        params: Dict[str, Any] = {"q": query, "prefix": f"{query}%", "word_prefix": f"% {query}%", "n": CANDIDATES}
+        if kind:
+            filters += " AND kind = :kind"
+            params["kind"] = kind
+        if sport:
+            filters += " AND sport = :sport"
+            params["sport"] = sport
+        res = await db.execute(
+            text(
+                "SELECT kind, norm, sport, name, team, mentions FROM search_entities "
+                f"WHERE (norm LIKE :prefix OR norm LIKE :word_prefix OR norm % :q){filters} "
+                "ORDER BY similarity(norm, :q) DESC, mentions DESC LIMIT :n"
+            ),
+            params,
+        )
+        return [dict(r) for r in res.mappings().all()]
+
+    async def search(self, db, q: str, kind: Optional[str] = None, sport: Optional[str] = None,
+                     limit: int = 10) -> Tuple[List[Dict[str, Any]], bool]:
+        """Ranked matches for ``q`` and whether they came from the result cache."""
+        query = normalize(q)
+        if len(query) < 2:
+            return [], False
+        key = (query, kind, sport, limit)
+        hit = self._results.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            self._results.move_to_end(key)
+            self.counters["cache_hits"] += 1
+            return hit[1], True
+
+        results: Optional[List[Dict[str, Any]]] = None
+        if (
+            self.pg_trgm is not False
+            and db.bind.dialect.name == "postgresql"
+            and time.monotonic() >= self._pg_retry_at
+        ):
+            try:
+                results = rank(query, await self._pg_candidates(db, query, kind, sport), limit)
+                self.pg_trgm = True
+                self.counters["pg_trgm"] += 1
+            except Exception as e:
+                await db.rollback()
+                if await self._pg_trgm_installed(db) is False:
+                    logger.warning("search: pg_trgm is not installed, using the in-memory index: %s", e)
+                    self.pg_trgm = False
+                else:
+                    logger.warning(
+                        "search: pg_trgm lookup failed, using the in-memory index for %ss: %s", PG_TRGM_RETRY_SECONDS, e
+                    )
+                    self._pg_retry_at = time.monotonic() + PG_TRGM_RETRY_SECONDS
+        if results is None:
+            if self._memory is None:
+                await self.load(db)
+            results = self._memory.search(query, kind, sport, limit)
+            self.counters["ngram"] += 1
+
+        self._results[key] = (time.monotonic() + SEARCH_CACHE_TTL_SECONDS, results)
+        if len(self._results) > SEARCH_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return results, False
+
+    async def _pg_trgm_installed(self, db) -> Optional[bool]:
+        """Whether the extension exists; None when that cannot be told (treated as transient)."""
+        try:
+            res = await db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+            return res.scalar() is not None
+        except Exception:
+            await db.rollback()
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entities": len(self._memory) if self._memory is not None else None,
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            "pg_trgm": self.pg_trgm,
+            "cached_queries": len(self._results),
+            **self.counters,
+        }
+
+
+search_index = SearchIndex()
+
+
+async def refresh_search_index() -> None:
+    """Scheduler entry point."""
+    from db.session import async_session_maker
+
+    async with async_session_maker() as db:
+        try:
+            summary = await search_index.refresh(db)
+            logger.info("search: dictionary refreshed %s", summary)
+        except Exception as e:
+            logger.warning("search: dictionary refresh failed: %s", e)
+            await db.rollback()
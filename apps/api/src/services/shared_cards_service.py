@@ -2,7 +2,6 @@
 Shared Cards Service - Track and analyze shared betting cards/slips
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,7 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -65,10 +64,7 @@ class SharedCard:
     created_at: datetime
     updated_at: datetime
 
-class SharedCardsService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class SharedCardsService(AsyncpgRepository):
     async def create_shared_card(self, platform: str, sport_id: int, legs: List[Dict[str, Any]], 
                                 label: str, total_odds: float, decimal_odds: float,
                                 parlay_probability: float, parlay_ev: float, 
@@ -76,7 +72,7 @@ class SharedCardsService:
                                 kelly_risk_level: Optional[str] = None) -> bool:
         """Create a new shared card"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -102,7 +98,7 @@ class SharedCardsService:
     async def get_shared_cards_by_platform(self, platform: str, limit: int = 50) -> List[SharedCard]:
         """Get shared cards for a specific platform"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM shared_cards 
@@ -145,7 +141,7 @@ class SharedCardsService:
     async def get_shared_cards_by_sport(self, sport_id: int, limit: int = 50) -> List[SharedCard]:
         """Get shared cards for a specific sport"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM shared_cards 
@@ -188,7 +184,7 @@ class SharedCardsService:
     async def get_shared_cards_by_grade(self, grade: str, limit: int = 50) -> List[SharedCard]:
         """Get shared cards by grade"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM shared_cards 
@@ -231,7 +227,7 @@ class SharedCardsService:
     async def get_trending_cards(self, hours: int = 24, limit: int = 20) -> List[SharedCard]:
         """Get trending shared cards based on views and recent activity"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM shared_cards 
@@ -274,7 +270,7 @@ class SharedCardsService:
     async def get_top_performing_cards(self, days: int = 30, limit: int = 20) -> List[SharedCard]:
         """Get top performing shared cards"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM shared_cards 
@@ -318,7 +314,7 @@ class SharedCardsService:
     async def update_card_views(self, card_id: int) -> bool:
         """Update card view count"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             await conn.execute("""
                 UPDATE shared_cards 
@@ -337,7 +333,7 @@ class SharedCardsService:
     async def settle_card(self, card_id: int, won: bool) -> bool:
         """Settle a shared card"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -358,7 +354,7 @@ class SharedCardsService:
     async def get_shared_card_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get overall shared card statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Overall statistics
             overall = await conn.fetchrow("""
@@ -499,7 +495,7 @@ class SharedCardsService:
     async def search_shared_cards(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search shared cards by label or legs"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
@@ -0,0 +1,231 @@
+"""
+Two-tier result cache for Monte Carlo simulations.
+
+Identical slips requested by many users (the same top picks) and repeat single-prop
+probabilities are served from cache instead of being re-simulated:
+
+  * fingerprint    — sha256 of the canonical inputs: legs sorted by player / market /
+                     side with normalized lines, prices and priors, plus ``n`` and
+                     MC_MODEL_VERSION
+  * tier 1         — in-process LRU (SIM_CACHE_LRU_SIZE entries, per-entry TTL)
+  * tier 2         — Redis through CacheManager, shared by every worker (skipped while
+                     the cache runs on its in-memory fallback)
+  * single-flight  — concurrent misses on one fingerprint share one simulation
+  * invalidation   — generation tokens per input scope (``odds``, ``priors``). Bumping
+                     a scope re-keys every entry that read it; parlay legs carry their
+                     prices and priors in the fingerprint itself.
+
+Usage:
+    key, order = parlay_fingerprint(legs, n_sims)
+    result, source = await simulation_cache.get_or_compute(key, run_simulation)
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Bump when the simulation math changes so old results stop matching.
+MC_MODEL_VERSION = os.getenv("MC_MODEL_VERSION", "mc-normal-v1")
+SIM_CACHE_TTL_SECONDS = int(os.getenv("SIM_CACHE_TTL_SECONDS", "1800"))
+SIM_CACHE_LRU_SIZE = max(1, int(os.getenv("SIM_CACHE_LRU_SIZE", "2048")))
+# How long a worker trusts its copy of a generation token before re-reading Redis.
+SIM_CACHE_GEN_REFRESH_SECONDS = float(os.getenv("SIM_CACHE_GEN_REFRESH_SECONDS", "5"))
+
+ODDS = "odds"
+PRIORS = "priors"
+
+_KEY_PREFIX = "mcres"
+_GEN_PREFIX = "mcgen"
+_GEN_TTL = 7 * 86400
+
+MISS, L1, L2, SHARED = "miss", "l1", "l2", "shared"
+
+
+def _num(value: Any, digits: int) -> Optional[float]:
+    try:
+        return round(float(value), digits)
+    except (TypeError, ValueError):
+        return None
+
+
+def canonical_leg(leg: Dict[str, Any]) -> Dict[str, Any]:
+    """The inputs of one leg that change a simulation outcome, in normalized form."""
+    return {
+        "p": str(leg.get("player_name") or leg.get("player") or "").strip().lower(),
+        "m": str(leg.get("stat_type") or leg.get("market_key") or leg.get("market") or "").lower(),
+        "l": _num(leg.get("line"), 2),
+        "s": str(leg.get("side", "over")).lower(),
+        "o": _num(leg.get("odds", -110), 0),
+        "mu": _num(leg.get("mean"), 4),
+        "sd": _num(leg.get("std_dev"), 4),
+    }
+
+
+def _digest(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:40]
+
+
+def parlay_fingerprint(legs: List[Dict[str, Any]], n_sims: int) -> Tuple[str, List[int]]:
+    """
+    Fingerprint of a parlay and the canonical leg order it was taken in. Simulate
+    legs in that order so a cached ``leg_results`` can be mapped back to any
+    caller's ordering of the same slip.
+    """
+    canon = [canonical_leg(leg) for leg in legs]
+    keys = [json.dumps(c, sort_keys=True) for c in canon]
+    order = sorted(range(len(legs)), key=keys.__getitem__)
+    fp = _digest({"v": MC_MODEL_VERSION, "k": "parlay", "n": int(n_sims), "legs": [canon[i] for i in order]})
+    return f"parlay:{fp}", order
+
+
+class SimulationCache:
+    def __init__(self, maxsize: int = SIM_CACHE_LRU_SIZE) -> None:
+        self.maxsize = maxsize
+        self._lru: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._gens: Dict[str, Tuple[str, float]] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    async def generation(self, scope: str) -> str:
+        token, fetched = self._gens.get(scope, ("0", 0.0))
+        if time.monotonic() - fetched < SIM_CACHE_GEN_REFRESH_SECONDS:
+            return token
+        if cache.is_redis:
+            try:
+                token = await cache.get(f"{_GEN_PREFIX}:{scope}") or token
+            except Exception as e:
+                logger.debug("simulation cache generation read failed: %s", e)
+        self._gens[scope] = (token, time.monotonic())
+        return token
+
+    async def bump(self, *scopes: str) -> None:
+        """Invalidate every cached result that depends on ``scopes`` (all workers)."""
+        token = str(time.time_ns())
+        for scope in scopes:
+            self._gens[scope] = (token, time.monotonic())
+            self.counters[f"invalidations_{scope}"] += 1
+            if cache.is_redis:
+                try:
+                    await cache.set(f"{_GEN_PREFIX}:{scope}", token, ttl=_GEN_TTL)
+                except Exception as e:
+                    logger.debug("simulation cache generation write failed: %s", e)
+
+    async def key(self, kind: str, inputs: Dict[str, Any], scopes: Iterable[str] = ()) -> str:
+        """Fingerprint for results computed from ``inputs`` plus data read from ``scopes``."""
+        gens = {scope: await self.generation(scope) for scope in sorted(scopes)}
+        return f"{kind}:{_digest({'v': MC_MODEL_VERSION, 'k': kind, 'in': inputs, 'g': gens})}"
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+    def _l1_get(self, key: str) -> Any:
+        entry = self._lru.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return entry[1]
+
+    def _l1_set(self, key: str, value: Any, ttl: int) -> None:
+        self._lru[key] = (time.monotonic() + ttl, value)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    async def get(self, key: str) -> Tuple[Any, str]:
+        value = self._l1_get(key)
+        if value is not None:
+            return value, L1
+        if cache.is_redis:
+            try:
+                value = await cache.get_json(f"{_KEY_PREFIX}:{key}")
+            except Exception as e:
+                logger.debug("simulation cache L2 read failed: %s", e)
+                value = None
+            if value is not None:
+                self._l1_set(key, value, SIM_CACHE_TTL_SECONDS)
+                return value, L2
+        return None, MISS
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = ttl or SIM_CACHE_TTL_SECONDS
+        self._l1_set(key, value, ttl)
+        if cache.is_redis:
+            try:
+                await cache.set_json(f"{_KEY_PREFIX}:{key}", value, ttl=ttl)
+            except Exception as e:
+                logger.debug("simulation cache L2 write failed: %s", e)
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]], ttl: Optional[int] = None
+    ) -> Tuple[Any, str]:
+        """Cached value for ``key`` or the result of ``compute()``; returns ``(value, source)``."""
+        value, source = await self.get(key)
+        if source != MISS:
+            self.counters[f"hits_{source}"] += 1
+            return value, source
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                value = await asyncio.shield(pending)
+                self.counters["coalesced"] += 1
+                return value, SHARED
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this caller was cancelled, not the shared run
+                # The leading caller went away mid-run; simulate for ourselves.
+
+        self.counters["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; keeps asyncio from logging it as unretrieved
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        await self.set(key, value, ttl)
+        return value, MISS
+
+    def clear(self) -> None:
+        self._lru.clear()
+        self._gens.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.counters["hits_l1"] + self.counters["hits_l2"] + self.counters["coalesced"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "lookups": lookups,
+            "l1_size": len(self._lru),
+            "l1_capacity": self.maxsize,
+            "l2": cache.status,
+            "model_version": MC_MODEL_VERSION,
+        }
+
+
+simulation_cache = SimulationCache()
@@ -0,0 +1,416 @@
+"""
+Time-bucketed rollups behind the legacy ``*_statistics`` endpoints.
+
+The statistics methods on the raw-SQL odds services used to run 4-6 full-scan
+GROUP BY queries over the raw tables per request. Each source now has a rollup
+table at (hour or day bucket x bookmaker x the dimensions its endpoint groups by)
+holding additive measures: row counts, sums plus non-null counts for averages,
+MIN/MAX timestamps, and, where an id would explode the grain, the distinct ids of
+the bucket as an array that reads union with ``unnest``.
+
+Compaction (``compact_all``, on the scheduler every STATS_ROLLUP_INTERVAL_MINUTES)
+is incremental per rollup:
+
+  * the last STATS_ROLLUP_SETTLE_BUCKETS buckets before the previous high-water
+    mark and everything after it are re-aggregated (late inserts)
+  * buckets holding rows whose ``updated_at`` moved past the stored watermark are
+    re-aggregated (results graded, statuses changed)
+  * a re-aggregated bucket is deleted and rebuilt in one transaction
+
+Reads (``Rollup.window``) take complete buckets from the rollup and aggregate the
+raw rows newer than the high-water mark on the fly, so inserts show up immediately
+and the raw scan is bounded by one compaction interval. Windows are aligned to the
+bucket: ``hours=24`` covers the current hour plus the 24 before it. Until the
+scheduler has built a rollup, ``window_bounds`` puts the high-water mark at the window
+start, so the read is the plain raw aggregate; requests never run the backfill.
+
+``lines`` has no ``updated_at``; an ``is_current`` flip on a row older than the
+settle window is not picked up until the rollup is rebuilt (``compact(..., full=True)``).
+"""
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from db.asyncpg_pool import acquire_timed, get_asyncpg_pool, release_timed
+
+logger = logging.getLogger(__name__)
+
+STATS_ROLLUP_INTERVAL_MINUTES = int(os.getenv("STATS_ROLLUP_INTERVAL_MINUTES", "5"))
+STATS_ROLLUP_SETTLE_BUCKETS = max(1, int(os.getenv("STATS_ROLLUP_SETTLE_BUCKETS", "2")))
+# Rows committed a little after a later updated_at was already seen are still caught.
+CHANGE_OVERLAP = timedelta(minutes=5)
+
+_UNITS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+STATE_DDL = """
+CREATE TABLE IF NOT EXISTS stats_rollup_state (
+    name TEXT PRIMARY KEY,
+    through TIMESTAMPTZ NOT NULL,
+    change_watermark TIMESTAMPTZ,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    buckets_rebuilt BIGINT NOT NULL DEFAULT 0
+)
+"""
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    type: str
+    expr: str
+
+
+@dataclass(frozen=True)
+class Rollup:
+    name: str
+    source: str
+    unit: str
+    time_column: str
+    dimensions: Tuple[Column, ...]
+    measures: Tuple[Column, ...]
+    change_column: Optional[str] = None
+
+    @property
+    def table(self) -> str:
+        return f"{self.name}_rollup_{self.unit}ly"
+
+    @property
+    def step(self) -> timedelta:
+        return _UNITS[self.unit]
+
+    @property
+    def columns(self) -> Tuple[Column, ...]:
+        return self.dimensions + self.measures
+
+    def ddl(self) -> List[str]:
+        cols = ",\n    ".join(f"{c.name} {c.type}" for c in self.columns)
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS {self.table} (\n    bucket TIMESTAMPTZ NOT NULL,\n    {cols}\n)",
+            f"CREATE INDEX IF NOT EXISTS idx_{self.table}_bucket ON {self.table} (bucket)",
+            f"CREATE INDEX IF NOT EXISTS idx_{self.source}_{self.time_column} ON {self.source} ({self.time_column})",
+        ]
+        if self.change_column:
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.source}_{self.change_column} "
+                f"ON {self.source} ({self.change_column})"
+            )
+        return statements
+
+    def aggregate(self, where: str) -> str:
+        """Raw rows matching ``where`` aggregated into rollup-shaped rows."""
+        select = ",\n    ".join(f"{c.expr} AS {c.name}" for c in self.columns)
+        group_by = ", ".join(str(i) for i in range(1, len(self.dimensions) + 2))
+        return (
+            f"SELECT date_trunc('{self.unit}', {self.time_column}) AS bucket,\n    {select}\n"
+            f"FROM {self.source}\nWHERE {where}\nGROUP BY {group_by}"
+        )
+
+    def rows(self, rollup_where: str = "TRUE", raw_where: str = "TRUE", through: str = "$2") -> str:
+        """Compacted rows before ``through`` plus the raw tail after it, aggregated the same way."""
+        names = ", ".join(["bucket"] + [c.name for c in self.columns])
+        tail = self.aggregate(f"{self.time_column} >= {through} AND ({raw_where})")
+        return (
+            f"SELECT {names} FROM {self.table} WHERE bucket < {through} AND ({rollup_where})\n"
+            f"UNION ALL\n{tail}"
+        )
+
+    def window(self, since: str = "$1", through: str = "$2") -> str:
+        """Rollup rows for buckets from ``since`` on; pair with ``window_bounds``."""
+        return self.rows(f"bucket >= {since}", f"{self.time_column} >= {since}", through)
+
+
+def _c(name: str, type_: str, expr: Optional[str] = None) -> Column:
+    return Column(name, type_, expr or name)
+
+
+def _avg_of(column: str, type_: str = "DOUBLE PRECISION") -> Tuple[Column, Column]:
+    return (
+        _c(f"{column}_sum", type_, f"SUM({column})::{type_.lower()}"),
+        _c(f"{column}_n", "BIGINT", f"COUNT({column})"),
+    )
+
+
+def _ids(name: str, column: str, type_: str) -> Column:
+    return _c(name, f"{type_}[]", f"array_agg(DISTINCT {column}::{type_.lower()})")
+
+
+NFL_ODDS_RANGE = """CASE
+        WHEN home_odds < -300 THEN 'Heavy Favorite'
+        WHEN home_odds < -200 THEN 'Strong Favorite'
+        WHEN home_odds < -150 THEN 'Moderate Favorite'
+        WHEN home_odds < -110 THEN 'Light Favorite'
+        WHEN home_odds < -100 THEN 'Pickem'
+        WHEN home_odds < -50 THEN 'Slight Favorite'
+        WHEN home_odds < 0 THEN 'Pickem'
+        WHEN home_odds <= 50 THEN 'Slight Underdog'
+        WHEN home_odds <= 100 THEN 'Moderate Underdog'
+        WHEN home_odds <= 150 THEN 'Strong Underdog'
+        WHEN home_odds <= 200 THEN 'Heavy Underdog'
+        ELSE 'Extreme Underdog'
+    END"""
+
+# NFL odds keep only low-cardinality dimensions (bookmaker x week x odds range); games and
+# teams ride along as id arrays, and the by-team view has its own rollup keyed by team
+# only (at most one row per team per hour). The NCAAB rollup is daily and keeps game_id.
+# Snapshots and lines carry per-market/player ids the same way.
+ROLLUPS: Dict[str, Rollup] = {
+    r.name: r
+    for r in (
+        Rollup(
+            name="live_odds_nfl",
+            source="live_odds_nfl",
+            unit="hour",
+            time_column="timestamp",
+            change_column="updated_at",
+            dimensions=(
+                _c("bookmaker", "TEXT", "bookmaker::text"),
+                _c("week", "INTEGER", "week::integer"),
+                _c("season", "INTEGER", "season::integer"),
+                _c("odds_range", "TEXT", NFL_ODDS_RANGE),
+            ),
+            measures=(
+                _c("n", "BIGINT", "COUNT(*)"),
+                *_avg_of("home_odds"),
+                *_avg_of("away_odds"),
+                _c("home_favorites", "BIGINT", "COUNT(*) FILTER (WHERE home_odds < 0)"),
+                _c("away_favorites", "BIGINT", "COUNT(*) FILTER (WHERE away_odds < 0)"),
+                _c("draw_markets", "BIGINT", "COUNT(draw_odds)"),
+                _ids("game_ids", "game_id", "BIGINT"),
+                _ids("home_teams", "home_team", "TEXT"),
+                _ids("away_teams", "away_team", "TEXT"),
+            ),
+        ),
+        Rollup(
+            name="live_odds_nfl_teams",
+            source="live_odds_nfl",
+            unit="hour",
+            time_column="timestamp",
+            change_column="updated_at",
+            dimensions=(_c("home_team", "TEXT", "home_team::text"),),
+            measures=(
+                _c("n", "BIGINT", "COUNT(*)"),
+                *_avg_of("home_odds"),
+                *_avg_of("away_odds"),
+                _c("home_favorites", "BIGINT", "COUNT(*) FILTER (WHERE home_odds < 0)"),
+                _c("away_favorites", "BIGINT", "COUNT(*) FILTER (WHERE away_odds < 0)"),
+                _ids("game_ids", "game_id", "BIGINT"),
+                _ids("weeks", "week", "INTEGER"),
+            ),
+        ),
+        Rollup(
+            name="odds_snapshots",
+            source="odds_snapshots",
+            unit="hour",
+            time_column="snapshot_at",
+            change_column="updated_at",
+            dimensions=(
+                _c("bookmaker", "TEXT", "bookmaker::text"),
+                _c("game_id", "BIGINT", "game_id::bigint"),
+                _c("side", "TEXT", "side::text"),
+                _c("is_active", "BOOLEAN"),
+            ),
+            measures=(
+                _c("n", "BIGINT", "COUNT(*)"),
+                *_avg_of("line_value"),
+                *_avg_of("price"),
+                *_avg_of("american_odds"),
+                _c("first_snapshot", "TIMESTAMPTZ", "MIN(snapshot_at)"),
+                _c("last_snapshot", "TIMESTAMPTZ", "MAX(snapshot_at)"),
+                _ids("market_ids", "market_id", "BIGINT"),
+                _ids("player_ids", "player_id", "BIGINT"),
+                _ids("fixture_ids", "external_fixture_id", "TEXT"),
+                _ids("external_market_ids", "external_market_id", "TEXT"),
+                _ids("external_outcome_ids", "external_outcome_id", "TEXT"),
+            ),
+        ),
+        Rollup(
+            name="lines",
+            source="lines",
+            unit="hour",
+            time_column="fetched_at",
+            dimensions=(
+                _c("sportsbook", "TEXT", "sportsbook::text"),
+                _c("game_id", "BIGINT", "game_id::bigint"),
+                _c("side", "TEXT", "side::text"),
+                _c("is_current", "BOOLEAN"),
+            ),
+            measures=(
+                _c("n", "BIGINT", "COUNT(*)"),
+                *_avg_of("line_value"),
+                *_avg_of("odds"),
+                _ids("market_ids", "market_id", "BIGINT"),
+                _ids("player_ids", "player_id", "BIGINT"),
+            ),
+        ),
+        Rollup(
+            name="historical_odds_ncaab",
+            source="historical_odds_ncaab",
+            unit="day",
+            time_column="snapshot_date",
+            change_column="updated_at",
+            dimensions=(
+                _c("bookmaker", "TEXT", "bookmaker::text"),
+                _c("game_id", "BIGINT", "game_id::bigint"),
+                _c("home_team", "TEXT", "home_team::text"),
+                _c("result", "TEXT", "result::text"),
+            ),
+            measures=(
+                _c("n", "BIGINT", "COUNT(*)"),
+                *_avg_of("home_odds"),
+                *_avg_of("away_odds"),
+                *_avg_of("draw_odds"),
+            ),
+        ),
+        Rollup(
+            name="games",
+            source="games",
+            unit="day",
+            time_column="created_at",
+            change_column="updated_at",
+            dimensions=(
+                _c("sport_id", "BIGINT", "sport_id::bigint"),
+                _c("status", "TEXT", "status::text"),
+                _c("start_date", "DATE", "DATE(start_time)"),
+            ),
+            measures=(_c("n", "BIGINT", "COUNT(*)"),),
+        ),
+    )
+}
+
+
+def ddl_statements() -> List[str]:
+    statements = [STATE_DDL.strip()]
+    for rollup in ROLLUPS.values():
+        statements.extend(rollup.ddl())
+    return statements
+
+
+def merge_ranges(ranges: Iterable[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """Collapse overlapping or touching ``[lo, hi)`` ranges."""
+    merged: List[Tuple[datetime, datetime]] = []
+    for lo, hi in sorted(r for r in ranges if r[0] < r[1]):
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(hi, merged[-1][1]))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def dirty_ranges(
+    rollup: Rollup,
+    previous_through: datetime,
+    through: datetime,
+    changed_buckets: Sequence[datetime] = (),
+) -> List[Tuple[datetime, datetime]]:
+    """Bucket ranges a compaction must rebuild: the settle window, new buckets, changed buckets."""
+    settle_from = previous_through - rollup.step * STATS_ROLLUP_SETTLE_BUCKETS
+    ranges = [(settle_from, through)]
+    ranges.extend((b, b + rollup.step) for b in changed_buckets)
+    return merge_ranges(ranges)
+
+
+async def _rebuild(conn, rollup: Rollup, lo: Optional[datetime], hi: datetime) -> None:
+    if lo is None:
+        await conn.execute(f"DELETE FROM {rollup.table} WHERE bucket < $1", hi)
+        where = f"{rollup.time_column} < $1"
+        args: Tuple[Any, ...] = (hi,)
+    else:
+        await conn.execute(f"DELETE FROM {rollup.table} WHERE bucket >= $1 AND bucket < $2", lo, hi)
+        where = f"{rollup.time_column} >= $1 AND {rollup.time_column} < $2"
+        args = (lo, hi)
+    names = ", ".join(["bucket"] + [c.name for c in rollup.columns])
+    await conn.execute(f"INSERT INTO {rollup.table} ({names})\n{rollup.aggregate(where)}", *args)
+
+
+async def compact(conn, rollup: Rollup, full: bool = False) -> Dict[str, Any]:
+    """Bring one rollup up to the current bucket. Serialized across workers by an advisory lock."""
+    started = time.perf_counter()
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", f"stats_rollup:{rollup.name}")
+        through = await conn.fetchval(f"SELECT date_trunc('{rollup.unit}', NOW())")
+        state = None if full else await conn.fetchrow(
+            "SELECT through, change_watermark FROM stats_rollup_state WHERE name = $1", rollup.name
+        )
+
+        watermark = None
+        changed: List[datetime] = []
+        if rollup.change_column:
+            watermark = await conn.fetchval(f"SELECT MAX({rollup.change_column}) FROM {rollup.source}")
+            if state is not None and state["change_watermark"] is not None:
+                rows = await conn.fetch(
+                    f"SELECT DISTINCT date_trunc('{rollup.unit}', {rollup.time_column}) AS bucket "
+                    f"FROM {rollup.source} WHERE {rollup.change_column} > $1 AND {rollup.time_column} < $2",
+                    state["change_watermark"] - CHANGE_OVERLAP, through,
+                )
+                changed = [r["bucket"] for r in rows if r["bucket"] is not None]
+
+        if state is None:
+            ranges: List[Tuple[Optional[datetime], datetime]] = [(None, through)]
+        else:
+            ranges = list(dirty_ranges(rollup, state["through"], through, changed))
+        for lo, hi in ranges:
+            await _rebuild(conn, rollup, lo, hi)
+
+        rebuilt = len(ranges)
+        await conn.execute(
+            """
+            INSERT INTO stats_rollup_state (name, through, change_watermark, refreshed_at, buckets_rebuilt)
+            VALUES ($1, $2, $3, NOW(), $4)
+            ON CONFLICT (name) DO UPDATE SET
+                through = EXCLUDED.through,
+                change_watermark = COALESCE(EXCLUDED.change_watermark, stats_rollup_state.change_watermark),
+                refreshed_at = EXCLUDED.refreshed_at,
+                buckets_rebuilt = stats_rollup_state.buckets_rebuilt + EXCLUDED.buckets_rebuilt
+            """,
+            rollup.name, through, watermark, rebuilt,
+        )
+    return {
+        "rollup": rollup.name,
+        "through": through.isoformat(),
+        "ranges": rebuilt,
+        "changed_buckets": len(changed),
+        "full": state is None,
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def window_bounds(conn, name: str, span: timedelta) -> Tuple[datetime, datetime]:
+    """
+    ``(since, through)`` for ``Rollup.window()``: the first bucket of the window and the
+    rollup's high-water mark. A rollup the scheduler has not built yet reads the raw
+    table for the whole window (``through = since``) instead of backfilling inline.
+    """
+    rollup = ROLLUPS[name]
+    since = await conn.fetchval(f"SELECT date_trunc('{rollup.unit}', NOW()) - $1::interval", span)
+    try:
+        through = await conn.fetchval("SELECT through FROM stats_rollup_state WHERE name = $1", name)
+    except Exception:
+        through = None  # state table not created yet
+    if through is None:
+        return since, since
+    return since, max(since, through)
+
+
+async def compact_all() -> List[Dict[str, Any]]:
+    """Scheduler entry point: compact every rollup whose source table exists."""
+    pool = await get_asyncpg_pool()
+    if pool is None:
+        return []
+    results = []
+    conn = await acquire_timed(pool)
+    try:
+        for rollup in ROLLUPS.values():
+            if await conn.fetchval("SELECT to_regclass($1)", rollup.source) is None:
+                continue
+            try:
+                results.append(await compact(conn, rollup))
+            except Exception as e:
+                logger.warning("stats rollup %s compaction failed: %s", rollup.name, e)
+    finally:
+        await release_timed(pool, conn)
+    if results:
+        logger.info("stats rollups compacted: %s", ", ".join(f"{r['rollup']}={r['ms']}ms" for r in results))
+    return results
@@ -2,7 +2,6 @@
 Trade Details Service - Track and analyze player trades between teams
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,7 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,16 +37,13 @@ class TradeDetail:
     created_at: datetime
     updated_at: datetime
 
-class TradeDetailsService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class TradeDetailsService(AsyncpgRepository):
     async def create_trade_detail(self, trade_id: str, player_id: int, from_team_id: Optional[int],
                                  to_team_id: Optional[int], asset_type: str, asset_description: Optional[str],
                                  player_name: str) -> bool:
         """Create a new trade detail"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -70,7 +66,7 @@ class TradeDetailsService:
     async def get_trade_details_by_trade_id(self, trade_id: str) -> List[TradeDetail]:
         """Get all trade details for a specific trade"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM trade_details 
@@ -103,7 +99,7 @@ class TradeDetailsService:
     async def get_trade_details_by_team(self, team_id: int, role: str = 'both') -> List[TradeDetail]:
         """Get trade details for a specific team"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             if role == 'from':
                 results = await conn.fetch("""
@@ -149,7 +145,7 @@ class TradeDetailsService:
     async def get_trade_details_by_player(self, player_id: int) -> List[TradeDetail]:
         """Get trade details for a specific player"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM trade_details 
@@ -182,7 +178,7 @@ class TradeDetailsService:
     async def get_trade_details_by_asset_type(self, asset_type: str, limit: int = 50) -> List[TradeDetail]:
         """Get trade details by asset type"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM trade_details 
@@ -216,7 +212,7 @@ class TradeDetailsService:
     async def get_recent_trades(self, days: int = 30, limit: int = 20) -> List[TradeDetail]:
         """Get recent trades"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM trade_details 
@@ -250,7 +246,7 @@ class TradeDetailsService:
     async def get_trade_summary(self, trade_id: str) -> Dict[str, Any]:
         """Get a summary of a specific trade"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Get all trade details
             details = await conn.fetch("""
@@ -314,7 +310,7 @@ class TradeDetailsService:
     async def get_team_trade_history(self, team_id: int, days: int = 365) -> Dict[str, Any]:
         """Get trade history for a specific team"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Get all trades involving the team
             details = await conn.fetch("""
@@ -372,7 +368,7 @@ class TradeDetailsService:
     async def get_trade_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get overall trade statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Overall statistics
             overall = await conn.fetchrow("""
@@ -487,7 +483,7 @@ class TradeDetailsService:
     async def search_trade_details(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search trade details by player name or trade ID"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
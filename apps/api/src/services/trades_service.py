@@ -2,7 +2,6 @@
 Trades Service - Track and analyze master trade records
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,7 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,16 +37,13 @@ class Trade:
     created_at: datetime
     updated_at: datetime
 
-class TradesService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class TradesService(AsyncpgRepository):
     async def create_trade(self, trade_date: datetime.date, season_year: int, description: str,
                           headline: str, source_url: Optional[str], source: Optional[str],
                           is_applied: bool = False) -> bool:
         """Create a new trade"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -70,7 +66,7 @@ class TradesService:
     async def get_trades_by_season(self, season_year: int) -> List[Trade]:
         """Get trades for a specific season"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM trades 
@@ -103,7 +99,7 @@ class TradesService:
     async def get_trades_by_source(self, source: str) -> List[Trade]:
         """Get trades from a specific source"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM trades 
@@ -136,7 +132,7 @@ class TradesService:
     async def get_trades_by_date_range(self, start_date: datetime.date, end_date: datetime.date) -> List[Trade]:
         """Get trades within a date range"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM trades 
@@ -169,7 +165,7 @@ class TradesService:
     async def get_recent_trades(self, days: int = 30) -> List[Trade]:
         """Get recent trades"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM trades 
@@ -202,7 +198,7 @@ class TradesService:
     async def get_applied_trades(self) -> List[Trade]:
         """Get applied trades"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM trades 
@@ -235,7 +231,7 @@ class TradesService:
     async def get_pending_trades(self) -> List[Trade]:
         """Get pending trades"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM trades 
@@ -268,7 +264,7 @@ class TradesService:
     async def apply_trade(self, trade_id: int) -> bool:
         """Apply a trade"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -289,7 +285,7 @@ class TradesService:
     async def get_trade_statistics(self, days: int = 365) -> Dict[str, Any]:
         """Get overall trade statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Overall statistics
             overall = await conn.fetchrow("""
@@ -396,7 +392,7 @@ class TradesService:
     async def search_trades(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search trades by headline or description"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
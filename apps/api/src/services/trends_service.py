@@ -3,6 +3,7 @@ import random
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 from services.player_splits_service import get_full_splits
+from services.feature_store import feature_store, stat_category
 # Mock data removed for production.
 
 logger = logging.getLogger(__name__)
@@ -43,6 +44,11 @@ class TrendsService:
                 result = await db.execute(stmt)
                 picks = result.scalars().all()
 
+                # Materialized splits for the whole slate in one read
+                features = await feature_store.get_many(
+                    db, [(p.player_id, p.stat_type) for p in picks]
+                ) if picks else {}
+
             if not picks:
                 return []
 
@@ -60,9 +66,11 @@ class TrendsService:
                     continue
                 seen_combos.add(combo_key)
 
-                # Fetch real splits from BDL (NBA only for now) or hit_rates table
-                # For now, we attempt get_full_splits and fall back to skipping
-                if sport_key == "basketball_nba":
+                # Feature store first; BDL (NBA only) for players it has not materialized yet
+                pick_features = features.get((pick.player_id, stat_category(pick.stat_type)))
+                if pick_features is not None and pick_features.recent_values and pick.line is not None:
+                    splits_data = {"splits": pick_features.splits(float(pick.line))}
+                elif sport_key == "basketball_nba":
                     splits_data = await get_full_splits(pick.player_name, pick.stat_type, pick.line)
                 else:
                     # Non-NBA sports: future integration
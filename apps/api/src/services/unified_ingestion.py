@@ -30,9 +30,11 @@ from typing import List, Dict, Any, Optional
 from db.session import async_session_maker # type: ignore
 from schemas.props import PropRecord # type: ignore
 from services.odds_mapping import odds_mapper # type: ignore
+from services.odds_normalizer import PropBatch # type: ignore
 from core.config import settings # type: ignore
 from services.brains import sharp_money_brain, brain_clv_tracker, injury_impact_brain, brain_advanced_service # type: ignore
 from services.unified_odds_persistence import upsert_unified_odds # type: ignore
+from services.simulation_cache import ODDS, simulation_cache # type: ignore
 from services.heartbeat_service import HeartbeatService # type: ignore
 from services.odds_api_client import odds_api_client # type: ignore
 from services.persistence_helpers import upsert_props_live, insert_props_history, delete_props_for_sport # type: ignore
@@ -48,9 +50,16 @@ from services.commence_time import (  # type: ignore
 )
 from brain.engine import brain_governor  # type: ignore
 from services.ingestion_job_guard import try_start_job, finish_job
+from services.metrics_registry import StageTimer, registry
 
 logger = logging.getLogger(__name__)
 
+INGEST_STAGE_SECONDS = registry.histogram(
+    "ingest_stage_seconds", "UnifiedIngestionService.run duration per waterfall stage", ("sport", "stage")
+)
+INGEST_RUNS = registry.counter("ingest_runs", "UnifiedIngestionService.run completions by status", ("sport", "status"))
+INGEST_ROWS = registry.counter("ingest_rows_upserted", "Rows upserted by UnifiedIngestionService.run", ("sport",))
+
 
 def _is_auth_failure_error(err: Exception) -> bool:
     msg = str(err).lower()
@@ -149,7 +158,20 @@ class UnifiedIngestionService:
         return metadata_map
 
     async def run(self, sport_key: str):
+        stages = StageTimer(INGEST_STAGE_SECONDS, sport=sport_key)
+        status = "error"
+        try:
+            metrics = await self._run(sport_key, stages)
+            status = metrics.get("status", "unknown")
+            INGEST_ROWS.inc(metrics.get("rows_upserted") or 0, sport=sport_key)
+            return metrics
+        finally:
+            stages.done()
+            INGEST_RUNS.inc(sport=sport_key, status=status)
+
+    async def _run(self, sport_key: str, stages: StageTimer):
         start_time = datetime.now(timezone.utc)
+        stages.next("init")
         logger.debug(f"=== WATERFALL STAGE 0: INIT for {sport_key} START ===")
         source_name = "none"
         from workers.ev_engine import ev_engine # type: ignore
@@ -218,7 +240,7 @@ class UnifiedIngestionService:
                 metrics["status"] = "skipped"
                 metrics["skipped_reason"] = plan.reason
                 metrics["brain"] = plan.to_metrics_dict()
-                await self.run_intelligence_pipeline(sport_key, [])
+                await self.run_intelligence_pipeline(sport_key, [], since=start_time)
                 try:
                     await brain_advanced_service.generate_model_picks(sport_key, session)
                 except Exception as e:
@@ -236,6 +258,7 @@ class UnifiedIngestionService:
                 return metrics
         
         # 1. Fetch odds-shaped events (multi-provider chain, not TOA-only)
+        stages.next("fetch_odds")
         logger.debug(f"=== WATERFALL STAGE 1: FETCH ODDS for {sport_key} START ===")
         if not odds_api_client.is_configured:
             logger.info(
@@ -341,6 +364,7 @@ class UnifiedIngestionService:
 
         logger.debug(f"=== WATERFALL STAGE 1: FETCH ODDS for {sport_key} COMPLETE — {len(odds_raw)} events ===")
         # 2d. Fetch Player Props (Requires per-event calls)
+        stages.next("fetch_props")
         logger.debug(f"=== WATERFALL STAGE 2: FETCH PLAYER PROPS for {sport_key} START ===")
         PROP_MARKETS_BY_SPORT = {
             "basketball_nba": "player_points,player_rebounds,player_assists,player_threes,player_blocks,player_steals,player_points_rebounds_assists,player_points_rebounds,player_points_assists,player_turnovers",
@@ -507,26 +531,26 @@ class UnifiedIngestionService:
         metadata_map = UnifiedIngestionService._build_metadata_map(odds_raw)
 
         logger.debug(f"=== WATERFALL STAGE 2: FETCH PLAYER PROPS for {sport_key} COMPLETE ===")
-        # 3. Normalize into PropRecords
+        # 3. Normalize into a columnar PropBatch
+        stages.next("normalize")
         logger.debug(f"=== WATERFALL STAGE 3: NORMALIZE & ENRICH for {sport_key} START ===")
-        records = odds_mapper.map_theodds_props_to_records(odds_raw, metadata_map, sport_key)
+        batch = odds_mapper.normalize_theodds_props(odds_raw, metadata_map, sport_key)
         
         # Merge logic (Betstack + Primary)
-        combined_records = records + betstack_records
+        batch.extend_records(betstack_records)
         
-        # Normalize player_name for all records to avoid NULLs breaking filters/constraints
-        for r in combined_records:
-            if not r.player_name:
-                r.player_name = r.home_team or "Matchup"
-            if r.game_start_time is not None and reject_absurd_future(r.game_start_time) is None:
-                r.game_start_time = None
-
-        # 3b. Market Intelligence: Best Odds, Soft/Sharp flagging
-        records = self.enrich_with_market_intel(combined_records)
+        # Normalize player_name for all rows to avoid NULLs breaking filters/constraints
+        batch.finalize()
+        batch.validate()
+
+        # 3b. Market Intelligence: Best Odds, Soft/Sharp flagging (column-wise on the batch)
+        self.enrich_with_market_intel(batch)
+        records = batch.props_live_rows()
         metrics["odds_count"] = len(records)
         
         logger.debug(f"=== WATERFALL STAGE 3: NORMALIZE & ENRICH for {sport_key} COMPLETE — {len(records)} records ===")
         # 4. Standardized Persistence
+        stages.next("persist")
         logger.debug(f"=== WATERFALL STAGE 4: PERSIST for {sport_key} START ===")
         # Only delete old data if we have a substantial replacement set (>=10 records).
         # This prevents partial API responses or exhausted keys from wiping the table.
@@ -537,46 +561,13 @@ class UnifiedIngestionService:
             logger.warning(f"UnifiedIngestion: Only {len(records)} records for {sport_key} — skipping delete to preserve existing data")
             
         if records:
-            await upsert_props_live(records, session=session)
-            await insert_props_history(records, session=session)
+            await upsert_props_live(batch, session=session)
+            await insert_props_history(batch, session=session)
         metrics["rows_upserted"] = len(records)
         
-        # 4b. Sync with UnifiedOdds for Brains (Split into discrete outcomes)
-        unified_rows = []
-        for r in records:
-            # Common metadata
-            base = {
-                "sport": r.sport,
-                "league": r.league,
-                "event_id": r.game_id,
-                "game_time": r.game_start_time,
-                "home_team": r.home_team,
-                "away_team": r.away_team,
-                "market_key": r.market_key,
-                "player_name": r.player_name, # Already normalized above
-                "bookmaker": r.book,
-                "line": float(r.line) if r.line is not None else None,
-            }
-
-            # Over Outcome
-            if r.odds_over is not None or r.implied_over is not None:
-                over_row = base.copy()
-                over_row.update({
-                    "outcome_key": "over",
-                    "price": float(r.odds_over) if r.odds_over else 2.0,
-                    "implied_prob": float(r.implied_over) if r.implied_over else None
-                })
-                unified_rows.append(over_row)
-
-            # Under Outcome
-            if r.odds_under is not None or r.implied_under is not None:
-                under_row = base.copy()
-                under_row.update({
-                    "outcome_key": "under",
-                    "price": float(r.odds_under) if r.odds_under else 2.0,
-                    "implied_prob": float(r.implied_under) if r.implied_under else None
-                })
-                unified_rows.append(under_row)
+        # 4b. Sync with UnifiedOdds for Brains (Split into discrete outcomes) — built from the
+        # same columnar batch, so the records are not walked a second time.
+        unified_rows = batch.unified_rows()
 
         # Task 6: Diagnostic Logging for Unified Odds (instrumented per user request)
         if unified_rows:
@@ -585,6 +576,8 @@ class UnifiedIngestionService:
                 await upsert_unified_odds(unified_rows)
                 logger.info(f"UnifiedIngestion: successfully wrote unified odds rows for {sport_key}")
                 metrics["rows_upserted"] = len(unified_rows)
+                # Prices moved: cached single-prop probabilities read the book spread.
+                await simulation_cache.bump(ODDS)
             except Exception as e:
                 logger.error(f"UnifiedIngestion: upsert_unified_odds failed for {sport_key}: {e}", exc_info=True)
                 metrics["errors"].append(f"Unified Odds Persistence: {str(e)}")
@@ -593,11 +586,13 @@ class UnifiedIngestionService:
 
         logger.debug(f"=== WATERFALL STAGE 4: PERSIST for {sport_key} COMPLETE — {metrics['rows_upserted']} rows ===")
         # 5. Trigger Unified Intelligence Pipeline
+        stages.next("intelligence")
         logger.debug(f"=== WATERFALL STAGE 5: INTELLIGENCE PIPELINE for {sport_key} START ===")
-        await self.run_intelligence_pipeline(sport_key, records)
+        await self.run_intelligence_pipeline(sport_key, records, since=start_time)
 
         logger.debug(f"=== WATERFALL STAGE 5: INTELLIGENCE PIPELINE for {sport_key} COMPLETE ===")
         # 6. Promote EV signals to ModelPicks
+        stages.next("model_picks")
         logger.debug(f"=== WATERFALL STAGE 6: MODEL PICK PROMOTION for {sport_key} START ===")
         try:
             await brain_advanced_service.generate_model_picks(sport_key, session)
@@ -691,10 +686,13 @@ class UnifiedIngestionService:
                             meta={"error": str(e), "attempts": retries}
                         )
 
-    async def run_intelligence_pipeline(self, sport: str, records: List[PropRecord]):
+    async def run_intelligence_pipeline(
+        self, sport: str, records: List[Dict[str, Any]], since: Optional[datetime] = None
+    ):
         """
         Single orchestrator for all post-ingestion scoring.
         Ensures data dependencies and standardized output.
+        ``since`` is the ingest start time; alert detection only rescans rows written after it.
         """
         logger.info(f"🚀 [INTELLIGENCE PIPELINE] Starting for {sport}...")
         
@@ -709,7 +707,7 @@ class UnifiedIngestionService:
             
             # Step 2: Signal Detection (Whales, Steam, Sharps)
             from services.alert_writer import run_alert_detection # type: ignore
-            await run_alert_detection(sport)
+            await run_alert_detection(sport, since=since)
             
             # Step 3–4: Analytical extras + news (explicit gather — all tasks are coroutines)
             from services.news_service import news_service
@@ -741,42 +739,11 @@ class UnifiedIngestionService:
         except Exception as e:
             logger.error(f"❌ [INTELLIGENCE PIPELINE] Failed for {sport}: {e}")
 
-    def enrich_with_market_intel(self, records: List[PropRecord]) -> List[PropRecord]:
+    def enrich_with_market_intel(self, batch: PropBatch) -> PropBatch:
         """
         Flag Best Book and Sharp/Soft categorization.
         """
-        if not records: return []
-        
-        # Grouping by (game_id, market_key, player_name, line)
-        groups: Dict[tuple, List[PropRecord]] = {}
-        for r in records:
-            # We use float(line) to group different Representations of the same numeric line
-            safe_line = float(r.line) if r.line is not None else None
-            key = (r.game_id, r.market_key, r.player_name, safe_line)
-            if key not in groups: groups[key] = []
-            groups[key].append(r)
-            
-        for key, prop_group in groups.items():
-            # Best Over (Max price / Min Implied)
-            best_over = max((r.odds_over for r in prop_group if r.odds_over is not None), default=None)
-            # Best Under (Max price / Min Implied)
-            best_under = max((r.odds_under for r in prop_group if r.odds_under is not None), default=None)
-            
-            for r in prop_group:
-                if best_over is not None and r.odds_over == best_over:
-                    r.is_best_over = True
-                if best_under is not None and r.odds_under == best_under:
-                    r.is_best_under = True
-                
-                # Book category
-                book_lower = r.book.lower()
-                r.is_sharp_book = any(s in book_lower for s in settings.SHARP_BOOKMAKERS)
-                r.is_soft_book = any(s in book_lower for s in settings.SOFT_BOOKMAKERS)
-                
-                # Standardized confidence metric: capped at 0.95, 4 decimal precision
-                raw_conf = len(prop_group) / 10.0
-                r.confidence = round(float(min(raw_conf, 0.95)), 4)  # type: ignore (Stale/Inaccurate check)
-                
-        return records
+        batch.mark_market_intel(settings.SHARP_BOOKMAKERS, settings.SOFT_BOOKMAKERS)
+        return batch
 
 unified_ingestion = UnifiedIngestionService()
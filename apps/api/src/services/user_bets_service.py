@@ -2,7 +2,6 @@
 User Bets Service - Track and analyze user betting activity
 """
 import asyncio
-import asyncpg
 import os
 import json
 import time
@@ -12,7 +11,7 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
-from core.asyncpg_dsn import asyncpg_dsn_from_database_url
+from db.repository import AsyncpgRepository
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -56,17 +55,14 @@ class UserBet:
     created_at: datetime
     updated_at: datetime
 
-class UserBetsService:
-    def __init__(self):
-        self.db_url = asyncpg_dsn_from_database_url(os.getenv("DATABASE_URL") or "")
-        
+class UserBetsService(AsyncpgRepository):
     async def create_user_bet(self, sport_id: int, game_id: int, player_id: Optional[int],
                              market_type: str, side: str, line_value: Optional[float],
                              sportsbook: str, opening_odds: float, stake: float,
                              notes: Optional[str] = None, model_pick_id: Optional[int] = None) -> bool:
         """Create a new user bet"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -89,7 +85,7 @@ class UserBetsService:
     async def get_user_bets_by_sport(self, sport_id: int) -> List[UserBet]:
         """Get user bets for a specific sport"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM user_bets 
@@ -134,7 +130,7 @@ class UserBetsService:
     async def get_user_bets_by_status(self, status: str) -> List[UserBet]:
         """Get user bets by status"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM user_bets 
@@ -179,7 +175,7 @@ class UserBetsService:
     async def get_user_bets_by_sportsbook(self, sportsbook: str) -> List[UserBet]:
         """Get user bets from a specific sportsbook"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM user_bets 
@@ -224,7 +220,7 @@ class UserBetsService:
     async def get_user_bets_by_date_range(self, start_date: datetime, end_date: datetime) -> List[UserBet]:
         """Get user bets within a date range"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM user_bets 
@@ -269,7 +265,7 @@ class UserBetsService:
     async def get_recent_user_bets(self, days: int = 7) -> List[UserBet]:
         """Get recent user bets"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             results = await conn.fetch("""
                 SELECT * FROM user_bets 
@@ -316,7 +312,7 @@ class UserBetsService:
                              clv_cents: Optional[float] = None, profit_loss: Optional[float] = None) -> bool:
         """Settle a user bet"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             now = datetime.now(timezone.utc)
             
@@ -350,7 +346,7 @@ class UserBetsService:
     async def get_user_bets_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get overall user bets statistics"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             # Overall statistics
             overall = await conn.fetchrow("""
@@ -501,7 +497,7 @@ class UserBetsService:
     async def search_user_bets(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search user bets by player, market, or notes"""
         try:
-            conn = await asyncpg.connect(self.db_url)
+            conn = await self.connect()
             
             search_query = f"%{query}%"
             
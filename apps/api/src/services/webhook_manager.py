@@ -1,40 +1,46 @@
 import httpx
 from services.api_telemetry import InstrumentedAsyncClient
-import asyncio
-import json
+from services.delivery_queue import delivery_queue
 import logging
 
 logger = logging.getLogger(__name__)
 
+BOT_USERNAME = "Lucrix Bot"
+BOT_AVATAR_URL = "https://perplexedge.com/og-image.png"
+
 class WebhookManager:
     def __init__(self):
         self.http_client = InstrumentedAsyncClient(provider="discord", purpose="webhook")
 
+    @staticmethod
+    def build_pick_embed(pick_data: dict) -> dict:
+        player_name = pick_data.get("player_name", "Unknown Player")
+        edge = pick_data.get("ev_percentage", 0)
+        line = pick_data.get("line", 0)
+        stat = pick_data.get("stat_type", "Stat")
+        book = pick_data.get("sportsbook", "DraftKings")
+        return {
+            "title": f"🚀 Institutional +EV Alert: {player_name}",
+            "description": f"Target found at **{book}** with a verified edge.",
+            "color": 0x10b981, # Emerald Green
+            "fields": [
+                {"name": "stat", "value": stat, "inline": True},
+                {"name": "line", "value": f"{line}", "inline": True},
+                {"name": "edge", "value": f"+{edge}%", "inline": True},
+            ],
+            "footer": {"text": "Powered by Lucrix Intelligence"}
+        }
+
     async def send_discord_alert(self, webhook_url: str, pick_data: dict):
         """
-        Sends a rich-embed Discord notification for a specific +EV pick.
+        Sends a rich-embed Discord notification for a specific +EV pick immediately
+        (bypasses the delivery queue; use dispatch_alerts for fan-out).
         """
         try:
-            player_name = pick_data.get("player_name", "Unknown Player")
-            edge = pick_data.get("ev_percentage", 0)
-            line = pick_data.get("line", 0)
-            stat = pick_data.get("stat_type", "Stat")
-            book = pick_data.get("sportsbook", "DraftKings")
-            
             payload = {
-                "username": "Lucrix Bot",
-                "avatar_url": "https://perplexedge.com/og-image.png",
-                "embeds": [{
-                    "title": f"🚀 Institutional +EV Alert: {player_name}",
-                    "description": f"Target found at **{book}** with a verified edge.",
-                    "color": 0x10b981, # Emerald Green
-                    "fields": [
-                        {"name": "stat", "value": stat, "inline": True},
-                        {"name": "line", "value": f"{line}", "inline": True},
-                        {"name": "edge", "value": f"+{edge}%", "inline": True},
-                    ],
-                    "footer": {"text": "Powered by Lucrix Intelligence"}
-                }]
+                "username": BOT_USERNAME,
+                "avatar_url": BOT_AVATAR_URL,
+                "embeds": [self.build_pick_embed(pick_data)],
             }
             
             # Use self.http_client to send the post
@@ -46,19 +52,25 @@ class WebhookManager:
 
     async def dispatch_alerts(self, picking_data: list, registered_hooks: list):
         """
-        Iterates through active picks and dispatches them to all registered customer webhooks.
+        Queues every active pick for all registered customer webhooks. The delivery
+        queue coalesces picks per webhook into multi-embed messages and rate-limits
+        each destination, so a large slate no longer fires one request per (pick × hook).
         """
-        tasks = []
         # For efficiency, we only alert on high-value items (e.g. Edge > 4%)
         high_ev_picks = [p for p in picking_data if p.get("ev_percentage", 0) > 4.0]
-        
-        for pick in high_ev_picks:
-            for hook_url in registered_hooks:
-                tasks.append(self.send_discord_alert(hook_url, pick))
-        
-        if tasks:
-            results = await asyncio.gather(*tasks)
-            logger.info(f"📢 Dispatched {sum(results)} alerts to external Discord Webhooks.")
+        embeds = [self.build_pick_embed(p) for p in high_ev_picks]
+
+        queued = 0
+        for hook_url in registered_hooks:
+            for embed in embeds:
+                await delivery_queue.enqueue_discord(
+                    hook_url, embeds=[embed], username=BOT_USERNAME, avatar_url=BOT_AVATAR_URL
+                )
+                queued += 1
+
+        if queued:
+            logger.info(f"📢 Queued {queued} alerts for external Discord Webhooks.")
+        return queued
 
 webhook_manager = WebhookManager()
 send_discord_alert = webhook_manager.send_discord_alert
@@ -1,5 +1,5 @@
 import httpx
-from services.api_telemetry import InstrumentedAsyncClient
+from services.delivery_queue import delivery_queue
 import logging
 from typing import Optional, Dict, Any
 
@@ -8,40 +8,25 @@ logger = logging.getLogger(__name__)
 class WebhookService:
     async def send_discord_signal(self, webhook_url: str, content: str, embed: Optional[Dict[str, Any]] = None):
         """
-        Send a signal to a Discord webhook.
+        Queue a signal for a Discord webhook (delivered with rate limiting and retries).
         """
-        payload = {"content": content}
-        if embed:
-            payload["embeds"] = [embed]
-            
-        async with InstrumentedAsyncClient(provider="discord", purpose="webhook") as client:
-            try:
-                response = await client.post(webhook_url, json=payload)
-                response.raise_for_status()
-                return True
-            except Exception as e:
-                logger.error(f"Failed to send Discord signal: {e}")
-                return False
+        try:
+            await delivery_queue.enqueue_discord(webhook_url, content=content, embeds=[embed] if embed else None)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to queue Discord signal: {e}")
+            return False
 
     async def send_telegram_signal(self, bot_token: str, chat_id: str, message: str):
         """
-        Send a signal via Telegram Bot API.
+        Queue a signal for the Telegram Bot API (delivered with rate limiting and retries).
         """
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        payload = {
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "HTML"
-        }
-        
-        async with InstrumentedAsyncClient(provider="telegram", purpose="webhook") as client:
-            try:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-                return True
-            except Exception as e:
-                logger.error(f"Failed to send Telegram signal: {e}")
-                return False
+        try:
+            await delivery_queue.enqueue_telegram(bot_token, chat_id, message)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to queue Telegram signal: {e}")
+            return False
 
     def format_prop_signal(self, prop_data: Dict[str, Any]) -> str:
         """
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+import db.asyncpg_pool as pool_mod
+import db.repository as repo_mod
+from db.repository import AsyncpgRepository
+
+
+class FakeConn:
+    def __init__(self, n):
+        self.n = n
+
+    async def fetchval(self, sql, *args):
+        return self.n
+
+    def is_closed(self):
+        return False
+
+
+class FakePool:
+    def __init__(self):
+        self.created = 0
+        self.out = set()
+
+    async def acquire(self, timeout=None):
+        self.created += 1
+        conn = FakeConn(self.created)
+        self.out.add(conn)
+        return conn
+
+    async def release(self, conn):
+        self.out.remove(conn)
+
+    def get_size(self):
+        return self.created
+
+    def get_idle_size(self):
+        return self.created - len(self.out)
+
+
+class DemoService(AsyncpgRepository):
+    async def ok(self):
+        conn = await self.connect()
+        value = await conn.fetchval("SELECT 1")
+        await conn.close()
+        return value
+
+    async def forgets_to_close(self):
+        conn = await self.connect()
+        return await conn.fetchval("SELECT 1")
+
+    async def raises_before_close(self):
+        conn = await self.connect()
+        await conn.fetchval("SELECT 1")
+        raise RuntimeError("boom")
+
+    async def nested(self):
+        conn = await self.connect()
+        inner = await self.ok()
+        await conn.close()
+        return inner
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = FakePool()
+
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(repo_mod, "get_asyncpg_pool", get_pool)
+    monkeypatch.setattr(pool_mod, "pool_metrics", pool_mod.PoolMetrics())
+    monkeypatch.setattr(repo_mod, "pool_metrics", pool_mod.pool_metrics)
+    return pool
+
+
+def test_close_returns_connection_to_pool(fake_pool):
+    svc = DemoService()
+    assert asyncio.run(svc.ok()) == 1
+    assert fake_pool.out == set()
+    snap = pool_mod.pool_metrics.snapshot()
+    assert snap["acquired"] == 1 and snap["in_use"] == 0
+
+
+def test_method_scope_releases_unreturned_connections(fake_pool):
+    svc = DemoService()
+    asyncio.run(svc.forgets_to_close())
+    assert fake_pool.out == set()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(svc.raises_before_close())
+    assert fake_pool.out == set()
+    assert pool_mod.pool_metrics.in_use == 0
+
+
+def test_nested_methods_and_concurrency_share_the_pool(fake_pool):
+    svc = DemoService()
+
+    async def main():
+        return await asyncio.gather(svc.nested(), *(svc.ok() for _ in range(5)))
+
+    asyncio.run(main())
+    assert fake_pool.out == set()
+    snap = pool_mod.pool_metrics.snapshot()
+    assert snap["acquired"] == 7
+    assert snap["peak_in_use"] >= 1
+    assert snap["wait_p95_ms"] is not None
+
+
+def test_legacy_services_inherit_the_repository():
+    from services.trades_service import TradesService
+    from services.brain_anomaly_detector import BrainAnomalyDetector
+
+    assert issubclass(TradesService, AsyncpgRepository)
+    detector = BrainAnomalyDetector()
+    assert detector.thresholds and hasattr(detector, "db_url")
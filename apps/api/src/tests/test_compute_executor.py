@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+import pytest
+
+from services.compute_executor import (
+    ComputeBusy,
+    ComputeExecutor,
+    ComputeJob,
+    ComputeTimeout,
+    DeadlineExceeded,
+    ParlaySimulationJob,
+    TrainingJob,
+    check_deadline,
+)
+
+LEGS = [
+    {"player_name": "A", "mean": 25.0, "std_dev": 5.0, "line": 22.5, "side": "over", "odds": -110},
+    {"player_name": "B", "mean": 8.0, "std_dev": 2.0, "line": 9.5, "side": "under", "odds": 120},
+]
+
+
+class _SpinJob(ComputeJob):
+    """Busy loop that only stops at a deadline check (inline mode only: not importable by workers)."""
+
+    kind = "spin"
+
+    def run(self, deadline):
+        while True:
+            check_deadline(deadline)
+            time.sleep(0.001)
+
+
+def test_check_deadline():
+    check_deadline(None)
+    check_deadline(time.time() + 60)
+    with pytest.raises(DeadlineExceeded):
+        check_deadline(time.time() - 1)
+
+
+def test_inline_mode_runs_jobs_and_records_latency():
+    executor = ComputeExecutor()
+
+    async def main():
+        return await executor.run(ParlaySimulationJob(LEGS, n_sims=2000))
+
+    result = asyncio.run(main())
+    assert set(result) >= {"parlay_hit_rate", "parlay_ev", "leg_results"}
+    stats = executor.stats()
+    assert stats["mode"] == "inline"
+    assert stats["completed"] == 1 and stats["in_flight"] == 0
+    assert stats["jobs"]["parlay_simulation"]["samples"] == 1
+
+
+def test_timeout_stops_the_job_at_its_deadline():
+    executor = ComputeExecutor()
+
+    async def main():
+        with pytest.raises(ComputeTimeout):
+            await executor.run(_SpinJob(), timeout=0.05)
+        # The worker thread gives up at its next deadline check instead of running to completion.
+        start = time.time()
+        while executor.stats()["in_flight"] and time.time() - start < 5:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert executor.stats()["timed_out"] == 1
+
+
+def test_backpressure_rejects_when_queue_full(monkeypatch):
+    import services.compute_executor as mod
+
+    monkeypatch.setattr(mod, "COMPUTE_MAX_PENDING", 1)
+    executor = ComputeExecutor()
+
+    async def main():
+        slow = asyncio.create_task(executor.run(_SpinJob(), timeout=0.3))
+        await asyncio.sleep(0)
+        with pytest.raises(ComputeBusy):
+            await executor.run(ParlaySimulationJob(LEGS, n_sims=100))
+        with pytest.raises(ComputeTimeout):
+            await slow
+
+    asyncio.run(main())
+    assert executor.stats()["rejected"] == 1
+
+
+def test_process_pool_round_trip():
+    executor = ComputeExecutor()
+
+    async def main():
+        executor.start(workers=1)
+        try:
+            await executor.warm()
+            return await executor.run(ParlaySimulationJob(LEGS, n_sims=5000), timeout=60)
+        finally:
+            await executor.stop()
+
+    result = asyncio.run(main())
+    assert 0 < result["parlay_hit_rate"] < 1
+    assert executor.stats()["mode"] == "inline"  # stopped
+
+
+def test_backtest_job_in_worker_process():
+    from services.compute_executor import BacktestJob
+
+    executor = ComputeExecutor()
+    props = [{"created_at": f"2026-01-01T00:{i:02d}:00", "odds": 1.91} for i in range(40)]
+
+    async def main():
+        executor.start(workers=1)
+        try:
+            return await executor.run(BacktestJob(props, "2026-01-01T00:00:00"), timeout=60)
+        finally:
+            await executor.stop()
+
+    result = asyncio.run(main())
+    assert result["summary"]["total_trades"] == 40
+    assert len(result["equity_curve"]) == 41
+
+
+def test_parlay_simulation_rejects_unbounded_n_sims():
+    from services.monte_carlo_service import MC_MAX_SIMS, simulate_parlay_legs
+
+    with pytest.raises(ValueError):
+        simulate_parlay_legs(LEGS, MC_MAX_SIMS + 1)
+    with pytest.raises(ValueError):
+        simulate_parlay_legs(LEGS, 0)
+
+
+def test_training_fits_on_the_executor(monkeypatch):
+    import ml.projections as projections
+    from services import compute_executor as ce
+
+    executor = ComputeExecutor()
+    submitted = []
+    original_run = executor.run
+
+    async def run(job, timeout=None):
+        submitted.append(job)
+        return await original_run(job, timeout)
+
+    monkeypatch.setattr(executor, "run", run)
+    monkeypatch.setattr(ce, "compute_executor", executor)
+    monkeypatch.setattr(projections, "load_training_set", lambda sport, stat, db: ([[1.0] * 10] * 3, [2.0] * 3))
+
+    result = asyncio.run(projections.train_model("NBA", "points", db=None))
+    assert result == {"status": "insufficient_data", "records": 3}
+    assert isinstance(submitted[0], TrainingJob) and submitted[0].stat_category == "points"
+    assert executor.stats()["jobs"]["training"]["samples"] == 1
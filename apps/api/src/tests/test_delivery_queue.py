@@ -0,0 +1,232 @@
+import asyncio
+
+from services.delivery_queue import DISCORD, DeliveryQueue, DeliveryResult, coalesce_discord, OutboundMessage
+
+
+def _embed(i: int) -> dict:
+    return {"title": f"pick {i}"}
+
+
+def test_discord_messages_coalesce_into_multi_embed_payloads():
+    msgs = [OutboundMessage(DISCORD, "hook-a", {"embeds": [_embed(i)], "username": "bot"}) for i in range(12)]
+    msgs.append(OutboundMessage(DISCORD, "hook-b", {"embeds": [_embed(99)], "username": "bot"}))
+    msgs.append(OutboundMessage(DISCORD, "hook-a", {"content": "plain text"}))
+
+    units = coalesce_discord(msgs)
+    sizes = sorted(len(payload.get("embeds", [])) for _, payload in units)
+    assert sizes == [0, 1, 2, 10]
+    assert sum(len(group) for group, _ in units) == len(msgs)
+
+
+def test_rate_limited_destination_is_parked_and_retried():
+    calls = []
+
+    async def sender(destination, payload):
+        calls.append(len(payload["embeds"]))
+        if len(calls) == 1:
+            return DeliveryResult("retry", retry_after=0.0)
+        return DeliveryResult("ok")
+
+    async def run():
+        q = DeliveryQueue(autostart=False)
+        q.register_sender(DISCORD, sender)
+        for i in range(3):
+            await q.enqueue_discord("hook", embeds=[_embed(i)])
+        assert await q.process_once() == 3
+        # The 429 parks the messages and empties the destination bucket; they go out once it refills.
+        for _ in range(10):
+            await asyncio.sleep(0.1)
+            await q.process_once()
+            if q.metrics.counters["sent"]:
+                break
+        return await q.stats()
+
+    stats = asyncio.run(run())
+    assert calls == [3, 3]
+    assert stats["rate_limited"] == 3
+    assert stats["sent"] == 3
+    assert stats["requests"] == 1
+    assert stats["depth"] == {"ready": 0, "delayed": 0}
+
+
+def test_permanent_failure_is_dropped():
+    async def sender(destination, payload):
+        return DeliveryResult("drop", detail="404")
+
+    async def run():
+        q = DeliveryQueue(autostart=False)
+        q.register_sender(DISCORD, sender)
+        await q.enqueue_discord("hook", content="hello")
+        await q.process_once()
+        return await q.stats()
+
+    stats = asyncio.run(run())
+    assert stats["dropped"] == 1
+    assert stats["depth"]["delayed"] == 0
+
+
+def test_restart_after_stop_delivers_on_fresh_clients(monkeypatch):
+    posted = []
+
+    class FakeResp:
+        status_code = 200
+        headers = {}
+
+    async def run():
+        q = DeliveryQueue(autostart=False)
+
+        async def no_redis():
+            return None
+
+        q._connect_backend = no_redis
+        await q.start(workers=1)
+        first = q._clients[DISCORD]
+        await q.stop(drain_seconds=0)
+        assert q._clients == {}
+
+        await q.start(workers=1)
+        client = q._clients[DISCORD]
+        assert client is not first
+
+        async def post(url, json=None):
+            posted.append(url)
+            return FakeResp()
+
+        monkeypatch.setattr(client, "post", post)
+        await q.enqueue_discord("hook", content="after restart")
+        for _ in range(20):
+            if posted:
+                break
+            await asyncio.sleep(0.05)
+        await q.stop(drain_seconds=0)
+
+    asyncio.run(run())
+    assert posted == ["hook"]
+
+
+class _FakeRedis:
+    """The handful of list / set / zset commands the Redis backend uses."""
+
+    def __init__(self):
+        self.lists, self.zsets, self.sets, self.keys = {}, {}, {}, {}
+
+    async def lpush(self, key, raw):
+        self.lists.setdefault(key, []).insert(0, raw)
+
+    async def lmove(self, src, dst, wherefrom, whereto):
+        items = self.lists.get(src)
+        if not items:
+            return None
+        raw = items.pop()
+        self.lists.setdefault(dst, []).insert(0, raw)
+        return raw
+
+    async def lrem(self, key, count, raw):
+        if raw in self.lists.get(key, []):
+            self.lists[key].remove(raw)
+
+    async def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zrangebyscore(self, key, lo, hi, start=0, num=None):
+        return [r for r, at in sorted(self.zsets.get(key, {}).items(), key=lambda kv: kv[1]) if lo <= at <= hi][:num]
+
+    async def zrange(self, key, start, stop, withscores=False):
+        return list(self.zsets.get(key, {}).items())
+
+    async def zrem(self, key, raw):
+        return self.zsets.get(key, {}).pop(raw, None) is not None
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def set(self, key, value, ex=None):
+        self.keys[key] = value
+
+    async def exists(self, key):
+        return key in self.keys
+
+    async def delete(self, key):
+        self.keys.pop(key, None)
+
+    async def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    async def srem(self, key, member):
+        self.sets.get(key, set()).discard(member)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+
+def _redis_queue(redis, consumer):
+    from services.delivery_queue import _RedisBackend
+
+    q = DeliveryQueue(autostart=False)
+    q.consumer = consumer
+    q._backend = _RedisBackend(redis, consumer)
+    return q
+
+
+def test_message_in_flight_at_crash_is_recovered_by_another_consumer():
+    from services.delivery_queue import _PROCESSING_KEY
+
+    sent = []
+
+    started = asyncio.Event()
+
+    async def hang(destination, payload):
+        started.set()
+        await asyncio.sleep(3600)
+
+    async def ok(destination, payload):
+        sent.append(payload)
+        return DeliveryResult("ok")
+
+    async def run():
+        redis = _FakeRedis()
+        a = _redis_queue(redis, "a")
+        a.register_sender(DISCORD, hang)
+        await a.enqueue_discord("hook", content="hello")
+        inflight = asyncio.create_task(a.process_once())
+        await started.wait()
+        inflight.cancel()  # process dies mid-send, before the ack
+        await asyncio.gather(inflight, return_exceptions=True)
+        assert len(redis.lists[_PROCESSING_KEY.format("a")]) == 1
+        redis.keys.clear()  # a's liveness key expired
+
+        b = _redis_queue(redis, "b")
+        b.register_sender(DISCORD, ok)
+        await b.process_once()
+        return redis, await b.stats()
+
+    redis, stats = asyncio.run(run())
+    assert sent == [{"content": "hello"}]
+    assert stats["sent"] == 1 and stats["depth"] == {"ready": 0, "delayed": 0}
+    assert not any(redis.lists.get(_PROCESSING_KEY.format(c)) for c in "ab")
+
+
+def test_channel_without_local_sender_stays_queued():
+    from services.delivery_queue import WEBPUSH
+
+    pushed = []
+
+    async def push_sender(destination, payload):
+        pushed.append(destination)
+        return DeliveryResult("ok")
+
+    async def run():
+        redis = _FakeRedis()
+        api = _redis_queue(redis, "api")  # no web push sender in this process
+        await api.enqueue(WEBPUSH, "endpoint-1", {"title": "line moved"})
+        assert await api.process_once() == 0
+
+        pusher = _redis_queue(redis, "pusher")
+        pusher.register_sender(WEBPUSH, push_sender)
+        return await pusher.process_once()
+
+    assert asyncio.run(run()) == 1
+    assert pushed == ["endpoint-1"]
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import db.base  # noqa: F401
+from models.prop import PropLine
+from services.dvp_service import DVP_LAST_N, DvpService
+
+
+async def _session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: PropLine.__table__.create(c))
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+def test_matrix_matches_last_n_ratings_and_honors_custom_window():
+    async def run():
+        engine, maker = await _session()
+        now = datetime.now(timezone.utc)
+        async with maker() as db:
+            # 20 settled PG points rows vs BOS: the newest 15 are all "hits", older ones misses.
+            for i in range(20):
+                db.add(PropLine(
+                    player_id=f"h{i}", player_name="Hist", opponent="BOS", position="PG",
+                    stat_type="player_points", is_settled=True,
+                    hit_rate_l10=80 if i < DVP_LAST_N else 10,
+                    created_at=now - timedelta(hours=i),
+                ))
+            db.add(PropLine(
+                player_id="p1", player_name="Guard", opponent="BOS", position="PG",
+                stat_type="player_points", is_settled=False, created_at=now,
+            ))
+            await db.commit()
+
+            service = DvpService()
+            rating = await service.get_dvp_rating("BOS", "PG", "player_points", db)
+            assert rating["sample"] == DVP_LAST_N
+            assert rating["rating"] == "Favorable"
+            assert service.lookup("NYK", "PG", "player_points")["label"] == "🟡 Matchup Data Pending"
+
+            card = await service.get_dvp_for_prop_card("p1", db)
+            assert card["dvp"]["player_points"]["rating"] == "Favorable"
+            assert "player_assists" in card["dvp"]
+            assert await service.get_dvp_for_prop_card("missing", db) == {}
+
+            slate = await service.get_dvp_for_slate(["p1", "missing", "p1", ""], db)
+            assert list(slate) == ["p1"]
+            assert slate["p1"]["dvp"]["player_points"]["rating"] == "Favorable"
+
+            # a wider window is read live and takes in the older misses
+            wide = await service.get_dvp_rating("BOS", "PG", "player_points", db, last_n=20)
+            assert wide["sample"] == 20
+            assert wide["allow_rate"] == 0.75
+            assert (await service.get_dvp_rating("NYK", "PG", "player_points", db, last_n=5))["sample"] == 0
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_stale_matrix_is_served_not_rebuilt_on_read(monkeypatch):
+    from services import dvp_service as dvp_mod
+    from services.cache import CacheManager
+    from services.dvp_service import DvpMatrix
+
+    monkeypatch.setattr(dvp_mod, "cache", CacheManager())
+
+    async def run():
+        service = DvpService()
+        stale = DvpMatrix(version=1, built_at=0.0, cells={("BOS", "PG", "player_points"): (9, 10)})
+        service._matrix = stale
+
+        async def no_rebuild(db=None):
+            raise AssertionError("read path must not rebuild a stale matrix")
+
+        service.rebuild_matrix = no_rebuild
+        assert await service.ensure_matrix(db=object()) is stale
+        assert service.lookup("BOS", "PG", "player_points")["rating"] == "Favorable"
+
+        # a newer copy published by another process replaces it
+        newer = DvpMatrix(version=2, built_at=0.0)
+        await dvp_mod.cache.set_json(dvp_mod.DVP_MATRIX_CACHE_KEY, newer.to_json())
+        assert (await service.ensure_matrix(db=object())).version == 2
+
+    asyncio.run(run())
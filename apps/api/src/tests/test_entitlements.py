@@ -0,0 +1,50 @@
+import asyncio
+from types import SimpleNamespace
+
+from services.entitlements import EntitlementResolver, Entitlements, request_entitlements
+
+
+def test_entitlements_rank_and_features():
+    assert Entitlements(tier="elite").has_tier("pro")
+    assert not Entitlements(tier="pro").has_tier("elite")
+    assert Entitlements(tier="free", is_owner=True).has_tier("syndicate")
+    assert not Entitlements(tier="free").allows("whale_watcher")
+    assert Entitlements(tier="premium").allows("whale_watcher")
+
+
+def test_resolver_caches_per_user_and_invalidates(monkeypatch):
+    import deps.auth as deps_auth
+
+    calls = []
+
+    async def fake_profile(auth_id):
+        calls.append(auth_id)
+        return None
+
+    monkeypatch.setattr(deps_auth, "get_user_profile", fake_profile)
+
+    async def run():
+        resolver = EntitlementResolver()
+        user = {"id": "u1", "email": "A@x.io", "user_metadata": {"tier": "pro"}}
+
+        first = await resolver.for_user(user)
+        second = await resolver.for_user(user)
+        assert first is second and first.tier == "pro" and calls == ["u1"]
+
+        resolver.invalidate(email="a@x.io")
+        await resolver.for_user(user)
+        assert calls == ["u1", "u1"]
+
+        # Request scope: computed once, then pinned on request.state.
+        request = SimpleNamespace(state=SimpleNamespace())
+        computed = []
+
+        async def compute():
+            computed.append(1)
+            return Entitlements(tier="elite")
+
+        assert (await request_entitlements(request, compute)).tier == "elite"
+        assert (await request_entitlements(request, compute)).tier == "elite"
+        assert computed == [1]
+
+    asyncio.run(run())
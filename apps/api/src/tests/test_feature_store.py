@@ -0,0 +1,158 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import db.base  # noqa: F401
+from models.brain import PlayerFeature, PlayerStats
+from services.feature_store import FeatureStore
+
+
+async def _session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: PlayerStats.__table__.create(c))
+        await conn.run_sync(lambda c: PlayerFeature.__table__.create(c))
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+def _game(pid, days_ago, value, opp, home, created):
+    return PlayerStats(
+        player_id=pid, player_name=f"Player {pid}", stat_category="points", value=value,
+        opponent_team=opp, is_home=home,
+        game_date=datetime(2026, 3, 20, tzinfo=timezone.utc) - timedelta(days=days_ago),
+        created_at=created,
+    )
+
+
+def test_refresh_materializes_windows_splits_and_is_incremental():
+    async def run():
+        engine, maker = await _session()
+        t0 = datetime(2026, 3, 21, tzinfo=timezone.utc)
+        store = FeatureStore()
+        async with maker() as db:
+            # Newest first: 30, 20 (back-to-back), 10 two days earlier, then older games.
+            values = [30, 20, 10, 25, 15, 22]
+            days = [0, 1, 3, 5, 7, 9]
+            for i, (v, d) in enumerate(zip(values, days)):
+                db.add(_game("1", d, v, "BOS" if i % 2 else "NYK", i % 2 == 0, t0))
+            db.add(_game("2", 0, 8, "BOS", True, t0))
+            await db.commit()
+
+            assert await store.refresh(db) == 2
+            f = await store.get(db, "1", "player_points")
+            assert f.games == 6 and f.l5_avg == 20.0
+            assert f.is_back_to_back and f.rest_days == 0 and f.is_3_in_4
+            assert f.hit_rate(18.5, 5)["hits"] == 3
+            assert f.h2h("BOS")["games"] == 3
+            assert f.home_away()["home_games"] == 3
+
+            by_name = await store.get_many(db, [("Player 1", "points"), ("Player 2", "points")], by="player_name")
+            assert set(by_name) == {("Player 1", "points"), ("Player 2", "points")}
+
+            # Only player 2 has a row past the watermark -> only its features are rebuilt.
+            db.add(_game("2", -2, 12, "MIA", False, t0 + timedelta(hours=1)))
+            await db.commit()
+            assert await store.refresh(db) == 1
+            assert (await store.get(db, "2", "points")).games == 2
+            assert await store.refresh(db) == 0
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_full_splits_read_the_feature_store(monkeypatch):
+    import services.feature_store as fs
+    import services.player_splits_service as splits
+
+    async def no_external(*args, **kwargs):
+        raise AssertionError("materialized players must not hit BallDontLie")
+
+    monkeypatch.setattr(splits, "search_player", no_external)
+
+    async def run():
+        engine, maker = await _session()
+        store = FeatureStore()
+        monkeypatch.setattr(fs, "feature_store", store)
+        async with maker() as db:
+            for i, v in enumerate([30, 20, 10, 25, 15]):
+                db.add(_game("1", i, v, "BOS", True, datetime(2026, 3, 21, tzinfo=timezone.utc)))
+            await db.commit()
+            await store.refresh(db)
+
+            result = await splits.get_full_splits("Player 1", "points", 18.5, db=db)
+            assert result["source"] == "feature_store" and result["player_id"] == "1"
+            assert result["splits"]["l5"]["hits"] == 3
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_grading_pipeline_refreshes_features(monkeypatch):
+    import services.dvp_service as dvp
+    import services.feature_store as fs
+    import services.grader as grader
+
+    calls = []
+
+    class _Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def step(session):
+        calls.append("grade")
+
+    async def refresh(session):
+        calls.append("features")
+
+    async def rebuild(session):
+        calls.append("dvp")
+
+    monkeypatch.setattr(grader, "async_session_maker", _Session)
+    for name in ("grade_props_live", "compute_ev_signals", "grade_model_picks_from_scores"):
+        monkeypatch.setattr(grader, name, step)
+    monkeypatch.setattr(fs.feature_store, "refresh", refresh)
+    monkeypatch.setattr(dvp.dvp_service, "rebuild_matrix", rebuild)
+
+    asyncio.run(grader.run_full_grading_pipeline())
+    assert calls == ["grade", "grade", "grade", "dvp", "features"]
+
+
+def test_back_to_back_falls_back_outside_cached_dates(monkeypatch):
+    import services.h2h_service as h2h
+    from services.feature_store import PlayerFeatures
+
+    features = PlayerFeatures(
+        player_id="1", player_name="Player 1", stat_category="points",
+        recent_dates=["2026-03-20", "2026-03-18", "2026-03-16", "2026-03-14"],
+    )
+    monkeypatch.setattr(h2h.feature_store, "get_player_sync", lambda db, pid: features)
+
+    class _Query:
+        def __init__(self, db):
+            self.db = db
+
+        def filter(self, *args):
+            return self
+
+        def first(self):
+            self.db.queries += 1
+            return object()  # played both nights
+
+    class _Db:
+        queries = 0
+
+        def query(self, model):
+            return _Query(self)
+
+    db = _Db()
+    service = h2h.H2HService()
+    # inside the cached window: answered from features, no query
+    assert service.check_back_to_back("1", "2026-03-21", db)["is_back_to_back"]
+    assert db.queries == 0
+    # a month earlier the features know nothing; the DB decides
+    old = service.check_back_to_back("1", "2026-02-10", db)
+    assert db.queries == 2 and old["is_back_to_back"] and old["is_3_in_4_nights"]
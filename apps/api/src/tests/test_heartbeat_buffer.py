@@ -0,0 +1,73 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import services.heartbeat_service as hb
+from models.heartbeat import Heartbeat
+
+
+def _sqlite(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    monkeypatch.setattr(hb, "engine", engine)
+    monkeypatch.setattr(hb, "async_session_maker", async_sessionmaker(engine, expire_on_commit=False))
+    return engine
+
+
+def test_heartbeats_flush_as_one_upsert_and_reads_see_pending(monkeypatch):
+    async def main():
+        engine = _sqlite(monkeypatch)
+        async with engine.begin() as conn:
+            await conn.run_sync(Heartbeat.__table__.create)
+        buffer = hb.HeartbeatBuffer()
+
+        buffer.record("ingest_basketball_nba", "ok", rows_written=40, meta={"metrics": {"events": 3}})
+        buffer.record("ingest_basketball_nba", "error", rows_written=2, error_count=1, meta={"error": "timeout"})
+        buffer.record("model_inference", "ok", rows_written=5)
+
+        async with AsyncSession(engine) as db:
+            pending = await buffer.get(db, "ingest_basketball_nba")
+            assert (await db.execute(select(Heartbeat))).scalars().all() == []
+        assert pending.rows_written_today == 42 and pending.status == "error"
+        assert pending.last_success_at is not None
+
+        assert await buffer.flush() == 2
+        buffer.record("ingest_basketball_nba", "ok", rows_written=8, meta={"error": None})
+        assert await buffer.flush() == 1
+        await buffer.stop()
+
+        async with AsyncSession(engine) as db:
+            rows = {h.feed_name: h for h in (await db.execute(select(Heartbeat))).scalars().all()}
+            buffer.invalidate()
+            served = {h.feed_name: h for h in await buffer.all(db)}
+        await engine.dispose()
+        return rows, served
+
+    rows, served = asyncio.run(main())
+    nba = rows["ingest_basketball_nba"]
+    assert (nba.rows_written_today, nba.error_count_today, nba.status) == (50, 1, "ok")
+    assert nba.meta == {"metrics": {"events": 3}, "error": None}
+    assert rows["model_inference"].meta is None
+    assert served["ingest_basketball_nba"].rows_written_today == 50
+    assert set(served) == {"ingest_basketball_nba", "model_inference"}
+
+
+def test_failed_flush_keeps_the_batch(monkeypatch):
+    async def main():
+        engine = _sqlite(monkeypatch)  # no heartbeats table: the upsert fails
+        buffer = hb.HeartbeatBuffer()
+        buffer.record("ev_grader_basketball_nba", "ok", rows_written=3)
+        assert await buffer.flush() == 0
+        buffer.record("ev_grader_basketball_nba", "idle_no_edges")
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Heartbeat.__table__.create)
+        assert await buffer.flush() == 1
+        await buffer.stop()
+        async with AsyncSession(engine) as db:
+            row = (await db.execute(select(Heartbeat))).scalar_one()
+        await engine.dispose()
+        return row
+
+    row = asyncio.run(main())
+    assert (row.rows_written_today, row.status) == (3, "idle_no_edges")
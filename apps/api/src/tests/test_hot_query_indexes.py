@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import bench_hot_queries  # noqa: E402
+
+
+def test_index_sql_per_dialect():
+    migration = bench_hot_queries.load_migration()
+    spec = next(s for s in migration.INDEXES if s["name"] == "ix_unified_odds_consensus")
+
+    pg = migration.create_index_sql(spec, "postgresql")
+    assert pg.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_unified_odds_consensus")
+    assert "INCLUDE (bookmaker, implied_prob)" in pg
+    assert pg.endswith("WHERE implied_prob IS NOT NULL")
+
+    lite = migration.create_index_sql(spec, "sqlite")
+    assert "CONCURRENTLY" not in lite and "INCLUDE" not in lite
+    assert migration.drop_index_sql(spec, "sqlite") == "DROP INDEX IF EXISTS ix_unified_odds_consensus"
+
+
+def test_bench_runs_both_phases_on_sqlite(capsys):
+    report = bench_hot_queries.main([
+        "--sports", "1", "--games", "2", "--players", "2", "--books", "2", "--runs", "2", "--json",
+    ])
+    assert report["database"] == "sqlite"
+    assert set(report["before"]) == set(report["after"]) == {
+        "canonical_props", "props_live", "props_live_market", "sharp_consensus",
+    }
+    assert report["rows"]["unified_odds"] > 0
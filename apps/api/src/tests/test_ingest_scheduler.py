@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from services import ingest_scheduler as mod
+from services.cache import CacheManager
+from services.ingest_scheduler import SCHEDULE_DDL, IngestScheduler
+
+
+async def _db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(text(SCHEDULE_DDL))
+    return engine
+
+
+def test_lease_has_a_single_holder_until_released():
+    cache = CacheManager()
+    cache.redis_url = None
+
+    async def main():
+        a = await cache.acquire_lease("leader", "node-a", ttl=60)
+        b = await cache.acquire_lease("leader", "node-b", ttl=60)
+        renewed = await cache.acquire_lease("leader", "node-a", ttl=60)
+        await cache.release_lease("leader", "node-b")  # not the holder: no-op
+        still_a = not await cache.acquire_lease("leader", "node-b", ttl=60)
+        await cache.release_lease("leader", "node-a")
+        return a, b, renewed, still_a, await cache.acquire_lease("leader", "node-b", ttl=60)
+
+    assert asyncio.run(main()) == (True, False, True, True, True)
+
+
+def test_due_jobs_are_claimed_once_and_rescheduled_by_quota():
+    async def main():
+        engine = await _db()
+        sched = IngestScheduler(session_factory=lambda: AsyncSession(engine))
+        other = IngestScheduler(session_factory=lambda: AsyncSession(engine))
+        async with AsyncSession(engine) as db:
+            await sched.sync_jobs(db, {"basketball_nba": 600, "icehockey_nhl": 3600})
+            first = await sched.claim_due(db, quota_pct=0.7, limit=10)  # conservative: 2x interval
+            second = await other.claim_due(db, quota_pct=0.0, limit=10)
+            rows = {r["sport_key"]: r for r in (await db.execute(text("SELECT * FROM ingest_schedule"))).mappings()}
+
+            await sched.sync_jobs(db, {"basketball_nba": 600})
+            enabled = (await db.execute(text("SELECT sport_key FROM ingest_schedule WHERE enabled"))).scalars().all()
+        await engine.dispose()
+        return first, second, rows, enabled
+
+    first, second, rows, enabled = asyncio.run(main())
+    assert sorted(first) == ["basketball_nba", "icehockey_nhl"] and second == []
+    nba = rows["basketball_nba"]
+    gap = datetime.fromisoformat(str(nba["next_run_at"])) - datetime.fromisoformat(str(nba["last_dispatched_at"]))
+    assert gap == timedelta(seconds=1200) and nba["dispatch_count"] == 1
+    assert enabled == ["basketball_nba"]
+
+
+def test_sync_keeps_manual_disables_and_pending_jobs_free_the_limit():
+    async def main():
+        engine = await _db()
+        sched = IngestScheduler(session_factory=lambda: AsyncSession(engine))
+        async with AsyncSession(engine) as db:
+            jobs = {"basketball_nba": 600, "icehockey_nhl": 600, "baseball_mlb": 600}
+            await sched.sync_jobs(db, jobs)
+            await db.execute(text("UPDATE ingest_schedule SET enabled = FALSE WHERE sport_key = 'icehockey_nhl'"))
+            await sched.sync_jobs(db, {"basketball_nba": 600})  # mlb leaves the config
+            await sched.sync_jobs(db, jobs)  # ...and comes back; nhl stays off
+            enabled = (await db.execute(text("SELECT sport_key FROM ingest_schedule WHERE enabled"))).scalars().all()
+
+            sched._pending.add("basketball_nba")
+            claimed = await sched.claim_due(db, quota_pct=0.0, limit=1)
+        await engine.dispose()
+        return sorted(enabled), claimed
+
+    enabled, claimed = asyncio.run(main())
+    assert enabled == ["baseball_mlb", "basketball_nba"]
+    assert claimed == ["baseball_mlb"]
+
+
+def test_only_the_leader_dispatches(monkeypatch):
+    dispatched = []
+
+    async def fake_run_job(sport):
+        dispatched.append(sport)
+        return "ok"
+
+    async def no_quota(self, db):
+        return 0.0
+
+    shared = CacheManager()
+    shared.redis_url = None
+    monkeypatch.setattr(mod, "run_job", fake_run_job)
+    monkeypatch.setattr(mod, "desired_jobs", lambda: {"basketball_nba": 600})
+    monkeypatch.setattr(IngestScheduler, "_quota", no_quota)
+    monkeypatch.setattr("services.cache.cache", shared)
+
+    async def main():
+        engine = await _db()
+        leader = IngestScheduler(session_factory=lambda: AsyncSession(engine), node_id="a")
+        standby = IngestScheduler(session_factory=lambda: AsyncSession(engine), node_id="b")
+        ticks = [await leader.tick(), await standby.tick()]
+        await asyncio.sleep(0.01)
+        await leader.stop()
+        await engine.dispose()
+        return ticks, standby.is_leader
+
+    ticks, standby_leader = asyncio.run(main())
+    assert ticks == [["basketball_nba"], []] and not standby_leader
+    assert dispatched == ["basketball_nba"]
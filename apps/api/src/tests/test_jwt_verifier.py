@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from jose import jwt
+
+from api_utils.jwt_verifier import JWTVerifier, TokenInvalid, TokenUnverifiable, VerifiedUser
+
+
+def _token(secret: str, **claims) -> str:
+    payload = {"sub": "user-1", "email": "a@b.co", "aud": "authenticated", "exp": int(time.time()) + 300}
+    payload.update(claims)
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+def test_hs256_token_verified_locally_and_memoized():
+    verifier = JWTVerifier(hs_secret="s3cret", audience="authenticated")
+    token = _token("s3cret", user_metadata={"tier": "pro"})
+
+    async def run():
+        claims = await verifier.verify(token)
+        again = await verifier.verify(token)
+        return claims, again
+
+    claims, again = asyncio.run(run())
+    assert claims["sub"] == "user-1"
+    assert again is claims
+    assert verifier.cache.hits == 1
+
+    user = VerifiedUser.from_claims(claims)
+    assert user.get("id") == "user-1"
+    assert user.user_metadata["tier"] == "pro"
+
+
+def test_bad_signature_rejected_and_unknown_format_unverifiable():
+    verifier = JWTVerifier(hs_secret="s3cret", audience="authenticated")
+
+    try:
+        asyncio.run(verifier.verify(_token("wrong")))
+    except TokenInvalid:
+        pass
+    else:
+        raise AssertionError("Expected TokenInvalid for bad signature")
+
+    no_secret = JWTVerifier(audience="authenticated")
+    try:
+        asyncio.run(no_secret.verify(_token("s3cret")))
+    except TokenUnverifiable:
+        pass
+    else:
+        raise AssertionError("Expected TokenUnverifiable without a configured secret")
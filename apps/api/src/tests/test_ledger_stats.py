@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import db.base  # noqa: F401  (resolves the models import order)
+from models.bet import BetLeg, BetSlip
+from models.prop import PropLine
+from services.ledger_service import LedgerService
+
+
+async def _run():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        for table in (PropLine.__table__, BetSlip.__table__, BetLeg.__table__):
+            await conn.run_sync(table.create)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    async with Session() as db:
+        db.add_all([
+            PropLine(id=1, sport_key="nba", stat_type="points", player_name="A"),
+            PropLine(id=2, sport_key="nfl", stat_type="yards", player_name="B"),
+            BetSlip(id=1, user_id="u1", total_odds=150, status="won", placed_at=t0),
+            BetSlip(id=2, user_id="u1", total_odds=-110, status="lost", placed_at=t0 + timedelta(days=1)),
+            BetSlip(id=3, user_id="u1", total_odds=-200, status="won", placed_at=t0 + timedelta(days=2)),
+            BetSlip(id=4, user_id="u2", total_odds=100, status="won", placed_at=t0),
+            BetLeg(slip_id=1, prop_id=1),
+            BetLeg(slip_id=2, prop_id=1),
+            BetLeg(slip_id=2, prop_id=2),
+            BetLeg(slip_id=3, prop_id=2),
+            BetLeg(slip_id=4, prop_id=1),
+        ])
+        await db.commit()
+
+        service = LedgerService()
+        stats = await service.get_user_stats(db, "u1")
+        cached = await service.get_user_stats(db, "u1")
+
+        # a bet tracked in another process invalidates this process's view through the shared cache
+        db.add(BetSlip(id=5, user_id="u1", total_odds=100, status="won", placed_at=t0 + timedelta(days=3)))
+        await db.commit()
+        assert (await service.get_user_stats(db, "u1"))["total_bets"] == 3
+        await LedgerService().invalidate_user_stats("u1")
+        refreshed = await service.get_user_stats(db, "u1")
+    await engine.dispose()
+    return stats, cached, refreshed
+
+
+def test_grouped_user_stats_match_per_slip_math():
+    stats, cached, refreshed = asyncio.run(_run())
+    assert cached == stats
+    assert refreshed["total_bets"] == 4
+    assert stats["total_bets"] == 3
+    assert stats["win_rate"] == 66.7
+    assert stats["profit_loss"] == 1.0  # +1.5 - 1 + 0.5
+    by_sport = {h["label"]: h["value"] for h in stats["heatmaps"]["by_sport"]}
+    assert by_sport == {"nba": 1.0, "nfl": 0.0}  # slip 2's loss split across both legs
+    assert [r["profit"] for r in stats["risk_reward"]] == [1.5, -1.0, 0.5]
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+from services.live_poll_planner import (
+    DemandTracker,
+    LivePollPlanner,
+    VolatilityTracker,
+    interval_budget,
+)
+
+
+def test_interval_budget_scales_with_mode_and_headroom():
+    now = datetime(2026, 1, 1, 12, 30, tzinfo=timezone.utc)
+    quota = {"mode": "normal", "used_hour": 0, "hour_limit": 600, "used_day": 0, "day_limit": 10_000}
+    # 30 min left at a 60s interval -> 30 intervals -> 20 units each (capped at 24)
+    assert interval_budget(quota, 60, now) == 20
+    assert interval_budget({**quota, "mode": "conservative"}, 60, now) == 10
+    assert interval_budget({**quota, "mode": "emergency_freeze"}, 60, now) == 0
+    assert interval_budget({**quota, "used_hour": 600}, 60, now) == 0
+
+
+def test_plan_prefers_live_and_demanded_events_within_budget():
+    now = datetime.now(timezone.utc)
+    events = {
+        "basketball_nba": [
+            {"id": "live1", "commence_time": (now - timedelta(minutes=30)).isoformat()},
+            {"id": "soon1", "commence_time": (now + timedelta(hours=1)).isoformat()},
+            {"id": "later1", "commence_time": (now + timedelta(days=2)).isoformat()},
+        ],
+        "icehockey_nhl": [
+            {"id": "soon2", "commence_time": (now + timedelta(hours=2)).isoformat()},
+        ],
+    }
+    demand = DemandTracker()
+    demand.record("icehockey_nhl", "soon2")
+    demand.record("icehockey_nhl", "soon2")
+    planner = LivePollPlanner(demand, VolatilityTracker())
+
+    targets = planner.candidates(
+        events,
+        featured_markets=None,
+        props_markets_by_sport={"basketball_nba": "player_points", "icehockey_nhl": "player_points"},
+        include_props=True,
+        now=now,
+    )
+    assert all(t.event_id != "later1" for t in targets)
+
+    plan = planner.plan(targets, budget=2)
+    assert [t.event_id for t in plan] == ["live1", "soon2"]
+
+
+def test_router_demand_keys_line_up_with_planner_targets():
+    now = datetime.now(timezone.utc)
+    events = {
+        "basketball_nba": [
+            {"id": "g1", "commence_time": (now + timedelta(hours=1)).isoformat()},
+            {"id": "g2", "commence_time": (now + timedelta(hours=1)).isoformat()},
+        ],
+    }
+    demand = DemandTracker()
+    # What /api/props/live?market=player_points and /api/waterfall/props?game_id=g2 record.
+    demand.record("basketball_nba", market="player_points")
+    demand.record("basketball_nba", "g2", "player_rebounds")
+    demand.record("basketball_nba", "g2", "player_rebounds")
+    # Sport-wide demand counts once, not once per matching key shape.
+    sport_only = DemandTracker()
+    sport_only.record("basketball_nba")
+    assert round(sport_only.score("basketball_nba"), 3) == 1.0
+    assert round(sport_only.score("basketball_nba", market="featured"), 3) == 1.0
+
+    planner = LivePollPlanner(demand, VolatilityTracker())
+    targets = planner.candidates(
+        events, featured_markets=None, props_markets_by_sport={"basketball_nba": "player_points"},
+        include_props=True, now=now,
+    )
+    chosen = planner.plan(targets, budget=1)
+    assert [(t.event_id, t.market) for t in chosen] == [("g2", "player_props")]
+    assert demand.score("basketball_nba", "g2", "player_props") > demand.score("basketball_nba", "g1", "player_props") > 0
+
+
+def test_demand_ignores_unknown_sports():
+    demand = DemandTracker()
+    demand.record("basketball_nba")
+    demand.record("not_a_sport")
+    demand.record("'; DROP TABLE props_live; --")
+    demand.record(None)
+    assert demand.sports() == ["basketball_nba"]
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from services.metrics_collector import MetricsCollector, estimate_rows, recent_average_edge
+
+
+def test_estimate_rows_falls_back_to_exact_count_off_postgres():
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE unified_odds (id INTEGER PRIMARY KEY)"))
+            await conn.execute(text("INSERT INTO unified_odds (id) VALUES (1), (2), (3)"))
+        async with AsyncSession(engine) as db:
+            rows = await estimate_rows(db, ("unified_odds", "missing_table"))
+        await engine.dispose()
+        return rows
+
+    assert asyncio.run(main()) == {"unified_odds": 3, "missing_table": None}
+
+
+def test_heartbeats_advance_feeds_and_last_ingest_without_io():
+    collector = MetricsCollector()
+    collector.record_heartbeat("ingest_basketball_nba", "ok", rows_written=40)
+    collector.record_heartbeat("ingest_basketball_nba", "error", rows_written=2)
+    collector.record_heartbeat("model_inference", "ok", rows_written=5)
+
+    snap = collector.peek()
+    nba = snap["feeds"]["ingest_basketball_nba"]
+    assert nba["rows_written_today"] == 42 and nba["status"] == "error"
+    assert snap["last_ingest_at"] == nba["last_success_at"]
+    assert snap["age_seconds"] is None  # nothing collected yet
+
+
+def test_concurrent_reads_share_one_refresh():
+    collector = MetricsCollector()
+    calls = []
+
+    async def fake_collect():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        collector._snapshot = {"collected_at": "2026-10-19T00:00:00+00:00", "db_connected": True}
+        collector._health = {"status": "healthy", "_internal": {"is_stale": False}}
+        collector._collected_mono = time.monotonic()
+        collector.refreshes += 1
+
+    collector._collect = fake_collect
+
+    async def main():
+        snaps = await asyncio.gather(*(collector.snapshot() for _ in range(5)))
+        health = await collector.health()
+        health["_internal"]["is_stale"] = True  # callers pop/mutate their copy
+        return snaps, health, await collector.health()
+
+    snaps, _, health_again = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(s["db_connected"] for s in snaps)
+    assert health_again["_internal"]["is_stale"] is False
+
+
+def test_average_edge_only_reads_recently_refreshed_signals():
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        now = datetime.now(timezone.utc)
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE ev_signals (edge_percent FLOAT, updated_at TIMESTAMP)"))
+            await conn.execute(
+                text("INSERT INTO ev_signals VALUES (:e, :t)"),
+                [{"e": 4.0, "t": now - timedelta(minutes=5)},
+                 {"e": 2.0, "t": now - timedelta(minutes=10)},
+                 {"e": 90.0, "t": now - timedelta(days=3)}],
+            )
+        async with AsyncSession(engine) as db:
+            recent = await recent_average_edge(db, window_minutes=60)
+            empty = await recent_average_edge(db, window_minutes=1)
+        await engine.dispose()
+        return recent, empty
+
+    assert asyncio.run(main()) == (3.0, 0.0)
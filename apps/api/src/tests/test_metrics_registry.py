@@ -0,0 +1,87 @@
+import pytest
+
+from db.query_metrics import statement_name
+from services.metrics_registry import MetricsRegistry, StageTimer
+
+
+def test_render_uses_prometheus_text_format():
+    reg = MetricsRegistry()
+    runs = reg.counter("ingest_runs", "Ingest runs", ("sport", "status"))
+    runs.inc(sport="basketball_nba", status="ok")
+    runs.inc(2, sport="basketball_nba", status="ok")
+    reg.gauge("ws_connections", "Open sockets").set(4)
+
+    out = reg.render()
+    assert "# HELP ingest_runs_total Ingest runs" in out
+    assert "# TYPE ingest_runs_total counter" in out
+    assert 'ingest_runs_total{sport="basketball_nba",status="ok"} 3' in out
+    assert "ws_connections 4\n" in out
+
+    reg.counter("retries_total", "Already suffixed").inc()
+    assert "# TYPE retries_total counter\nretries_total 1\n" in reg.render()
+
+
+def test_process_info_is_one_and_start_time_is_separate():
+    import os
+
+    from services.metrics_registry import registry
+
+    out = registry.render()
+    assert f'process_info{{process_id="{os.getpid()}"}} 1\n' in out
+    assert "# TYPE process_start_time_seconds gauge" in out
+
+
+def test_histogram_buckets_are_cumulative():
+    reg = MetricsRegistry()
+    h = reg.histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.observe(v, stage="persist")
+
+    lines = reg.render().splitlines()
+    assert 'stage_seconds_bucket{stage="persist",le="0.1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="persist",le="1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="persist",le="+Inf"} 4' in lines
+    assert 'stage_seconds_count{stage="persist"} 4' in lines
+
+
+def test_registry_rejects_conflicting_redefinition():
+    reg = MetricsRegistry()
+    assert reg.counter("x", "doc", ("a",)) is reg.counter("x", "doc", ("a",))
+    with pytest.raises(ValueError):
+        reg.gauge("x", "doc", ("a",))
+    with pytest.raises(ValueError):
+        reg.counter("x", "doc", ("a",)).inc(b="1")
+
+
+def test_stage_timer_records_each_stage_once():
+    reg = MetricsRegistry()
+    h = reg.histogram("ingest_stage_seconds", "doc", ("sport", "stage"))
+    stages = StageTimer(h, sport="nfl")
+    for stage in ("fetch_odds", "normalize", "persist"):
+        stages.next(stage)
+    stages.done()
+
+    assert {key[1] for key in h._children} == {"fetch_odds", "normalize", "persist"}
+    assert all(child.count == 1 for child in h._children.values())
+
+
+def test_statement_name_is_bounded_by_verb_and_table():
+    assert statement_name("SELECT * FROM unified_odds WHERE id = 7") == "select unified_odds"
+    assert statement_name("  insert into ev_signals (a) values (1)") == "insert ev_signals"
+    assert statement_name("UPDATE heartbeats SET status = 'ok'") == "update heartbeats"
+    assert statement_name("SELECT 1") == "select"
+    assert statement_name("VACUUM ANALYZE lines") == "other"
+
+
+def test_statement_name_drops_schemas_and_skips_ctes():
+    assert statement_name('select * from "public".unified_odds') == "select unified_odds"
+    assert statement_name('DELETE FROM public."props_live" WHERE id = 1') == "delete props_live"
+    recent = (
+        "WITH recent AS (SELECT id FROM unified_odds WHERE t > now() - interval '1 hour') "
+        "SELECT * FROM recent JOIN players p ON p.id = recent.id"
+    )
+    assert statement_name(recent) == "select unified_odds"
+    assert statement_name("WITH s AS (SELECT 1) INSERT INTO ev_signals SELECT * FROM s") == "insert ev_signals"
+    assert statement_name("WITH s AS (SELECT 1) SELECT * FROM s") == "select"
+    assert statement_name("SELECT (SELECT max(id) FROM other) AS m FROM heartbeats") == "select heartbeats"
+    assert statement_name("SELECT count(*) FROM (SELECT * FROM props_live WHERE s = 'x)') sub") == "select props_live"
@@ -0,0 +1,83 @@
+from services.middle_service import Offer, best_by_line, find_arbs, find_middle, middle_service
+
+
+def _o(side, book, line, odds):
+    implied = 100.0 / (odds + 100.0) if odds > 0 else -odds / (-odds + 100.0)
+    return Offer(side, book, line, odds, implied)
+
+
+def test_best_by_line_and_same_line_arb():
+    overs, unders = best_by_line([
+        _o("over", "dk", 24.5, -110),
+        _o("over", "fd", 24.5, 105),
+        _o("under", "mgm", 24.5, 110),
+        _o("under", "dk", 24.5, -115),
+    ])
+    assert overs[24.5].book == "fd" and unders[24.5].book == "mgm"
+    arbs = find_arbs(overs, unders)
+    assert len(arbs) == 1 and arbs[0][2] < 0.99
+
+
+def test_middle_sweep_uses_alternate_lines_within_price_budget():
+    overs, unders = best_by_line([
+        _o("over", "dk", 22.5, -115),
+        _o("over", "alt", 18.5, -600),  # widest but far too expensive
+        _o("under", "fd", 25.5, -110),
+        _o("under", "mgm", 23.5, -105),
+    ])
+    over, under = find_middle(overs, unders)
+    assert (over.line, under.line) == (22.5, 25.5)
+    assert find_middle({}, unders) is None
+
+
+def test_scan_rows_groups_per_player_market():
+    rows = [
+        {"event_id": "e1", "player_name": "A", "market_key": "player_points", "outcome_key": "over",
+         "bookmaker": "dk", "line": 20.5, "price": -110, "implied_prob": None, "home_team": "H", "away_team": "V"},
+        {"event_id": "e1", "player_name": "A", "market_key": "player_points_alternate", "outcome_key": "under",
+         "bookmaker": "fd", "line": 22.5, "price": -110, "implied_prob": None, "home_team": "H", "away_team": "V"},
+        {"event_id": "e1", "player_name": "B", "market_key": "player_points", "outcome_key": "under",
+         "bookmaker": "fd", "line": 30.5, "price": -110, "implied_prob": None, "home_team": "H", "away_team": "V"},
+    ]
+    result = middle_service._scan_rows(rows)
+    assert [m["window"] for m in result["middles"]] == ["20.5 - 22.5"]
+    assert result["middles"][0]["game"] == "V @ H"
+    assert result["arbs"] == []
+
+
+def test_scan_cache_keeps_one_entry_per_sport():
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+
+    from services.middle_service import MiddleService
+
+    service = MiddleService()
+    stamps = iter([datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i) for i in (0, 0, 5)])
+    scans = []
+
+    async def stamp(db, sport_key):
+        return next(stamps)
+
+    class _Db:
+        async def execute(self, *args):
+            scans.append(args)
+
+            class _Result:
+                def mappings(self):
+                    return self
+
+                def all(self):
+                    return []
+
+            return _Result()
+
+    service._ingest_stamp = stamp
+
+    async def run():
+        for _ in range(3):
+            await service.get_opportunities("basketball_nba", _Db())
+
+    asyncio.run(run())
+    # the second call hits the cache; the third sees a new ingest and replaces the entry
+    assert len(scans) == 2
+    assert list(service._cache._store) == ["basketball_nba"]
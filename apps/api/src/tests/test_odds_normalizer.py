@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from schemas.props import PropRecord
+from services.odds_normalizer import normalize_player_name, normalize_theodds_props
+
+
+def _payload():
+    return [
+        {
+            "id": "evt1",
+            "sport_title": "NBA",
+            "bookmakers": [
+                {
+                    "key": "draftkings",
+                    "last_update": "2026-01-01T00:00:00Z",
+                    "markets": [
+                        {
+                            "key": "player_points",
+                            "outcomes": [
+                                {"name": "Over", "description": "James, LeBron", "price": -110, "point": 25.5},
+                                {"name": "Under", "description": "James, LeBron", "price": -120, "point": 25.5},
+                            ],
+                        },
+                        {
+                            "key": "h2h",
+                            "outcomes": [
+                                {"name": "Lakers", "price": 150},
+                                {"name": "Celtics", "price": -170},
+                            ],
+                        },
+                    ],
+                }
+            ],
+        }
+    ]
+
+
+def test_single_pass_batch_pairs_outcomes_and_feeds_both_writers():
+    meta = {"evt1": {"home_team": "Lakers", "away_team": "Celtics", "game_time": None}}
+    batch = normalize_theodds_props(_payload(), meta, "basketball_nba")
+    batch.finalize()
+
+    assert len(batch) == 2
+    assert batch.player_name == ["Lebron James", "Lakers"]
+    assert batch.odds_over == [-110, 150] and batch.odds_under == [-120, -170]
+    assert batch.source_ts[0] == datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    records = batch.to_records()
+    assert all(isinstance(r, PropRecord) for r in records)
+    assert records[0].line == Decimal("25.5")
+
+    rows = batch.unified_rows()
+    assert [(r["player_name"], r["outcome_key"], r["price"]) for r in rows] == [
+        ("Lebron James", "over", -110.0),
+        ("Lebron James", "under", -120.0),
+        ("Lakers", "over", 150.0),
+        ("Lakers", "under", -170.0),
+    ]
+
+
+def test_player_name_normalization_is_memoized():
+    normalize_player_name.cache_clear()
+    for _ in range(3):
+        assert normalize_player_name(" jaden smith jr.") == "Jaden Smith"
+    assert normalize_player_name.cache_info().hits == 2
+
+
+def _broken_batch():
+    meta = {"evt1": {"home_team": "Lakers", "away_team": "Celtics", "game_time": None}}
+    batch = normalize_theodds_props(_payload(), meta, "basketball_nba")
+    batch.finalize()
+    batch.book[0] = None  # book is required
+    return batch
+
+
+def test_rows_failing_strict_validation_are_not_persisted_by_either_writer():
+    batch = _broken_batch()
+    assert batch.validate(strict=True) == 1
+    assert batch.validate(strict=True) == 0  # once per batch
+
+    assert {r["player_name"] for r in batch.unified_rows()} == {"Lakers"}
+    assert [r["player_name"] for r in batch.props_live_rows()] == ["Lakers"]
+    assert [r.player_name for r in _broken_batch().to_records()] == ["Lakers"]
+
+
+def test_validation_is_sampled_by_default():
+    batch = _broken_batch()
+    # an unsampled row is not validated; to_records always validates
+    assert batch.validate(sample=0.0, strict=False) == 0
+    assert len(batch.props_live_rows()) == 2
+
+
+def test_market_intel_flags_are_columnar_and_reach_the_live_rows():
+    payload = _payload()
+    fanduel = {**payload[0]["bookmakers"][0], "key": "fanduel", "markets": [{
+        "key": "player_points",
+        "outcomes": [
+            {"name": "Over", "description": "James, LeBron", "price": -105, "point": 25.5},
+            {"name": "Under", "description": "James, LeBron", "price": -130, "point": 25.5},
+        ],
+    }]}
+    payload[0]["bookmakers"].append(fanduel)
+    meta = {"evt1": {"home_team": "Lakers", "away_team": "Celtics", "game_time": None}}
+    batch = normalize_theodds_props(payload, meta, "basketball_nba")
+    batch.finalize()
+    batch.mark_market_intel(sharp_books=["pinnacle"], soft_books=["fanduel", "draftkings"])
+
+    rows = {(r["book"], r["player_name"]): r for r in batch.props_live_rows()}
+    dk, fd = rows[("draftkings", "Lebron James")], rows[("fanduel", "Lebron James")]
+    assert fd["is_best_over"] and not dk["is_best_over"]
+    assert dk["is_best_under"] and not fd["is_best_under"]
+    assert dk["confidence"] == fd["confidence"] == 0.2
+    assert dk["is_soft_book"] and not dk["is_sharp_book"]
+    assert set(dk) == set(PropRecord.model_fields)
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from services.prizepicks_collector import PrizePicksCollector, iter_board, normalize_player_name
+
+STAGING_DDL = """
+    CREATE TABLE pp_projections_staging (
+        id TEXT PRIMARY KEY,
+        player_name TEXT NOT NULL,
+        stat_type TEXT NOT NULL,
+        line_score REAL NOT NULL,
+        league TEXT,
+        game_time TIMESTAMP,
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        graded BOOLEAN DEFAULT FALSE,
+        actual_value REAL,
+        hit BOOLEAN,
+        content_hash TEXT
+    )
+"""
+
+
+def _board(lines):
+    return json.dumps({
+        "data": [
+            {
+                "id": pid,
+                "attributes": {"stat_type": "Points", "line_score": line, "league": "NBA",
+                               "start_time": "2026-03-01T00:00:00Z"},
+                "relationships": {"new_player": {"data": {"id": f"p{pid}"}}},
+            }
+            for pid, line in lines.items()
+        ] + [{"id": "orphan", "attributes": {}, "relationships": {}}],
+        "included": [
+            {"type": "new_player", "id": f"p{pid}", "attributes": {"name": f"Luka Dončić {pid}"}}
+            for pid in lines
+        ],
+    }).encode()
+
+
+def test_normalize_player_name_is_memoized():
+    assert normalize_player_name("Luka Dončić Jr") == "luka doncic"
+    before = normalize_player_name.cache_info().hits
+    normalize_player_name("Luka Dončić Jr")
+    assert normalize_player_name.cache_info().hits == before + 1
+
+
+def test_collector_skips_unchanged_rows_and_emits_line_changes():
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.execute(text(STAGING_DDL))
+        maker = async_sessionmaker(engine, expire_on_commit=False)
+
+        collector = PrizePicksCollector()
+        seen = []
+        collector.on_line_change(lambda events: seen.extend(events))
+
+        async with maker() as session:
+            first = list(iter_board(_board({"1": 20.5, "2": 7.5, "3": 4.5})))
+            assert len(first) == 3
+            assert (await collector.upsert(first, session))["written"] == 3
+
+            # Graded rows are frozen even when their line moves.
+            await session.execute(text("UPDATE pp_projections_staging SET graded = TRUE WHERE id = '3'"))
+            await session.commit()
+
+            second = list(iter_board(_board({"1": 21.5, "2": 7.5, "3": 5.5})))
+            stats = await collector.upsert(second, session)
+            assert stats == {"seen": 3, "written": 2, "unchanged": 1, "line_changes": 2}
+            assert [(e.projection_id, e.old_line, e.new_line) for e in seen] == [("1", 20.5, 21.5), ("3", 4.5, 5.5)]
+
+            lines = dict((await session.execute(text("SELECT id, line_score FROM pp_projections_staging"))).all())
+            assert lines == {"1": 21.5, "2": 7.5, "3": 4.5}
+
+            assert (await collector.upsert(second, session))["written"] == 0
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_line_changes_are_broadcast_to_websocket_clients(monkeypatch):
+    from core.connection_manager import manager
+    from services import prizepicks_collector as mod
+
+    published = []
+
+    async def publish(message, channel="updates:global"):
+        published.append((channel, message))
+
+    monkeypatch.setattr(manager, "publish", publish)
+    assert mod.broadcast_line_changes in mod.prizepicks_collector._listeners
+
+    event = mod.LineChangeEvent("1", "Luka", "luka", "Points", "NBA", 20.5, 21.5, None, "2026-03-01T00:00:00Z")
+    asyncio.run(mod.prizepicks_collector._emit([event]))
+    assert published == [("updates:global", {"type": "prizepicks_line_change", "events": [event.to_dict()]})]
@@ -0,0 +1,89 @@
+import asyncio
+
+from services.cache import CacheManager
+from services.entitlements import Entitlements
+from services import rate_limiter as rl
+
+
+def test_token_bucket_memory_fallback_refills_and_refunds():
+    async def run():
+        cache = CacheManager()
+        ok, left, wait = await cache.take_tokens("b", rate=1.0, capacity=2, cost=2)
+        assert ok and left == 0 and wait == 0
+        ok, _, wait = await cache.take_tokens("b", rate=1.0, capacity=2, cost=1)
+        assert not ok and 0 < wait <= 1
+        ok, left, _ = await cache.take_tokens("b", rate=1.0, capacity=2, cost=-1)
+        assert left >= 1
+
+    asyncio.run(run())
+
+
+def test_limiter_enforces_tier_quota_and_retry_after(monkeypatch):
+    monkeypatch.setattr(rl, "cache", CacheManager())
+    limiter = rl.RateLimiter()
+    oracle = rl.match_route("POST", "/api/oracle/chat")
+    assert oracle.quota == "oracle_daily"
+    assert rl.match_route("GET", "/api/props") is None
+
+    async def run():
+        free = await limiter.check("ip:1", Entitlements(tier="free"), oracle)
+        assert not free.allowed and not free.included and free.retry_after == 0
+
+        pro = Entitlements(tier="pro", user_key="u1")
+        results = [await limiter.check("u:u1", pro, oracle) for _ in range(8)]
+        # 60 compute units/min at cost 8 -> 7 calls fit the burst, the 8th waits.
+        assert [d.allowed for d in results] == [True] * 7 + [False]
+        assert results[-1].bucket == "compute" and results[-1].retry_after >= 1
+
+    asyncio.run(run())
+
+
+def test_simulation_is_metered_by_daily_sim_count(monkeypatch):
+    monkeypatch.setattr(rl, "cache", CacheManager())
+    limiter = rl.RateLimiter()
+    assert rl.match_route("GET", "/api/simulation/basketball_nba") is None
+    simulate = rl.match_route("POST", "/api/parlays/simulate")
+    assert simulate.quota == "sim_count"
+
+    async def run():
+        free = await limiter.check("ip:1", Entitlements(tier="free"), simulate)
+        assert not free.allowed and not free.included
+
+        class SmallPlan(Entitlements):
+            @property
+            def limits(self):
+                return {**super().limits, "sim_count": 2}
+
+        pro = SmallPlan(tier="pro", user_key="u1")
+        results = [await limiter.check("u:u1", pro, simulate) for _ in range(3)]
+        # the daily allowance runs out before the 60-unit compute burst does
+        assert [d.allowed for d in results] == [True, True, False]
+        assert results[-1].bucket == "sim_count" and results[-1].included
+        assert results[-1].retry_after > 60
+
+    asyncio.run(run())
+
+
+def test_client_ip_ignores_spoofed_forwarded_for():
+    from starlette.requests import Request
+    from middleware.rate_limit import _client_ip
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/api/parlays/simulate", "query_string": b"",
+        "headers": [(b"x-forwarded-for", b"1.2.3.4")], "client": ("10.0.0.7", 5000),
+    }
+    assert _client_ip(Request(scope), hops=0) == "10.0.0.7"
+
+
+def test_client_ip_takes_address_appended_by_trusted_proxy():
+    from starlette.requests import Request
+    from middleware.rate_limit import _client_ip
+
+    def request(forwarded):
+        headers = [(b"x-forwarded-for", forwarded)] if forwarded else []
+        return Request({"type": "http", "method": "POST", "path": "/", "query_string": b"",
+                        "headers": headers, "client": ("10.0.0.7", 5000)})
+
+    # the leftmost entry is whatever the client sent; the proxy appended the last one
+    assert _client_ip(request(b"1.2.3.4, 203.0.113.9"), hops=1) == "203.0.113.9"
+    assert _client_ip(request(None), hops=1) == "10.0.0.7"
@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from db.query_metrics import instrument_engine
+from middleware.profiling import ProfilingMiddleware
+from services.request_profiler import ProfileStore, install_http_spans, span
+
+
+def _profile(wall_ms, route="GET /api/props/{prop_id}"):
+    return {"route": route, "wall_ms": wall_ms, "db_ms": 1.0, "http_ms": 0.0}
+
+
+def test_store_keeps_slowest_n_per_route():
+    store = ProfileStore(per_route=3)
+    for ms in (5, 50, 1, 40, 30, 2):
+        store.record(_profile(ms))
+    store.record(_profile(900, route="GET /api/props/graded"))
+
+    assert [p["wall_ms"] for p in store.slowest("GET /api/props/{prop_id}")] == [50, 40, 30]
+    assert store.slowest(limit=1)[0]["route"] == "GET /api/props/graded"
+    summary = {r["route"]: r for r in store.routes()}
+    assert summary["GET /api/props/{prop_id}"]["sampled"] == 6
+
+
+def test_sampled_request_splits_time_into_db_http_and_cpu():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine)
+    install_http_spans()
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(lambda req: httpx.Response(200, json={})))
+
+    app = FastAPI()
+    store = ProfileStore()
+    app.add_middleware(ProfilingMiddleware, sample_rate=1.0, store=store)
+
+    @app.get("/props/{prop_id}")
+    async def prop(prop_id: int):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        await upstream.get("https://odds.example/v4/sports")
+        with span("db", "manual"):
+            await asyncio.sleep(0.02)
+        return {"id": prop_id}
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get("/props/7")
+        await upstream.aclose()
+        await engine.dispose()
+        return resp
+
+    resp = asyncio.run(main())
+    assert resp.status_code == 200 and "db;dur=" in resp.headers["server-timing"]
+    [profile] = store.slowest()
+    assert profile["route"] == "GET /props/{prop_id}" and profile["path"] == "/props/7"
+    assert profile["db_calls"] >= 2 and profile["db_ms"] >= 20
+    assert profile["http_calls"] == 1
+    assert {s["label"] for s in profile["spans"]} >= {"select", "manual", "GET odds.example/v4/sports"}
+    assert profile["cpu_ms"] >= 0
+
+
+def test_unmatched_paths_share_one_route_key():
+    app = FastAPI()
+    store = ProfileStore()
+    app.add_middleware(ProfilingMiddleware, sample_rate=1.0, store=store)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for path in ("/wp-login.php", "/.env", "/admin/x"):
+                assert (await client.get(path)).status_code == 404
+
+    asyncio.run(main())
+    assert [r["route"] for r in store.routes()] == ["GET <unmatched>"]
+    assert store.routes()[0]["sampled"] == 3
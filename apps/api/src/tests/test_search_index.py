@@ -0,0 +1,165 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from services.search_index import DDL, NgramIndex, SearchIndex, normalize
+
+
+def _entry(kind, name, mentions=1, sport="basketball_nba"):
+    return {"kind": kind, "norm": normalize(name), "sport": sport, "name": name, "team": None, "mentions": mentions}
+
+
+INDEX = NgramIndex([
+    _entry("player", "LeBron James", mentions=50),
+    _entry("player", "James Harden", mentions=10),
+    _entry("player", "Luka Dončić", mentions=40),
+    _entry("team", "Los Angeles Lakers", mentions=30),
+    _entry("player", "Jamal Murray", mentions=5),
+])
+
+
+def test_normalize_strips_accents_case_and_punctuation():
+    assert normalize("Luka Dončić") == normalize("luka doncic") == "luka doncic"
+    assert normalize("  D'Angelo  Russell Jr. ") == "d angelo russell jr"
+
+
+def test_prefix_beats_word_prefix_beats_fuzzy():
+    names = [r["name"] for r in INDEX.search("jam", limit=5)]
+    assert names[:3] == ["James Harden", "Jamal Murray", "LeBron James"]
+    assert INDEX.search("doncic")[0]["name"] == "Luka Dončić"
+    assert INDEX.search("lebrom jmes")[0]["name"] == "LeBron James"  # typo tolerant
+    assert [r["name"] for r in INDEX.search("lak", kind="team")] == ["Los Angeles Lakers"]
+    assert INDEX.search("lak", kind="player") == []
+
+
+def test_refresh_builds_dictionary_from_sources_and_caches_lookups():
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        now = datetime.now(timezone.utc) - timedelta(minutes=10)
+        async with engine.begin() as conn:
+            for stmt in DDL[:2]:
+                await conn.execute(text(stmt))
+            await conn.execute(text(
+                "CREATE TABLE unified_odds (sport TEXT, player_name TEXT, home_team TEXT, away_team TEXT, created_at TIMESTAMP)"
+            ))
+            await conn.execute(text(
+                "CREATE TABLE props_live (sport TEXT, player_name TEXT, team TEXT, last_updated_at TIMESTAMP)"
+            ))
+            await conn.execute(
+                text("INSERT INTO unified_odds VALUES ('basketball_nba', :p, 'Denver Nuggets', 'Boston Celtics', :t)"),
+                [{"p": "Nikola Jokić", "t": now}, {"p": "Nikola Jokic", "t": now}, {"p": None, "t": now}],
+            )
+            await conn.execute(
+                text("INSERT INTO props_live VALUES ('basketball_nba', 'Jamal Murray', 'Denver Nuggets', :t)"),
+                {"t": now},
+            )
+        index = SearchIndex()
+        async with AsyncSession(engine) as db:
+            summary = await index.refresh(db)
+            jokic, first_cached = await index.search(db, "jokic")
+            again, second_cached = await index.search(db, "Jokic")
+            teams, _ = await index.search(db, "nug", kind="team")
+        await engine.dispose()
+        return summary, jokic, first_cached, again, second_cached, teams
+
+    summary, jokic, first_cached, again, second_cached, teams = asyncio.run(main())
+    assert summary["entities"] == 4  # one Jokic (accent variants merge), Murray, Nuggets, Celtics
+    assert jokic[0]["name"].startswith("Nikola Joki") and not first_cached
+    assert again == jokic and second_cached
+    assert [t["name"] for t in teams] == ["Denver Nuggets"]
+
+
+def test_incremental_refresh_adds_mentions_and_reads_proplines(monkeypatch):
+    import services.search_index as si
+
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        old = datetime.now(timezone.utc) - timedelta(hours=1)
+        async with engine.begin() as conn:
+            for stmt in DDL[:2]:
+                await conn.execute(text(stmt))
+            await conn.execute(text("CREATE TABLE proplines (sport_key TEXT, player_name TEXT, team TEXT, created_at TIMESTAMP)"))
+            await conn.execute(
+                text("INSERT INTO proplines VALUES ('basketball_nba', 'Cade Cunningham', 'Detroit Pistons', :t)"),
+                [{"t": old}, {"t": old}],
+            )
+        index = SearchIndex()
+        async with AsyncSession(engine) as db:
+            await index.refresh(db)
+            await index.refresh(db)  # nothing new: counts must not change
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text("INSERT INTO proplines VALUES ('basketball_nba', 'Cade Cunningham', 'Detroit Pistons', :t)"),
+                    {"t": datetime.now(timezone.utc) - timedelta(minutes=1)},
+                )
+            # Next window covers the new row once the lag has passed.
+            monkeypatch.setattr(si, "REFRESH_LAG", timedelta(0))
+            await index.refresh(db)
+            await index.refresh(db)
+            rows = (await db.execute(text("SELECT kind, name, team, mentions FROM search_entities ORDER BY kind"))).all()
+        await engine.dispose()
+        return rows
+
+    rows = asyncio.run(main())
+    assert [tuple(r) for r in rows] == [
+        ("player", "Cade Cunningham", "Detroit Pistons", 3),
+        ("team", "Detroit Pistons", None, 3),
+    ]
+
+
+def test_pg_trgm_failure_backs_off_unless_the_extension_is_missing(monkeypatch):
+    import services.search_index as si
+
+    class _Result:
+        def __init__(self, value):
+            self.value = value
+
+        def scalar(self):
+            return self.value
+
+    class _Db:
+        class bind:
+            class dialect:
+                name = "postgresql"
+
+        def __init__(self, installed):
+            self.installed = installed
+
+        async def execute(self, stmt, params=None):
+            return _Result(1 if self.installed else None)
+
+        async def rollback(self):
+            return None
+
+    attempts = []
+
+    async def failing(db, query, kind, sport):
+        attempts.append(query)
+        raise RuntimeError("canceling statement due to statement timeout")
+
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(si.time, "monotonic", lambda: clock["now"])
+
+    async def main():
+        index = SearchIndex()
+        index._memory = INDEX
+        monkeypatch.setattr(index, "_pg_candidates", failing)
+        db = _Db(installed=True)
+        first, _ = await index.search(db, "lebron")
+        await index.search(db, "luka")  # inside the backoff: straight to memory
+        clock["now"] += si.PG_TRGM_RETRY_SECONDS
+        await index.search(db, "harden")  # retried after it
+        transient = index.pg_trgm
+
+        missing = SearchIndex()
+        missing._memory = INDEX
+        monkeypatch.setattr(missing, "_pg_candidates", failing)
+        await missing.search(_Db(installed=False), "lebron")
+        return first, transient, missing.pg_trgm
+
+    first, transient, missing = asyncio.run(main())
+    assert first[0]["name"] == "LeBron James"
+    assert attempts == ["lebron", "harden", "lebron"]
+    assert transient is None and missing is False
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from services.simulation_cache import (
+    L1,
+    MISS,
+    PRIORS,
+    SHARED,
+    SimulationCache,
+    parlay_fingerprint,
+)
+
+LEG_A = {"player_name": "Jalen Brunson", "stat_type": "points", "line": 26.5, "side": "over", "odds": -115,
+         "mean": 27.2, "std_dev": 5.1}
+LEG_B = {"player_name": "Josh Hart", "stat_type": "rebounds", "line": 9.5, "side": "under", "odds": 105,
+         "mean": 9.1, "std_dev": 2.4}
+
+
+def test_fingerprint_ignores_leg_order_and_formatting():
+    key_ab, order_ab = parlay_fingerprint([LEG_A, LEG_B], 10_000)
+    key_ba, order_ba = parlay_fingerprint([dict(LEG_B, side="UNDER", odds="105"), LEG_A], 10_000)
+    assert key_ab == key_ba
+    assert [[LEG_A, LEG_B][i]["player_name"] for i in order_ab] == [[LEG_B, LEG_A][i]["player_name"] for i in order_ba]
+
+
+def test_fingerprint_changes_with_inputs():
+    base, _ = parlay_fingerprint([LEG_A, LEG_B], 10_000)
+    assert parlay_fingerprint([LEG_A, LEG_B], 20_000)[0] != base
+    assert parlay_fingerprint([dict(LEG_A, line=27.5), LEG_B], 10_000)[0] != base
+    assert parlay_fingerprint([dict(LEG_A, odds=-120), LEG_B], 10_000)[0] != base
+    assert parlay_fingerprint([dict(LEG_A, mean=25.0), LEG_B], 10_000)[0] != base
+
+
+def test_get_or_compute_hits_lru_and_coalesces_concurrent_misses():
+    sc = SimulationCache(maxsize=8)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"p": 0.42}
+
+    async def main():
+        first = await asyncio.gather(*(sc.get_or_compute("k", compute) for _ in range(5)))
+        again = await sc.get_or_compute("k", compute)
+        return first, again
+
+    first, again = asyncio.run(main())
+    assert len(calls) == 1
+    assert [src for _, src in first].count(MISS) == 1
+    assert [src for _, src in first].count(SHARED) == 4
+    assert again == ({"p": 0.42}, L1)
+    stats = sc.stats()
+    assert stats["misses"] == 1 and stats["hits_l1"] == 1
+    assert stats["hit_rate"] == pytest.approx(5 / 6, rel=1e-3)
+
+
+def test_failed_compute_is_not_cached():
+    sc = SimulationCache()
+
+    async def boom():
+        raise RuntimeError("db down")
+
+    async def ok():
+        return 0.6
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await sc.get_or_compute("k", boom)
+        return await sc.get_or_compute("k", ok)
+
+    assert asyncio.run(main()) == (0.6, MISS)
+
+
+def test_bump_rekeys_dependent_entries():
+    sc = SimulationCache()
+
+    async def main():
+        inputs = {"p": "jalen brunson", "l": 26.5}
+        before = await sc.key("prop", inputs, scopes=(PRIORS,))
+        same = await sc.key("prop", inputs, scopes=(PRIORS,))
+        unscoped = await sc.key("prop", inputs)
+        await sc.bump(PRIORS)
+        after = await sc.key("prop", inputs, scopes=(PRIORS,))
+        return before, same, unscoped, after, await sc.key("prop", inputs)
+
+    before, same, unscoped, after, unscoped_after = asyncio.run(main())
+    assert before == same
+    assert after != before
+    assert unscoped == unscoped_after
+    assert sc.stats()["invalidations_priors"] == 1
+
+
+def test_lru_evicts_oldest():
+    sc = SimulationCache(maxsize=2)
+
+    async def main():
+        for k in ("a", "b", "c"):
+            await sc.set(k, k)
+        return [(await sc.get(k))[1] for k in ("a", "b", "c")]
+
+    assert asyncio.run(main()) == [MISS, L1, L1]
+
+
+def test_parlay_results_map_back_to_caller_leg_order():
+    from services import monte_carlo_service as mcs
+
+    async def main():
+        mcs.simulation_cache.clear()
+        first, cached_first = await mcs.simulate_parlay_cached([LEG_A, LEG_B], n_sims=2000)
+        second, cached_second = await mcs.simulate_parlay_cached([LEG_B, LEG_A], n_sims=2000)
+        return first, cached_first, second, cached_second
+
+    first, cached_first, second, cached_second = asyncio.run(main())
+    assert not cached_first and cached_second
+    assert [r["player_name"] for r in first["leg_results"]] == ["Jalen Brunson", "Josh Hart"]
+    assert [r["player_name"] for r in second["leg_results"]] == ["Josh Hart", "Jalen Brunson"]
+    assert second["parlay_hit_rate"] == first["parlay_hit_rate"]
@@ -0,0 +1,26 @@
+import asyncio
+import os
+
+from db.sql_migrations import run_sql_migration_file, split_sql_statements
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "migrations")
+
+
+def test_header_comment_does_not_hide_first_statement():
+    sql = "-- header\n-- more\nALTER TABLE t ADD COLUMN c TEXT;\n\n-- note\nCREATE INDEX i ON t (c);\n-- trailing\n"
+    assert split_sql_statements(sql) == ["ALTER TABLE t ADD COLUMN c TEXT", "CREATE INDEX i ON t (c)"]
+
+
+def test_alert_fingerprint_migration_runs_every_statement():
+    executed = []
+
+    async def run_step(stmt):
+        executed.append(stmt)
+
+    path = os.path.join(MIGRATIONS, "20261019_alert_move_fingerprints.sql")
+    count = asyncio.run(run_sql_migration_file(path, run_step))
+
+    assert count == len(executed) == 5
+    assert executed[0].startswith("ALTER TABLE IF EXISTS whale_moves")
+    assert "ADD COLUMN IF NOT EXISTS move_fingerprint" in executed[0]
+    assert any("uix_whale_moves_fingerprint" in s for s in executed)
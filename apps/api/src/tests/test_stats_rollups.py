@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from services.stats_rollups import ROLLUPS, compact, dirty_ranges, merge_ranges, window_bounds
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+H = timedelta(hours=1)
+
+
+class FakeConn:
+    def __init__(self, state=None, changed=(), through=T0 + 10 * H):
+        self.state = state
+        self.changed = list(changed)
+        self.through = through
+        self.executed = []
+
+    def transaction(self):
+        conn = self
+
+        class _Tx:
+            async def __aenter__(self):
+                return conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Tx()
+
+    async def execute(self, sql, *args):
+        self.executed.append((sql, args))
+
+    async def fetchval(self, sql, *args):
+        if "date_trunc" in sql:
+            return self.through
+        return T0 + 9 * H  # MAX(updated_at)
+
+    async def fetchrow(self, sql, *args):
+        return self.state
+
+    async def fetch(self, sql, *args):
+        return [{"bucket": b} for b in self.changed]
+
+
+def test_merge_ranges_collapses_overlaps():
+    ranges = [(T0 + 5 * H, T0 + 6 * H), (T0, T0 + 2 * H), (T0 + H, T0 + 3 * H), (T0 + 3 * H, T0 + 4 * H)]
+    assert merge_ranges(ranges) == [(T0, T0 + 4 * H), (T0 + 5 * H, T0 + 6 * H)]
+    assert merge_ranges([(T0, T0)]) == []
+
+
+def test_dirty_ranges_cover_settle_window_and_changed_buckets():
+    rollup = ROLLUPS["live_odds_nfl"]
+    ranges = dirty_ranges(rollup, T0 + 8 * H, T0 + 10 * H, changed_buckets=[T0 + 2 * H, T0 + 7 * H])
+    # settle window starts two buckets before the old high-water mark and swallows the 07:00 bucket
+    assert ranges == [(T0 + 2 * H, T0 + 3 * H), (T0 + 6 * H, T0 + 10 * H)]
+
+
+def test_window_reads_rollup_before_high_water_mark_and_raw_tail_after():
+    sql = ROLLUPS["odds_snapshots"].window()
+    head, tail = sql.split("UNION ALL")
+    assert "FROM odds_snapshots_rollup_hourly WHERE bucket < $2 AND (bucket >= $1)" in head
+    assert "FROM odds_snapshots\nWHERE snapshot_at >= $2 AND (snapshot_at >= $1)" in tail
+    assert "GROUP BY 1, 2, 3, 4, 5" in tail
+    # both halves project the same columns in the same order
+    names = head.split("SELECT ", 1)[1].split(" FROM", 1)[0].split(", ")
+    assert [line.rsplit(" AS ", 1)[1].rstrip(",") for line in tail.splitlines() if " AS " in line] == names
+
+
+def test_compact_rebuilds_only_dirty_buckets():
+    rollup = ROLLUPS["games"]
+    day = timedelta(days=1)
+    conn = FakeConn(
+        state={"through": T0 + 9 * day, "change_watermark": T0 + 8 * day},
+        changed=[T0 + day],
+        through=T0 + 10 * day,
+    )
+    result = asyncio.run(compact(conn, rollup))
+    deletes = [args for sql, args in conn.executed if sql.startswith("DELETE")]
+    assert deletes == [(T0 + day, T0 + 2 * day), (T0 + 7 * day, T0 + 10 * day)]
+    assert result["ranges"] == 2 and not result["full"]
+
+    fresh = FakeConn(through=T0 + 10 * day)
+    assert asyncio.run(compact(fresh, rollup))["full"]
+    assert [args for sql, args in fresh.executed if sql.startswith("DELETE")] == [(T0 + 10 * day,)]
+
+
+def test_nfl_odds_rollup_grain_excludes_games_and_teams():
+    grain = {c.name for c in ROLLUPS["live_odds_nfl"].dimensions}
+    assert grain == {"bookmaker", "week", "season", "odds_range"}
+    assert [c.name for c in ROLLUPS["live_odds_nfl_teams"].dimensions] == ["home_team"]
+    assert ROLLUPS["live_odds_nfl_teams"].table == "live_odds_nfl_teams_rollup_hourly"
+    assert ROLLUPS["live_odds_nfl"].table == "live_odds_nfl_rollup_hourly"
+
+
+def test_window_bounds_reads_raw_until_the_scheduler_builds_the_rollup():
+    class NoState(FakeConn):
+        async def fetchval(self, sql, *args):
+            if "stats_rollup_state" in sql:
+                return None
+            return await super().fetchval(sql, *args)
+
+    conn = NoState(through=T0 + 10 * H)
+    since, through = asyncio.run(window_bounds(conn, "live_odds_nfl", timedelta(hours=24)))
+    assert since == through == T0 + 10 * H
+    assert conn.executed == []  # no inline compaction
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+import db.asyncpg_pool as pool_mod
+import deps.auth as auth
+from services.cache_service import TTLCache
+
+
+class FakeConn:
+    """Records queries; the users table is a dict keyed by auth_id."""
+
+    def __init__(self, users=None, fail=False):
+        self.users = dict(users or {})
+        self.fail = fail
+        self.queries = []
+
+    async def fetchrow(self, sql, *args):
+        self.queries.append(" ".join(sql.split()))
+        if self.fail:
+            raise ConnectionError("db down")
+        if sql.lstrip().startswith("INSERT"):
+            auth_id, email = args
+            row = self.users.setdefault(auth_id, {"auth_id": auth_id, "email": email, "subscription_tier": "free"})
+            if row["email"] is None:
+                row["email"] = email
+            return dict(row)
+        row = self.users.get(args[0])
+        return dict(row) if row else None
+
+
+class FakePool(FakeConn):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    def terminate(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fresh_profile_cache(monkeypatch):
+    monkeypatch.setattr(auth, "_profile_cache", TTLCache(maxsize=auth.USER_PROFILE_CACHE_MAXSIZE))
+
+
+def test_jit_provisioning_is_one_upsert_then_cached():
+    conn = FakeConn(users={"u2": {"auth_id": "u2", "email": None, "subscription_tier": "pro"}})
+
+    async def run():
+        new = await auth.provision_user_jit({"sub": "u1", "email": "a@x.io"}, conn)
+        again = await auth.provision_user_jit({"sub": "u1", "email": "a@x.io"}, conn)
+        existing = await auth.provision_user_jit({"sub": "u2", "email": "b@x.io"}, conn)
+        missing_sub = await auth.provision_user_jit({"email": "c@x.io"}, conn)
+        return new, again, existing, missing_sub
+
+    new, again, existing, missing_sub = asyncio.run(run())
+    assert new["subscription_tier"] == "free" and again == new
+    # an existing row comes back through RETURNING with its tier; email is only back-filled
+    assert existing["subscription_tier"] == "pro" and existing["email"] == "b@x.io"
+    assert missing_sub is None
+    assert len(conn.queries) == 2
+    assert all(q.startswith("INSERT INTO users") and "ON CONFLICT (auth_id)" in q and "RETURNING" in q
+               for q in conn.queries)
+
+
+def test_profile_misses_are_cached_briefly(monkeypatch):
+    pool = FakePool()
+
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(auth, "get_asyncpg_pool", get_pool)
+
+    async def run():
+        assert await auth.get_user_profile("ghost") is None
+        assert await auth.get_user_profile("ghost") is None
+        assert len(pool.queries) == 1
+
+        # JIT provisioning replaces the cached miss
+        await auth.provision_user_jit({"sub": "ghost", "email": "g@x.io"}, pool)
+        profile = await auth.get_user_profile("ghost")
+        assert profile["subscription_tier"] == "free"
+
+        pool.fail = True
+        assert await auth.get_user_profile("down") is None
+        assert await auth.get_user_profile("down") is None
+        assert len([q for q in pool.queries if q.startswith("SELECT")]) == 2
+
+    asyncio.run(run())
+
+
+def test_profile_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(auth, "_profile_cache", TTLCache(maxsize=3))
+    pool = FakePool(users={"known": {"auth_id": "known", "email": None, "subscription_tier": "pro"}})
+
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(auth, "get_asyncpg_pool", get_pool)
+
+    async def run():
+        assert (await auth.get_user_profile("known"))["subscription_tier"] == "pro"
+        for i in range(10):
+            assert await auth.get_user_profile(f"scan-{i}") is None
+            # the known user stays hot, so misses evict each other first
+            await auth.get_user_profile("known")
+
+    asyncio.run(run())
+    assert len(auth._profile_cache) == 3
+    assert auth._profile_cache.get("known") is not None
+    assert len(pool.queries) == 11  # one lookup for "known", one per scanned id
+
+
+def test_pool_lifecycle(monkeypatch):
+    created = []
+
+    async def create_pool(dsn, **kwargs):
+        created.append(kwargs)
+        return FakePool()
+
+    monkeypatch.setattr(pool_mod, "_pool", None)
+    monkeypatch.setattr(pool_mod, "asyncpg_available", lambda: True)
+    monkeypatch.setattr(pool_mod, "_pool_dsn", lambda: "postgresql://u@h/db")
+    monkeypatch.setattr(pool_mod.asyncpg, "create_pool", create_pool)
+
+    async def run():
+        first = await pool_mod.init_asyncpg_pool()
+        assert await pool_mod.init_asyncpg_pool() is first
+        assert await pool_mod.get_asyncpg_pool() is first
+        assert len(created) == 1 and created[0]["statement_cache_size"] == 0
+
+        await pool_mod.close_asyncpg_pool()
+        assert first.closed and pool_mod._pool is None
+        # workers and scripts outside the lifespan get a pool lazily
+        assert await pool_mod.get_asyncpg_pool() is not first
+        assert len(created) == 2
+        await pool_mod.close_asyncpg_pool()
+
+    asyncio.run(run())
+
+
+def test_no_pool_without_postgres(monkeypatch):
+    monkeypatch.setattr(pool_mod, "_pool", None)
+    monkeypatch.setattr(pool_mod, "asyncpg_available", lambda: False)
+    assert asyncio.run(pool_mod.init_asyncpg_pool()) is None
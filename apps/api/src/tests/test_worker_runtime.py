@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from workers import runtime
+
+
+def test_tasks_share_one_persistent_loop(monkeypatch):
+    opened, closed = [], []
+
+    async def fake_open():
+        opened.append(asyncio.get_running_loop())
+
+    async def fake_close():
+        closed.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(runtime, "_open_resources", fake_open)
+    monkeypatch.setattr(runtime, "_close_resources", fake_close)
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    runtime._on_worker_process_init()
+    try:
+        first = runtime.run_async(current_loop())
+        second = runtime.run_async(current_loop())
+        assert first is second is opened[0]
+        assert runtime.start() is first  # idempotent
+        assert len(opened) == 1
+
+        with pytest.raises(ValueError):
+            runtime.run_async(_fail())
+    finally:
+        runtime._on_worker_process_shutdown()
+    assert closed == [first] and first.is_closed()
+
+
+async def _fail():
+    raise ValueError("boom")
+
+
+def test_run_async_refuses_to_block_a_running_loop(monkeypatch):
+    async def noop():
+        pass
+
+    monkeypatch.setattr(runtime, "_open_resources", noop)
+    monkeypatch.setattr(runtime, "_close_resources", noop)
+
+    async def main():
+        coro = noop()
+        try:
+            runtime.run_async(coro)
+        finally:
+            coro.close()
+
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(main())
+    finally:
+        runtime.stop()
@@ -1,13 +1,13 @@
 """Periodic cleanup of expired arbitrage_opportunities rows."""
 from __future__ import annotations
 
-import asyncio
 import logging
 
 from sqlalchemy import text
 
 from celery_app import celery_app
 from db.session import DATABASE_URL, async_session_maker
+from workers.runtime import run_async
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +26,6 @@ async def _delete_expired_arbs() -> int:
 
 @celery_app.task(name="workers.arb_cleanup.arb_cleanup_task")
 def arb_cleanup_task() -> None:
-    n = asyncio.run(_delete_expired_arbs())
+    n = run_async(_delete_expired_arbs())
     if n:
         logger.info("arb_cleanup: removed %s expired arbitrage_opportunities rows", n)
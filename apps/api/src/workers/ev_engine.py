@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 from services.ev_service import ev_service
 
 from celery_app import celery_app
-import asyncio
+from workers.runtime import run_async
 
 class EVEngine:
     async def run_ev_cycle(self, sport: str):
@@ -55,11 +55,6 @@ class EVEngine:
 @celery_app.task(name="workers.ev_engine.run_ev_cycle_task")
 def run_ev_cycle_task(sport: str):
     """Celery task wrapper for the async EV cycle"""
-    loop = asyncio.get_event_loop()
-    if loop.is_running():
-        # If already in a loop (unlikely for Celery worker process), use create_task
-        asyncio.create_task(ev_engine.run_ev_cycle(sport))
-    else:
-        loop.run_until_complete(ev_engine.run_ev_cycle(sport))
+    run_async(ev_engine.run_ev_cycle(sport))
 
 ev_engine = EVEngine()
@@ -0,0 +1,136 @@
+"""
+One long-lived event loop per Celery worker process.
+
+Tasks used to drive their coroutines with ``asyncio.get_event_loop().run_until_complete``
+or ``asyncio.run``. ``asyncio.run`` closes its loop afterwards, so the SQLAlchemy pool,
+the Redis client and the httpx pools of the module-level clients kept connections bound
+to a dead loop, and the next task failed with "attached to a different loop" or paid
+for a fresh connect (the ingest coordinator re-ran ``cache.connect()`` every tick).
+
+``worker_process_init`` now starts a loop on a daemon thread in each worker process
+and opens the shared resources on it once: Redis (``cache.connect``) and the asyncpg
+pool, after dropping any engine pool inherited across the fork. Tasks submit their
+coroutine with ``run_async`` and block on the result, so every task in the process
+reuses the same connections. ``worker_process_shutdown`` closes them again.
+
+Running the loop on its own thread works for every pool type (prefork, solo,
+threads); with ``solo`` / ``threads`` there is no process-init signal, so the first
+``run_async`` call starts the runtime instead.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SHUTDOWN_TIMEOUT_SECONDS = 30.0
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+async def _open_resources() -> None:
+    from db.asyncpg_pool import init_asyncpg_pool
+    from services.cache import cache
+
+    await cache.connect()
+    await init_asyncpg_pool()
+
+
+async def _close_resources() -> None:
+    from db.asyncpg_pool import close_asyncpg_pool
+    from db.session import engine
+    from services.cache import cache
+    from services.heartbeat_service import heartbeat_buffer
+
+    for name, closer in (
+        ("heartbeat buffer", heartbeat_buffer.stop),
+        ("asyncpg pool", close_asyncpg_pool),
+        ("SQLAlchemy engine", engine.dispose),
+        ("cache", cache.close),
+    ):
+        try:
+            await closer()
+        except Exception as e:
+            logger.warning("worker runtime: closing %s failed: %s", name, e)
+
+
+def start() -> asyncio.AbstractEventLoop:
+    """Start this process's loop thread and open shared resources on it (idempotent)."""
+    global _loop, _thread
+    with _lock:
+        if _loop is not None and _thread is not None and _thread.is_alive():
+            return _loop
+
+        from db.session import engine
+
+        # Connections checked out by the parent must not be shared with the child.
+        engine.sync_engine.dispose(close=False)
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="celery-async-runtime", daemon=True)
+        thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(_open_resources(), loop).result()
+        except Exception as e:
+            # Same degradation as the API: cache falls back to memory, raw SQL to direct connects.
+            logger.warning("worker runtime: resource init incomplete: %s", e)
+        _loop, _thread = loop, thread
+        logger.info("worker runtime: event loop started")
+        return loop
+
+
+def stop() -> None:
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop = _thread = None
+    if loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_close_resources(), loop).result(SHUTDOWN_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning("worker runtime: shutdown incomplete: %s", e)
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(SHUTDOWN_TIMEOUT_SECONDS)
+    if not loop.is_running():
+        loop.close()
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """Run ``coro`` on the worker loop and wait for its result."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        # Called from async code (eager task inside the API): blocking here would stall it.
+        raise RuntimeError("run_async() cannot be called from a running event loop; await the coroutine instead")
+    loop = _loop if _thread is not None and _thread.is_alive() else start()
+    future: Future[Any] = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result()
+    except BaseException:
+        # Soft time limit / worker shutdown interrupted the wait: do not leave the task running.
+        future.cancel()
+        raise
+
+
+@worker_process_init.connect
+def _on_worker_process_init(**_: Any) -> None:
+    start()
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**_: Any) -> None:
+    stop()
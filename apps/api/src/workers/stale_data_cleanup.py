@@ -1,13 +1,13 @@
 """Periodic cleanup for stale operational market data tables."""
 from __future__ import annotations
 
-import asyncio
 import logging
 
 from sqlalchemy import text
 
 from celery_app import celery_app
 from db.session import DATABASE_URL, async_session_maker
+from workers.runtime import run_async
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +37,6 @@ async def _cleanup_stale_rows() -> int:
 
 @celery_app.task(name="workers.stale_data_cleanup.stale_data_cleanup_task")
 def stale_data_cleanup_task() -> None:
-    removed = asyncio.run(_cleanup_stale_rows())
+    removed = run_async(_cleanup_stale_rows())
     if removed:
         logger.info("stale_data_cleanup: removed %s stale rows", removed)